@@ -201,12 +201,18 @@ def test_cli_screenshot(caplog):
              "🔹 Getting page for: body-lorem-ipsum (Default)"),
             ("py-website-capture", 20,
              "🔹 Getting page for: window-lorem-ipsum (Default)"),
+            ("py-website-capture", 20,
+             "🔸 [1] Done: body-lorem-ipsum (Default)"),
+            ("py-website-capture", 20,
+             "🔸 [2] Done: window-lorem-ipsum (Default)"),
         ]
 
         assert sorted(os.listdir(test_cwd)) == sorted([
             "body_Default.png",
             "window_Default.png",
             "foo.json",
+            "journal.jsonl",
+            "summary.json",
         ])
 
         expected = os.path.join(test_cwd, "body_Default.png")
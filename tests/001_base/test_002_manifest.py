@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+from website_capture.manifest import (CaptureManifest, get_config_fingerprint,
+                                      get_page_validator)
+
+
+def test_config_fingerprint():
+    """
+    Fingerprint should not depend from items order but from their values.
+    """
+    assert get_config_fingerprint({"name": "foo", "url": "bar"}) == (
+        get_config_fingerprint({"url": "bar", "name": "foo"})
+    )
+    assert get_config_fingerprint({"name": "foo", "url": "bar"}) != (
+        get_config_fingerprint({"name": "foo", "url": "ping"})
+    )
+
+
+def test_page_validator(temp_builds_dir):
+    """
+    Validator should change when page content changes.
+    """
+    basedir = temp_builds_dir.join("manifest_page_validator")
+    os.makedirs(basedir)
+    path = os.path.join(basedir, "page.html")
+    url = "file://{}".format(path)
+
+    with io.open(path, "w") as fp:
+        fp.write("<html>Foo</html>")
+    os.utime(path, (1000000000, 1000000000))
+
+    first = get_page_validator(url)
+    assert first is not None
+    assert get_page_validator(url, previous=first) == first
+
+    with io.open(path, "w") as fp:
+        fp.write("<html>Bar</html>")
+    os.utime(path, (1000000042, 1000000042))
+
+    assert get_page_validator(url, previous=first) != first
+
+
+def test_page_validator_unreachable():
+    assert get_page_validator("http://127.0.0.1:1/nope") is None
+    assert get_page_validator("some_url") is None
+
+
+def test_manifest_save_merge(temp_builds_dir):
+    """
+    Saving manifest should keep entries saved from another instance.
+    """
+    basedir = temp_builds_dir.join("manifest_save_merge")
+    path = os.path.join(basedir, "manifest.json")
+
+    first = CaptureManifest(path).load()
+    second = CaptureManifest(path).load()
+
+    first.update("foo", "fingerprint-foo", {"etag": "1"}, {"name": "foo"})
+    second.update("bar", "fingerprint-bar", None, {"name": "bar"})
+    first.save()
+    second.save()
+
+    with io.open(path, "r") as fp:
+        content = json.load(fp)
+
+    assert sorted(content.keys()) == ["bar", "foo"]
+    assert CaptureManifest(path).load().get("foo") == {
+        "fingerprint": "fingerprint-foo",
+        "validator": {"etag": "1"},
+        "payload": {"name": "foo"},
+    }
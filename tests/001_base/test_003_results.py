@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+from website_capture.results import (CombinedResults, ResultJournal,
+                                     ResultWriter, serialize_result)
+
+
+def test_serialize_result():
+    """
+    Error exception should be turned to a string without modifying original
+    item.
+    """
+    error = ValueError("Nope")
+    item = {"name": "foo", "size": (1, 42), "error": error}
+
+    assert serialize_result("dummy", "error", item) == {
+        "interface": "dummy",
+        "status": "error",
+        "item": {"name": "foo", "size": (1, 42), "error": "Nope"},
+    }
+    assert item["error"] is error
+
+
+def test_result_writer():
+    """
+    Each result should be written as a JSON line.
+    """
+    fp = io.StringIO()
+    writer = ResultWriter(fp)
+
+    writer.write("dummy", "success", {"name": "foo", "size": (1, 42)})
+    writer.write("dummy", "error", {"name": "bar", "error": ValueError("Nope")})
+
+    assert [json.loads(line) for line in fp.getvalue().splitlines()] == [
+        {
+            "interface": "dummy",
+            "status": "success",
+            "item": {"name": "foo", "size": [1, 42]},
+        },
+        {
+            "interface": "dummy",
+            "status": "error",
+            "item": {"name": "bar", "error": "Nope"},
+        },
+    ]
+
+
+def test_combined_results():
+    """
+    Results should be grouped by interface with counts for each status.
+    """
+    fp = io.StringIO()
+    combined = CombinedResults(fp, interfaces=["dummy", "chrome"])
+
+    combined.add("dummy", "success", {"name": "foo", "size": (1, 42)})
+    combined.add("dummy", "error", {"name": "bar", "error": ValueError("No")})
+    combined.add("firefox", "skipped", {"name": "foo", "skipped": True})
+    combined.save()
+
+    assert json.loads(fp.getvalue()) == {
+        "chrome": {
+            "counts": {"error": 0, "skipped": 0, "success": 0},
+            "results": [],
+        },
+        "dummy": {
+            "counts": {"error": 1, "skipped": 0, "success": 1},
+            "results": [
+                {"status": "success",
+                 "item": {"name": "foo", "size": [1, 42]}},
+                {"status": "error", "item": {"name": "bar", "error": "No"}},
+            ],
+        },
+        "firefox": {
+            "counts": {"error": 0, "skipped": 1, "success": 0},
+            "results": [
+                {"status": "skipped",
+                 "item": {"name": "foo", "skipped": True}},
+            ],
+        },
+    }
+
+
+def test_journal_write_load(temp_builds_dir):
+    """
+    Journal should only load succeeded results and ignore a truncated line.
+    """
+    path = temp_builds_dir.join("journal_write_load", "journal.jsonl")
+
+    journal = ResultJournal(str(path)).open()
+    journal.write("Dummy:1x42:foo", "DummyInterface", "success",
+                  {"name": "foo", "size": (1, 42)})
+    journal.write("Dummy:1x42:bar", "DummyInterface", "error",
+                  {"name": "bar", "size": (1, 42), "error": ValueError()})
+    journal.close()
+
+    with io.open(str(path), "a") as fp:
+        fp.write('{"key": "Dummy:1x42:ping", "status": "succ')
+
+    journal = ResultJournal(str(path)).open(resume=True)
+
+    assert journal.finished == {
+        "Dummy:1x42:foo": {"name": "foo", "size": [1, 42]},
+    }
+    assert journal.get("Dummy:1x42:bar") is None
+
+    journal.write("Dummy:1x42:ping", "DummyInterface", "success",
+                  {"name": "ping", "size": (1, 42)})
+    journal.close()
+
+    assert sorted(ResultJournal(str(path)).load().finished) == [
+        "Dummy:1x42:foo",
+        "Dummy:1x42:ping",
+    ]
+
+
+def test_journal_open_restart(temp_builds_dir):
+    """
+    Opening journal without resume should start it again from scratch.
+    """
+    path = temp_builds_dir.join("journal_open_restart", "journal.jsonl")
+
+    journal = ResultJournal(str(path)).open()
+    journal.write("Dummy:1x42:foo", "DummyInterface", "success",
+                  {"name": "foo", "size": (1, 42)})
+    journal.close()
+
+    journal = ResultJournal(str(path)).open()
+    journal.close()
+
+    assert journal.finished == {}
+    assert os.path.getsize(str(path)) == 0
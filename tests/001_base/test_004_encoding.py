@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import io
+import threading
+
+import pytest
+
+from website_capture.encoding import (ScreenshotEncoder, encode_screenshot,
+                                      validate_encoding_options)
+from website_capture.exceptions import (PageConfigError,
+                                        ScreenshotEncodingError)
+from website_capture.interfaces.dummy import DummyInterface
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def build_config(basedir, name, **options):
+    interface = DummyInterface(basedir, size_dir=False)
+    interface.DESTINATION_FILEPATH = "{name}"
+
+    return interface.get_page_config(
+        dict({"name": name, "url": "http://localhost/"}, **options),
+        interface._default_size_value,
+    )
+
+
+def test_encode_screenshot_raw(temp_builds_dir, png_content):
+    """
+    Default PNG screenshot should be written as it comes from driver.
+    """
+    basedir = temp_builds_dir.join("encode_raw").mkdir()
+    config = build_config(str(basedir), "foo")
+
+    assert encode_screenshot(png_content, config) == config["screenshot_path"]
+    assert config["screenshot_path"].endswith("/foo.png")
+
+    with io.open(config["screenshot_path"], "rb") as fp:
+        assert fp.read() == png_content
+
+
+@pytest.mark.parametrize("options,extension,expected_format", [
+    ({"screenshot_format": "jpeg", "screenshot_quality": 60}, "jpg", "JPEG"),
+    ({"screenshot_format": "webp"}, "webp", "WEBP"),
+    ({"screenshot_optimize": True}, "png", "PNG"),
+])
+def test_encode_screenshot_format(temp_builds_dir, png_content, options,
+                                  extension, expected_format):
+    """
+    Screenshot should be re-encoded to the required format.
+    """
+    basedir = temp_builds_dir.join(
+        "encode_format_{}".format(expected_format)
+    ).mkdir()
+    config = build_config(str(basedir), "foo", **options)
+
+    path = encode_screenshot(png_content, config)
+
+    assert path.endswith("/foo.{}".format(extension))
+    with Image.open(path) as image:
+        assert image.format == expected_format
+        assert image.size == (40, 30)
+
+
+def test_encode_screenshot_thumbnail(temp_builds_dir, png_content):
+    """
+    Thumbnail should be written next to screenshot and fit in given size.
+    """
+    basedir = temp_builds_dir.join("encode_thumbnail").mkdir()
+    config = build_config(str(basedir), "foo", screenshot_thumbnail=[20, 20])
+
+    encode_screenshot(png_content, config)
+
+    assert config["thumbnail_path"].endswith("/foo.thumb.png")
+    with Image.open(config["screenshot_path"]) as image:
+        assert image.size == (40, 30)
+    with Image.open(config["thumbnail_path"]) as image:
+        assert image.size == (20, 15)
+
+
+@pytest.mark.parametrize("options", [
+    {"screenshot_format": "gif"},
+    {"screenshot_quality": 0},
+    {"screenshot_quality": "high"},
+    {"screenshot_thumbnail": [20]},
+    {"screenshot_thumbnail": [20, -1]},
+])
+def test_validate_encoding_options(options):
+    with pytest.raises(PageConfigError):
+        validate_encoding_options(dict({"name": "foo"}, **options))
+
+
+def test_encoder_background(temp_builds_dir, png_content):
+    """
+    Encoder should write screenshots from its threads, with a bounded number
+    of pending screenshots, and every ones should be written once closed.
+    """
+    basedir = temp_builds_dir.join("encoder_background").mkdir()
+    encoder = ScreenshotEncoder(workers=2, max_pending=2)
+    threads = set()
+
+    original_run = encoder.run
+
+    def run(config, func, *args):
+        threads.add(threading.current_thread().name)
+        return original_run(config, func, *args)
+
+    encoder.run = run
+
+    configs = [
+        build_config(str(basedir), "p{}".format(i), screenshot_format="webp")
+        for i in range(6)
+    ]
+    for config in configs:
+        encoder.submit(png_content, config)
+    encoder.close()
+
+    assert encoder.errors == []
+    assert all([name.startswith("screenshot-encoder") for name in threads])
+    for config in configs:
+        with Image.open(config["screenshot_path"]) as image:
+            assert image.format == "WEBP"
+
+
+def test_encoder_error(temp_builds_dir):
+    """
+    Encoding error should be logged without stopping the encoder.
+    """
+    basedir = temp_builds_dir.join("encoder_error").mkdir()
+    encoder = ScreenshotEncoder()
+
+    config = build_config(str(basedir), "foo", screenshot_format="webp")
+    encoder.submit(b"not an image", config)
+    encoder.close()
+
+    assert [item["name"] for item in encoder.errors] == ["foo"]
+
+
+class BrokenScreenshotInterface(DummyInterface):
+    """
+    Dummy interface which takes screenshots which can not be decoded.
+    """
+    DESTINATION_FILEPATH = "{name}"
+
+    def task_screenshot(self, driver, config, response):
+        return self.save_screenshot(config, b"not an image")
+
+
+def test_encoder_error_page_job(temp_builds_dir):
+    """
+    Page job should fail once its screenshot could not be encoded in
+    background.
+    """
+    basedir = temp_builds_dir.join("encoder_error_page_job")
+    interface = BrokenScreenshotInterface(basedir, size_dir=False)
+
+    built, error_logs = interface.run([{
+        "name": "foo",
+        "url": "http://localhost/foo",
+        "tasks": ["screenshot"],
+        "screenshot_format": "webp",
+    }])
+
+    assert built == []
+    assert [item["name"] for item in error_logs] == ["foo"]
+    assert isinstance(error_logs[0]["error"], ScreenshotEncodingError)
+    assert "foo.webp" in str(error_logs[0]["error"])
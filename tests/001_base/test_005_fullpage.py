@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+
+import pytest
+
+from website_capture.encoding import ScreenshotEncoder
+from website_capture.fullpage import FullpageStitcher, PNGStreamWriter
+from website_capture.interfaces.dummy import DummyInterface
+
+from tests.conftest import build_png
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def build_config(basedir, name, **options):
+    interface = DummyInterface(basedir, size_dir=False)
+    interface.DESTINATION_FILEPATH = "{name}"
+
+    return interface.get_page_config(
+        dict({"name": name, "url": "http://localhost/"}, **options),
+        interface._default_size_value,
+    )
+
+
+def test_png_stream_writer():
+    """
+    Rows written in many blocks should make a valid PNG image.
+    """
+    fp = io.BytesIO()
+    writer = PNGStreamWriter(fp, 4, 3)
+    writer.write_rows(bytes([255, 0, 0]) * 4)
+    writer.write_rows(bytes([0, 255, 0]) * 4 + bytes([0, 0, 255]) * 4)
+    writer.close()
+
+    fp.seek(0)
+    with Image.open(fp) as image:
+        assert image.size == (4, 3)
+        assert [image.getpixel((0, y)) for y in range(3)] == [
+            (255, 0, 0),
+            (0, 255, 0),
+            (0, 0, 255),
+        ]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_stitcher(temp_builds_dir, workers):
+    """
+    Tiles should be stitched in order with the already captured part of last
+    tile skipped, strip files are removed once finished.
+    """
+    basedir = temp_builds_dir.join("stitcher_{}".format(workers)).mkdir()
+    config = build_config(str(basedir), "foo", screenshot_method="fullpage")
+    encoder = ScreenshotEncoder(workers=workers) if workers else None
+
+    stitcher = FullpageStitcher(config, 30, encoder=encoder)
+    stitcher.add_tile(build_png(40, 30, (10, 0, 0)))
+    stitcher.add_tile(build_png(40, 30, (20, 0, 0)))
+    stitcher.add_tile(build_png(40, 30, (30, 0, 0)), skip=20)
+    path = stitcher.finish()
+
+    if encoder:
+        encoder.close()
+        assert encoder.errors == []
+
+    with Image.open(path) as image:
+        assert image.size == (40, 70)
+        assert [image.getpixel((0, y))[0] for y in (0, 29, 30, 59, 60, 69)] == [
+            10, 10, 20, 20, 30, 30,
+        ]
+
+    assert os.listdir(str(basedir)) == ["foo.png"]
+
+
+def test_stitcher_reencode(temp_builds_dir):
+    """
+    Stitched screenshot should be encoded to the page screenshot format.
+    """
+    basedir = temp_builds_dir.join("stitcher_reencode").mkdir()
+    config = build_config(str(basedir), "foo", screenshot_method="fullpage",
+                          screenshot_format="webp")
+
+    stitcher = FullpageStitcher(config, 30)
+    stitcher.add_tile(build_png(40, 30))
+    stitcher.add_tile(build_png(40, 30))
+    path = stitcher.finish()
+
+    with Image.open(path) as image:
+        assert image.format == "WEBP"
+        assert image.size == (40, 60)
+
+    assert os.listdir(str(basedir)) == ["foo.webp"]
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+import pytest
+
+from website_capture import diff
+from website_capture.diff import (compare_screenshots, find_screenshots,
+                                  get_cache_path)
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def save_image(path, size=(100, 80), color=(200, 30, 30), boxes=None):
+    """
+    Save an image filled with color with some boxes of other colors.
+    """
+    image = Image.new("RGB", size, color)
+    for box, box_color in (boxes or []):
+        image.paste(box_color, box)
+    image.save(path)
+
+    return path
+
+
+def test_compare_unchanged(temp_builds_dir):
+    """
+    Identical images should be unchanged without any diff image and baseline
+    block hashes should be cached.
+    """
+    basedir = temp_builds_dir.join("diff_unchanged").mkdir()
+    path = save_image(str(basedir.join("current.png")))
+    baseline_path = save_image(str(basedir.join("baseline.png")))
+    diff_path = str(basedir.join("current.diff.png"))
+
+    result = compare_screenshots(path, baseline_path, diff_path=diff_path)
+
+    assert result == {
+        "status": "unchanged",
+        "score": 0.0,
+        "mismatched": 0,
+        "blocks": 0,
+        "baseline": baseline_path,
+        "diff": None,
+    }
+    assert not os.path.exists(diff_path)
+
+    with io.open(get_cache_path(baseline_path), "r") as fp:
+        cache = json.load(fp)
+    # 100x80 image is divided in two columns and two rows of blocks
+    assert len(cache["hashes"]) == 4
+
+
+def test_compare_cached_hashes(temp_builds_dir, monkeypatch):
+    """
+    Baseline hashes should be computed again only when baseline has changed.
+    """
+    basedir = temp_builds_dir.join("diff_cached_hashes").mkdir()
+    path = save_image(str(basedir.join("current.png")))
+    baseline_path = save_image(str(basedir.join("baseline.png")))
+
+    compare_screenshots(path, baseline_path)
+
+    calls = []
+    original = diff.get_block_hashes
+
+    def get_block_hashes(image, block_size=diff.DIFF_BLOCK_SIZE):
+        calls.append(image.size)
+        return original(image, block_size)
+
+    monkeypatch.setattr(diff, "get_block_hashes", get_block_hashes)
+
+    compare_screenshots(path, baseline_path)
+    # Only current image has been hashed
+    assert len(calls) == 1
+
+    save_image(baseline_path, boxes=[((0, 0, 10, 10), (0, 0, 0))])
+    os.utime(baseline_path, ns=(1, 1))
+
+    result = compare_screenshots(path, baseline_path)
+    assert len(calls) == 3
+    assert result["status"] == "changed"
+
+
+def test_compare_changed(temp_builds_dir):
+    """
+    Changed pixels should be counted from changed blocks only, a diff image
+    is written.
+    """
+    basedir = temp_builds_dir.join("diff_changed").mkdir()
+    path = save_image(str(basedir.join("current.png")),
+                      boxes=[((10, 10, 20, 20), (0, 0, 0))])
+    baseline_path = save_image(str(basedir.join("baseline.png")))
+    diff_path = str(basedir.join("current.diff.png"))
+
+    result = compare_screenshots(path, baseline_path, diff_path=diff_path)
+
+    assert result["status"] == "changed"
+    assert result["mismatched"] == 100
+    assert result["score"] == 100 / 8000
+    assert result["blocks"] == 1
+    assert result["diff"] == diff_path
+
+    with Image.open(diff_path) as image:
+        assert image.size == (100, 80)
+        assert image.getpixel((15, 15)) == diff.DIFF_COLOR
+        assert image.getpixel((50, 50)) != diff.DIFF_COLOR
+
+
+@pytest.mark.parametrize("options,expected_status,expected_mismatched", [
+    ({}, "changed", 100),
+    ({"threshold": 0.02}, "unchanged", 100),
+    ({"tolerance": 5}, "changed", 100),
+    ({"tolerance": 10}, "unchanged", 0),
+    ({"ignore": [[10, 10, 5, 10]]}, "changed", 50),
+    ({"ignore": [[0, 0, 50, 50]]}, "unchanged", 0),
+])
+def test_compare_options(tmpdir, options, expected_status,
+                         expected_mismatched):
+    """
+    Threshold, tolerance and ignored regions should be used to compare.
+    """
+    basedir = tmpdir
+    path = save_image(str(basedir.join("current.png")),
+                      boxes=[((10, 10, 20, 20), (200, 30, 40))])
+    baseline_path = save_image(str(basedir.join("baseline.png")))
+
+    result = compare_screenshots(path, baseline_path, **options)
+
+    assert result["status"] == expected_status
+    assert result["mismatched"] == expected_mismatched
+
+
+def test_compare_other_size(temp_builds_dir):
+    """
+    Pixels outside the common area should be mismatched.
+    """
+    basedir = temp_builds_dir.join("diff_other_size").mkdir()
+    path = save_image(str(basedir.join("current.png")), size=(100, 90))
+    baseline_path = save_image(str(basedir.join("baseline.png")))
+    diff_path = str(basedir.join("current.diff.png"))
+
+    result = compare_screenshots(path, baseline_path, diff_path=diff_path)
+
+    assert result["mismatched"] == 1000
+    assert result["score"] == 1000 / 9000
+
+    with Image.open(diff_path) as image:
+        assert image.size == (100, 90)
+        assert image.getpixel((50, 85)) == diff.DIFF_COLOR
+
+
+def test_compare_missing(temp_builds_dir):
+    basedir = temp_builds_dir.join("diff_missing").mkdir()
+    path = save_image(str(basedir.join("current.png")))
+
+    result = compare_screenshots(path, str(basedir.join("baseline.png")))
+
+    assert result["status"] == "missing"
+    assert result["score"] is None
+
+
+def test_find_screenshots(temp_builds_dir):
+    basedir = temp_builds_dir.join("diff_find_screenshots").mkdir()
+    basedir.join("1x42").mkdir()
+    for filename in ["foo.png", "foo.diff.png", "foo.thumb.png",
+                     "1x42/bar.webp", "1x42/bar.report.json",
+                     "foo.png.blocks.json", "ping.jpg"]:
+        basedir.join(filename).write("")
+
+    assert find_screenshots(str(basedir)) == [
+        "foo.png",
+        "ping.jpg",
+        os.path.join("1x42", "bar.webp"),
+    ]
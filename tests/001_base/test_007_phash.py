@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+import io
+import random
+
+import pytest
+
+from website_capture.phash import (HashIndex, compute_hashes, format_hashes,
+                                   hamming_distance, pack_bits, split_hash)
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def build_layout(reverse=False):
+    """
+    Build an image looking like a page layout with a header, a sidebar and
+    some text lines.
+    """
+    background, foreground = (255, 255, 255), (30, 30, 120)
+    if reverse:
+        background, foreground = foreground, background
+
+    image = Image.new("RGB", (120, 160), background)
+    image.paste(foreground, (0, 0, 120, 24))
+    image.paste(foreground, (0, 24, 30, 160))
+    for top in range(40, 150, 16):
+        image.paste(foreground, (40, top, 110 - top // 4, top + 6))
+
+    return image
+
+
+def test_pack_bits():
+    assert pack_bits([]) == 0
+    assert pack_bits([True, False, True]) == 5
+    assert pack_bits([1] * 64) == 2 ** 64 - 1
+
+
+def test_hamming_distance():
+    assert hamming_distance(0, 0) == 0
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, 2 ** 64 - 1) == 64
+
+
+def test_compute_hashes():
+    """
+    Hashes should be 64 bits, same for resized images and different for
+    another image.
+    """
+    image = build_layout()
+    hashes = compute_hashes(image)
+
+    assert sorted(hashes) == ["ahash", "dhash", "phash"]
+    assert all([0 <= value < 2 ** 64 for value in hashes.values()])
+
+    resized = compute_hashes(image.resize((240, 320)))
+    for kind in hashes:
+        assert hamming_distance(hashes[kind], resized[kind]) <= 4
+
+    reversed_hashes = compute_hashes(build_layout(reverse=True))
+    assert hamming_distance(hashes["phash"], reversed_hashes["phash"]) > 10
+
+    assert format_hashes({"ahash": 255}) == {"ahash": "00000000000000ff"}
+
+
+def test_index_roundtrip(temp_builds_dir):
+    """
+    Index should be written to a file of fixed size entries and loaded back.
+    """
+    path = temp_builds_dir.join("phash_roundtrip.idx").strpath
+
+    index = HashIndex(path)
+    index.add("foo.png", {"ahash": 1, "dhash": 2, "phash": 2 ** 64 - 1})
+    index.add("1x42/bar.png", {"ahash": 3, "dhash": 4, "phash": 5})
+    index.add("foo.png", {"ahash": 6, "dhash": 7, "phash": 8})
+    index.save()
+
+    with io.open(path, "rb") as fp:
+        content = fp.read()
+    assert len(content) == (
+        HashIndex.HEADER.size + 2 * 3 * 8 + len("foo.png\n1x42/bar.png")
+    )
+
+    loaded = HashIndex(path).load()
+    assert len(loaded) == 2
+    assert loaded.get("foo.png") == {"ahash": 6, "dhash": 7, "phash": 8}
+    assert loaded.get("1x42/bar.png") == {"ahash": 3, "dhash": 4, "phash": 5}
+    assert loaded.get("nope.png") is None
+
+    with pytest.raises(ValueError):
+        index.add("foo\nbar", {"ahash": 1, "dhash": 2, "phash": 3})
+
+
+def test_index_invalid_file(temp_builds_dir, caplog):
+    path = temp_builds_dir.join("phash_invalid.idx").strpath
+    with io.open(path, "wb") as fp:
+        fp.write(b"nope")
+
+    assert len(HashIndex(path).load()) == 0
+    assert caplog.record_tuples == [
+        ("py-website-capture", 30,
+         "Ignored invalid hash index file: {}".format(path)),
+    ]
+
+
+def test_index_save_merge(temp_builds_dir):
+    """
+    Saving should keep entries saved from another instance in the meantime.
+    """
+    path = temp_builds_dir.join("phash_merge.idx").strpath
+
+    first = HashIndex(path).load()
+    second = HashIndex(path).load()
+
+    first.add("foo.png", {"ahash": 1, "dhash": 1, "phash": 1})
+    second.add("bar.png", {"ahash": 2, "dhash": 2, "phash": 2})
+    first.save()
+    second.save()
+
+    loaded = HashIndex(path).load()
+    assert sorted(loaded.keys) == ["bar.png", "foo.png"]
+
+
+def test_index_queries(temp_builds_dir):
+    index = HashIndex(temp_builds_dir.join("phash_queries.idx").strpath)
+    index.add("a.png", {"ahash": 0, "dhash": 0, "phash": 0b0000})
+    index.add("b.png", {"ahash": 0, "dhash": 0, "phash": 0b0001})
+    index.add("c.png", {"ahash": 0, "dhash": 0, "phash": 0b0111})
+    index.add("d.png", {"ahash": 0, "dhash": 0, "phash": 0b0000})
+
+    assert index.query(0) == [("a.png", 0), ("d.png", 0)]
+    assert index.query(0, distance=1) == [
+        ("a.png", 0), ("d.png", 0), ("b.png", 1),
+    ]
+
+    assert index.duplicates() == [["a.png", "d.png"]]
+    assert index.duplicates(distance=1) == [["a.png", "b.png", "d.png"]]
+    assert index.duplicates(distance=2) == [
+        ["a.png", "b.png", "c.png", "d.png"],
+    ]
+    assert index.duplicates(kind="ahash") == [
+        ["a.png", "b.png", "c.png", "d.png"],
+    ]
+
+    other = HashIndex(temp_builds_dir.join("phash_other.idx").strpath)
+    other.add("a.png", {"ahash": 0, "dhash": 0, "phash": 0b0000})
+    other.add("b.png", {"ahash": 0, "dhash": 0, "phash": 0b0000})
+    other.add("c.png", {"ahash": 0, "dhash": 0, "phash": 0b1111})
+    other.add("e.png", {"ahash": 0, "dhash": 0, "phash": 0b0000})
+
+    assert index.compare(other) == {
+        "unchanged": ["a.png"],
+        "changed": ["b.png", "c.png"],
+        "added": ["d.png"],
+        "removed": ["e.png"],
+    }
+    assert index.compare(other, distance=1)["changed"] == []
+
+
+@pytest.mark.parametrize("count", [1, 3, 64])
+def test_split_hash(count):
+    value = random.Random(count).getrandbits(64)
+    chunks = split_hash(value, count)
+
+    assert len(chunks) == count
+    # Chunks are joined back from the most significant ones
+    widths = [64 // count + (1 if i < 64 % count else 0)
+              for i in range(count)]
+    joined = 0
+    for chunk, width in reversed(list(zip(chunks, widths))):
+        joined = (joined << width) | chunk
+    assert joined == value
+
+
+@pytest.mark.parametrize("distance", [1, 4, 9, 64])
+def test_index_duplicates_bands(temp_builds_dir, distance):
+    """
+    Duplicates found from hash bands should be the same than from comparing
+    every pairs of hashes.
+    """
+    rand = random.Random(distance)
+    index = HashIndex(temp_builds_dir.join("phash_bands.idx").strpath)
+
+    values = []
+    for i in range(20):
+        value = rand.getrandbits(64)
+        values.append(value)
+        # Near hashes with a few flipped bits
+        for j in range(3):
+            for bit in rand.sample(range(64), rand.randint(1, 6)):
+                value ^= 1 << bit
+            values.append(value)
+
+    for i, value in enumerate(values):
+        index.add("{}.png".format(i), {
+            "ahash": 0, "dhash": 0, "phash": value,
+        })
+
+    parents = list(range(len(values)))
+
+    def find(i):
+        while parents[i] != i:
+            i = parents[i]
+        return i
+
+    for i in range(len(values)):
+        for j in range(i + 1, len(values)):
+            if hamming_distance(values[i], values[j]) <= distance:
+                parents[find(j)] = find(i)
+
+    groups = {}
+    for i in range(len(values)):
+        groups.setdefault(find(i), []).append("{}.png".format(i))
+    expected = sorted(
+        [sorted(keys) for keys in groups.values() if len(keys) > 1]
+    )
+
+    assert index.duplicates(distance=distance) == expected
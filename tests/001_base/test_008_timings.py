@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+import pytest
+
+from website_capture.timings import (PhaseTimer, RunSummary, percentile,
+                                     time_phase)
+
+
+@pytest.mark.parametrize("values,rank,expected", [
+    ([], 50, None),
+    ([1], 95, 1),
+    ([1, 2, 3, 4], 50, 2),
+    ([1, 2, 3, 4], 95, 4),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 0, 1),
+])
+def test_percentile(values, rank, expected):
+    assert percentile(values, rank) == expected
+
+
+def test_phase_timer():
+    """
+    Phases timed multiple times should be accumulated, even on error.
+    """
+    timer = PhaseTimer()
+
+    with timer.phase("foo"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.phase("bar"):
+            raise ValueError()
+    first = timer.timings["foo"]
+    with time_phase({"timer": timer}, "foo"):
+        pass
+
+    assert sorted(timer.timings) == ["bar", "foo"]
+    assert timer.timings["foo"] > first
+
+    # Without any timer nothing is timed
+    with time_phase({}, "foo"):
+        pass
+
+
+def test_run_summary(temp_builds_dir):
+    path = temp_builds_dir.join("timings_summary", "summary.json").strpath
+
+    summary = RunSummary(path)
+    for i in range(1, 21):
+        summary.add("DummyInterface", {"load": i / 10, "total": i})
+    summary.add("OtherInterface", {"total": 1})
+    summary.update_section("extra", {"foo": "bar"})
+
+    expected = {
+        "extra": {"foo": "bar"},
+        "interfaces": {
+            "DummyInterface": {
+                "pages": 20,
+                "phases": {
+                    "load": {"count": 20, "p50": 1.0, "p95": 1.9, "max": 2.0},
+                    "total": {"count": 20, "p50": 10, "p95": 19, "max": 20},
+                },
+            },
+            "OtherInterface": {
+                "pages": 1,
+                "phases": {
+                    "total": {"count": 1, "p50": 1, "p95": 1, "max": 1},
+                },
+            },
+        },
+    }
+    assert summary.save() == expected
+
+    with io.open(path, "r") as fp:
+        assert json.load(fp) == expected
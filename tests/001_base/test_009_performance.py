@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from website_capture.performance import get_performance_metrics
+
+from tests.conftest import PERFORMANCE_ENTRIES
+
+
+def test_performance_metrics():
+    metrics = get_performance_metrics(PERFORMANCE_ENTRIES)
+
+    assert metrics["ttfb"] == 120.5
+    assert metrics["dom_content_loaded"] == 300
+    assert metrics["load"] == 450
+    assert metrics["first_paint"] == 310
+    assert metrics["first_contentful_paint"] == 320
+    assert metrics["largest_contentful_paint"] == 400
+    assert metrics["transfer_size"] == 2048
+    assert metrics["resources_count"] == 2
+    assert metrics["resources_transfer_size"] == 600
+    assert metrics["resources_decoded_size"] == 2500
+    # Resources are ordered by start time
+    assert metrics["resources"] == [
+        {
+            "url": "http://localhost/foo.css",
+            "type": "link",
+            "start": 150,
+            "duration": 50,
+            "ttfb": 30,
+            "transfer_size": 600,
+            "encoded_size": 500,
+            "decoded_size": 1500,
+        },
+        {
+            "url": "http://localhost/foo.js",
+            "type": "script",
+            "start": 200,
+            "duration": 80,
+            "ttfb": 50,
+            "transfer_size": 0,
+            "encoded_size": 300,
+            "decoded_size": 1000,
+        },
+    ]
+
+
+def test_performance_metrics_empty():
+    """
+    Missing entries or events which did not happen should give empty metrics.
+    """
+    metrics = get_performance_metrics({
+        "navigation": [{"startTime": 0, "responseStart": 10,
+                        "loadEventEnd": 0}],
+    })
+
+    assert metrics["ttfb"] == 10
+    assert metrics["load"] is None
+    assert metrics["first_contentful_paint"] is None
+    assert metrics["largest_contentful_paint"] is None
+    assert metrics["resources"] == []
+
+    assert get_performance_metrics(None)["ttfb"] is None
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from website_capture.exceptions import PageConfigError
+from website_capture.readiness import WAIT_INTERVAL, get_wait_options
+
+
+@pytest.mark.parametrize("wait_for,expected", [
+    (None, None),
+    ({}, None),
+    (
+        {"selector": "#app"},
+        {
+            "selector": "#app",
+            "network_idle": 0,
+            "fonts": False,
+            "script": None,
+            "timeout": 30000,
+            "interval": WAIT_INTERVAL,
+        },
+    ),
+    (
+        {
+            "network_idle": 500,
+            "fonts": True,
+            "script": "return window.ready;",
+            "timeout": 2.5,
+        },
+        {
+            "selector": None,
+            "network_idle": 500,
+            "fonts": True,
+            "script": "return window.ready;",
+            "timeout": 2500,
+            "interval": WAIT_INTERVAL,
+        },
+    ),
+])
+def test_get_wait_options(wait_for, expected):
+    assert get_wait_options({"name": "foo", "wait_for": wait_for}) == expected
+
+
+@pytest.mark.parametrize("wait_for", [
+    "#app",
+    {"nope": True},
+    {"selector": 42},
+    {"network_idle": -1},
+    {"timeout": "10"},
+    {"timeout": True},
+])
+def test_get_wait_options_invalid(wait_for):
+    with pytest.raises(PageConfigError):
+        get_wait_options({"name": "foo", "wait_for": wait_for})
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import base64
+import json
+
+import pytest
+
+from website_capture.blocking import (count_blocked_requests,
+                                      get_blocked_patterns,
+                                      get_firefox_preferences, get_pac_script)
+from website_capture.exceptions import PageConfigError
+
+
+def test_get_blocked_patterns():
+    """
+    Page patterns should be added to global ones.
+    """
+    patterns = get_blocked_patterns(
+        {"name": "foo", "block_urls": ["*://ads.com/*", "*.analytics.js"],
+         "block_resource_types": ["font"]},
+        block_urls=["*.analytics.js"],
+    )
+
+    assert patterns == [
+        "*.analytics.js", "*.eot", "*.eot?*", "*.otf", "*.otf?*", "*.ttf",
+        "*.ttf?*", "*.woff", "*.woff2", "*.woff2?*", "*.woff?*",
+        "*://ads.com/*",
+    ]
+
+    assert get_blocked_patterns({"name": "foo"}) == []
+
+    with pytest.raises(PageConfigError):
+        get_blocked_patterns({"name": "foo",
+                              "block_resource_types": ["nope"]})
+
+
+def test_firefox_preferences():
+    preferences = get_firefox_preferences(["*://ads.com/*"])
+
+    assert preferences["network.proxy.type"] == 2
+    prefix, content = preferences["network.proxy.autoconfig_url"].split(",")
+    assert prefix == "data:application/x-ns-proxy-autoconfig;base64"
+    assert base64.b64decode(content).decode("utf-8") == get_pac_script(
+        ["*://ads.com/*"]
+    )
+    assert 'var patterns = ["*://ads.com/*"];' in get_pac_script(
+        ["*://ads.com/*"]
+    )
+
+
+def test_firefox_preferences_proxy():
+    """
+    Requests which are not blocked should be sent to given proxy.
+    """
+    preferences = get_firefox_preferences([], proxy="127.0.0.1:8080")
+
+    assert preferences["network.proxy.type"] == 2
+    assert preferences["network.proxy.allow_hijacking_localhost"] is True
+    assert 'return "PROXY 127.0.0.1:8080";' in get_pac_script(
+        ["*://ads.com/*"], proxy="127.0.0.1:8080"
+    )
+    assert 'return "DIRECT";' in get_pac_script(["*://ads.com/*"])
+    assert "network.proxy.allow_hijacking_localhost" not in (
+        get_firefox_preferences(["*://ads.com/*"])
+    )
+
+
+def test_count_blocked_requests():
+    def entry(params):
+        return {"message": json.dumps({"message": {
+            "method": "Network.loadingFailed",
+            "params": params,
+        }})}
+
+    assert count_blocked_requests([
+        entry({"blockedReason": "inspector"}),
+        entry({"errorText": "net::ERR_FAILED"}),
+        {"message": "invalid"},
+        entry({"blockedReason": "inspector"}),
+    ]) == 2
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import urllib.error
+import urllib.request
+
+from website_capture.proxy import (CacheStore, CachingProxy, get_expires,
+                                   is_cacheable)
+
+from tests.conftest import OriginHandler
+
+
+def fetch(proxy, url, data=None):
+    """
+    Request given URL through proxy like a browser would do.
+    """
+    opener = urllib.request.build_opener(
+        urllib.request.ProxyHandler({"http": "http://" + proxy.address})
+    )
+    try:
+        with opener.open(url, data=data, timeout=10) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_is_cacheable():
+    assert is_cacheable(200, [("Content-Type", "text/css")]) is True
+    assert is_cacheable(200, [("Vary", "Accept-Encoding")]) is True
+    assert is_cacheable(404, []) is False
+    assert is_cacheable(
+        200, [("Cache-Control", "private, max-age=60")]
+    ) is False
+    assert is_cacheable(200, [("Set-Cookie", "id=1")]) is False
+    assert is_cacheable(200, [("Vary", "Cookie")]) is False
+
+
+def test_get_expires():
+    assert get_expires([("Cache-Control", "public, max-age=60")], 100) == 160
+    assert get_expires([("Cache-Control", "s-maxage=10, max-age=60")],
+                       100) == 110
+    assert get_expires(
+        [("Expires", "Thu, 01 Jan 1970 00:01:40 GMT")], 0
+    ) == 100
+    assert get_expires([("Expires", "invalid")], 0) is None
+    assert get_expires([], 0) is None
+
+
+def test_cache_store_lru(tmpdir):
+    """
+    Least recently used entries should be removed when cache is too big.
+    """
+    directory = tmpdir.join("lru").strpath
+    store = CacheStore(directory, 150).load()
+
+    assert store.put("foo", {}, b"a" * 60) is True
+    assert store.put("bar", {}, b"b" * 60) is True
+    # Access makes entry the most recently used
+    assert store.get("foo") == ({}, b"a" * 60)
+    assert store.put("ping", {}, b"c" * 60) is True
+
+    assert list(store.entries) == ["foo", "ping"]
+    assert store.get("bar") is None
+    assert store.evictions == 1
+    assert store.size == 2 * 63
+
+    # Entry bigger than cache is never stored
+    assert store.put("big", {}, b"d" * 200) is False
+    assert "big" not in store.entries
+
+    # Entries and their order are restored from directory
+    restored = CacheStore(directory, 150).load()
+    assert set(restored.entries) == {"foo", "ping"}
+    assert restored.size == store.size
+    assert restored.get("ping") == ({}, b"c" * 60)
+
+
+def test_proxy_cache(tmpdir, origin_server):
+    """
+    Cacheable responses should be requested once from origin, other ones
+    are always forwarded.
+    """
+    proxy = CachingProxy(tmpdir.join("cache").strpath).start()
+    try:
+        for i in range(3):
+            for path in ["/style.css", "/private.json", "/cookie.txt",
+                         "/missing.png"]:
+                status, headers, body = fetch(proxy, origin_server.url + path)
+                assert status == OriginHandler.RESPONSES[path][0]
+                assert body == OriginHandler.RESPONSES[path][2]
+
+        status, headers, body = fetch(proxy, origin_server.url + "/style.css")
+        assert headers["X-Cache"] == "HIT"
+        assert headers["Content-Type"] == "text/css"
+
+        status, headers, body = fetch(proxy, origin_server.url + "/echo",
+                                      data=b"ping")
+        assert body == b"ping"
+    finally:
+        stats = proxy.stop()
+
+    assert origin_server.requests.count("/style.css") == 1
+    assert origin_server.requests.count("/private.json") == 3
+    assert origin_server.requests.count("/cookie.txt") == 3
+    assert origin_server.requests.count("/missing.png") == 3
+    assert origin_server.requests.count("/echo") == 1
+
+    assert stats["hits"] == 3
+    assert stats["misses"] == 10
+    assert stats["stored"] == 1
+    assert stats["bypassed"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_ratio"] == 3 / 13
+
+
+def test_proxy_freshness(tmpdir, origin_server):
+    """
+    Responses cached from a previous run should only be served until they
+    expire.
+    """
+    directory = tmpdir.join("fresh").strpath
+
+    for i in range(2):
+        proxy = CachingProxy(directory).start()
+        try:
+            fetch(proxy, origin_server.url + "/style.css")
+            fetch(proxy, origin_server.url + "/app.js")
+        finally:
+            stats = proxy.stop()
+
+    # Style without freshness information is requested again on second run
+    assert origin_server.requests.count("/style.css") == 2
+    assert origin_server.requests.count("/app.js") == 1
+    assert stats["hits"] == 1
+    assert stats["entries"] == 2
+
+
+def test_proxy_upstream_error(tmpdir):
+    proxy = CachingProxy(tmpdir.join("error").strpath).start()
+    try:
+        status, headers, body = fetch(proxy, "http://127.0.0.1:9/foo")
+    finally:
+        stats = proxy.stop()
+
+    assert status == 502
+    assert stats["errors"] == 1
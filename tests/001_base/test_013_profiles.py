@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import sys
+
+from website_capture.profiles import (ProfileTemplate, get_preferences_script,
+                                      reflink_file)
+
+
+def write_file(path, content):
+    dirname = os.path.dirname(path)
+    if not os.path.exists(dirname):
+        os.makedirs(dirname)
+
+    with io.open(path, "w") as fp:
+        fp.write(content)
+
+
+def read_file(path):
+    with io.open(path, "r") as fp:
+        return fp.read()
+
+
+def warm(path):
+    """
+    Pretend to be a browser which creates its profile files.
+    """
+    write_file(os.path.join(path, "places.sqlite"), "places")
+    write_file(os.path.join(path, "startupCache", "startupCache.8.little"),
+               "cache")
+    write_file(os.path.join(path, "user.js"), "browser content")
+    write_file(os.path.join(path, "lock"), "")
+
+
+def test_get_preferences_script():
+    assert get_preferences_script({"foo.bar": True, "ping": "pong"}) == (
+        'user_pref("foo.bar", true);\n'
+        'user_pref("ping", "pong");\n'
+    )
+
+
+def test_build(tmpdir):
+    """
+    Template should be built once for the same preferences.
+    """
+    directory = tmpdir.join("build").strpath
+    warmed = []
+
+    def counted_warm(path):
+        warmed.append(path)
+        warm(path)
+
+    template = ProfileTemplate(directory, {"foo": 1})
+    assert template.is_built is False
+    assert template.build(warm=counted_warm) is True
+    assert template.is_built is True
+    assert len(warmed) == 1
+
+    assert sorted(os.listdir(template.path)) == [
+        ".template", "places.sqlite", "startupCache", "user.js",
+    ]
+    # Preferences are written after browser warming
+    assert read_file(os.path.join(template.path, "user.js")) == (
+        'user_pref("foo", 1);\n'
+    )
+
+    # Template is reused from directory
+    template = ProfileTemplate(directory, {"foo": 1})
+    assert template.build(warm=counted_warm) is False
+    assert len(warmed) == 1
+
+    # Other preferences make another template
+    other = ProfileTemplate(directory, {"foo": 2})
+    assert other.path != template.path
+    assert other.build() is True
+    assert not [
+        name for name in os.listdir(directory) if name.startswith(".build-")
+    ]
+
+
+def test_clone(tmpdir):
+    """
+    Clone should have every template files but changing a clone should not
+    change its template.
+    """
+    template = ProfileTemplate(tmpdir.join("clone").strpath, {"foo": 1})
+    template.build(warm=warm)
+
+    first = template.clone()
+    second = template.clone()
+    assert first != second
+
+    for path in [first, second]:
+        assert sorted(os.listdir(path)) == [
+            "places.sqlite", "startupCache", "user.js",
+        ]
+        assert read_file(os.path.join(path, "places.sqlite")) == "places"
+        assert read_file(
+            os.path.join(path, "startupCache", "startupCache.8.little")
+        ) == "cache"
+
+    # Shared file is hard linked when filesystem does not support
+    # copy-on-write
+    if not template.reflink:
+        assert os.stat(
+            os.path.join(first, "startupCache", "startupCache.8.little")
+        ).st_ino == os.stat(
+            os.path.join(template.path, "startupCache",
+                         "startupCache.8.little")
+        ).st_ino
+
+    write_file(os.path.join(first, "places.sqlite"), "changed")
+    write_file(os.path.join(first, "user.js"), "changed")
+    assert read_file(os.path.join(template.path, "places.sqlite")) == "places"
+    assert read_file(os.path.join(second, "user.js")) == (
+        'user_pref("foo", 1);\n'
+    )
+
+    template.remove_clone(first)
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_clone_preferences(tmpdir):
+    """
+    Preferences given to clone should replace template ones only in clone.
+    """
+    template = ProfileTemplate(tmpdir.join("clone_prefs").strpath, {"foo": 1})
+    template.build(warm=warm)
+
+    path = template.clone(preferences={"foo": 1, "bar": 2})
+
+    assert read_file(os.path.join(path, "user.js")) == (
+        'user_pref("bar", 2);\nuser_pref("foo", 1);\n'
+    )
+    assert read_file(os.path.join(template.path, "user.js")) == (
+        'user_pref("foo", 1);\n'
+    )
+
+
+def test_clone_without_fcntl(tmpdir, monkeypatch):
+    """
+    Platforms without ``fcntl`` module should fall back to hard links and
+    copies.
+    """
+    # Importing a module set to None in modules raises ImportError
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+
+    source = tmpdir.join("source.txt")
+    source.write("foo")
+    assert reflink_file(source.strpath, tmpdir.join("dest.txt").strpath) is (
+        False
+    )
+
+    template = ProfileTemplate(tmpdir.join("no_fcntl").strpath, {"foo": 1})
+    template.build(warm=warm)
+    path = template.clone()
+
+    assert template.reflink is False
+    assert read_file(os.path.join(path, "places.sqlite")) == "places"
+    assert os.stat(
+        os.path.join(path, "startupCache", "startupCache.8.little")
+    ).st_ino == os.stat(
+        os.path.join(template.path, "startupCache", "startupCache.8.little")
+    ).st_ino
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import urllib.request
+
+from website_capture import benchmark
+from website_capture.benchmark import (BENCHMARK_SIZES, SiteServer,
+                                       benchmark_pipeline, build_pages,
+                                       compare_results, get_max_rss,
+                                       get_statistics)
+from website_capture.interfaces.dummy import DummyInterface
+
+
+def test_build_pages():
+    pages = build_pages(3, urls=["http://foo", "http://bar"])
+
+    assert [page["name"] for page in pages] == [
+        "page-000000", "page-000001", "page-000002",
+    ]
+    assert [page["url"] for page in pages] == [
+        "http://foo", "http://bar", "http://foo",
+    ]
+    assert pages[0]["sizes"] == BENCHMARK_SIZES
+
+
+def test_get_statistics():
+    assert get_statistics([3, 1, 2]) == {
+        "count": 3, "min": 1, "max": 3, "mean": 2, "p50": 2, "p95": 3,
+    }
+    assert get_statistics([])["mean"] is None
+
+
+def test_compare_results():
+    def results(*items):
+        return {"results": {"pipeline": {"dummy": {
+            str(count): {"pages_per_second": value} for count, value in items
+        }}}}
+
+    assert compare_results(
+        results((10, 100.0), (100, 50.0)),
+        results((100, 100.0), (10, 50.0), (1000, 10.0)),
+    ) == [
+        ("dummy", 10, 100.0, 50.0, 0.5),
+        ("dummy", 100, 50.0, 100.0, 2.0),
+    ]
+
+
+def test_benchmark_pipeline(temp_builds_dir):
+    basedir = temp_builds_dir.join("benchmark_pipeline").strpath
+
+    result = benchmark_pipeline(DummyInterface, build_pages(5), basedir)
+
+    assert result["pages"] == 5
+    assert result["jobs"] == 15
+    assert result["errors"] == 0
+    assert result["pages_per_second"] > 0
+    assert result["page_config"]["configs"] == 15
+    assert result["phases"]["total"]["count"] == 15
+    assert sorted(result["phases"]) == [
+        "acquire", "driver_start", "load", "release", "resize",
+        "task_processing", "task_report", "task_screenshot", "total",
+    ]
+    assert result["peak_memory"] > 0
+    assert result["max_rss"] > 0
+    assert os.path.exists(os.path.join(basedir, "summary.json"))
+
+
+def test_get_max_rss_unavailable(monkeypatch):
+    """
+    Platforms without ``resource`` module do not have maximum resident
+    memory.
+    """
+    monkeypatch.setattr(benchmark, "resource", None)
+
+    assert get_max_rss() is None
+
+
+def test_site_server(tmpdir):
+    os.makedirs(tmpdir.join("site", "sub").strpath)
+    for path in ["index.html", "sub/page.html", "style.css"]:
+        with io.open(tmpdir.join("site", path).strpath, "w") as fp:
+            fp.write(path)
+
+    with SiteServer(tmpdir.join("site").strpath) as server:
+        urls = server.get_urls()
+        assert urls == [
+            server.url + "/index.html",
+            server.url + "/sub/page.html",
+        ]
+        with urllib.request.urlopen(urls[1]) as response:
+            assert response.read() == b"sub/page.html"
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+import pytest
+
+from website_capture.conf import get_project_configuration
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.pages import (ChainedPages, PageRecord, PagesFile,
+                                   iter_page_lines)
+
+
+def test_page_record():
+    """
+    Record should behave like the page item it comes from.
+    """
+    item = {"name": "foo", "url": "http://foo", "tasks": ["screenshot"]}
+    record = PageRecord.from_item(item)
+
+    assert dict(record) == item
+    assert record["name"] == "foo"
+    assert record.get("sizes") is None
+    assert "sizes" not in record
+    assert "tasks" in record
+    assert len(record) == 3
+
+    record["sizes"] = [(10, 20)]
+    record["wait_for"] = {"fonts": True}
+    assert dict(record) == dict(item, sizes=[(10, 20)],
+                                wait_for={"fonts": True})
+
+    with pytest.raises(KeyError):
+        record["nope"]
+
+    with pytest.raises(AttributeError):
+        record.nope = True
+
+    assert PageRecord("foo", "http://foo").options is None
+
+
+def test_iter_page_lines():
+    """
+    Pages should be validated only when they are read.
+    """
+    content = "\n".join([
+        json.dumps({"name": "foo", "url": "http://foo",
+                    "sizes": [[10, 20]]}),
+        "",
+        json.dumps({"name": "bar", "url": "http://bar",
+                    "sizes": [[10, 20]]}),
+        json.dumps({"name": "ping"}),
+    ])
+
+    pages = iter_page_lines(io.StringIO(content), name="pages.jsonl")
+    foo = next(pages)
+    bar = next(pages)
+    assert foo.sizes == ((10, 20),)
+    # Equal sizes are shared
+    assert foo.sizes is bar.sizes
+
+    with pytest.raises(SettingsInvalidError) as excinfo:
+        next(pages)
+    assert str(excinfo.value) == (
+        "Page item must have a 'url' value at pages.jsonl:4"
+    )
+
+    with pytest.raises(SettingsInvalidError) as excinfo:
+        list(iter_page_lines(io.StringIO("{nope"), name="pages.jsonl"))
+    assert str(excinfo.value).startswith(
+        "Invalid JSON page item at pages.jsonl:1"
+    )
+
+    with pytest.raises(SettingsInvalidError):
+        list(iter_page_lines(io.StringIO(json.dumps(
+            {"name": "foo", "url": "http://foo", "sizes": [10, 20]}
+        ))))
+
+
+def test_pages_file_configuration(tmpdir):
+    """
+    Pages file should be relative to configuration file and added to inline
+    pages.
+    """
+    with io.open(tmpdir.join("pages.jsonl").strpath, "w") as fp:
+        fp.write(json.dumps({"name": "bar", "url": "http://bar"}) + "\n")
+        fp.write(json.dumps({"name": "ping", "url": "http://ping"}) + "\n")
+
+    path = tmpdir.join("config.json").strpath
+    with io.open(path, "w") as fp:
+        json.dump({
+            "output_dir": "outputs",
+            "pages": [{"name": "foo", "url": "http://foo"}],
+            "pages_file": "pages.jsonl",
+        }, fp)
+
+    with io.open(path, "r") as fp:
+        config = get_project_configuration(fp)
+
+    assert isinstance(config["pages"], ChainedPages)
+    # Pages can be iterated more than once
+    for i in range(2):
+        assert [page["name"] for page in config["pages"]] == [
+            "foo", "bar", "ping",
+        ]
+
+
+def test_run_pages_file(temp_builds_dir):
+    """
+    Interface should capture pages from records like from dictionnaries,
+    page options are shared with every page configurations.
+    """
+    basedir = temp_builds_dir.join("run_pages_file").strpath
+    os.makedirs(basedir)
+    path = os.path.join(basedir, "pages.jsonl")
+    with io.open(path, "w") as fp:
+        for name in ["foo", "bar"]:
+            fp.write(json.dumps({
+                "name": name,
+                "url": "http://localhost/{}".format(name),
+                "sizes": [[10, 20], [30, 40]],
+                "tasks": ["screenshot"],
+            }) + "\n")
+
+    interface = DummyInterface(basedir)
+
+    built, error_logs = interface.run(PagesFile(path))
+    assert error_logs == []
+    assert sorted([(item["name"], item["size"]) for item in built]) == [
+        ("bar", (10, 20)), ("bar", (30, 40)),
+        ("foo", (10, 20)), ("foo", (30, 40)),
+    ]
+
+    page = next(iter(PagesFile(path)))
+    first = interface.get_page_config(page, (10, 20))
+    second = interface.get_page_config(page, (30, 40))
+    assert first["tasks"] is second["tasks"]
+    assert first["screenshot_path"] != second["screenshot_path"]
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+import gzip
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from website_capture.benchmark import SiteServer
+from website_capture.conf import get_project_configuration
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.sources import (CrawlSource, HashSet, PageDiscovery,
+                                     SitemapSource, get_page_name,
+                                     normalize_url, validate_source)
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{}
+</urlset>"""
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{}
+</sitemapindex>"""
+
+
+def get_sitemap(urls):
+    return SITEMAP.format("\n".join([
+        "<url><loc>{}</loc><priority>0.5</priority></url>".format(url)
+        for url in urls
+    ]))
+
+
+def get_sitemap_index(urls):
+    return SITEMAP_INDEX.format("\n".join([
+        "<sitemap><loc>{}</loc></sitemap>".format(url)
+        for url in urls
+    ]))
+
+
+def write(path, content):
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with io.open(str(path), mode) as fp:
+        fp.write(content)
+
+
+def build_site(directory):
+    """
+    Build a small site where home links to every pages, "foo" links to
+    "foo/ping" and a page links to another origin.
+    """
+    os.makedirs(str(directory.join("foo")))
+    pages = {
+        "index.html": [
+            "foo.html", "/bar.html#top", "foo.html", "sitemap.xml",
+            "http://example.com/outside.html",
+        ],
+        "foo.html": ["foo/ping.html", "index.html"],
+        "bar.html": [],
+        "foo/ping.html": ["../foo/pong.html"],
+        "foo/pong.html": [],
+    }
+
+    for path, links in pages.items():
+        write(directory.join(path), "<html><body>{}</body></html>".format(
+            "".join(['<a href="{}">link</a>'.format(url) for url in links])
+        ))
+
+    write(directory.join("sitemap.xml"), "<urlset></urlset>")
+
+
+def test_hash_set():
+    """
+    Hash set should only keep a hash of its values.
+    """
+    urls = HashSet()
+
+    assert urls.add("http://foo/") is True
+    assert urls.add("http://foo/") is False
+    assert urls.add("http://bar/") is True
+    assert "http://foo/" in urls
+    assert "http://ping/" not in urls
+    assert len(urls) == 2
+    assert all([isinstance(item, int) for item in urls.hashes])
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("HTTP://Foo.com", "http://foo.com/"),
+    ("http://foo.com/Bar/?a=1#top", "http://foo.com/Bar/?a=1"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("http://foo.com/", "foo.com-838f1ca3"),
+    ("http://foo.com:8001/blog/post_1.html",
+     "foo.com-8001-blog-post-1.html-3215bd94"),
+    ("http://foo.com/search?q=bar", "foo.com-search-d573762b"),
+])
+def test_get_page_name(url, expected):
+    assert get_page_name(url) == expected
+
+
+def test_get_page_name_collisions():
+    """
+    URLs with the same readable part should still have distinct names.
+    """
+    urls = [
+        "http://foo.com/a/b",
+        "http://foo.com/a-b",
+        "http://foo.com/a_b",
+        "http://foo.com/a/",
+        "http://foo.com/a",
+    ]
+    names = [get_page_name(url) for url in urls]
+
+    assert [name.rsplit("-", 1)[0] for name in names] == [
+        "foo.com-a-b", "foo.com-a-b", "foo.com-a-b", "foo.com-a", "foo.com-a",
+    ]
+    assert len(set(names)) == len(urls)
+
+
+@pytest.mark.parametrize("source,message", [
+    ([], "Source #1 must be a dictionnary."),
+    ({"include": ["*"]}, "Source #1 must have exactly one of these items"),
+    ({"sitemap": "a", "crawl": "b"}, "Source #1 must have exactly one"),
+    ({"sitemap": "a", "nope": 1}, "Unknowed options 'nope' for source #1"),
+    ({"sitemap": "a", "include": "*"}, "Option 'include' of source #1"),
+    ({"sitemap": "a", "sizes": [[1]]}, "Option 'sizes' of source #1"),
+    ({"crawl": "a", "max_pages": -1}, "Option 'max_pages' of source #1"),
+])
+def test_validate_source(source, message):
+    with pytest.raises(SettingsInvalidError) as excinfo:
+        validate_source(source, 1)
+
+    assert str(excinfo.value).startswith(message)
+
+
+def test_sitemap_source(tmpdir):
+    """
+    Sitemap source should read pages from sitemap index and every sitemaps
+    it refers to, even compressed ones, with source defaults.
+    """
+    write(tmpdir.join("first.xml"), get_sitemap([
+        "http://foo.com/", "http://foo.com/blog/", "http://foo.com/blog/1",
+    ]))
+    write(tmpdir.join("second.xml.gz"), gzip.compress(get_sitemap([
+        "http://foo.com/about", "http://foo.com/blog/2",
+        "http://foo.com/blog/1#comments",
+    ]).encode("utf-8")))
+    write(tmpdir.join("sitemap.xml"), get_sitemap_index([
+        "file://{}".format(tmpdir.join("first.xml")),
+        "file://{}".format(tmpdir.join("second.xml.gz")),
+        "file://{}".format(tmpdir.join("missing.xml")),
+    ]))
+
+    source = SitemapSource({
+        "sitemap": str(tmpdir.join("sitemap.xml")),
+        "include": ["http://foo.com/blog/*"],
+        "exclude": ["*/2"],
+        "sizes": [[320, 480], [1440, 900]],
+        "tasks": ["screenshot"],
+    })
+    pages = list(source.iter_pages(HashSet()))
+
+    assert [dict(page) for page in pages] == [
+        {
+            "name": "foo.com-blog-7f440bf0",
+            "url": "http://foo.com/blog/",
+            "sizes": ((320, 480), (1440, 900)),
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "foo.com-blog-1-4a7062a5",
+            "url": "http://foo.com/blog/1",
+            "sizes": ((320, 480), (1440, 900)),
+            "tasks": ["screenshot"],
+        },
+    ]
+
+
+def test_crawl_source(tmpdir):
+    """
+    Crawl source should follow links from the same origin within its bounds.
+    """
+    build_site(tmpdir)
+
+    with SiteServer(str(tmpdir)) as server:
+        source = CrawlSource({
+            "crawl": server.url + "/index.html",
+            "exclude": ["*/bar.html"],
+            "max_depth": 1,
+        })
+        urls = list(source.iter_urls())
+        assert urls == [
+            server.url + "/index.html",
+            server.url + "/foo.html",
+        ]
+
+        # Pages which are not HTML documents still count for maximum
+        source = CrawlSource({"crawl": server.url + "/index.html",
+                              "max_pages": 4})
+        urls = list(source.iter_urls())
+        assert urls == [
+            server.url + "/index.html",
+            server.url + "/foo.html",
+            server.url + "/bar.html",
+        ]
+
+        source = CrawlSource({"crawl": server.url + "/index.html"})
+        urls = list(source.iter_urls())
+        assert urls == [
+            server.url + "/index.html",
+            server.url + "/foo.html",
+            server.url + "/bar.html",
+            server.url + "/foo/ping.html",
+        ]
+
+
+def test_discovery(tmpdir):
+    """
+    Discovery should give every pages from sources only once and replay them
+    on next iterations.
+    """
+    build_site(tmpdir)
+
+    with SiteServer(str(tmpdir)) as server:
+        write(tmpdir.join("sitemap.xml"), get_sitemap([
+            server.url + "/foo.html",
+            server.url + "/foo/pong.html",
+        ]))
+        discovery = PageDiscovery([
+            {"sitemap": server.url + "/sitemap.xml"},
+            {"crawl": server.url + "/index.html", "max_depth": 1},
+        ])
+
+        names = [page["name"] for page in discovery]
+        assert names == [
+            get_page_name(server.url + path)
+            for path in ["/foo.html", "/foo/pong.html", "/index.html",
+                         "/bar.html"]
+        ]
+
+    # Server is stopped, pages come from the first discovery
+    assert [page["name"] for page in discovery] == names
+
+
+def test_discovery_overlap(tmpdir):
+    """
+    Pages should be captured while discovery is still running.
+    """
+    discovered = threading.Event()
+    resume = threading.Event()
+
+    class BlockingSource(SitemapSource):
+        def iter_urls(self):
+            yield "http://foo.com/first"
+            discovered.set()
+            assert resume.wait(5)
+            yield "http://foo.com/second"
+
+    discovery = PageDiscovery([{"sitemap": "foo"}])
+    discovery.sources = [BlockingSource({"sitemap": "foo",
+                                         "tasks": ["screenshot"]})]
+
+    interface = DummyInterface(str(tmpdir.join("overlap")))
+    results = interface.iter_run(discovery, stream=True)
+
+    status, item = next(results)
+    assert (status, item["name"]) == ("success", "foo.com-first-f44e1dda")
+    assert discovered.is_set()
+
+    resume.set()
+    assert [item["name"] for status, item in results] == [
+        "foo.com-second-8afa15ec",
+    ]
+
+
+def test_discovery_concurrent():
+    """
+    Concurrent iterations should share a single discovery and each one
+    should yield every pages.
+    """
+    calls = []
+    resume = threading.Event()
+
+    class BlockingSource(SitemapSource):
+        def iter_urls(self):
+            calls.append(threading.current_thread())
+            for i in range(50):
+                if i == 10:
+                    assert resume.wait(5)
+                yield "http://foo.com/{}".format(i)
+
+    discovery = PageDiscovery([])
+    discovery.sources = [BlockingSource({"sitemap": "foo"})]
+
+    results = {}
+
+    def iterate(name):
+        results[name] = [page["url"] for page in discovery]
+
+    threads = [
+        threading.Thread(target=iterate, args=(i,), daemon=True)
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    resume.set()
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+    expected = ["http://foo.com/{}".format(i) for i in range(50)]
+    assert results == {i: expected for i in range(4)}
+    assert len(calls) == 1
+    assert [page["url"] for page in discovery.pages] == expected
+
+
+def test_discovery_error():
+    """
+    Discovery errors should be raised to the iterating code.
+    """
+    class FailingSource(SitemapSource):
+        def iter_urls(self):
+            yield "http://foo.com/"
+            raise RuntimeError("Boom")
+
+    discovery = PageDiscovery([])
+    discovery.sources = [FailingSource({"sitemap": "foo"})]
+
+    pages = iter(discovery)
+    assert next(pages)["url"] == "http://foo.com/"
+    with pytest.raises(RuntimeError):
+        next(pages)
+    assert discovery.pages is None
+
+
+def test_configuration_sources(tmpdir):
+    """
+    Sources should be validated and sitemap paths should be relative to
+    configuration file.
+    """
+    write(tmpdir.join("sitemap.xml"), get_sitemap(["http://foo.com/"]))
+    config_path = tmpdir.join("config.json")
+    write(config_path, json.dumps({
+        "output_dir": "output",
+        "pages": [{"name": "bar", "url": "http://bar.com"}],
+        "sources": [{"sitemap": "sitemap.xml"}],
+    }))
+
+    with io.open(str(config_path), "r") as fp:
+        config = get_project_configuration(fp)
+
+    assert [page["name"] for page in config["pages"]] == [
+        "bar", "foo.com-838f1ca3",
+    ]
+
+    with pytest.raises(SettingsInvalidError):
+        get_project_configuration(io.StringIO(json.dumps({
+            "output_dir": "output",
+            "sources": {"sitemap": "sitemap.xml"},
+        })))
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from website_capture.exceptions import PageConfigError
+from website_capture.scheduler import (JobScheduler, get_page_priority,
+                                       get_page_timeout)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_scheduler_priority():
+    """
+    Batches should be given by highest priority first, batches with the same
+    priority keep their order.
+    """
+    scheduler = JobScheduler()
+    scheduler.extend([
+        [((1, 1), {"name": "foo"})],
+        [((1, 1), {"name": "bar", "priority": 5})],
+        [((1, 1), {"name": "ping", "priority": -1})],
+        [((1, 1), {"name": "pong"}), ((2, 2), {"name": "pong"})],
+        [((1, 1), {"name": "home", "priority": 5.5})],
+    ])
+
+    assert len(scheduler) == 5
+    assert [batch[0][1]["name"] for batch in scheduler] == [
+        "home", "bar", "foo", "pong", "ping",
+    ]
+    assert len(scheduler) == 0
+
+
+def test_scheduler_budget():
+    """
+    Remaining budget should decrease from scheduler start.
+    """
+    clock = FakeClock()
+
+    scheduler = JobScheduler(clock=clock).start()
+    assert scheduler.remaining is None
+    assert scheduler.is_expired is False
+
+    scheduler = JobScheduler(time_budget=10, clock=clock)
+    assert scheduler.remaining == 10
+    scheduler.start()
+    clock.now += 4
+    assert scheduler.remaining == 6
+    assert scheduler.is_expired is False
+    clock.now += 7
+    assert scheduler.remaining == 0
+    assert scheduler.is_expired is True
+
+
+@pytest.mark.parametrize("page,expected", [
+    ({}, 0),
+    ({"priority": 3}, 3),
+    ({"priority": -0.5}, -0.5),
+])
+def test_get_page_priority(page, expected):
+    assert get_page_priority(page) == expected
+
+
+@pytest.mark.parametrize("priority", ["high", True, None])
+def test_get_page_priority_invalid(priority):
+    with pytest.raises(PageConfigError):
+        get_page_priority({"name": "foo", "priority": priority})
+
+
+def test_get_page_timeout():
+    assert get_page_timeout({}) is None
+    assert get_page_timeout({}, default=10) == 10
+    assert get_page_timeout({"timeout": 2.5}, default=10) == 2.5
+
+    for timeout in [0, -1, "10", False]:
+        with pytest.raises(PageConfigError):
+            get_page_timeout({"name": "foo", "timeout": timeout})
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium.common.exceptions import (NoSuchElementException,
+                                        TimeoutException, WebDriverException)
+
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.retry import RetryPolicy, validate_retry_options
+
+
+def test_retry_policy_default():
+    """
+    Default policy should never retry.
+    """
+    policy = RetryPolicy()
+
+    assert policy.enabled is False
+    assert policy.is_retryable(WebDriverException("Boom")) is True
+    assert policy.should_retry(WebDriverException("Boom"), 1) is False
+
+
+def test_retry_policy_exceptions():
+    policy = RetryPolicy(max_attempts=3, exceptions=[
+        "selenium.common.exceptions.TimeoutException",
+        "builtins.ConnectionError",
+    ])
+
+    assert policy.enabled is True
+    assert policy.should_retry(TimeoutException("Slow"), 1) is True
+    assert policy.should_retry(TimeoutException("Slow"), 2) is True
+    assert policy.should_retry(TimeoutException("Slow"), 3) is False
+    assert policy.should_retry(ConnectionResetError(), 1) is True
+    assert policy.should_retry(NoSuchElementException("Nope"), 1) is False
+    assert policy.should_retry(ValueError("Nope"), 1) is False
+
+    # Driver errors are handled even if they are not retryable
+    assert policy.is_handled(NoSuchElementException("Nope")) is True
+    assert policy.is_handled(ConnectionResetError()) is True
+    assert policy.is_handled(ValueError("Nope")) is False
+
+    # Driver is still responsive after a timeout
+    assert policy.is_crash(TimeoutException("Slow")) is False
+    assert policy.is_crash(WebDriverException("Boom")) is True
+
+
+def test_retry_policy_delay(monkeypatch):
+    """
+    Delays should grow exponentially until maximum delay, jitter removes a
+    random part of them.
+    """
+    policy = RetryPolicy(max_attempts=10, backoff=0.5, max_backoff=3,
+                         jitter=0)
+    assert [policy.get_delay(i) for i in range(1, 6)] == [0.5, 1, 2, 3, 3]
+
+    monkeypatch.setattr("random.random", lambda: 0.5)
+    policy = RetryPolicy(max_attempts=10, backoff=2, jitter=0.5)
+    assert [policy.get_delay(i) for i in range(1, 4)] == [1.5, 3, 6]
+
+
+@pytest.mark.parametrize("path", [
+    "selenium.common.exceptions.Nope",
+    "nope.NopeError",
+    "Nope",
+    "website_capture.retry.RetryPolicy",
+])
+def test_retry_policy_invalid_exception(path):
+    with pytest.raises(SettingsInvalidError):
+        RetryPolicy(exceptions=[path])
+
+
+@pytest.mark.parametrize("options,message", [
+    ([], "Item 'retry' must be a dictionnary."),
+    ({"nope": 1}, "Unknowed 'retry' options 'nope'"),
+    ({"max_attempts": 0}, "Option 'retry.max_attempts' must be"),
+    ({"max_attempts": 1.5}, "Option 'retry.max_attempts' must be"),
+    ({"backoff": -1}, "Option 'retry.backoff' must be"),
+    ({"jitter": 2}, "Option 'retry.jitter' must be between 0 and 1."),
+    ({"exceptions": "Nope"}, "Option 'retry.exceptions' must be"),
+])
+def test_validate_retry_options(options, message):
+    with pytest.raises(SettingsInvalidError) as excinfo:
+        validate_retry_options(options)
+
+    assert str(excinfo.value).startswith(message)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from website_capture.distributed import (JOB_FAILED_MESSAGE,
+                                         LEASE_EXPIRED_MESSAGE, QueueClient,
+                                         QueueServer, QueueWorker, WorkQueue,
+                                         build_jobs)
+from website_capture.interfaces.dummy import DummyInterface
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowInterface(DummyInterface):
+    """
+    Dummy interface where each capture takes a little time so every workers
+    get jobs.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def capture(self, driver, config, **kwargs):
+        time.sleep(0.02)
+        return super().capture(driver, config, **kwargs)
+
+
+def build_pages(count):
+    return [
+        {
+            "name": "page-{}".format(i),
+            "url": "http://localhost/{}".format(i),
+            "sizes": [(1, 42), (30, 30)],
+            "tasks": ["screenshot"],
+        }
+        for i in range(count)
+    ]
+
+
+def test_build_jobs():
+    jobs = build_jobs({
+        "dummy": DummyInterface("/basedir"),
+        "slow": SlowInterface("/basedir"),
+    }, build_pages(2) + [{"name": "foo", "url": "http://localhost/foo"}])
+
+    assert [
+        (job["id"], job["interface"], job["page"]["name"], job["size"])
+        for job in jobs
+    ][:6] == [
+        (1, "dummy", "page-0", [1, 42]),
+        (2, "dummy", "page-0", [30, 30]),
+        (3, "dummy", "page-1", [1, 42]),
+        (4, "dummy", "page-1", [30, 30]),
+        (5, "dummy", "foo", [0, 0]),
+        (6, "slow", "page-0", [1, 42]),
+    ]
+    assert len(jobs) == 10
+
+
+def test_work_queue_lease():
+    """
+    Expired leases should be given to another worker until their maximum
+    number of leases.
+    """
+    clock = FakeClock()
+    queue = WorkQueue(build_jobs({"dummy": DummyInterface("/basedir")},
+                                 build_pages(2)),
+                      lease_timeout=10, max_leases=2, clock=clock)
+
+    assert [job["id"] for job in queue.lease("foo", count=3)] == [1, 2, 3]
+    assert [job["id"] for job in queue.lease("bar")] == [4]
+    assert queue.lease("bar") == []
+
+    # Heartbeat renews leases of worker jobs only
+    clock.now = 8
+    assert queue.heartbeat("foo", [1, 2, 3, 4]) == [4]
+
+    # Lease of "bar" expires, job is given again
+    clock.now = 12
+    assert [job["id"] for job in queue.lease("ping")] == [4]
+    assert queue.get_stats() == {"jobs": 4, "pending": 0, "leased": 4,
+                                 "done": 0, "workers": 3}
+
+    assert queue.complete("foo", 1, [("success", {"name": "page-0"})]) is True
+    assert queue.complete("foo", 1, [("success", {"name": "page-0"})]) is False
+    # Results from a worker which has lost its lease are still accepted
+    assert queue.complete("bar", 4, [("error", {"name": "page-1"})]) is True
+    assert queue.heartbeat("ping", [4]) == [4]
+
+    # Jobs are given again once expired, then they fail once they have
+    # expired for the second time
+    clock.now = 30
+    assert [job["id"] for job in queue.lease("foo", count=3)] == [2, 3]
+    assert queue.is_finished is False
+    clock.now = 50
+    assert queue.lease("foo") == []
+    assert queue.is_finished is True
+
+    results = [
+        (job["id"], status, item.get("msg"))
+        for job, status, item in queue.iter_results()
+    ]
+    assert results == [
+        (1, "success", None),
+        (4, "error", None),
+        (2, "error", LEASE_EXPIRED_MESSAGE),
+        (3, "error", LEASE_EXPIRED_MESSAGE),
+    ]
+
+
+def test_distributed_run(tmpdir):
+    """
+    Several local workers should perform every jobs once.
+    """
+    basedir = str(tmpdir.join("outputs"))
+    interface = SlowInterface(basedir)
+    queue = WorkQueue(build_jobs({"slow": interface}, build_pages(10)))
+    options = {"slow": {"basedir": basedir}}
+
+    with QueueServer(queue, options) as server:
+        workers = [
+            QueueWorker(QueueClient(server.url), {"slow": SlowInterface},
+                        name="worker-{}".format(i), workers=2,
+                        poll_interval=0.05)
+            for i in range(2)
+        ]
+        threads = [
+            threading.Thread(target=worker.run, daemon=True)
+            for worker in workers
+        ]
+        for thread in threads:
+            thread.start()
+
+        results = list(queue.iter_results())
+        assert queue.wait_workers(5) is True
+
+        for thread in threads:
+            thread.join(5)
+            assert not thread.is_alive()
+
+    assert len(results) == 20
+    assert sorted([job["id"] for job, status, item in results]) == list(
+        range(1, 21)
+    )
+    assert all([status == "success" for job, status, item in results])
+    assert results[0][2]["screenshot"].startswith(basedir)
+    assert sum([worker.performed for worker in workers]) == 20
+    assert all([worker.performed > 0 for worker in workers])
+
+
+class RunningInterface(DummyInterface):
+    """
+    Dummy interface which remembers if run objects are opened when capturing.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def capture(self, driver, config, **kwargs):
+        self.started = self.scheduler is not None and self.encoder is not None
+        return super().capture(driver, config, **kwargs)
+
+
+class FailingInterface(DummyInterface):
+    """
+    Dummy interface which can not create any destination directory.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def make_destination_dir(self, size):
+        raise OSError("Disk is full")
+
+
+def run_worker(queue, options, interfaces):
+    with QueueServer(queue, options) as server:
+        worker = QueueWorker(QueueClient(server.url), interfaces,
+                             poll_interval=0.05)
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+
+        results = list(queue.iter_results())
+        assert queue.wait_workers(5) is True
+        thread.join(5)
+        assert not thread.is_alive()
+
+    return worker, results
+
+
+def test_worker_run_setup(tmpdir):
+    """
+    Worker interfaces should be started and finished like for a run.
+    """
+    basedir = str(tmpdir.join("outputs"))
+    interface = RunningInterface(basedir)
+    queue = WorkQueue(build_jobs({"running": interface}, build_pages(1)))
+
+    worker, results = run_worker(queue, {"running": {"basedir": basedir}},
+                                 {"running": RunningInterface})
+
+    assert [status for job, status, item in results] == ["success"] * 2
+    assert worker.interfaces["running"].started is True
+    # Run objects are closed once worker stops
+    assert worker.interfaces["running"].scheduler is None
+    assert worker.interfaces["running"].encoder is None
+
+
+def test_worker_time_budget(tmpdir):
+    """
+    Time budget from interface options should skip worker jobs.
+    """
+    basedir = str(tmpdir.join("outputs"))
+    interface = RunningInterface(basedir)
+    queue = WorkQueue(build_jobs({"running": interface}, build_pages(1)))
+    options = {"running": {"basedir": basedir, "time_budget": 0}}
+
+    worker, results = run_worker(queue, options,
+                                 {"running": RunningInterface})
+
+    assert [status for job, status, item in results] == ["skipped"] * 2
+
+
+def test_worker_failed_job(tmpdir):
+    """
+    Jobs failing on worker should be reported as errors right away instead
+    of waiting for their lease to expire.
+    """
+    basedir = str(tmpdir.join("outputs"))
+    interface = FailingInterface(basedir)
+    queue = WorkQueue(build_jobs({"failing": interface}, build_pages(1)),
+                      lease_timeout=60)
+
+    start = time.time()
+    worker, results = run_worker(queue, {"failing": {"basedir": basedir}},
+                                 {"failing": FailingInterface})
+
+    assert time.time() - start < 10
+    assert [
+        (status, item["name"], item["msg"], item["error"])
+        for job, status, item in results
+    ] == [
+        ("error", "page-0", JOB_FAILED_MESSAGE, "Disk is full"),
+    ] * 2
+    assert worker.performed == 2
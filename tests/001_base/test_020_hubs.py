@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.hubs import HubBalancer, validate_hubs
+
+
+@pytest.mark.parametrize("hubs,expected", [
+    ([], "Option 'hubs' must be a non empty list."),
+    ("http://hub:4444", "Option 'hubs' must be a non empty list."),
+    ([42], "Hub must be an URL or a dictionnary."),
+    (["hub:4444"], "Hub URL must be an HTTP URL: hub:4444"),
+    (
+        [{"url": "http://hub:4444", "max_sessions": 0}],
+        ("Hub option 'max_sessions' must be a positive integer: "
+         "http://hub:4444"),
+    ),
+    (
+        [{"url": "http://hub:4444", "sessions": 2}],
+        ("Unknowed hub options 'sessions', they must be one of: url, "
+         "max_sessions"),
+    ),
+    (
+        ["http://hub:4444", {"url": "http://hub:4444", "max_sessions": 2}],
+        "Hub URL is defined twice: http://hub:4444",
+    ),
+])
+def test_validate_hubs_invalid(hubs, expected):
+    with pytest.raises(SettingsInvalidError) as excinfo:
+        validate_hubs(hubs)
+
+    assert str(excinfo.value) == expected
+
+
+def test_validate_hubs_valid():
+    validate_hubs([
+        "http://hub-1:4444/wd/hub",
+        {"url": "https://hub-2:4444", "max_sessions": 4},
+    ])
+
+
+def test_balancer_lowest_load():
+    """
+    Slots should be reserved on the hub with the lowest load relatively to
+    its maximum.
+    """
+    balancer = HubBalancer([
+        "http://hub-1",
+        {"url": "http://hub-2", "max_sessions": 3},
+    ])
+
+    assert balancer.capacity == 4
+    assert [balancer.acquire() for i in range(4)] == [
+        "http://hub-1", "http://hub-2", "http://hub-2", "http://hub-2",
+    ]
+    assert balancer.active == {"http://hub-1": 1, "http://hub-2": 3}
+
+    balancer.release("http://hub-2")
+    assert balancer.acquire() == "http://hub-2"
+    assert balancer.reserved == {"http://hub-1": 1, "http://hub-2": 4}
+
+
+def test_balancer_exclude():
+    balancer = HubBalancer(["http://hub-1", "http://hub-2"])
+
+    assert balancer.acquire(exclude=["http://hub-1"]) == "http://hub-2"
+    assert balancer.acquire(exclude=["http://hub-1", "http://hub-2"]) is None
+
+
+def test_balancer_wait():
+    """
+    A slot should be waited for when every hubs are full.
+    """
+    balancer = HubBalancer(["http://hub-1"])
+    assert balancer.acquire() == "http://hub-1"
+
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(
+        balancer.acquire()
+    ))
+    thread.start()
+    thread.join(0.1)
+    assert acquired == []
+
+    balancer.release("http://hub-1")
+    thread.join(5)
+    assert acquired == ["http://hub-1"]
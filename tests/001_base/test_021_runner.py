@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from website_capture.exceptions import PageConfigError
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.runner import ConcurrentRunner
+from website_capture.sources import PageDiscovery, SitemapSource
+from website_capture.timings import RunSummary
+
+
+class WaitingInterface(DummyInterface):
+    """
+    Dummy interface which waits for an event before capturing its first page
+    and sets another event once it is done.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, wait_for=None, done=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_for = wait_for
+        self.done = done
+        self.threads = set()
+
+    def capture(self, driver, config, **kwargs):
+        # Thread objects since idents are reused once a thread ends
+        self.threads.add(threading.current_thread())
+        if self.wait_for is not None:
+            assert self.wait_for.wait(5)
+        payload = super().capture(driver, config, **kwargs)
+        if self.done is not None:
+            self.done.set()
+        return payload
+
+
+class FailingInterface(DummyInterface):
+    DESTINATION_FILEPATH = "{name}_failing"
+
+    def capture(self, driver, config, **kwargs):
+        raise PageConfigError("Nope")
+
+
+class ProxyInterface(DummyInterface):
+    """
+    Dummy interface which remembers caching proxies used by its captures.
+    """
+    DESTINATION_FILEPATH = "{name}_proxy"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.proxies = set()
+
+    def capture(self, driver, config, **kwargs):
+        self.proxies.add(self.proxy)
+        return super().capture(driver, config, **kwargs)
+
+
+class OtherProxyInterface(ProxyInterface):
+    pass
+
+
+def build_pages():
+    return [
+        {"name": "foo", "url": "http://localhost/foo",
+         "tasks": ["screenshot"]},
+        {"name": "bar", "url": "http://localhost/bar",
+         "sizes": [(1, 42), (30, 30)], "tasks": ["screenshot"]},
+    ]
+
+
+def test_iter_run_concurrent(temp_builds_dir):
+    """
+    Interfaces should run at the same time from their own thread and their
+    results should be merged.
+    """
+    basedir = temp_builds_dir.join("runner_iter_run_concurrent")
+    first_done = threading.Event()
+
+    # First interface can only finish its pages once the second one has
+    # captured a page, so runner would block if interfaces were sequential
+    interfaces = {
+        "first": WaitingInterface(basedir, wait_for=first_done),
+        "second": WaitingInterface(basedir, done=first_done, workers=2),
+    }
+
+    results = list(ConcurrentRunner(interfaces).iter_run(build_pages()))
+
+    assert sorted([
+        (name, status, item["name"], item["size"])
+        for name, status, item in results
+    ]) == [
+        ("first", "success", "bar", (1, 42)),
+        ("first", "success", "bar", (30, 30)),
+        ("first", "success", "foo", (0, 0)),
+        ("second", "success", "bar", (1, 42)),
+        ("second", "success", "bar", (30, 30)),
+        ("second", "success", "foo", (0, 0)),
+    ]
+    assert interfaces["first"].threads.isdisjoint(
+        interfaces["second"].threads
+    )
+
+
+def test_run(temp_builds_dir):
+    basedir = temp_builds_dir.join("runner_run")
+
+    output = ConcurrentRunner({
+        "first": WaitingInterface(basedir),
+        "second": WaitingInterface(basedir),
+    }).run(build_pages())
+
+    assert sorted(output) == ["first", "second"]
+    for built, error_logs in output.values():
+        assert len(built) == 3
+        assert error_logs == []
+
+
+def test_iter_run_error(temp_builds_dir):
+    """
+    Error from an interface should be raised once every interfaces have
+    stopped.
+    """
+    basedir = temp_builds_dir.join("runner_iter_run_error")
+
+    runner = ConcurrentRunner({
+        "first": WaitingInterface(basedir),
+        "failing": FailingInterface(basedir),
+    })
+
+    with pytest.raises(PageConfigError):
+        list(runner.iter_run(build_pages()))
+
+
+def test_iter_run_discovery(temp_builds_dir):
+    """
+    Pages should be discovered once for every interfaces.
+    """
+    basedir = temp_builds_dir.join("runner_iter_run_discovery")
+    calls = []
+
+    class CountingSource(SitemapSource):
+        def iter_urls(self):
+            calls.append(self.location)
+            for i in range(20):
+                yield "http://foo.com/{}".format(i)
+
+    discovery = PageDiscovery([])
+    discovery.sources = [CountingSource({"sitemap": "foo",
+                                         "tasks": ["screenshot"]})]
+
+    output = ConcurrentRunner({
+        "first": WaitingInterface(basedir),
+        "second": WaitingInterface(basedir, workers=2),
+    }).run(discovery, stream=True)
+
+    assert calls == ["foo"]
+    for built, error_logs in output.values():
+        assert error_logs == []
+        assert sorted([item["url"] for item in built]) == sorted([
+            "http://foo.com/{}".format(i) for i in range(20)
+        ])
+
+
+def test_iter_run_shared_proxy(temp_builds_dir):
+    """
+    Interfaces with the same cache directory should share a single caching
+    proxy, stopped once every interfaces are finished.
+    """
+    basedir = temp_builds_dir.join("runner_iter_run_shared_proxy")
+    summary = RunSummary(basedir.join("summary.json").strpath)
+    proxy_cache = {"directory": basedir.join("cache").strpath}
+    interfaces = {
+        "first": ProxyInterface(basedir, proxy_cache=proxy_cache,
+                                summary=summary),
+        "second": OtherProxyInterface(basedir, proxy_cache=proxy_cache,
+                                      summary=summary),
+        "without": ProxyInterface(basedir, summary=summary),
+    }
+
+    results = list(ConcurrentRunner(interfaces).iter_run(build_pages()))
+
+    assert len(results) == 9
+    proxies = interfaces["first"].proxies
+    assert len(proxies) == 1
+    assert None not in proxies
+    assert interfaces["second"].proxies == proxies
+    assert interfaces["without"].proxies == {None}
+
+    # Proxy is stopped and interfaces do not keep it anymore
+    assert proxies.pop().server is None
+    for interface in interfaces.values():
+        assert interface.proxy is None
+        assert interface.shared_proxy is None
+
+    assert list(summary.sections["proxy"]) == [
+        "ProxyInterface, OtherProxyInterface"
+    ]
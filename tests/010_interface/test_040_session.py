@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+
+import pytest
+
+from selenium.common.exceptions import WebDriverException
+
+from website_capture.interfaces.base import LogManagerMixin
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.interfaces.session import DriverSession, DriverSessionPool
+
+
+class CountingInterface(DummyInterface):
+    """
+    Dummy interface which keeps track of opened and closed drivers.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened = []
+        self.closed = []
+
+    def get_driver_instance(self, options, config):
+        driver = super().get_driver_instance(options, config)
+        self.opened.append(config["name"])
+        return driver
+
+    def tear_down_driver(self, driver, config):
+        super().tear_down_driver(driver, config)
+        self.closed.append(config["name"])
+
+
+class FailingInterface(CountingInterface):
+    """
+    Counting interface which raises a driver error for page named "fail".
+    """
+    def capture(self, driver, config, **kwargs):
+        if config["name"] == "fail":
+            raise WebDriverException("Browser has crashed")
+        return super().capture(driver, config, **kwargs)
+
+
+def build_pages(names, sizes=None):
+    return [
+        {
+            "name": name,
+            "url": "http://localhost/{}".format(name),
+            "sizes": sizes or [(1, 42)],
+            "tasks": ["screenshot"],
+        }
+        for name in names
+    ]
+
+
+def test_session_acquire_reuse():
+    """
+    Session should open driver once and reuse it for every acquire with the
+    same size.
+    """
+    interface = CountingInterface("/basedir")
+    session = DriverSession(interface)
+
+    first = session.acquire(interface.get_page_config(
+        {"name": "foo", "url": "foo"}, (1, 42)
+    ))
+    second = session.acquire(interface.get_page_config(
+        {"name": "bar", "url": "bar"}, (1, 42)
+    ))
+
+    assert first is second
+    assert session.jobs == 2
+    assert interface.opened == ["foo"]
+
+    session.close()
+
+    assert session.is_open is False
+    assert interface.closed == ["foo"]
+
+
+def test_session_acquire_other_key():
+    """
+    Acquiring session for a page which requires other driver options should
+    open a new driver.
+    """
+    class BlockingInterface(CountingInterface):
+        def get_session_key(self, config):
+            return tuple(self.get_blocked_patterns(config))
+
+    interface = BlockingInterface("/basedir", block_urls=["*.mp4"])
+    session = DriverSession(interface)
+
+    for name, patterns in [("foo", []), ("bar", []), ("ping", ["*.mp3"])]:
+        session.acquire(interface.get_page_config(
+            {"name": name, "url": name, "block_urls": patterns}, (1, 42)
+        ))
+
+    assert interface.opened == ["foo", "ping"]
+    assert interface.closed == ["foo"]
+    assert session.key == ("*.mp3", "*.mp4")
+
+
+def test_session_acquire_other_size():
+    """
+    Acquiring session with another size should resize browser except for
+    default size which requires a new driver.
+    """
+    interface = CountingInterface("/basedir")
+    session = DriverSession(interface)
+
+    first = session.acquire(interface.get_page_config(
+        {"name": "foo", "url": "foo"}, (1, 42)
+    ))
+    second = session.acquire(interface.get_page_config(
+        {"name": "bar", "url": "bar"}, (30, 30)
+    ))
+
+    assert first is second
+    assert interface.opened == ["foo"]
+    assert interface.closed == []
+    assert session.size == (30, 30)
+
+    session.acquire(interface.get_page_config(
+        {"name": "ping", "url": "ping"}, interface._default_size_value
+    ))
+
+    assert interface.opened == ["foo", "ping"]
+    assert interface.closed == ["foo"]
+    assert session.size == interface._default_size_value
+
+
+def test_session_log_offset(temp_builds_dir):
+    """
+    Page config should be patched to read only its own part of session
+    driver log.
+    """
+    basedir = temp_builds_dir.join("session_log_offset")
+    os.makedirs(os.path.join(basedir, "1x42"))
+
+    interface = CountingInterface(basedir)
+    session = DriverSession(interface)
+
+    first = interface.get_page_config({"name": "foo", "url": "foo"}, (1, 42))
+    session.acquire(first)
+    with io.open(first["driver_log_path"], "w") as fp:
+        fp.write("Foo line\n")
+
+    second = interface.get_page_config({"name": "bar", "url": "bar"}, (1, 42))
+    session.acquire(second)
+    with io.open(first["driver_log_path"], "a") as fp:
+        fp.write("Bar line\n")
+
+    assert second["driver_log_path"] == first["driver_log_path"]
+    assert second["driver_log_offset"] == len("Foo line\n")
+
+    manager = LogManagerMixin()
+    assert manager.get_driver_logs_content({}, first, {}) == (
+        "Foo line\nBar line\n"
+    )
+    assert manager.get_driver_logs_content({}, second, {}) == "Bar line\n"
+
+
+def test_pool_one_session_per_thread():
+    """
+    Pool should always return the same session to the same thread.
+    """
+    interface = CountingInterface("/basedir")
+    pool = DriverSessionPool(interface)
+
+    assert pool.get() is pool.get()
+    assert len(pool.sessions) == 1
+
+
+@pytest.mark.parametrize("session_pages,expected_opened", [
+    (0, ["p0"]),
+    (2, ["p0", "p2", "p4"]),
+    (1, ["p0", "p1", "p2", "p3", "p4"]),
+])
+def test_run_driver_reuse(temp_builds_dir, session_pages, expected_opened):
+    """
+    Run should open a single driver for every page of a size unless
+    'session_pages' limit is reached.
+    """
+    basedir = temp_builds_dir.join(
+        "session_run_reuse_{}".format(session_pages)
+    )
+
+    interface = CountingInterface(basedir, session_pages=session_pages)
+    built, error_logs = interface.run(
+        build_pages(["p0", "p1", "p2", "p3", "p4"])
+    )
+
+    assert len(built) == 5
+    assert error_logs == []
+    assert interface.opened == expected_opened
+    # Every opened driver has been closed
+    assert interface.closed == expected_opened
+
+
+def test_run_driver_recycle_on_error(temp_builds_dir):
+    """
+    Driver should be recycled after a driver error.
+    """
+    basedir = temp_builds_dir.join("session_run_recycle_error")
+
+    interface = FailingInterface(basedir)
+    built, error_logs = interface.run(
+        build_pages(["foo", "fail", "bar", "ping"])
+    )
+
+    assert [item["name"] for item in built] == ["foo", "bar", "ping"]
+    assert [item["name"] for item in error_logs] == ["fail"]
+    assert interface.opened == ["foo", "bar"]
+    assert interface.closed == ["foo", "bar"]
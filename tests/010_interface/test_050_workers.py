@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from selenium.common.exceptions import WebDriverException
+
+from website_capture.interfaces.dummy import DummyInterface
+
+
+class SlowInterface(DummyInterface):
+    """
+    Dummy interface where capture duration depends from page and which keep
+    track of threads used.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def capture(self, driver, config, **kwargs):
+        with self._lock:
+            self.threads.add(threading.get_ident())
+
+        time.sleep(config.get("delay", 0))
+
+        if config["name"] == "fail":
+            raise WebDriverException("Browser has crashed")
+
+        return super().capture(driver, config, **kwargs)
+
+
+def build_pages():
+    return [
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "sizes": [(1, 42), (30, 30)],
+            "tasks": ["screenshot"],
+            "delay": 0.05,
+        },
+        {
+            "name": "fail",
+            "url": "http://localhost/fail",
+            "sizes": [(1, 42)],
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "sizes": [(30, 30)],
+            "tasks": ["screenshot"],
+            "delay": 0.01,
+        },
+        {
+            "name": "ping",
+            "url": "http://localhost/ping",
+            "tasks": ["screenshot"],
+        },
+    ]
+
+
+@pytest.mark.parametrize("workers", [2, 4, 8])
+def test_run_workers_order(temp_builds_dir, workers):
+    """
+    Concurrent run should return the same results in the same order than a
+    sequential run.
+    """
+    sequential = SlowInterface(
+        temp_builds_dir.join("workers_sequential_{}".format(workers))
+    )
+    expected_built, expected_errors = sequential.run(build_pages())
+
+    concurrent = SlowInterface(
+        temp_builds_dir.join("workers_concurrent_{}".format(workers)),
+        workers=workers,
+    )
+    built, error_logs = concurrent.run(build_pages())
+
+    assert [(item["name"], item["size"]) for item in built] == [
+        (item["name"], item["size"]) for item in expected_built
+    ]
+    assert [(item["name"], item["size"]) for item in error_logs] == [
+        (item["name"], item["size"]) for item in expected_errors
+    ]
+    assert len(concurrent.threads) > 1
+    assert len(concurrent.threads) <= workers
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+
+from website_capture.interfaces.dummy import DummyInterface
+
+
+class WritingInterface(DummyInterface):
+    """
+    Dummy interface which really writes screenshot files and keeps track of
+    captured pages.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.captured = []
+
+    def task_screenshot(self, driver, config, response):
+        self.captured.append(config["name"])
+        with io.open(config["screenshot_path"], "w") as fp:
+            fp.write("Screenshot")
+        return config["screenshot_path"]
+
+
+def write_page(path, content, mtime):
+    with io.open(path, "w") as fp:
+        fp.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_run_incremental(temp_builds_dir):
+    """
+    Incremental run should only capture pages which have changed since
+    previous run and return previous payload for the other ones.
+    """
+    basedir = temp_builds_dir.join("interface_incremental")
+    sitedir = temp_builds_dir.join("interface_incremental_site")
+    os.makedirs(sitedir)
+
+    foo_path = os.path.join(sitedir, "foo.html")
+    bar_path = os.path.join(sitedir, "bar.html")
+    write_page(foo_path, "Foo", 1000000000)
+    write_page(bar_path, "Bar", 1000000000)
+
+    def get_pages(bar_method="body"):
+        return [
+            {
+                "name": "foo",
+                "url": "file://{}".format(foo_path),
+                "sizes": [(1, 42)],
+                "tasks": ["screenshot"],
+            },
+            {
+                "name": "bar",
+                "url": "file://{}".format(bar_path),
+                "sizes": [(1, 42)],
+                "screenshot_method": bar_method,
+                "tasks": ["screenshot"],
+            },
+            {
+                "name": "unreachable",
+                "url": "http://127.0.0.1:1/nope",
+                "sizes": [(1, 42)],
+                "tasks": ["screenshot"],
+            },
+        ]
+
+    interface = WritingInterface(basedir, incremental=True)
+    first_built, errors = interface.run(get_pages())
+    assert interface.captured == ["foo", "bar", "unreachable"]
+    assert os.path.exists(os.path.join(basedir, "manifest.json"))
+
+    # Nothing changed except unreachable page which can not be validated
+    interface = WritingInterface(basedir, incremental=True)
+    built, errors = interface.run(get_pages())
+    assert interface.captured == ["unreachable"]
+    # Unreachable page has been captured again with its own timings
+    assert built[:2] == first_built[:2]
+    assert [dict(item, timings=None) for item in built[2:]] == [
+        dict(item, timings=None) for item in first_built[2:]
+    ]
+
+    # Page content has changed
+    write_page(foo_path, "Foo changed", 1000000042)
+    interface = WritingInterface(basedir, incremental=True)
+    built, errors = interface.run(get_pages())
+    assert interface.captured == ["foo", "unreachable"]
+
+    # Page configuration has changed
+    interface = WritingInterface(basedir, incremental=True)
+    built, errors = interface.run(get_pages(bar_method="window"))
+    assert interface.captured == ["bar", "unreachable"]
+
+    # Page output has been removed
+    os.remove(os.path.join(basedir, "1x42", "foo_test.png"))
+    interface = WritingInterface(basedir, incremental=True)
+    built, errors = interface.run(get_pages(bar_method="window"))
+    assert interface.captured == ["foo", "unreachable"]
+
+    # Incremental mode disabled
+    interface = WritingInterface(basedir)
+    built, errors = interface.run(get_pages(bar_method="window"))
+    assert interface.captured == ["foo", "bar", "unreachable"]
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.interfaces.dummy import DummyInterface
+
+
+class TrackingInterface(DummyInterface):
+    """
+    Dummy interface which keeps track of driver events.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events = []
+
+    def get_driver_instance(self, options, config):
+        self.events.append(("open", config["name"], config["size"]))
+        return super().get_driver_instance(options, config)
+
+    def set_browser_size(self, driver, config):
+        self.events.append(("resize", config["name"], config["size"]))
+
+    def wait_for_reflow(self, driver, config):
+        self.events.append(("reflow", config["name"], config["size"]))
+
+    def load_page(self, driver, config):
+        self.events.append(("load", config["name"], config["size"]))
+        return super().load_page(driver, config)
+
+
+def build_pages():
+    return [
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "sizes": [(30, 30), (1, 42)],
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "sizes": [(1, 42), (0, 0)],
+            "tasks": ["screenshot"],
+        },
+    ]
+
+
+def test_get_job_batches():
+    interface = TrackingInterface("/basedir", scheduling="page")
+    pages = interface.page_default_values(build_pages())
+    sizes = interface.get_available_sizes(pages)
+
+    assert [
+        [(size, page["name"]) for size, page in batch]
+        for batch in interface.get_job_batches(sizes, pages)
+    ] == [
+        [((1, 42), "foo"), ((30, 30), "foo")],
+        [((0, 0), "bar"), ((1, 42), "bar")],
+    ]
+
+    interface.scheduling = "size"
+    assert [
+        [(size, page["name"]) for size, page in batch]
+        for batch in interface.get_job_batches(sizes, pages)
+    ] == [
+        [((0, 0), "bar")],
+        [((1, 42), "foo")],
+        [((1, 42), "bar")],
+        [((30, 30), "foo")],
+    ]
+
+
+def test_iter_page_default_values():
+    """
+    Default values should be set page after page without reading every
+    pages first.
+    """
+    interface = TrackingInterface("/basedir")
+
+    def iter_pages():
+        yield {"name": "foo", "url": "http://localhost/foo"}
+        raise AssertionError("Every pages have been read")
+
+    page = next(interface.iter_page_default_values(iter_pages()))
+    assert page["sizes"] == [(0, 0)]
+
+
+def test_get_run_batches_page(temp_builds_dir):
+    """
+    Page scheduling should read pages once, page after page, and only create
+    directories of required sizes.
+    """
+    basedir = temp_builds_dir.join("get_run_batches_page")
+    interface = TrackingInterface(basedir, scheduling="page")
+    interface.scheduler = interface.get_scheduler().start()
+
+    batches = interface.get_run_batches(iter(build_pages()))
+
+    assert [
+        [(size, page["name"]) for size, page in batch]
+        for batch in batches
+    ] == [
+        [((1, 42), "foo"), ((30, 30), "foo")],
+        [((0, 0), "bar"), ((1, 42), "bar")],
+    ]
+    assert sorted(basedir.listdir()) == [
+        basedir.join(name) for name in ["1x42", "30x30", "Default"]
+    ]
+
+
+def test_get_job_batches_invalid():
+    interface = TrackingInterface("/basedir", scheduling="nope")
+
+    with pytest.raises(SettingsInvalidError):
+        interface.get_job_batches([], [])
+
+
+def test_run_page_scheduling(temp_builds_dir):
+    """
+    Page scheduling should load each page once and resize browser for each
+    of its sizes, with the same outputs than size scheduling.
+    """
+    size_interface = TrackingInterface(
+        temp_builds_dir.join("scheduling_size")
+    )
+    size_built, size_errors = size_interface.run(build_pages())
+
+    page_interface = TrackingInterface(
+        temp_builds_dir.join("scheduling_page"),
+        scheduling="page",
+    )
+    page_built, page_errors = page_interface.run(build_pages())
+
+    assert page_interface.events == [
+        ("open", "foo", (1, 42)),
+        ("resize", "foo", (1, 42)),
+        ("load", "foo", (1, 42)),
+        ("resize", "foo", (30, 30)),
+        ("reflow", "foo", (30, 30)),
+        # Default size requires a new driver
+        ("open", "bar", (0, 0)),
+        ("load", "bar", (0, 0)),
+        ("resize", "bar", (1, 42)),
+        ("reflow", "bar", (1, 42)),
+    ]
+
+    loads = [item for item in size_interface.events if item[0] == "load"]
+    assert len(loads) == 4
+
+    def relative(built, interface):
+        return sorted([
+            (item["name"], item["size"],
+             item["screenshot"][len(str(interface.basedir)):])
+            for item in built
+        ])
+
+    assert relative(page_built, page_interface) == (
+        relative(size_built, size_interface)
+    )
+
+
+def test_run_page_scheduling_workers(temp_builds_dir):
+    """
+    Every sizes of a page should be performed by the same worker.
+    """
+    interface = TrackingInterface(
+        temp_builds_dir.join("scheduling_page_workers"),
+        scheduling="page",
+        workers=2,
+    )
+    built, errors = interface.run(build_pages())
+
+    assert [(item["name"], item["size"]) for item in built] == [
+        ("foo", (1, 42)),
+        ("foo", (30, 30)),
+        ("bar", (0, 0)),
+        ("bar", (1, 42)),
+    ]
+    loads = [item for item in interface.events if item[0] == "load"]
+    assert len(loads) == 2
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium.common.exceptions import WebDriverException
+
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.interfaces.asyncio_interface import AsyncWebDriverInterface
+
+
+class StreamingInterface(DummyInterface):
+    """
+    Dummy interface which keeps track of captured pages and raises a driver
+    error for page named "fail".
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.captured = []
+        self.closed = 0
+
+    def capture(self, driver, config, **kwargs):
+        self.captured.append(config["name"])
+        if config["name"] == "fail":
+            raise WebDriverException("Browser has crashed")
+        return super().capture(driver, config, **kwargs)
+
+    def tear_down_driver(self, driver, config):
+        super().tear_down_driver(driver, config)
+        self.closed += 1
+
+
+def build_pages(names):
+    return [
+        {
+            "name": name,
+            "url": "http://localhost/{}".format(name),
+            "sizes": [(1, 42)],
+            "tasks": ["screenshot"],
+        }
+        for name in names
+    ]
+
+
+def test_iter_run_yield_early(temp_builds_dir):
+    """
+    Results should be yielded as soon as their page job is finished.
+    """
+    basedir = temp_builds_dir.join("iter_run_yield_early")
+
+    interface = StreamingInterface(basedir)
+    results = interface.iter_run(build_pages(["foo", "fail", "bar"]))
+
+    status, item = next(results)
+    assert (status, item["name"]) == ("success", "foo")
+    assert interface.captured == ["foo"]
+
+    status, item = next(results)
+    assert (status, item["name"]) == ("error", "fail")
+    assert interface.captured == ["foo", "fail"]
+
+    status, item = next(results)
+    assert (status, item["name"]) == ("success", "bar")
+
+    with pytest.raises(StopIteration):
+        next(results)
+
+
+def test_iter_run_close(temp_builds_dir):
+    """
+    Closing generator before its end should stop jobs and close drivers.
+    """
+    basedir = temp_builds_dir.join("iter_run_close")
+
+    interface = StreamingInterface(basedir)
+    results = interface.iter_run(build_pages(["foo", "bar", "ping"]))
+
+    next(results)
+    results.close()
+
+    assert interface.captured == ["foo"]
+    assert interface.closed == 1
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_iter_run_order(temp_builds_dir, workers):
+    """
+    Results should be yielded in the same order than a sequential run
+    whatever the number of workers is.
+    """
+    basedir = temp_builds_dir.join("iter_run_order_{}".format(workers))
+    names = ["p{}".format(i) for i in range(10)]
+
+    interface = StreamingInterface(basedir, workers=workers)
+
+    assert [
+        item["name"] for status, item in interface.iter_run(build_pages(names))
+    ] == names
+
+
+def test_asyncio_iter_run(temp_builds_dir, fake_webdriver):
+    """
+    Asyncio interface should yield results in the same order than a
+    sequential run.
+    """
+    basedir = temp_builds_dir.join("asyncio_iter_run")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        workers=3,
+    )
+    interface.DESTINATION_FILEPATH = "{name}_test"
+
+    results = list(interface.iter_run(build_pages(["foo", "fail", "bar"])))
+
+    assert [(status, item["name"]) for status, item in results] == [
+        ("success", "foo"),
+        ("error", "fail"),
+        ("success", "bar"),
+    ]
+    # Every opened sessions have been closed
+    assert fake_webdriver.sessions == {}
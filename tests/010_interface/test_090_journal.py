@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.interfaces.asyncio_interface import AsyncWebDriverInterface
+from website_capture.results import ResultJournal
+
+
+class JournalInterface(DummyInterface):
+    """
+    Dummy interface which keeps track of captured pages and raises a driver
+    error for pages from "failing" attribute.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, failing=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failing = failing or []
+        self.captured = []
+
+    def capture(self, driver, config, **kwargs):
+        self.captured.append(config["name"])
+        if config["name"] in self.failing:
+            raise WebDriverException("Browser has crashed")
+        return super().capture(driver, config, **kwargs)
+
+
+def build_pages(names):
+    return [
+        {
+            "name": name,
+            "url": "http://localhost/{}".format(name),
+            "sizes": [(1, 42)],
+            "tasks": ["screenshot"],
+        }
+        for name in names
+    ]
+
+
+def test_journal_resume(temp_builds_dir):
+    """
+    Resumed run should only capture pages which have not succeeded yet and
+    return the journal payload for the others.
+    """
+    basedir = temp_builds_dir.join("journal_resume")
+    path = os.path.join(basedir, "journal.jsonl")
+    pages = build_pages(["foo", "bar", "ping"])
+
+    journal = ResultJournal(path).open()
+    interface = JournalInterface(basedir, journal=journal, failing=["bar"])
+    results = interface.iter_run(pages)
+    # Interrupted after the second result
+    next(results)
+    next(results)
+    results.close()
+    journal.close()
+
+    assert interface.captured == ["foo", "bar"]
+
+    journal = ResultJournal(path).open(resume=True)
+    interface = JournalInterface(basedir, journal=journal)
+    built, error_logs = interface.run(pages)
+    journal.close()
+
+    assert interface.captured == ["bar", "ping"]
+    assert [(item["name"], item["size"]) for item in built] == [
+        ("foo", (1, 42)),
+        ("bar", (1, 42)),
+        ("ping", (1, 42)),
+    ]
+    assert error_logs == []
+
+    assert sorted(ResultJournal(path).load().finished) == [
+        "JournalInterface:1x42:bar",
+        "JournalInterface:1x42:foo",
+        "JournalInterface:1x42:ping",
+    ]
+
+
+def test_asyncio_journal_resume(temp_builds_dir, fake_webdriver):
+    """
+    Asyncio interface should write to journal and skip finished pages.
+    """
+    basedir = temp_builds_dir.join("asyncio_journal_resume")
+    path = os.path.join(basedir, "journal.jsonl")
+    pages = build_pages(["foo", "fail", "bar"])
+
+    journal = ResultJournal(path).open()
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        journal=journal,
+    )
+    interface.run(pages)
+    journal.close()
+
+    assert sorted(ResultJournal(path).load().finished) == [
+        "AsyncWebDriverInterface:1x42:bar",
+        "AsyncWebDriverInterface:1x42:foo",
+    ]
+
+    journal = ResultJournal(path).open(resume=True)
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        journal=journal,
+    )
+    fake_webdriver.commands = []
+    built, error_logs = interface.run(pages)
+    journal.close()
+
+    assert [item["name"] for item in built] == ["foo", "bar"]
+    assert [item["name"] for item in error_logs] == ["fail"]
+    loaded = [payload["url"] for method, path, payload
+              in fake_webdriver.commands if path.endswith("/url")]
+    assert loaded == ["http://localhost/fail"]
@@ -82,6 +82,8 @@ def test_page_job(temp_builds_dir, insert_basedir, page, size_dir, expected):
     engine.DESTINATION_FILEPATH = "{name}_test"
 
     built, error_logs = engine.page_job(required_size, page)
+    for item in built:
+        assert "total" in item.pop("timings")
 
     assert built == [insert_basedir(basedir, item) for item in expected]
     assert error_logs == []
@@ -134,6 +136,8 @@ def test_perform_size_pages(temp_builds_dir, insert_basedir, pages, size_dir, ex
     engine.DESTINATION_FILEPATH = "{name}_test"
 
     built, error_logs = engine.perform_size_pages(required_size, pages)
+    for item in built:
+        assert "total" in item.pop("timings")
     assert built == [insert_basedir(basedir, item) for item in expected_payload]
     assert error_logs == []
 
@@ -192,6 +196,8 @@ def test_run(temp_builds_dir, insert_basedir, pages, size_dir, expected_dirs,
     engine.DESTINATION_FILEPATH = "{name}_test"
 
     built, error_logs = engine.run(pages)
+    for item in built:
+        assert "total" in item.pop("timings")
     assert built == [insert_basedir(basedir, item) for item in expected_payload]
     assert error_logs == []
 
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import io
+import json
+import time
+
+import pytest
+
+from website_capture.interfaces.asyncio_interface import (
+    AsyncHTTPConnectionPool, AsyncWebDriverInterface
+)
+
+
+def test_connection_pool_keep_alive(fake_webdriver):
+    """
+    Successive requests should reuse the same connection.
+    """
+    async def requests():
+        http = AsyncHTTPConnectionPool(fake_webdriver.url, size=2)
+        responses = []
+        for i in range(5):
+            responses.append(await http.request("POST", "/session", {
+                "capabilities": {"alwaysMatch": {}},
+            }))
+        await http.close()
+        return http, responses
+
+    http, responses = asyncio.run(requests())
+
+    assert [status for status, headers, body in responses] == [200] * 5
+    assert http.opened == 1
+    assert fake_webdriver.connections == 1
+
+
+def test_connection_pool_read_chunked():
+    """
+    Chunked body should be read until its last empty chunk.
+    """
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"4\r\nfoo \r\n3;ext=1\r\nbar\r\n0\r\n\r\nnext")
+        reader.feed_eof()
+        http = AsyncHTTPConnectionPool("http://localhost:4444")
+        return await http.read_chunked(reader), await reader.read()
+
+    assert asyncio.run(read()) == (b"foo bar", b"next")
+
+
+def test_get_driver_options():
+    interface = AsyncWebDriverInterface(browser="chrome")
+
+    assert interface.get_driver_options({}) == {
+        "capabilities": {
+            "browserName": "chrome",
+            "goog:loggingPrefs": {"browser": "ALL"},
+            "goog:chromeOptions": {"args": ["--headless"]},
+        },
+    }
+
+
+def test_get_driver_options_page_load_strategy():
+    interface = AsyncWebDriverInterface(headless=False,
+                                        page_load_strategy="eager")
+
+    assert interface.get_driver_options({}) == {
+        "capabilities": {
+            "browserName": "firefox",
+            "pageLoadStrategy": "eager",
+        },
+    }
+
+
+def test_run(temp_builds_dir, fake_webdriver):
+    """
+    Run should perform every page jobs through WebDriver commands and return
+    results in the same order than a sequential run.
+    """
+    basedir = temp_builds_dir.join("asyncio_run")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        workers=3,
+    )
+    interface.DESTINATION_FILEPATH = "{name}_test"
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "sizes": [(1, 42), (30, 30)],
+            "tasks": ["screenshot", "report"],
+        },
+        {
+            "name": "fail",
+            "url": "http://localhost/fail",
+            "sizes": [(1, 42)],
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "sizes": [(1, 42)],
+            "screenshot_method": "window",
+            "tasks": ["screenshot"],
+        },
+    ])
+
+    assert [(item["name"], item["size"]) for item in built] == [
+        ("foo", (1, 42)),
+        ("bar", (1, 42)),
+        ("foo", (30, 30)),
+    ]
+    assert [(item["name"], item["size"]) for item in error_logs] == [
+        ("fail", (1, 42)),
+    ]
+
+    for item in built:
+        with io.open(item["screenshot"], "rb") as fp:
+            assert fp.read().startswith(b"\x89PNG")
+
+    with io.open(built[0]["report"], "r") as fp:
+        report = json.load(fp)
+
+    assert report["interface"] == "AsyncWebDriverInterface"
+    assert report["logs"] == [["error", "36:18 Uncaught ReferenceError"]]
+
+    # Every opened sessions have been closed and connections were shared
+    assert fake_webdriver.sessions == {}
+    assert fake_webdriver.connections <= 3
+
+
+def test_run_concurrency(temp_builds_dir, fake_webdriver):
+    """
+    Page loads should be in flight at the same time.
+    """
+    basedir = temp_builds_dir.join("asyncio_run_concurrency")
+    fake_webdriver.delay = 0.2
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        workers=10,
+    )
+
+    pages = [
+        {
+            "name": "page-{}".format(i),
+            "url": "http://localhost/{}".format(i),
+            "tasks": ["screenshot"],
+        }
+        for i in range(10)
+    ]
+
+    start = time.perf_counter()
+    built, error_logs = interface.run(pages)
+    elapsed = time.perf_counter() - start
+
+    assert len(built) == 10
+    # Sequential run would take at least two seconds
+    assert elapsed < 1.5
+
+
+def test_run_unreachable_server(temp_builds_dir):
+    """
+    An unreachable server should be logged as page errors.
+    """
+    basedir = temp_builds_dir.join("asyncio_run_unreachable")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url="http://127.0.0.1:1",
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "tasks": ["screenshot"],
+        },
+    ])
+
+    assert built == []
+    assert [item["name"] for item in error_logs] == ["foo"]
+
+
+def test_run_page_scheduling(temp_builds_dir, fake_webdriver):
+    """
+    With page scheduling, page should be loaded only once for all its sizes.
+    """
+    basedir = temp_builds_dir.join("asyncio_run_page_scheduling")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        scheduling="page",
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "sizes": [(1, 42), (30, 30), (300, 60)],
+            "tasks": ["screenshot"],
+        },
+    ])
+
+    assert [item["size"] for item in built] == [(1, 42), (30, 30), (300, 60)]
+
+    commands = [path.split("/", 3)[-1] for method, path, payload
+                in fake_webdriver.commands if path != "/session"]
+    assert commands.count("url") == 1
+    assert commands.count("window/rect") == 3
+    assert commands.count("execute/async") == 2
+
+
+def test_run_screenshot_format(temp_builds_dir, fake_webdriver):
+    """
+    Screenshots should be encoded to the page screenshot format.
+    """
+    Image = pytest.importorskip("PIL.Image")
+    basedir = temp_builds_dir.join("asyncio_run_screenshot_format")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        encoder_workers=2,
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "screenshot_format": "jpeg",
+            "screenshot_thumbnail": [20, 20],
+            "tasks": ["screenshot"],
+        },
+    ])
+
+    assert built[0]["screenshot"].endswith("foo_webdriver.jpg")
+    with Image.open(built[0]["screenshot"]) as image:
+        assert image.format == "JPEG"
+    with Image.open(built[0]["screenshot"][:-3] + "thumb.jpg") as image:
+        assert image.size == (20, 15)
+
+
+def test_run_fullpage(temp_builds_dir, fake_webdriver):
+    """
+    Full page screenshot should be stitched from a window screenshot for each
+    scroll position.
+    """
+    Image = pytest.importorskip("PIL.Image")
+    basedir = temp_builds_dir.join("asyncio_run_fullpage")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "screenshot_method": "fullpage",
+            "tasks": ["screenshot"],
+        },
+    ])
+
+    scrolls = [payload["args"][0] for method, path, payload
+               in fake_webdriver.commands
+               if path.endswith("/execute/sync") and payload["args"]]
+    assert scrolls == [0, 30, 60, 0]
+
+    with Image.open(built[0]["screenshot"]) as image:
+        assert image.size == (40, 70)
+        assert [image.getpixel((0, y))[1] for y in (0, 29, 30, 59, 60, 69)] == [
+            0, 0, 30, 30, 40, 40,
+        ]
+
+
+def test_run_performance(temp_builds_dir, fake_webdriver):
+    """
+    Performance task should get metrics from page performance entries.
+    """
+    basedir = temp_builds_dir.join("asyncio_run_performance")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "tasks": ["performance"],
+        },
+    ])
+
+    assert error_logs == []
+    metrics = built[0]["performance"]
+    assert metrics["ttfb"] == 120.5
+    assert metrics["largest_contentful_paint"] == 400
+    assert [item["url"] for item in metrics["resources"]] == [
+        "http://localhost/foo.css",
+        "http://localhost/foo.js",
+    ]
+
+
+def test_run_wait_for(temp_builds_dir, fake_webdriver, caplog):
+    """
+    Page should wait for its readiness conditions after loading and warn if
+    they are not met before timeout.
+    """
+    basedir = temp_builds_dir.join("asyncio_run_wait_for")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "wait_for": {"network_idle": 500, "fonts": True},
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "wait_for": {"selector": "#app", "timeout": 2},
+            "tasks": ["screenshot"],
+        },
+    ])
+
+    assert error_logs == []
+    assert [item["name"] for item in built] == ["foo", "bar"]
+    assert "wait" in built[0]["timings"]
+    # Driver script timeout leaves time to readiness script timeout then
+    # goes back to its default for next scripts
+    assert 7000 in fake_webdriver.script_timeouts
+    assert fake_webdriver.script_timeout == 30000
+    assert caplog.record_tuples == [
+        ("py-website-capture", 30,
+         "🔹 Page is not ready after 2000ms, still waiting for selector: "
+         "bar (Default)"),
+    ]
+
+
+def test_get_driver_options_blocking():
+    """
+    Firefox should block patterns from its profile preferences.
+    """
+    interface = AsyncWebDriverInterface(block_urls=["*://ads.com/*"])
+
+    options = interface.get_driver_options({"name": "foo"})
+    firefox_options = options["capabilities"]["moz:firefoxOptions"]
+    assert firefox_options["args"] == ["-headless"]
+    assert firefox_options["prefs"]["network.proxy.type"] == 2
+
+    # Driver is recycled when patterns change
+    assert interface.get_session_key({"name": "foo"}) != (
+        interface.get_session_key({"name": "bar", "block_urls": ["*.mp4"]})
+    )
+
+
+def test_get_driver_options_proxy(temp_builds_dir):
+    """
+    Browsers should be configured to use the running caching proxy.
+    """
+    basedir = temp_builds_dir.join("asyncio_driver_options_proxy")
+
+    for browser in ["firefox", "chrome"]:
+        interface = AsyncWebDriverInterface(basedir, browser=browser,
+                                            proxy_cache=True)
+
+        # Proxy is only used once started
+        options = interface.get_driver_options({"name": "foo"})
+        assert "prefs" not in options["capabilities"].get(
+            "moz:firefoxOptions", {}
+        )
+        assert options["capabilities"].get("goog:chromeOptions", {}).get(
+            "args", ["--headless"]
+        ) == ["--headless"]
+
+        interface.start_caching_proxy()
+        try:
+            options = interface.get_driver_options({"name": "foo"})
+            address = interface.proxy.address
+        finally:
+            interface.stop_caching_proxy()
+
+        if browser == "chrome":
+            assert options["capabilities"]["goog:chromeOptions"]["args"] == [
+                "--headless",
+                "--proxy-server=http://{}".format(address),
+                "--proxy-bypass-list=<-loopback>",
+            ]
+        else:
+            prefs = options["capabilities"]["moz:firefoxOptions"]["prefs"]
+            assert prefs["network.proxy.type"] == 2
+            assert prefs["network.proxy.allow_hijacking_localhost"] is True
+
+
+def test_run_blocking(temp_builds_dir, fake_webdriver):
+    """
+    Chrome should block patterns from DevTools protocol and report blocked
+    requests.
+    """
+    basedir = temp_builds_dir.join("asyncio_run_blocking")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        browser="chrome",
+        block_resource_types=["media"],
+    )
+
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "block_urls": ["*://ads.com/*"],
+            "tasks": ["report"],
+        },
+    ])
+
+    assert error_logs == []
+    with io.open(built[0]["report"], "r") as fp:
+        report = json.load(fp)
+    assert report["blocked"] == 2
+
+    commands = [
+        payload for method, path, payload in fake_webdriver.commands
+        if path.endswith("/goog/cdp/execute")
+    ]
+    assert [item["cmd"] for item in commands] == [
+        "Network.enable", "Network.setBlockedURLs",
+    ]
+    assert "*://ads.com/*" in commands[1]["params"]["urls"]
+    assert "*.mp4" in commands[1]["params"]["urls"]
+
+    session = [
+        payload for method, path, payload in fake_webdriver.commands
+        if path == "/session"
+    ][0]
+    assert session["capabilities"]["alwaysMatch"]["goog:loggingPrefs"] == {
+        "browser": "ALL",
+        "performance": "ALL",
+    }
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from website_capture.exceptions import PageConfigError
+from website_capture.interfaces.dummy import DummyInterface
+
+from tests.conftest import build_png
+
+Image = pytest.importorskip("PIL.Image")
+
+
+class ScreenshotInterface(DummyInterface):
+    """
+    Dummy interface which writes a screenshot from page color.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def task_screenshot(self, driver, config, response):
+        return self.save_screenshot(
+            config,
+            build_png(40, 30, tuple(config.get("color", [200, 30, 30])))
+        )
+
+
+def build_pages():
+    return [
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "tasks": ["screenshot", "diff"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "color": [0, 0, 0],
+            "sizes": [(1, 42)],
+            "tasks": ["screenshot", "diff"],
+        },
+        {
+            "name": "ping",
+            "url": "http://localhost/ping",
+            "diff_threshold": 1,
+            "color": [0, 0, 0],
+            "tasks": ["screenshot", "diff"],
+        },
+    ]
+
+
+@pytest.mark.parametrize("encoder_workers", [0, 2])
+def test_run_diff(temp_builds_dir, encoder_workers):
+    """
+    Diff task should compare written screenshot against the one from baseline
+    directory with the same relative path.
+    """
+    basedir = temp_builds_dir.join("run_diff_{}".format(encoder_workers))
+    baseline_dir = temp_builds_dir.join(
+        "run_diff_baseline_{}".format(encoder_workers)
+    )
+
+    # Build baseline
+    interface = ScreenshotInterface(baseline_dir)
+    interface.run([
+        dict(page, tasks=["screenshot"], color=[200, 30, 30])
+        for page in build_pages()
+    ])
+
+    interface = ScreenshotInterface(basedir, diff_baseline=baseline_dir,
+                                    encoder_workers=encoder_workers)
+    built, error_logs = interface.run(build_pages())
+
+    results = {item["name"]: item["diff"] for item in built}
+
+    assert results["foo"]["status"] == "unchanged"
+    assert results["foo"]["baseline"] == os.path.join(
+        baseline_dir, "Default", "foo_test.png"
+    )
+    assert results["bar"]["status"] == "changed"
+    assert results["bar"]["score"] == 1.0
+    assert results["bar"]["diff"] == os.path.join(
+        basedir, "1x42", "bar_test.diff.png"
+    )
+    assert os.path.exists(results["bar"]["diff"])
+    assert results["ping"]["status"] == "unchanged"
+    assert results["ping"]["score"] == 1.0
+
+
+def test_diff_page_baseline(temp_builds_dir):
+    """
+    Diff task requires a baseline directory from interface or page.
+    """
+    basedir = temp_builds_dir.join("diff_page_baseline")
+    interface = ScreenshotInterface(basedir)
+
+    with pytest.raises(PageConfigError):
+        interface.run(build_pages())
+
+    built, error_logs = interface.run([
+        dict(page, diff_baseline=str(temp_builds_dir.join("nope")))
+        for page in build_pages()
+    ])
+
+    assert [item["diff"]["status"] for item in built] == ["missing"] * 3
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.phash import HASH_INDEX_FILENAME, HashIndex
+
+from tests.conftest import build_png
+
+Image = pytest.importorskip("PIL.Image")
+
+
+class ScreenshotInterface(DummyInterface):
+    """
+    Dummy interface which writes a screenshot from page color.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def task_screenshot(self, driver, config, response):
+        return self.save_screenshot(
+            config,
+            build_png(40, 30, tuple(config.get("color", [200, 30, 30])))
+        )
+
+
+@pytest.mark.parametrize("encoder_workers", [0, 2])
+def test_run_hashes(temp_builds_dir, encoder_workers):
+    """
+    Screenshot hashes should be added to payload and saved to index.
+    """
+    basedir = temp_builds_dir.join("run_hashes_{}".format(encoder_workers))
+
+    interface = ScreenshotInterface(basedir, hash_screenshots=True,
+                                    encoder_workers=encoder_workers)
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "sizes": [(1, 42)],
+            "tasks": ["screenshot"],
+        },
+        {
+            "name": "ping",
+            "url": "http://localhost/ping",
+            "tasks": ["report"],
+        },
+    ])
+
+    assert error_logs == []
+    results = {item["name"]: item for item in built}
+
+    assert sorted(results["foo"]["hashes"]) == ["ahash", "dhash", "phash"]
+    # Same screenshot content gives the same hashes
+    assert results["foo"]["hashes"] == results["bar"]["hashes"]
+    assert "hashes" not in results["ping"]
+
+    index = HashIndex(os.path.join(basedir, HASH_INDEX_FILENAME)).load()
+    assert sorted(index.keys) == [
+        os.path.join("1x42", "bar_test.png"),
+        os.path.join("Default", "foo_test.png"),
+    ]
+    assert interface.hash_index is None
+
+
+def test_run_hashes_disabled(temp_builds_dir):
+    basedir = temp_builds_dir.join("run_hashes_disabled")
+
+    interface = ScreenshotInterface(basedir)
+    built, error_logs = interface.run([{
+        "name": "foo",
+        "url": "http://localhost/foo",
+        "tasks": ["screenshot"],
+    }])
+
+    assert "hashes" not in built[0]
+    assert not os.path.exists(os.path.join(basedir, HASH_INDEX_FILENAME))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import urllib.request
+
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.proxy import PROXY_CACHE_DIRNAME
+from website_capture.timings import RunSummary
+
+
+class ProxyInterface(DummyInterface):
+    """
+    Dummy interface which loads page assets through caching proxy like a
+    browser would do.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def load_page(self, driver, config):
+        response = super().load_page(driver, config)
+
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({
+            "http": "http://" + self.get_proxy_address(),
+        }))
+        response["assets"] = []
+        for url in config["assets"]:
+            with opener.open(url, timeout=10) as asset:
+                response["assets"].append(asset.read())
+
+        return response
+
+
+def test_run_proxy(temp_builds_dir, origin_server):
+    """
+    Assets shared by pages should be requested once from origin and proxy
+    statistics should be added to run summary.
+    """
+    basedir = temp_builds_dir.join("run_proxy").strpath
+    summary = RunSummary(os.path.join(basedir, "summary.json"))
+    assets = [
+        origin_server.url + "/style.css",
+        origin_server.url + "/private.json",
+    ]
+
+    interface = ProxyInterface(basedir, proxy_cache={"max_size": 1},
+                               summary=summary, workers=2)
+    built, error_logs = interface.run([
+        {
+            "name": "foo",
+            "url": "http://localhost/foo",
+            "assets": assets,
+            "tasks": ["performance"],
+        },
+        {
+            "name": "bar",
+            "url": "http://localhost/bar",
+            "assets": assets,
+            "tasks": ["performance"],
+        },
+        {
+            "name": "ping",
+            "url": "http://localhost/ping",
+            "assets": assets,
+            "tasks": ["performance"],
+        },
+    ])
+
+    assert error_logs == []
+    assert interface.proxy is None
+    assert origin_server.requests.count("/style.css") == 1
+    assert origin_server.requests.count("/private.json") == 3
+    assert os.path.exists(os.path.join(basedir, PROXY_CACHE_DIRNAME))
+
+    summary.save()
+    with open(summary.path) as fp:
+        stats = json.load(fp)["proxy"]["ProxyInterface"]
+
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["stored"] == 1
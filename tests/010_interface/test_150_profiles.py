@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from website_capture.interfaces.selenium_interface import (
+    SeleniumFirefoxInterface
+)
+
+
+class FakeFirefox(object):
+    """
+    Fake Firefox driver which only remembers its arguments.
+    """
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        if kwargs.get("service_log_path") == "fail":
+            raise RuntimeError("Browser failed")
+        FakeFirefox.instances.append(self)
+
+    def quit(self):
+        self.closed = True
+
+
+class FakeFirefoxInterface(SeleniumFirefoxInterface):
+    DRIVER_CLASS = FakeFirefox
+    FLUSH_DRIVER_LOGS = False
+
+
+def get_profile_path(options):
+    arguments = options["options"].arguments
+    return arguments[arguments.index("-profile") + 1]
+
+
+def test_driver_profile(temp_builds_dir):
+    """
+    Without template, driver should be started with a profile copied by
+    Selenium.
+    """
+    basedir = temp_builds_dir.join("driver_profile").strpath
+    interface = FakeFirefoxInterface(basedir, block_urls=["*.mp4"])
+    config = interface.get_page_config({"name": "foo", "url": "foo"}, (0, 0))
+
+    options = interface.get_driver_options(config)
+    assert "-profile" not in options["options"].arguments
+    assert "profile_clone" not in options
+    assert options["firefox_profile"].default_preferences[
+        "network.proxy.type"
+    ] == 2
+
+
+def test_driver_profile_template(temp_builds_dir):
+    """
+    Drivers should start from a clone of a template built once, clone is
+    removed once driver is closed.
+    """
+    basedir = temp_builds_dir.join("driver_profile_template").strpath
+    FakeFirefox.instances = []
+
+    interface = FakeFirefoxInterface(basedir, profile_template=True,
+                                     block_urls=["*.mp4"])
+    config = interface.get_page_config({"name": "foo", "url": "foo"}, (0, 0))
+
+    options = interface.get_driver_options(config)
+    assert "firefox_profile" not in options
+    # Template has been warmed from a browser started with its profile
+    assert len(FakeFirefox.instances) == 1
+    warm_options = FakeFirefox.instances[0].kwargs["options"]
+    assert "-profile" in warm_options.arguments
+    assert FakeFirefox.instances[0].closed is True
+
+    path = get_profile_path(options)
+    assert os.path.dirname(os.path.dirname(path)) == os.path.join(
+        basedir, ".profile-templates"
+    )
+    with open(os.path.join(path, "user.js")) as fp:
+        assert 'user_pref("network.proxy.type", 2);' in fp.read()
+
+    driver = interface.get_driver_instance(options, config)
+    assert "profile_clone" not in driver.kwargs
+    assert os.path.exists(path)
+
+    interface.tear_down_driver(driver, config)
+    assert driver.closed is True
+    assert not os.path.exists(path)
+
+    # Template is reused for next drivers
+    options = interface.get_driver_options(config)
+    assert len(interface.profile_templates) == 1
+    assert len(FakeFirefox.instances) == 2
+
+    # Clone is removed if driver can not be started
+    path = get_profile_path(options)
+    options["service_log_path"] = "fail"
+    with pytest.raises(RuntimeError):
+        interface.get_driver_instance(options, config)
+    assert not os.path.exists(path)
+
+    # Other preferences require another template
+    interface.get_driver_options(dict(config, block_urls=["*.mp3"]))
+    assert len(interface.profile_templates) == 2
+
+
+def test_driver_profile_template_proxy(temp_builds_dir):
+    """
+    Caching proxy address should only be set in clone preferences so the
+    same template is reused whatever proxy port is.
+    """
+    basedir = temp_builds_dir.join("driver_profile_template_proxy").strpath
+    FakeFirefox.instances = []
+
+    interface = FakeFirefoxInterface(basedir, profile_template=True)
+    config = interface.get_page_config({"name": "foo", "url": "foo"}, (0, 0))
+
+    paths = []
+    for port in [8001, 8002]:
+        interface.get_proxy_address = lambda: "127.0.0.1:{}".format(port)
+        paths.append(get_profile_path(interface.get_driver_options(config)))
+
+    assert len(interface.profile_templates) == 1
+    assert len(FakeFirefox.instances) == 1
+
+    template = list(interface.profile_templates.values())[0]
+    with open(os.path.join(template.path, "user.js")) as fp:
+        assert "network.proxy" not in fp.read()
+    for path in paths:
+        with open(os.path.join(path, "user.js")) as fp:
+            assert 'user_pref("network.proxy.type", 2);' in fp.read()
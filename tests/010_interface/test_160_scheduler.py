@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from website_capture.interfaces.asyncio_interface import AsyncWebDriverInterface
+from website_capture.interfaces.dummy import DummyInterface
+from website_capture.results import ResultJournal
+from website_capture.scheduler import JobScheduler
+
+
+class BudgetInterface(DummyInterface):
+    """
+    Dummy interface where each capture takes a second from a fake clock.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.now = 0
+        self.captured = []
+        self.timeouts = []
+
+    def get_job_timeout(self, config):
+        timeout = super().get_job_timeout(config)
+        self.timeouts.append((config["name"], timeout))
+        return timeout
+
+    def get_scheduler(self):
+        return JobScheduler(time_budget=self.time_budget,
+                            clock=lambda: self.now)
+
+    def capture(self, driver, config, **kwargs):
+        self.captured.append((config["name"], config["size"]))
+        self.now += 1
+        return super().capture(driver, config, **kwargs)
+
+
+def build_pages():
+    return [
+        {"name": "foo", "url": "http://localhost/foo",
+         "sizes": [(1, 42), (30, 30)], "tasks": ["screenshot"]},
+        {"name": "bar", "url": "http://localhost/bar", "priority": 10,
+         "sizes": [(1, 42)], "tasks": ["screenshot"]},
+        {"name": "ping", "url": "http://localhost/ping", "priority": -1,
+         "sizes": [(1, 42)], "tasks": ["screenshot"]},
+        {"name": "pong", "url": "http://localhost/pong", "priority": 10,
+         "sizes": [(30, 30)], "tasks": ["screenshot"]},
+    ]
+
+
+def test_run_priority(temp_builds_dir):
+    """
+    Jobs should be performed by page priority, then by scheduling order.
+    """
+    basedir = temp_builds_dir.join("scheduler_run_priority")
+
+    interface = BudgetInterface(basedir)
+    interface.run(build_pages())
+    assert interface.captured == [
+        ("bar", (1, 42)),
+        ("pong", (30, 30)),
+        ("foo", (1, 42)),
+        ("foo", (30, 30)),
+        ("ping", (1, 42)),
+    ]
+
+    interface = BudgetInterface(basedir, scheduling="page", workers=2)
+    built, error_logs = interface.run(build_pages())
+    assert [item["name"] for item in built] == [
+        "bar", "pong", "foo", "foo", "ping",
+    ]
+    assert len(interface.captured) == 5
+
+
+def test_run_time_budget(temp_builds_dir):
+    """
+    Jobs should be skipped once time budget is exhausted and recorded as
+    skipped results.
+    """
+    basedir = temp_builds_dir.join("scheduler_run_time_budget")
+    journal = ResultJournal(str(basedir.join("journal.jsonl"))).open()
+
+    interface = BudgetInterface(basedir, time_budget=2.5, page_timeout=2,
+                                journal=journal)
+    results = [
+        (status, item["name"])
+        for status, item in interface.iter_run(build_pages())
+    ]
+    journal.close()
+
+    assert results == [
+        ("success", "bar"),
+        ("success", "pong"),
+        ("success", "foo"),
+        ("skipped", "foo"),
+        ("skipped", "ping"),
+    ]
+    assert interface.captured == [
+        ("bar", (1, 42)),
+        ("pong", (30, 30)),
+        ("foo", (1, 42)),
+    ]
+    # Page timeout is shortened to remaining time budget
+    assert interface.timeouts == [
+        ("bar", 2),
+        ("pong", 1.5),
+        ("foo", 0.5),
+    ]
+
+    with io.open(str(basedir.join("journal.jsonl"))) as fp:
+        statuses = [json.loads(line)["status"] for line in fp]
+    assert statuses == ["success"] * 3 + ["skipped"] * 2
+
+    interface = BudgetInterface(basedir, time_budget=2.5)
+    built, error_logs = interface.run([
+        dict(page, priority=0, timeout=5) for page in build_pages()
+    ])
+    assert interface.timeouts[0] == ("foo", 2.5)
+
+
+def test_run_page_timeout(temp_builds_dir, fake_webdriver):
+    """
+    Page load should fail once its timeout is reached and driver should go
+    back to its default timeout for next pages.
+    """
+    basedir = temp_builds_dir.join("scheduler_run_page_timeout")
+    fake_webdriver.delay = 0.3
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        page_timeout=1,
+    )
+
+    built, error_logs = interface.run([
+        {"name": "foo", "url": "http://localhost/foo",
+         "tasks": ["screenshot"]},
+        {"name": "bar", "url": "http://localhost/bar", "timeout": 0.1,
+         "wait_for": {"selector": "#app", "timeout": 5},
+         "tasks": ["screenshot"]},
+    ])
+
+    assert [item["name"] for item in built] == ["foo"]
+    assert [item["name"] for item in error_logs] == ["bar"]
+    assert "Timed out loading page" in str(error_logs[0]["error"])
+    assert fake_webdriver.page_load_timeout == 100
+    assert [
+        payload["pageLoad"]
+        for method, path, payload in fake_webdriver.commands
+        if path.endswith("/timeouts") and "pageLoad" in payload
+    ] == [1000, 100]
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from website_capture.interfaces.asyncio_interface import AsyncWebDriverInterface
+from website_capture.interfaces.dummy import DummyInterface
+
+
+class FlakyInterface(DummyInterface):
+    """
+    Dummy interface where pages fail with the errors from their "failures"
+    option before succeeding.
+    """
+    DESTINATION_FILEPATH = "{name}_test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.captured = []
+        self.drivers = 0
+
+    def get_driver_instance(self, options, config):
+        self.drivers += 1
+        return super().get_driver_instance(options, config)
+
+    def capture(self, driver, config, **kwargs):
+        self.captured.append(config["name"])
+        failures = config.get("failures", [])
+        attempt = self.captured.count(config["name"])
+        if attempt <= len(failures):
+            raise failures[attempt - 1]
+        return super().capture(driver, config, **kwargs)
+
+
+def build_page(name, failures):
+    return {
+        "name": name,
+        "url": "http://localhost/{}".format(name),
+        "tasks": ["screenshot"],
+        "failures": failures,
+    }
+
+
+def test_run_retry(temp_builds_dir, caplog):
+    """
+    Failed page jobs should be retried and driver should be recycled after a
+    crash only.
+    """
+    basedir = temp_builds_dir.join("retry_run")
+
+    interface = FlakyInterface(basedir, retry={
+        "max_attempts": 3,
+        "backoff": 0,
+    })
+    built, error_logs = interface.run([
+        build_page("foo", [TimeoutException("Slow")]),
+        build_page("bar", [WebDriverException("Crash")]),
+        build_page("ping", [WebDriverException("Crash")] * 3),
+        build_page("pong", []),
+    ])
+
+    assert interface.captured == [
+        "foo", "foo", "bar", "bar", "ping", "ping", "ping", "pong",
+    ]
+    assert [item["name"] for item in built] == ["foo", "bar", "pong"]
+    # First driver is kept after timeout, then a new driver after each crash
+    assert interface.drivers == 5
+
+    assert [
+        [attempt.get("error") for attempt in item["attempts"]]
+        for item in built
+    ] == [["Message: Slow\n", None], ["Message: Crash\n", None], [None]]
+    assert all([
+        attempt["elapsed"] >= 0
+        for item in built for attempt in item["attempts"]
+    ])
+
+    assert [item["name"] for item in error_logs] == ["ping"]
+    assert len(error_logs[0]["attempts"]) == 3
+    assert str(error_logs[0]["error"]) == "Message: Crash\n"
+
+    retries = [
+        message for name, level, message in caplog.record_tuples
+        if message.startswith("🔹 Retrying")
+    ]
+    assert retries == [
+        "🔹 Retrying page in 0.0s after attempt 1/3: foo (Default)",
+        "🔹 Retrying page in 0.0s after attempt 1/3: bar (Default)",
+        "🔹 Retrying page in 0.0s after attempt 1/3: ping (Default)",
+        "🔹 Retrying page in 0.0s after attempt 2/3: ping (Default)",
+    ]
+
+
+def test_run_retry_exceptions(temp_builds_dir):
+    """
+    Only retryable errors should be retried, other driver errors fail page
+    job and unexpected errors are still critical.
+    """
+    basedir = temp_builds_dir.join("retry_run_exceptions")
+
+    interface = FlakyInterface(basedir, retry={
+        "max_attempts": 3,
+        "backoff": 0,
+        "exceptions": ["selenium.common.exceptions.TimeoutException"],
+    })
+    built, error_logs = interface.run([
+        build_page("foo", [TimeoutException("Slow")]),
+        build_page("bar", [WebDriverException("Crash")]),
+    ])
+    assert [item["name"] for item in built] == ["foo"]
+    assert [item["name"] for item in error_logs] == ["bar"]
+    assert len(error_logs[0]["attempts"]) == 1
+
+    with pytest.raises(ValueError):
+        interface.run([build_page("ping", [ValueError("Bug")])])
+
+
+def test_run_retry_acquire(temp_builds_dir):
+    """
+    Driver which fails to start should be retried like other driver errors.
+    """
+    basedir = temp_builds_dir.join("retry_run_acquire")
+
+    class FailingStartInterface(FlakyInterface):
+        def get_driver_instance(self, options, config):
+            if self.drivers == 0:
+                self.drivers += 1
+                raise WebDriverException("Unable to start")
+            return super().get_driver_instance(options, config)
+
+    interface = FailingStartInterface(basedir, retry={
+        "max_attempts": 2,
+        "backoff": 0,
+    })
+    built, error_logs = interface.run([build_page("foo", [])])
+
+    assert error_logs == []
+    assert [item["name"] for item in built] == ["foo"]
+    assert interface.captured == ["foo"]
+    assert interface.drivers == 2
+    assert [
+        attempt.get("error") for attempt in built[0]["attempts"]
+    ] == ["Message: Unable to start\n", None]
+
+
+def test_run_no_retry(temp_builds_dir):
+    """
+    Without retry policy, a failed page job is not retried and attempts are
+    not recorded.
+    """
+    basedir = temp_builds_dir.join("retry_run_no_retry")
+
+    interface = FlakyInterface(basedir)
+    built, error_logs = interface.run([
+        build_page("foo", [TimeoutException("Slow")]),
+        build_page("bar", []),
+    ])
+
+    assert interface.captured == ["foo", "bar"]
+    assert "attempts" not in built[0]
+    assert "attempts" not in error_logs[0]
+
+
+def test_run_retry_asyncio(temp_builds_dir, fake_webdriver):
+    """
+    Asynchronous interface should retry failed page jobs with a new session.
+    """
+    basedir = temp_builds_dir.join("retry_run_asyncio")
+
+    interface = AsyncWebDriverInterface(
+        basedir,
+        webdriver_url=fake_webdriver.url,
+        retry={"max_attempts": 2, "backoff": 0},
+    )
+
+    built, error_logs = interface.run([
+        {"name": "fail", "url": "http://localhost/fail",
+         "tasks": ["screenshot"]},
+        {"name": "foo", "url": "http://localhost/foo",
+         "tasks": ["screenshot"]},
+    ])
+
+    assert [item["name"] for item in built] == ["foo"]
+    assert len(built[0]["attempts"]) == 1
+    assert [item["name"] for item in error_logs] == ["fail"]
+    assert [
+        "Reached error page" in attempt["error"]
+        for attempt in error_logs[0]["attempts"]
+    ] == [True, True]
+    # A new session for each attempt then for next page
+    assert fake_webdriver.created == 3
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import socket
+
+import pytest
+
+from selenium.common.exceptions import WebDriverException
+
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.interfaces.remote_interface import RemoteInterface
+
+
+def build_pages(count):
+    return [
+        {
+            "name": "page-{}".format(i),
+            "url": "http://localhost/page-{}".format(i),
+            "sizes": [(320, 480)],
+            "tasks": ["screenshot", "report"],
+        }
+        for i in range(count)
+    ]
+
+
+def get_closed_url():
+    """
+    Return URL of a port where nothing is listening.
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    return "http://127.0.0.1:{}".format(port)
+
+
+def test_hubs_invalid(temp_builds_dir):
+    with pytest.raises(SettingsInvalidError):
+        RemoteInterface(temp_builds_dir, hubs=["hub:4444"])
+
+
+def test_workers_capacity(temp_builds_dir):
+    """
+    Workers should be limited to the sessions of every hubs.
+    """
+    interface = RemoteInterface(temp_builds_dir, workers=8, hubs=[
+        "http://hub-1:4444",
+        {"url": "http://hub-2:4444", "max_sessions": 2},
+    ])
+
+    assert interface.workers == 3
+
+
+def test_run(temp_builds_dir, fake_webdriver, another_fake_webdriver):
+    """
+    Sessions should be balanced between hubs, reused across pages and every
+    sessions should be closed at the end.
+    """
+    basedir = temp_builds_dir.join("remote_run")
+
+    interface = RemoteInterface(basedir, workers=3, hubs=[
+        {"url": fake_webdriver.url, "max_sessions": 2},
+        another_fake_webdriver.url,
+    ])
+    built, error_logs = interface.run(build_pages(9))
+
+    assert error_logs == []
+    assert sorted([item["name"] for item in built]) == [
+        "page-{}".format(i) for i in range(9)
+    ]
+    for item in built:
+        assert os.path.exists(item["screenshot"])
+        assert os.path.exists(item["report"])
+
+    assert fake_webdriver.created == 2
+    assert another_fake_webdriver.created == 1
+    assert fake_webdriver.sessions == {}
+    assert another_fake_webdriver.sessions == {}
+    assert interface.balancer.active == {
+        fake_webdriver.url: 0,
+        another_fake_webdriver.url: 0,
+    }
+
+    # Browser logs and windows size come from remote driver
+    with open(built[0]["report"]) as fp:
+        report = json.load(fp)
+    assert report["interface"] == "RemoteInterface"
+    assert report["logs"] == [["error", "36:18 Uncaught ReferenceError"]]
+    requests = [
+        (method, path.split("/", 3)[-1])
+        for method, path, payload in fake_webdriver.commands
+    ]
+    assert ("POST", "window/rect") in requests
+
+
+def test_run_hub_failure(temp_builds_dir, fake_webdriver):
+    """
+    A hub which can not open sessions should be skipped for other hubs.
+    """
+    basedir = temp_builds_dir.join("remote_run_hub_failure")
+    closed_url = get_closed_url()
+
+    interface = RemoteInterface(basedir, session_pages=1, hubs=[
+        closed_url,
+        fake_webdriver.url,
+    ])
+    built, error_logs = interface.run(build_pages(2))
+
+    assert error_logs == []
+    assert len(built) == 2
+    assert fake_webdriver.created == 2
+    assert interface.balancer.reserved == {
+        closed_url: 2,
+        fake_webdriver.url: 2,
+    }
+    assert interface.balancer.active == {
+        closed_url: 0,
+        fake_webdriver.url: 0,
+    }
+
+
+def test_run_every_hubs_failure(temp_builds_dir):
+    """
+    Page job should fail when no hub can open a session, like when a local
+    driver can not be started.
+    """
+    basedir = temp_builds_dir.join("remote_run_every_hubs_failure")
+
+    interface = RemoteInterface(basedir, hubs=[get_closed_url()])
+    built, error_logs = interface.run(build_pages(1))
+
+    assert built == []
+    assert len(error_logs) == 1
+    assert isinstance(error_logs[0]["error"], WebDriverException)
+    assert "Unable to open a session on any hub" in str(
+        error_logs[0]["error"]
+    )
+    assert list(interface.balancer.active.values()) == [0]
+
+
+def test_run_wait_for(temp_builds_dir, fake_webdriver):
+    """
+    Script timeout of driver should be restored after readiness script since
+    driver is reused for next pages.
+    """
+    basedir = temp_builds_dir.join("remote_run_wait_for")
+
+    interface = RemoteInterface(basedir, hubs=[fake_webdriver.url])
+    pages = build_pages(2)
+    pages[0]["wait_for"] = {"selector": "#app", "timeout": 2}
+    built, error_logs = interface.run(pages)
+
+    assert error_logs == []
+    assert len(built) == 2
+    assert fake_webdriver.created == 1
+    assert fake_webdriver.script_timeouts == [7000, 30000]
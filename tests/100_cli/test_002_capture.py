@@ -112,7 +112,310 @@ def test_dummy(caplog):
             ("py-website-capture", 20,
              "🤖 DummyInterface"),
             ("py-website-capture", 20,
-             "🔹 Getting page for: basic-lorem-ipsum (Default)")
+             "🔹 Getting page for: basic-lorem-ipsum (Default)"),
+            ("py-website-capture", 20,
+             "🔸 [1] Done: basic-lorem-ipsum (Default)"),
+        ]
+
+        assert result.exit_code == 0
+
+
+def test_dummy_workers(caplog):
+    """
+    Dummy driver usage with many workers
+    """
+    runner = CliRunner()
+
+    config = {
+        "output_dir": "./outputs/",
+        "pages": [
+            {
+                "name": "basic-lorem-ipsum",
+                "url": "http://localhost:8001/lorem-ipsum.basic.html",
+                "tasks": ["screenshot"],
+            },
+            {
+                "name": "every-logs",
+                "url": "http://localhost:8001/every-logs.basic.html",
+                "tasks": ["screenshot"],
+            },
         ]
+    }
+
+    # Temporary isolated current dir
+    with runner.isolated_filesystem():
+        with io.open("foo.json", 'w') as fp:
+            json.dump(config, fp)
+
+        result = runner.invoke(cli_frontend, [
+            "capture",
+            "--config",
+            "foo.json",
+            "--interface",
+            "dummy",
+            "--workers",
+            "2",
+        ])
+
+        assert sorted(caplog.record_tuples) == sorted([
+            ("py-website-capture", 20,
+             "🤖 DummyInterface"),
+            ("py-website-capture", 20,
+             "🔹 Getting page for: basic-lorem-ipsum (Default)"),
+            ("py-website-capture", 20,
+             "🔹 Getting page for: every-logs (Default)"),
+            ("py-website-capture", 20,
+             "🔸 [1] Done: basic-lorem-ipsum (Default)"),
+            ("py-website-capture", 20,
+             "🔸 [2] Done: every-logs (Default)"),
+        ])
 
         assert result.exit_code == 0
+
+
+def test_dummy_results(caplog):
+    """
+    Every results should be written as JSON lines in results file.
+    """
+    runner = CliRunner()
+
+    config = {
+        "output_dir": "./outputs/",
+        "pages": [
+            {
+                "name": "basic-lorem-ipsum",
+                "url": "http://localhost:8001/lorem-ipsum.basic.html",
+                "sizes": [[320, 200]],
+                "tasks": ["screenshot"],
+            },
+            {
+                "name": "every-logs",
+                "url": "http://localhost:8001/every-logs.basic.html",
+                "tasks": ["screenshot"],
+            },
+        ]
+    }
+
+    # Temporary isolated current dir
+    with runner.isolated_filesystem():
+        with io.open("foo.json", 'w') as fp:
+            json.dump(config, fp)
+
+        result = runner.invoke(cli_frontend, [
+            "capture",
+            "--config",
+            "foo.json",
+            "--interface",
+            "dummy",
+            "--results",
+            "results.jsonl",
+        ])
+
+        assert result.exit_code == 0
+
+        with io.open("results.jsonl", "r") as fp:
+            results = [json.loads(line) for line in fp]
+
+        assert [
+            (item["interface"], item["status"], item["item"]["name"],
+             item["item"]["size"])
+            for item in results
+        ] == [
+            ("dummy", "success", "every-logs", [0, 0]),
+            ("dummy", "success", "basic-lorem-ipsum", [320, 200]),
+        ]
+        assert "total" in results[0]["item"]["timings"]
+
+        # Run summary contains timings of every page jobs
+        with io.open("outputs/summary.json", "r") as fp:
+            summary = json.load(fp)
+
+        timings = summary["interfaces"]["DummyInterface"]
+        assert timings["pages"] == 2
+        assert sorted(timings["phases"]["total"]) == [
+            "count", "max", "p50", "p95",
+        ]
+        assert "task_screenshot" in timings["phases"]
+
+
+def test_dummy_resume(caplog):
+    """
+    Resumed capture should not capture again pages from journal.
+    """
+    runner = CliRunner()
+
+    config = {
+        "output_dir": "./outputs/",
+        "pages": [
+            {
+                "name": "basic-lorem-ipsum",
+                "url": "http://localhost:8001/lorem-ipsum.basic.html",
+                "tasks": ["screenshot"],
+            },
+        ]
+    }
+
+    # Temporary isolated current dir
+    with runner.isolated_filesystem():
+        with io.open("foo.json", 'w') as fp:
+            json.dump(config, fp)
+
+        result = runner.invoke(cli_frontend, [
+            "capture",
+            "--config",
+            "foo.json",
+        ])
+
+        assert result.exit_code == 0
+        assert os.path.exists("outputs/journal.jsonl")
+
+        caplog.clear()
+
+        result = runner.invoke(cli_frontend, [
+            "capture",
+            "--config",
+            "foo.json",
+            "--resume",
+        ])
+
+        assert caplog.record_tuples == [
+            ("py-website-capture", 30,
+             "No interface was chosen, using default 'dummy' interface"),
+            ("py-website-capture", 20,
+             "🤖 DummyInterface"),
+            ("py-website-capture", 20,
+             "🔹 Already finished page: basic-lorem-ipsum (Default)"),
+            ("py-website-capture", 20,
+             "🔸 [1] Done: basic-lorem-ipsum (Default)"),
+        ]
+
+        assert result.exit_code == 0
+
+
+def test_pages_file_fail(caplog):
+    """
+    Invalid page from pages file should output a critical log and abort
+    script execution once it is read.
+    """
+    runner = CliRunner()
+
+    config = {
+        "output_dir": "./outputs/",
+        "pages_file": "pages.jsonl",
+    }
+
+    with runner.isolated_filesystem():
+        with io.open("foo.json", "w") as fp:
+            json.dump(config, fp)
+
+        with io.open("pages.jsonl", "w") as fp:
+            fp.write(json.dumps({"name": "foo", "url": "http://foo",
+                                 "tasks": ["screenshot"]}) + "\n")
+            fp.write(json.dumps({"name": "bar"}) + "\n")
+
+        result = runner.invoke(cli_frontend, [
+            "capture",
+            "--config",
+            "foo.json",
+            "--interface",
+            "dummy",
+        ])
+
+        assert caplog.record_tuples[-1] == (
+            "py-website-capture",
+            50,
+            "Page item must have a 'url' value at {}:2".format(
+                os.path.abspath("pages.jsonl")
+            ),
+        )
+        assert result.exit_code == 1
+
+
+def test_concurrent(caplog, fake_webdriver):
+    """
+    Interfaces should run at the same time with their own workers, merged
+    progress and combined results.
+    """
+    runner = CliRunner()
+
+    config = {
+        "output_dir": "./outputs/",
+        "interface_options": {
+            "remote": {
+                "workers": 2,
+                "hubs": [{"url": fake_webdriver.url, "max_sessions": 2}],
+            },
+        },
+        "pages": [
+            {
+                "name": "basic-lorem-ipsum",
+                "url": "http://localhost:8001/lorem-ipsum.basic.html",
+                "sizes": [[320, 200]],
+                "tasks": ["screenshot"],
+            },
+            {
+                "name": "every-logs",
+                "url": "http://localhost:8001/every-logs.basic.html",
+                "sizes": [[320, 200]],
+                "tasks": ["screenshot"],
+            },
+        ]
+    }
+
+    # Temporary isolated current dir
+    with runner.isolated_filesystem():
+        with io.open("foo.json", 'w') as fp:
+            json.dump(config, fp)
+
+        result = runner.invoke(cli_frontend, [
+            "capture",
+            "--config",
+            "foo.json",
+            "--interface",
+            "dummy",
+            "--interface",
+            "remote",
+            "--concurrent",
+            "--combined-results",
+            "combined.json",
+        ])
+
+        assert result.exit_code == 0
+
+        messages = [
+            message for name, level, message in caplog.record_tuples
+            if message.startswith(("🤖", "🔸"))
+        ]
+        assert messages[0] == "🤖 DummyInterface, RemoteInterface"
+        assert sorted([
+            message.split(" ", 2)[2] for message in messages[1:]
+        ]) == [
+            "Done: basic-lorem-ipsum (320x200) with dummy",
+            "Done: basic-lorem-ipsum (320x200) with remote",
+            "Done: every-logs (320x200) with dummy",
+            "Done: every-logs (320x200) with remote",
+        ]
+        assert sorted([
+            message.split(" ", 2)[1] for message in messages[1:]
+        ]) == ["[1]", "[2]", "[3]", "[4]"]
+        assert caplog.record_tuples[-2:] == [
+            ("py-website-capture", 20,
+             "🔹 dummy: 2 Done, 0 Failed, 0 Skipped"),
+            ("py-website-capture", 20,
+             "🔹 remote: 2 Done, 0 Failed, 0 Skipped"),
+        ]
+
+        with io.open("combined.json", "r") as fp:
+            combined = json.load(fp)
+
+        assert sorted(combined) == ["dummy", "remote"]
+        for name in ["dummy", "remote"]:
+            assert combined[name]["counts"] == {
+                "error": 0, "skipped": 0, "success": 2,
+            }
+            assert sorted([
+                result["item"]["name"] for result in combined[name]["results"]
+            ]) == ["basic-lorem-ipsum", "every-logs"]
+
+        assert fake_webdriver.created == 2
+        assert fake_webdriver.sessions == {}
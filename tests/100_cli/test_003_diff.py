@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+import pytest
+
+from click.testing import CliRunner
+
+from website_capture.cli.console_script import cli_frontend
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_diff(caplog):
+    """
+    Diff command should compare every screenshots and fail if any has changed.
+    """
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        for dirname in ["current/1x42", "baseline/1x42"]:
+            os.makedirs(dirname)
+
+        Image.new("RGB", (10, 10), (0, 0, 0)).save("baseline/foo.png")
+        Image.new("RGB", (10, 10), (0, 0, 0)).save("current/foo.png")
+        Image.new("RGB", (10, 10), (0, 0, 0)).save("baseline/1x42/bar.png")
+        Image.new("RGB", (10, 10), (0, 0, 255)).save("current/1x42/bar.png")
+        Image.new("RGB", (10, 10), (0, 0, 0)).save("current/ping.png")
+
+        result = runner.invoke(cli_frontend, [
+            "diff",
+            "current",
+            "baseline",
+            "--results",
+            "results.jsonl",
+        ])
+
+        assert caplog.record_tuples == [
+            ("py-website-capture", 20,
+             "🔸 Missing baseline: ping.png"),
+            ("py-website-capture", 30,
+             "🔸 Changed: 1x42/bar.png (score 1.0000)"),
+            ("py-website-capture", 20,
+             "🔹 1 unchanged, 1 changed, 1 without baseline"),
+        ]
+        assert result.exit_code == 1
+        assert os.path.exists("current/1x42/bar.diff.png")
+
+        with io.open("results.jsonl", "r") as fp:
+            results = [json.loads(line) for line in fp]
+
+        assert [(item["path"], item["status"]) for item in results] == [
+            ("foo.png", "unchanged"),
+            ("ping.png", "missing"),
+            ("1x42/bar.png", "changed"),
+        ]
+
+        caplog.clear()
+
+        result = runner.invoke(cli_frontend, [
+            "diff",
+            "current",
+            "baseline",
+            "--ignore",
+            "0,0,10,10",
+        ])
+
+        assert result.exit_code == 0
+
+
+def test_diff_invalid_region():
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        os.makedirs("current")
+
+        result = runner.invoke(cli_frontend, [
+            "diff",
+            "current",
+            "current",
+            "--ignore",
+            "0,0,10",
+        ])
+
+        assert result.exit_code == 2
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from click.testing import CliRunner
+
+from website_capture.cli.console_script import cli_frontend
+from website_capture.phash import HashIndex
+
+
+def build_index(path, entries):
+    index = HashIndex(path)
+    for key, value in entries.items():
+        index.add(key, {"ahash": value, "dhash": value, "phash": value})
+    index.save()
+
+
+def test_hashes(caplog):
+    """
+    Hashes command should query index without any image.
+    """
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        build_index("hashes.idx", {"foo.png": 0, "bar.png": 1, "ping.png": 0})
+        build_index("previous.idx", {"foo.png": 0, "bar.png": 0,
+                                     "pong.png": 0})
+
+        result = runner.invoke(cli_frontend, ["hashes", "."])
+        assert result.exit_code == 0
+        assert caplog.record_tuples == [
+            ("py-website-capture", 20, "🔸 Similar: foo.png, ping.png"),
+            ("py-website-capture", 20,
+             "🔹 1 groups of similar screenshots from 3 indexed"),
+        ]
+        caplog.clear()
+
+        result = runner.invoke(cli_frontend, [
+            "hashes", "hashes.idx", "--similar", "foo.png", "--distance", "1",
+            "--results", "results.json",
+        ])
+        assert result.exit_code == 0
+        assert caplog.record_tuples == [
+            ("py-website-capture", 20,
+             "🔸 Similar: ping.png (distance 0)"),
+            ("py-website-capture", 20,
+             "🔸 Similar: bar.png (distance 1)"),
+            ("py-website-capture", 20, "🔹 2 similar screenshots"),
+        ]
+        with io.open("results.json", "r") as fp:
+            assert json.load(fp) == [
+                {"key": "ping.png", "distance": 0},
+                {"key": "bar.png", "distance": 1},
+            ]
+        caplog.clear()
+
+        result = runner.invoke(cli_frontend, [
+            "hashes", ".", "--compare", "previous.idx",
+        ])
+        assert result.exit_code == 1
+        assert caplog.record_tuples == [
+            ("py-website-capture", 30, "🔸 Changed: bar.png"),
+            ("py-website-capture", 20, "🔸 Added: ping.png"),
+            ("py-website-capture", 20, "🔸 Removed: pong.png"),
+            ("py-website-capture", 20,
+             "🔹 1 unchanged, 1 changed, 1 added, 1 removed"),
+        ]
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+from click.testing import CliRunner
+
+from website_capture.cli.console_script import cli_frontend
+
+
+def test_benchmark_launch():
+    """
+    Launch suite should write driver launch times with and without profile
+    template.
+    """
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli_frontend, [
+            "benchmark", "--suite", "launch", "--interface", "dummy",
+            "--launches", "3", "--output", "outputs",
+        ])
+        assert result.exit_code == 0
+
+        with io.open("outputs/results.json", "r") as fp:
+            content = json.load(fp)
+
+    assert sorted(content) == ["environment", "results"]
+    assert sorted(content["results"]) == ["driver_launch"]
+    measures = content["results"]["driver_launch"]["dummy"]
+    assert sorted(measures) == ["default", "profile_template"]
+    assert len(measures["default"]["launches"]) == 3
+    assert measures["default"]["next"]["count"] == 2
+
+
+def test_benchmark_pipeline(caplog):
+    """
+    Pipeline suite should write throughput for each number of pages and
+    compare it with a previous results file.
+    """
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        os.makedirs("site")
+        with io.open("site/index.html", "w") as fp:
+            fp.write("<html><body>Hello</body></html>")
+
+        result = runner.invoke(cli_frontend, [
+            "benchmark", "--pages", "10", "--pages", "100", "--site", "site",
+            "--results", "previous.json",
+        ])
+        assert result.exit_code == 0
+
+        caplog.clear()
+        result = runner.invoke(cli_frontend, [
+            "benchmark", "--pages", "10", "--no-memory",
+            "--compare", "previous.json",
+        ])
+        assert result.exit_code == 0
+
+        with io.open("previous.json", "r") as fp:
+            previous = json.load(fp)
+        with io.open("benchmarks/results.json", "r") as fp:
+            current = json.load(fp)
+
+    measures = previous["results"]["pipeline"]["dummy"]
+    assert sorted(measures) == ["10", "100"]
+    assert measures["100"]["jobs"] == 300
+    assert measures["100"]["errors"] == 0
+    assert measures["100"]["peak_memory"] > 0
+    assert "total" in measures["100"]["phases"]
+
+    assert sorted(current["results"]["pipeline"]["dummy"]) == ["10"]
+    assert current["results"]["pipeline"]["dummy"]["10"]["peak_memory"] is None
+
+    messages = [message for name, level, message in caplog.record_tuples]
+    assert [
+        message for message in messages
+        if message.startswith("🔸 dummy (10 pages):")
+    ]
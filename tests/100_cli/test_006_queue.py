@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import socket
+import threading
+import time
+import urllib.error
+
+from click.testing import CliRunner
+
+from website_capture.cli.capture import INTERFACES
+from website_capture.cli.console_script import cli_frontend
+from website_capture.distributed import QueueClient, QueueWorker
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_worker(url, name, done):
+    """
+    Start a worker in a thread once coordinator is reachable.
+
+    Worker gives up once coordinator is done since other workers may have
+    performed every jobs before it has reached coordinator.
+    """
+    worker = QueueWorker(QueueClient(url), INTERFACES, name=name,
+                         poll_interval=0.05)
+
+    def run():
+        while not done.is_set():
+            try:
+                worker.client.get_config()
+            except (OSError, urllib.error.URLError):
+                time.sleep(0.05)
+                continue
+
+            try:
+                worker.run()
+            except (OSError, urllib.error.URLError):
+                pass
+            return
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    return worker, thread
+
+
+def test_serve_queue(caplog):
+    """
+    Coordinator should serve jobs to local workers and write their results.
+    """
+    runner = CliRunner()
+    port = get_free_port()
+    url = "http://127.0.0.1:{}".format(port)
+
+    with runner.isolated_filesystem():
+        with io.open("config.json", "w") as fp:
+            json.dump({
+                "output_dir": "outputs",
+                "pages": [
+                    {"name": "foo", "url": "http://localhost/foo",
+                     "sizes": [[1, 42], [30, 30]], "tasks": ["screenshot"]},
+                    {"name": "bar", "url": "http://localhost/bar",
+                     "tasks": ["screenshot"]},
+                ],
+            }, fp)
+
+        done = threading.Event()
+        workers = [
+            start_worker(url, "worker-{}".format(i), done) for i in range(2)
+        ]
+
+        result = runner.invoke(cli_frontend, [
+            "serve-queue", "--config", "config.json", "--port", str(port),
+            "--results", "results.jsonl",
+        ])
+        done.set()
+        assert result.exit_code == 0
+
+        for worker, thread in workers:
+            thread.join(5)
+            assert not thread.is_alive()
+
+        with io.open("results.jsonl", "r") as fp:
+            results = [json.loads(line) for line in fp]
+
+    assert sum([worker.performed for worker, thread in workers]) == 3
+    assert sorted([
+        (item["interface"], item["status"], item["item"]["name"])
+        for item in results
+    ]) == [
+        ("dummy", "success", "bar"),
+        ("dummy", "success", "foo"),
+        ("dummy", "success", "foo"),
+    ]
+
+    messages = [message for name, level, message in caplog.record_tuples]
+    assert messages[0] == "🔹 Serving 3 jobs to workers on: {}".format(url)
+    assert messages[-1] == "🔹 Every jobs are done"
+
+
+def test_worker_unreachable(caplog):
+    runner = CliRunner()
+
+    result = runner.invoke(cli_frontend, [
+        "worker", "--url", "http://127.0.0.1:{}".format(get_free_port()),
+        "--name", "foo",
+    ])
+
+    assert result.exit_code == 1
+    assert caplog.record_tuples[0] == ("py-website-capture", 20, "🤖 foo")
+    assert caplog.record_tuples[1][2].startswith(
+        "Coordinator is not reachable"
+    )
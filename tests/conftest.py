@@ -1,7 +1,14 @@
 """
 Some fixture methods
 """
+import base64
+import json
 import os
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 
@@ -15,6 +22,76 @@ def temp_builds_dir(tmpdir_factory):
     return fn
 
 
+# Performance entries as returned from performance script
+PERFORMANCE_ENTRIES = {
+    "navigation": [{
+        "name": "http://localhost/foo",
+        "startTime": 0,
+        "responseStart": 120.5,
+        "domContentLoadedEventEnd": 300,
+        "loadEventEnd": 450,
+        "transferSize": 2048,
+    }],
+    "resource": [
+        {
+            "name": "http://localhost/foo.js",
+            "initiatorType": "script",
+            "startTime": 200,
+            "duration": 80,
+            "responseStart": 250,
+            "transferSize": 0,
+            "encodedBodySize": 300,
+            "decodedBodySize": 1000,
+        },
+        {
+            "name": "http://localhost/foo.css",
+            "initiatorType": "link",
+            "startTime": 150,
+            "duration": 50,
+            "responseStart": 180,
+            "transferSize": 600,
+            "encodedBodySize": 500,
+            "decodedBodySize": 1500,
+        },
+    ],
+    "paint": [
+        {"name": "first-paint", "startTime": 310},
+        {"name": "first-contentful-paint", "startTime": 320},
+    ],
+    "largest-contentful-paint": [
+        {"startTime": 330, "size": 100},
+        {"startTime": 400, "size": 5000},
+    ],
+}
+
+
+def build_png(width, height, color=(200, 30, 30)):
+    """
+    Build a valid PNG image filled with a single RGB color.
+    """
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data)))
+
+    row = b"\x00" + bytes(color) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", header),
+        chunk(b"IDAT", zlib.compress(row * height)),
+        chunk(b"IEND", b""),
+    ])
+
+
+@pytest.fixture(scope='session')
+def png_content():
+    """
+    Return bytes of a valid 40x30 PNG image.
+    """
+    return build_png(40, 30)
+
+
 @pytest.fixture(scope='session')
 def insert_basedir():
     """
@@ -29,3 +106,267 @@ def insert_basedir():
         return payload
 
     return curry_func
+
+
+class FakeWebDriverHandler(BaseHTTPRequestHandler):
+    """
+    Respond to a subset of W3C WebDriver commands without any browser.
+    """
+    protocol_version = "HTTP/1.1"
+    ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+    PNG = build_png(40, 30)
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, value, status=200):
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def error(self, message, status=500):
+        self.respond({"error": "unknown error", "message": message}, status)
+
+    def handle_command(self, method):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"null")
+        parts = self.path.strip("/").split("/")
+
+        with self.server.lock:
+            self.server.commands.append((method, self.path, payload))
+
+        if parts == ["session"] and method == "POST":
+            with self.server.lock:
+                self.server.created += 1
+                session_id = "session-{}".format(self.server.created)
+                self.server.sessions[session_id] = None
+            return self.respond({
+                "sessionId": session_id,
+                "capabilities": payload["capabilities"]["alwaysMatch"],
+            })
+
+        session_id = parts[1] if len(parts) > 1 else None
+        if parts[0] != "session" or session_id not in self.server.sessions:
+            return self.error("invalid session id", status=404)
+
+        command = "/".join(parts[2:])
+
+        if method == "DELETE" and not command:
+            with self.server.lock:
+                del self.server.sessions[session_id]
+            return self.respond(None)
+        elif command == "url":
+            if "fail" in payload["url"]:
+                return self.error("Reached error page")
+            timeout = self.server.page_load_timeout
+            if timeout is not None and self.server.delay * 1000 > timeout:
+                return self.error("Timed out loading page")
+            time.sleep(self.server.delay)
+            self.server.sessions[session_id] = payload["url"]
+            return self.respond(None)
+        elif command == "window/rect":
+            return self.respond(payload)
+        elif command == "timeouts":
+            if "script" in payload:
+                self.server.script_timeout = payload["script"]
+                self.server.script_timeouts.append(payload["script"])
+            if "pageLoad" in payload:
+                self.server.page_load_timeout = payload["pageLoad"]
+            return self.respond(None)
+        elif command == "execute/async":
+            if "document.readyState" in payload["script"]:
+                # Readiness script, selector is never found
+                options = payload["args"][0]
+                pending = ["selector"] if options["selector"] else []
+                return self.respond({
+                    "ready": not pending,
+                    "pending": pending,
+                    "elapsed": options["timeout"] if pending else 10,
+                })
+            if "getEntriesByType" in payload["script"]:
+                return self.respond(PERFORMANCE_ENTRIES)
+            return self.respond(None)
+        elif command == "execute/sync":
+            if "scrollTo" in payload["script"]:
+                position = max(min(
+                    payload["args"][0],
+                    self.server.page_height - self.server.viewport,
+                ), 0)
+                self.server.scrolls[session_id] = position
+                return self.respond(position)
+            return self.respond({
+                "height": self.server.page_height,
+                "viewport": self.server.viewport,
+            })
+        elif command == "screenshot":
+            # Window screenshot color depends from scroll position
+            position = self.server.scrolls.get(session_id, 0)
+            return self.respond(base64.b64encode(
+                build_png(40, self.server.viewport, (200, position, 30))
+            ).decode("ascii"))
+        elif command.endswith("/screenshot"):
+            return self.respond(base64.b64encode(self.PNG).decode("ascii"))
+        elif command == "element":
+            return self.respond({self.ELEMENT_KEY: "body-element"})
+        elif command == "goog/cdp/execute":
+            return self.respond({})
+        elif command == "log" and payload["type"] == "performance":
+            # Two requests have been blocked and one has failed
+            return self.respond([
+                {"message": json.dumps({"message": {
+                    "method": "Network.loadingFailed",
+                    "params": {"blockedReason": "inspector"},
+                }})},
+                {"message": json.dumps({"message": {
+                    "method": "Network.loadingFailed",
+                    "params": {"errorText": "net::ERR_FAILED"},
+                }})},
+                {"message": json.dumps({"message": {
+                    "method": "Network.loadingFailed",
+                    "params": {"blockedReason": "inspector"},
+                }})},
+            ])
+        elif command == "log":
+            return self.respond([
+                {
+                    "level": "SEVERE",
+                    "message": "{} 36:18 Uncaught ReferenceError".format(
+                        self.server.sessions[session_id]
+                    ),
+                },
+            ])
+
+        return self.error("unknown command: {}".format(command), status=404)
+
+    def do_GET(self):
+        self.handle_command("GET")
+
+    def do_POST(self):
+        self.handle_command("POST")
+
+    def do_DELETE(self):
+        self.handle_command("DELETE")
+
+
+def start_fake_webdriver():
+    """
+    Start a fake WebDriver server in a thread and return the server object,
+    its URL is available from ``url`` attribute.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWebDriverHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.commands = []
+    server.sessions = {}
+    server.created = 0
+    server.connections = 0
+    server.delay = 0
+    # Page height and viewport height used for scrolling commands
+    server.page_height = 70
+    server.viewport = 30
+    server.scrolls = {}
+    server.script_timeout = None
+    server.script_timeouts = []
+    server.page_load_timeout = None
+    server.url = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server
+
+
+@pytest.fixture(scope='function')
+def fake_webdriver():
+    """
+    Start a fake WebDriver server in a thread.
+
+    Return the server object, its URL is available from ``url`` attribute.
+    """
+    server = start_fake_webdriver()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='function')
+def another_fake_webdriver():
+    """
+    Start another fake WebDriver server in a thread, like a second hub.
+    """
+    server = start_fake_webdriver()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """
+    Origin server which counts requests for each path.
+    """
+    protocol_version = "HTTP/1.1"
+
+    RESPONSES = {
+        "/style.css": (200, [("Content-Type", "text/css")], b"body{}"),
+        "/app.js": (200, [("Cache-Control", "max-age=3600")], b"var a;"),
+        "/private.json": (200, [("Cache-Control", "no-store")], b"{}"),
+        "/cookie.txt": (200, [("Set-Cookie", "id=1")], b"cookie"),
+        "/missing.png": (404, [], b"missing"),
+    }
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        status, headers, body = self.RESPONSES.get(
+            self.path, (200, [], self.path.encode("utf-8"))
+        )
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.server.requests.append(self.path)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope='function')
+def origin_server():
+    """
+    Start an origin server in a thread.
+
+    Return the server object, its URL is available from ``url`` attribute and
+    requested paths from ``requests`` attribute.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OriginHandler)
+    server.daemon_threads = True
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    server.url = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks
+==========
+
+Measure performances of capture components so a change can be compared with
+numbers between two commits.
+
+Pipeline benchmarks run synthetic configurations from 10 to 100k pages with
+several sizes through an interface, usually ``DummyInterface`` to measure the
+pipeline itself without any browser. Real drivers can be benchmarked against
+a static site served locally, like the built ``page_tests`` site.
+"""
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Only available on POSIX platforms
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from website_capture.timings import (SUMMARY_PERCENTILES, RunSummary,
+                                     percentile)
+
+BENCHMARK_PAGE = {
+    "name": "benchmark",
+    "url": "about:blank",
+}
+
+# Default numbers of pages for pipeline benchmarks
+BENCHMARK_SCALES = [10, 100, 1000, 10000]
+
+# Every scale allowed, the biggest ones take minutes
+ALLOWED_BENCHMARK_SCALES = [10, 100, 1000, 10000, 100000]
+
+BENCHMARK_SIZES = [(320, 480), (768, 1024), (1440, 900)]
+
+BENCHMARK_TASKS = ["screenshot", "report", "processing"]
+
+
+def get_statistics(values):
+    """
+    Return statistics of given measures.
+
+    Returns:
+        dict: Number of measures with their percentiles, minimum, maximum and
+        mean. Values are None if there is no measure.
+    """
+    values = sorted(values)
+
+    statistics = {
+        "p{}".format(rank): percentile(values, rank)
+        for rank in SUMMARY_PERCENTILES
+    }
+    statistics.update({
+        "count": len(values),
+        "min": values[0] if values else None,
+        "max": values[-1] if values else None,
+        "mean": sum(values) / len(values) if values else None,
+    })
+
+    return statistics
+
+
+def benchmark_driver_launch(interface, launches=5, page=None):
+    """
+    Start then close interface drivers and measure how long each start takes.
+
+    Start time includes driver options so it covers browser profile
+    preparation.
+
+    Arguments:
+        interface (website_capture.interfaces.base.BaseInterface): Interface
+            to start drivers from.
+
+    Keyword Arguments:
+        launches (int): Number of drivers to start.
+        page (dict): Page item used to build driver configuration. Default to
+            ``BENCHMARK_PAGE``.
+
+    Returns:
+        dict: Elapsed time in seconds of the ``first`` start, which may
+        include one time preparations, and statistics of every following
+        starts in ``next``.
+    """
+    config = interface.get_page_config(page or BENCHMARK_PAGE,
+                                       interface._default_size_value)
+    interface.make_destination_dir(config["size"])
+
+    elapsed = []
+    for i in range(launches):
+        start_time = time.perf_counter()
+        options = interface.get_driver_options(config)
+        driver = interface.get_driver_instance(options, config)
+        elapsed.append(time.perf_counter() - start_time)
+
+        interface.tear_down_driver(driver, config)
+
+    return {
+        "first": elapsed[0] if elapsed else None,
+        "next": get_statistics(elapsed[1:]),
+        "launches": elapsed,
+    }
+
+
+def build_pages(count, sizes=None, tasks=None, urls=None):
+    """
+    Build synthetic page items.
+
+    Arguments:
+        count (int): Number of pages.
+
+    Keyword Arguments:
+        sizes (list): Sizes of every pages. Default to ``BENCHMARK_SIZES``.
+        tasks (list): Tasks of every pages. Default to ``BENCHMARK_TASKS``.
+        urls (list): URLs given to pages in turn. Default to the
+            ``BENCHMARK_PAGE`` URL.
+
+    Returns:
+        list: Page items.
+    """
+    sizes = BENCHMARK_SIZES if sizes is None else sizes
+    tasks = BENCHMARK_TASKS if tasks is None else tasks
+    urls = urls or [BENCHMARK_PAGE["url"]]
+
+    return [
+        {
+            "name": "page-{:06d}".format(i),
+            "url": urls[i % len(urls)],
+            "sizes": [tuple(size) for size in sizes],
+            "tasks": list(tasks),
+        }
+        for i in range(count)
+    ]
+
+
+def get_site_paths(directory):
+    """
+    Return path of every HTML documents from a site directory, relative to
+    this directory.
+    """
+    paths = []
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".html"):
+                paths.append(os.path.relpath(
+                    os.path.join(root, name), directory
+                ).replace(os.sep, "/"))
+
+    return paths
+
+
+class QuietHTTPRequestHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class SiteServer(object):
+    """
+    Serve a static site directory from a local HTTP server in a thread.
+
+    It is a context manager which starts server on a free port.
+
+    Arguments:
+        directory (string): Site directory.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.server = None
+        self.url = None
+
+    def get_urls(self):
+        """
+        Return URL of every HTML documents from site.
+        """
+        return [
+            "{}/{}".format(self.url, path)
+            for path in get_site_paths(self.directory)
+        ]
+
+    def __enter__(self):
+        handler = functools.partial(QuietHTTPRequestHandler,
+                                    directory=self.directory)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  kwargs={"poll_interval": 0.1}, daemon=True)
+        thread.start()
+
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+
+
+def benchmark_page_config(interface, pages):
+    """
+    Measure how long interface takes to build every page configurations.
+
+    Returns:
+        dict: Number of built ``configs``, ``elapsed`` time in seconds and
+        ``configs_per_second``.
+    """
+    pages = interface.page_default_values(pages)
+
+    start_time = time.perf_counter()
+    configs = 0
+    for page in pages:
+        for size in page["sizes"]:
+            interface.get_page_config(page, size)
+            configs += 1
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "configs": configs,
+        "elapsed": elapsed,
+        "configs_per_second": configs / elapsed if elapsed else None,
+    }
+
+
+def benchmark_pipeline(interface_class, pages, basedir, memory=True,
+                       **options):
+    """
+    Run pages through a new interface and measure its throughput.
+
+    Arguments:
+        interface_class (class): Interface class to benchmark.
+        pages (list): Page items to capture.
+        basedir (string): Output directory for interface.
+
+    Keyword Arguments:
+        memory (bool): Trace Python memory allocations to get memory peak.
+            It slows down run so throughput is lower than without it.
+            Default is True.
+        **options: Additional interface options.
+
+    Returns:
+        dict: Number of page ``jobs`` and ``errors``, ``elapsed`` time in
+        seconds, ``pages_per_second`` for page jobs, ``phases`` latency
+        summary from run summary, ``peak_memory`` in bytes of Python
+        allocations if traced and ``max_rss`` in kilobytes for the whole
+        process if platform provides it.
+    """
+    summary = RunSummary(os.path.join(basedir, "summary.json"))
+    interface = interface_class(basedir=basedir, summary=summary, **options)
+
+    page_config = benchmark_page_config(interface, pages)
+
+    if memory:
+        tracemalloc.start()
+
+    jobs = 0
+    errors = 0
+    start_time = time.perf_counter()
+    try:
+        for status, item in interface.iter_run(pages):
+            jobs += 1
+            if status == "error":
+                errors += 1
+        elapsed = time.perf_counter() - start_time
+    finally:
+        peak_memory = None
+        if memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    phases = summary.save()["interfaces"].get(interface_class.__name__, {})
+
+    return {
+        "pages": len(pages),
+        "jobs": jobs,
+        "errors": errors,
+        "elapsed": elapsed,
+        "pages_per_second": jobs / elapsed if elapsed else None,
+        "page_config": page_config,
+        "phases": phases.get("phases", {}),
+        "peak_memory": peak_memory,
+        "max_rss": get_max_rss(),
+    }
+
+
+def get_max_rss():
+    """
+    Return maximum resident memory of current process in kilobytes or None
+    if platform does not provide it.
+    """
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS gives it in bytes
+    if sys.platform == "darwin":
+        max_rss //= 1024
+
+    return max_rss
+
+
+def get_commit():
+    """
+    Return current Git commit of project or None if unavailable.
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.decode("ascii").strip()
+
+
+def get_environment():
+    """
+    Return informations about environment where benchmarks are run.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": get_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare_results(previous, current):
+    """
+    Compare pipeline throughput between two benchmark results.
+
+    Arguments:
+        previous (dict): Benchmark results file content used as reference.
+        current (dict): Benchmark results file content to compare.
+
+    Returns:
+        list: Tuples of interface name, number of pages, previous and current
+        pages per second and their ratio, for each benchmark in both results.
+    """
+    comparisons = []
+    previous = previous.get("results", {}).get("pipeline", {})
+    current = current.get("results", {}).get("pipeline", {})
+
+    for name, scales in sorted(current.items()):
+        for count, result in sorted(scales.items(), key=lambda x: int(x[0])):
+            reference = previous.get(name, {}).get(count)
+            if not reference or not reference["pages_per_second"]:
+                continue
+            comparisons.append((
+                name,
+                int(count),
+                reference["pages_per_second"],
+                result["pages_per_second"],
+                result["pages_per_second"] / reference["pages_per_second"],
+            ))
+
+    return comparisons
+
+
+def save_results(path, results):
+    """
+    Write benchmark results with their environment to a JSON file.
+    """
+    content = {
+        "environment": get_environment(),
+        "results": results,
+    }
+
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname)
+
+    with io.open(path, "w") as fp:
+        json.dump(content, fp, indent=4, sort_keys=True)
+
+    return content
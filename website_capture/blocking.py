@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Request blocking
+================
+
+Block requests from page matching URL patterns or resource types, like
+analytics, ads or videos which slow down page loading without adding
+anything to screenshots.
+
+Patterns use the wildcard syntax from Chrome DevTools protocol where ``*``
+matches any characters, like ``*://*.doubleclick.net/*``. Resource types are
+turned to patterns on their file extensions.
+
+Chrome blocks patterns with DevTools protocol. Firefox does not have any
+equivalent so patterns are given to a proxy auto-configuration script from
+browser profile, which sends blocked requests to a closed local port. The
+same script sends every other requests to the caching proxy when enabled.
+"""
+import base64
+import json
+
+from website_capture.conf import ALLOWED_BLOCK_RESOURCE_TYPES
+from website_capture.exceptions import PageConfigError
+
+# File extensions for each blocked resource type
+RESOURCE_TYPE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico",
+              "bmp"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "m4v", "mov",
+              "m3u8", "mpd"],
+}
+
+# Proxy for blocked requests, nothing listens on discard port so requests
+# fail immediately
+BLOCKED_PROXY = "PROXY 127.0.0.1:9"
+
+
+def get_type_patterns(resource_types):
+    """
+    Return URL patterns for given resource types.
+    """
+    patterns = []
+
+    for name in resource_types:
+        for extension in RESOURCE_TYPE_EXTENSIONS[name]:
+            patterns.append("*.{}".format(extension))
+            patterns.append("*.{}?*".format(extension))
+
+    return patterns
+
+
+def get_blocked_patterns(config, block_urls=None, block_resource_types=None):
+    """
+    Return every URL patterns to block for given page configuration.
+
+    Arguments:
+        config (dict): Page configuration, its ``block_urls`` and
+            ``block_resource_types`` items are added to the global ones.
+
+    Keyword Arguments:
+        block_urls (list): Global URL patterns to block.
+        block_resource_types (list): Global resource types to block.
+
+    Raises:
+        PageConfigError: If a resource type is unknowed.
+
+    Returns:
+        list: Sorted URL patterns without duplicates.
+    """
+    urls = list(block_urls or []) + list(config.get("block_urls") or [])
+    resource_types = (
+        list(block_resource_types or [])
+        + list(config.get("block_resource_types") or [])
+    )
+
+    for name in resource_types:
+        if name not in ALLOWED_BLOCK_RESOURCE_TYPES:
+            msg = ("Unknowed blocked resource type '{}' for page '{}', it "
+                   "must be one of: {}")
+            raise PageConfigError(msg.format(
+                name,
+                config.get("name"),
+                ", ".join(ALLOWED_BLOCK_RESOURCE_TYPES),
+            ))
+
+    return sorted(set(urls + get_type_patterns(resource_types)))
+
+
+def get_pac_script(patterns, proxy=None):
+    """
+    Return a proxy auto-configuration script which sends requests matching
+    given patterns to blocking proxy and every other requests directly, or
+    to given proxy address if any.
+    """
+    default = "PROXY {}".format(proxy) if proxy else "DIRECT"
+
+    return "\n".join([
+        "var patterns = {};".format(json.dumps(patterns)),
+        "function FindProxyForURL(url, host) {",
+        "    for (var i = 0; i < patterns.length; i++) {",
+        "        if (shExpMatch(url, patterns[i])) {",
+        "            return {};".format(json.dumps(BLOCKED_PROXY)),
+        "        }",
+        "    }",
+        "    return {};".format(json.dumps(default)),
+        "}",
+    ])
+
+
+def get_firefox_preferences(patterns, proxy=None):
+    """
+    Return Firefox profile preferences to block given patterns and to use
+    given proxy address if any.
+    """
+    script = base64.b64encode(
+        get_pac_script(patterns, proxy=proxy).encode("utf-8")
+    )
+
+    preferences = {
+        "network.proxy.type": 2,
+        "network.proxy.autoconfig_url": (
+            "data:application/x-ns-proxy-autoconfig;base64,"
+            + script.decode("ascii")
+        ),
+        # Give full URL to script for secure requests, not only the host
+        "network.proxy.autoconfig_url.include_path": True,
+    }
+
+    if proxy:
+        # Firefox never use a proxy for local addresses unless allowed
+        preferences["network.proxy.allow_hijacking_localhost"] = True
+
+    return preferences
+
+
+def count_blocked_requests(entries):
+    """
+    Count requests blocked from DevTools protocol in Chrome performance log
+    entries.
+
+    Arguments:
+        entries (list): Performance log entries where each message is a JSON
+            encoded DevTools event.
+
+    Returns:
+        int: Number of failed requests with a blocked reason.
+    """
+    count = 0
+
+    for entry in entries:
+        try:
+            event = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        if (
+            event.get("method") == "Network.loadingFailed"
+            and event.get("params", {}).get("blockedReason")
+        ):
+            count += 1
+
+    return count
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import logging
+import os
+
+import click
+
+from website_capture.benchmark import (ALLOWED_BENCHMARK_SCALES,
+                                       BENCHMARK_SCALES, SiteServer,
+                                       benchmark_driver_launch,
+                                       benchmark_pipeline, build_pages,
+                                       compare_results, save_results)
+from website_capture.cli.capture import DEFAULT_INTERFACE, INTERFACES
+
+BENCHMARK_SUITES = ["pipeline", "launch"]
+
+
+def run_pipeline_suite(logger, interfaces, scales, output, site, workers,
+                       memory):
+    """
+    Run pipeline benchmark for every interfaces and scales.
+    """
+    measures = {}
+
+    with contextlib.ExitStack() as stack:
+        urls = None
+        if site:
+            server = stack.enter_context(SiteServer(site))
+            urls = server.get_urls()
+            if not urls:
+                logger.critical("No HTML document in site: {}".format(site))
+                raise click.Abort()
+
+        for name in interfaces:
+            klass = INTERFACES[name]
+            measures[name] = {}
+
+            for count in scales:
+                logger.info("🤖 {} ({} pages)".format(klass.__name__, count))
+                result = benchmark_pipeline(
+                    klass,
+                    build_pages(count, urls=urls),
+                    os.path.join(output, "pipeline", name, str(count)),
+                    memory=memory,
+                    workers=workers,
+                )
+                measures[name][str(count)] = result
+
+                logger.info((
+                    "🔸 {pages_per_second:.1f} jobs/s, {jobs} jobs in "
+                    "{elapsed:.2f}s"
+                ).format(**result))
+
+    return measures
+
+
+def run_launch_suite(logger, interfaces, launches, output):
+    """
+    Run driver launch benchmark for every interfaces, first with a new
+    browser profile for each driver then from a profile template.
+    """
+    measures = {}
+
+    for name in interfaces:
+        klass = INTERFACES[name]
+        measures[name] = {}
+
+        for mode, profile_template in [
+            ("default", None),
+            ("profile_template", True),
+        ]:
+            logger.info("🤖 {} ({})".format(klass.__name__, mode))
+            interface_instance = klass(
+                basedir=os.path.join(output, "launch", name, mode),
+                profile_template=profile_template,
+            )
+
+            result = benchmark_driver_launch(interface_instance,
+                                             launches=launches)
+            measures[name][mode] = result
+
+            median = result["next"]["p50"]
+            logger.info("🔸 First launch: {:.3f}s, next median: {}".format(
+                result["first"],
+                "-" if median is None else "{:.3f}s".format(median),
+            ))
+
+    return measures
+
+
+@click.command()
+@click.option("--suite", type=click.Choice(BENCHMARK_SUITES),
+              multiple=True,
+              help=("Benchmark suite to run, 'pipeline' to run synthetic "
+                    "pages through interface or 'launch' to measure driver "
+                    "launch time. If argument is empty the 'pipeline' suite "
+                    "is used."))
+@click.option("--interface",
+              type=click.Choice(INTERFACES.keys()),
+              help=("Interface engine to benchmark. If argument is empty the "
+                    "default interface '{}' is used.".format(
+                        DEFAULT_INTERFACE)),
+              multiple=True)
+@click.option("--pages", type=click.Choice(
+                  [str(item) for item in ALLOWED_BENCHMARK_SCALES]
+              ),
+              multiple=True,
+              help=("Number of pages for a pipeline benchmark, each page has "
+                    "three sizes. If argument is empty, benchmarks are run "
+                    "for {} pages.".format(
+                        ", ".join([str(item) for item in BENCHMARK_SCALES])
+                    )))
+@click.option("--workers", default=1, metavar="INTEGER",
+              type=click.IntRange(min=1),
+              help="Number of interface workers. Default to 1.")
+@click.option("--site", default=None, metavar="PATH",
+              type=click.Path(exists=True, file_okay=False),
+              help=("Directory of a static site, like built 'page_tests', "
+                    "which is served locally so pages load its HTML "
+                    "documents in turn. Without it, pages load a blank "
+                    "document."))
+@click.option("--no-memory", is_flag=True,
+              help=("Do not trace memory allocations, peak memory is not "
+                    "measured but pipeline runs faster."))
+@click.option("--launches", default=5, metavar="INTEGER",
+              type=click.IntRange(min=1),
+              help=("Number of drivers to start for each launch measure. "
+                    "Default to 5."))
+@click.option("--output", default="benchmarks", metavar="PATH",
+              type=click.Path(file_okay=False),
+              help=("Directory where benchmark files are written. Default to "
+                    "'benchmarks'."))
+@click.option("--results", default=None, metavar="PATH",
+              type=click.Path(dir_okay=False),
+              help=("Path to the JSON file where to write results. Default "
+                    "to 'results.json' in output directory."))
+@click.option("--compare", default=None, metavar="PATH",
+              type=click.File("r"),
+              help=("Results file from a previous benchmark, like from "
+                    "another commit, to compare pipeline throughput with."))
+@click.pass_context
+def benchmark_command(context, suite, interface, pages, workers, site,
+                      no_memory, launches, output, results, compare):
+    """
+    Measure performances of interface(s) and write them to a JSON file which
+    can be compared between commits.
+    """
+    logger = logging.getLogger("py-website-capture")
+
+    interfaces = interface or (DEFAULT_INTERFACE,)
+    measures = {}
+
+    if "pipeline" in suite or not suite:
+        measures["pipeline"] = run_pipeline_suite(
+            logger,
+            interfaces,
+            [int(item) for item in pages] or BENCHMARK_SCALES,
+            output,
+            site,
+            workers,
+            not no_memory,
+        )
+
+    if "launch" in suite:
+        measures["driver_launch"] = run_launch_suite(logger, interfaces,
+                                                     launches, output)
+
+    path = results or os.path.join(output, "results.json")
+    content = save_results(path, measures)
+    logger.info("🔹 Results written to: {}".format(path))
+
+    if compare:
+        for name, count, previous, current, ratio in compare_results(
+            json.load(compare), content
+        ):
+            logger.info((
+                "🔸 {} ({} pages): {:.1f} jobs/s against {:.1f} ({:+.1%})"
+            ).format(name, count, current, previous, ratio - 1))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import click
 import logging
+import os
 from collections import OrderedDict
 
 from website_capture.exceptions import SettingsInvalidError
@@ -10,19 +11,85 @@ from website_capture.interfaces.selenium_interface import (
     SeleniumFirefoxInterface,
     SeleniumChromeInterface
 )
+from website_capture.interfaces.asyncio_interface import AsyncWebDriverInterface
+from website_capture.interfaces.remote_interface import RemoteInterface
 
-from website_capture.conf import get_project_configuration
+from website_capture.conf import (ALLOWED_SCHEDULING_MODES,
+                                  get_project_configuration)
+from website_capture.results import (JOURNAL_FILENAME, CombinedResults,
+                                     ResultJournal, ResultWriter)
+from website_capture.runner import ConcurrentRunner
+from website_capture.timings import RUN_SUMMARY_FILENAME, RunSummary
 
 
 INTERFACES = OrderedDict((
     ("dummy", DummyInterface),
     ("firefox", SeleniumFirefoxInterface),
     ("chrome", SeleniumChromeInterface),
+    ("webdriver", AsyncWebDriverInterface),
+    ("remote", RemoteInterface),
 ))
 
 
 DEFAULT_INTERFACE = "dummy"
 
+RESULT_LABELS = {
+    "success": "Done",
+    "error": "Failed",
+    "skipped": "Skipped",
+}
+
+
+def get_interface_config(json_config, workers=None, incremental=None,
+                         scheduling=None):
+    """
+    Return options shared by every interfaces from configuration, command
+    arguments override configuration items.
+    """
+    return {
+        "basedir": json_config["output_dir"],
+        "size_dir": json_config.get("size_dir", True),
+        "headless": json_config.get("headless", True),
+        "session_pages": json_config.get("session_pages", 0),
+        "workers": workers or json_config.get("workers", 1),
+        "incremental": incremental or json_config.get("incremental", False),
+        "scheduling": scheduling or json_config.get("scheduling", "size"),
+        "encoder_workers": json_config.get("encoder_workers", 1),
+        "diff_baseline": json_config.get("diff_baseline"),
+        "hash_screenshots": json_config.get("hash_screenshots", False),
+        "page_load_strategy": json_config.get("page_load_strategy", "normal"),
+        "block_urls": json_config.get("block_urls"),
+        "block_resource_types": json_config.get("block_resource_types"),
+        "proxy_cache": json_config.get("proxy_cache"),
+        "profile_template": json_config.get("profile_template"),
+        "time_budget": json_config.get("time_budget"),
+        "page_timeout": json_config.get("page_timeout"),
+        "retry": json_config.get("retry"),
+    }
+
+
+def get_interface_options(interface_config, json_config, name):
+    """
+    Return options for an interface with its own options from configuration
+    ``interface_options`` item.
+    """
+    options = dict(interface_config)
+    options.update(json_config.get("interface_options", {}).get(name, {}))
+
+    return options
+
+
+def write_result(name, status, item, writer=None, combined=None):
+    """
+    Write a result to results file and add it to combined results if they are
+    enabled.
+    """
+    if writer:
+        writer.write(name, status, item)
+
+    if combined:
+        combined.add(name, status, item)
+
 
 @click.command()
 @click.option("--interface",
@@ -35,8 +102,42 @@ DEFAULT_INTERFACE = "dummy"
               help="Path to config file",
               type=click.File("rb"),
               required=True)
+@click.option("--workers", default=None, metavar="INTEGER",
+              type=click.IntRange(min=1),
+              help=("Number of page jobs to perform at the same time, each "
+                    "worker uses its own browser. If not given, the "
+                    "'workers' item from config is used, default to 1."))
+@click.option("--incremental", is_flag=True, default=None,
+              help=("Skip pages which have not changed since their previous "
+                    "capture. If not given, the 'incremental' item from "
+                    "config is used."))
+@click.option("--scheduling", default=None,
+              type=click.Choice(ALLOWED_SCHEDULING_MODES),
+              help=("Job scheduling mode, 'size' performs every page for a "
+                    "size then the next size, 'page' performs every size of "
+                    "a page from a single page load then the next page. If "
+                    "not given, the 'scheduling' item from config is used, "
+                    "default to 'size'."))
+@click.option("--results", default=None, metavar="PATH",
+              type=click.File("w"),
+              help=("Path to a file where to write every result as a JSON "
+                    "line as soon as it is finished."))
+@click.option("--combined-results", default=None, metavar="PATH",
+              type=click.File("w"),
+              help=("Path to a file where to write every results grouped by "
+                    "interface as a single JSON document once capture is "
+                    "finished."))
+@click.option("--concurrent", is_flag=True,
+              help=("Run every interfaces at the same time instead of one "
+                    "after the other, each one with its own workers."))
+@click.option("--resume", is_flag=True,
+              help=("Resume a previous capture, pages which have already "
+                    "succeeded in the journal from output directory are not "
+                    "captured again."))
 @click.pass_context
-def capture_command(context, interface, config):
+def capture_command(context, interface, config, workers, incremental,
+                    scheduling, results, combined_results, concurrent,
+                    resume):
     """
     Perform page capture(s) from a job configuration file with required
     interface(s).
@@ -50,11 +151,9 @@ def capture_command(context, interface, config):
         raise click.Abort()
 
 
-    interface_config = {
-        "basedir": json_config["output_dir"],
-        "size_dir": json_config.get("size_dir", True),
-        "headless": json_config.get("headless", True),
-    }
+    interface_config = get_interface_config(json_config, workers=workers,
+                                            incremental=incremental,
+                                            scheduling=scheduling)
 
     if len(interface) == 0:
         logger.warning(
@@ -63,8 +162,85 @@ def capture_command(context, interface, config):
         )
         interface = (DEFAULT_INTERFACE,)
 
-    for item in interface:
-        klass = INTERFACES[item]
-        logger.info("🤖 {}".format(klass.__name__))
-        interface_instance = klass(**interface_config)
-        interface_instance.run(json_config["pages"])
+    writer = ResultWriter(results) if results else None
+    combined = (
+        CombinedResults(combined_results, interfaces=interface)
+        if combined_results else None
+    )
+
+    journal = ResultJournal(
+        os.path.join(json_config["output_dir"], JOURNAL_FILENAME)
+    ).open(resume=resume)
+    interface_config["journal"] = journal
+
+    summary = RunSummary(
+        os.path.join(json_config["output_dir"], RUN_SUMMARY_FILENAME)
+    )
+    interface_config["summary"] = summary
+
+    stream = "sources" in json_config
+
+    try:
+        instances = OrderedDict([
+            (name, INTERFACES[name](**get_interface_options(
+                interface_config, json_config, name
+            )))
+            for name in interface
+        ])
+
+        if concurrent:
+            logger.info("🤖 {}".format(", ".join([
+                instance.__class__.__name__
+                for instance in instances.values()
+            ])))
+
+            runner = ConcurrentRunner(instances)
+            jobs = runner.iter_run(json_config["pages"], stream=stream)
+            counts = {name: {} for name in instances}
+            for i, (name, status, item) in enumerate(jobs, start=1):
+                msg = "🔸 [{}] {}: {} ({}) with {}".format(
+                    i,
+                    RESULT_LABELS[status],
+                    item["name"],
+                    instances[name].get_size_repr(*item["size"]),
+                    name,
+                )
+                logger.info(msg)
+                counts[name][status] = counts[name].get(status, 0) + 1
+
+                write_result(name, status, item, writer=writer,
+                             combined=combined)
+
+            for name, statuses in counts.items():
+                logger.info("🔹 {}: {}".format(name, ", ".join([
+                    "{} {}".format(statuses.get(status, 0), label)
+                    for status, label in RESULT_LABELS.items()
+                ])))
+        else:
+            for name, interface_instance in instances.items():
+                logger.info("🤖 {}".format(
+                    interface_instance.__class__.__name__
+                ))
+
+                jobs = interface_instance.iter_run(json_config["pages"],
+                                                   stream=stream)
+                for i, (status, item) in enumerate(jobs, start=1):
+                    msg = "🔸 [{}] {}: {} ({})".format(
+                        i,
+                        RESULT_LABELS[status],
+                        item["name"],
+                        interface_instance.get_size_repr(*item["size"]),
+                    )
+                    logger.info(msg)
+
+                    write_result(name, status, item, writer=writer,
+                                 combined=combined)
+    # Pages from a pages file are validated while they are read
+    except SettingsInvalidError as e:
+        logger.critical(e)
+        raise click.Abort()
+    finally:
+        journal.close()
+        summary.save()
+        if combined:
+            combined.save()
@@ -7,6 +7,10 @@ from website_capture.logs import init_logger
 
 from website_capture.cli.version import version_command
 from website_capture.cli.capture import capture_command
+from website_capture.cli.diff import diff_command
+from website_capture.cli.hashes import hashes_command
+from website_capture.cli.benchmark import benchmark_command
+from website_capture.cli.queue import serve_queue_command, worker_command
 
 
 # Help alias on '-h' argument
@@ -49,3 +53,8 @@ def cli_frontend(ctx, verbose):
 # Attach commands methods to the main grouper
 cli_frontend.add_command(version_command, name="version")
 cli_frontend.add_command(capture_command, name="capture")
+cli_frontend.add_command(diff_command, name="diff")
+cli_frontend.add_command(hashes_command, name="hashes")
+cli_frontend.add_command(benchmark_command, name="benchmark")
+cli_frontend.add_command(serve_queue_command, name="serve-queue")
+cli_frontend.add_command(worker_command, name="worker")
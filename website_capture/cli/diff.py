@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+from website_capture.diff import (Image, compare_screenshots, find_screenshots,
+                                  get_diff_path)
+
+
+def parse_region(value):
+    """
+    Parse a region from ``X,Y,WIDTH,HEIGHT`` string.
+    """
+    try:
+        region = [int(item) for item in value.split(",")]
+    except ValueError:
+        region = []
+
+    if len(region) != 4:
+        msg = "Region must be four integers 'X,Y,WIDTH,HEIGHT': {}"
+        raise click.BadParameter(msg.format(value))
+
+    return region
+
+
+@click.command()
+@click.argument("current", type=click.Path(exists=True, file_okay=False))
+@click.argument("baseline", type=click.Path(exists=True, file_okay=False))
+@click.option("--threshold", default=0.0, metavar="FLOAT",
+              type=click.FloatRange(min=0, max=1),
+              help=("Maximum mismatch score, the ratio of mismatched pixels, "
+                    "for a screenshot to be considered unchanged. Default to "
+                    "0."))
+@click.option("--tolerance", default=0, metavar="INTEGER",
+              type=click.IntRange(min=0, max=255),
+              help=("Maximum difference of a pixel channel for pixel to be "
+                    "considered unchanged. Default to 0."))
+@click.option("--ignore", multiple=True, metavar="X,Y,WIDTH,HEIGHT",
+              help="Region to ignore from comparison, it can be repeated.")
+@click.option("--workers", default=1, metavar="INTEGER",
+              type=click.IntRange(min=1),
+              help="Number of screenshots to compare at the same time.")
+@click.option("--results", default=None, metavar="PATH",
+              type=click.File("w"),
+              help=("Path to a file where to write every comparison result "
+                    "as a JSON line."))
+@click.pass_context
+def diff_command(context, current, baseline, threshold, tolerance, ignore,
+                 workers, results):
+    """
+    Compare screenshots from CURRENT directory against screenshots with the
+    same relative path from BASELINE directory.
+
+    A diff image is written next to each changed screenshot. Command exits
+    with an error code if any screenshot has changed.
+    """
+    logger = logging.getLogger("py-website-capture")
+
+    if Image is None:
+        logger.critical("Package 'Pillow' is required to compare screenshots.")
+        raise click.Abort()
+
+    regions = [parse_region(item) for item in ignore]
+
+    def compare(path):
+        screenshot_path = os.path.join(current, path)
+        return path, compare_screenshots(
+            screenshot_path,
+            os.path.join(baseline, path),
+            diff_path=get_diff_path(screenshot_path),
+            threshold=threshold,
+            tolerance=tolerance,
+            ignore=regions,
+        )
+
+    counts = {"unchanged": 0, "changed": 0, "missing": 0}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, result in executor.map(compare, find_screenshots(current)):
+            counts[result["status"]] += 1
+
+            if result["status"] == "changed":
+                logger.warning("🔸 Changed: {} (score {:.4f})".format(
+                    path,
+                    result["score"],
+                ))
+            elif result["status"] == "missing":
+                logger.info("🔸 Missing baseline: {}".format(path))
+            else:
+                logger.debug("🔸 Unchanged: {}".format(path))
+
+            if results:
+                results.write(json.dumps(dict(result, path=path),
+                                         sort_keys=True) + "\n")
+                results.flush()
+
+    logger.info("🔹 {unchanged} unchanged, {changed} changed, {missing} "
+                "without baseline".format(**counts))
+
+    if counts["changed"]:
+        context.exit(1)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+
+import click
+
+from website_capture.phash import HASH_INDEX_FILENAME, HASH_KINDS, HashIndex
+
+
+def get_index_path(path):
+    """
+    Return hash index path from given output directory or index file path.
+    """
+    if os.path.isdir(path):
+        return os.path.join(path, HASH_INDEX_FILENAME)
+
+    return path
+
+
+@click.command()
+@click.argument("index", type=click.Path(exists=True))
+@click.option("--kind", default="phash", type=click.Choice(HASH_KINDS),
+              help="Hash kind to compare. Default to 'phash'.")
+@click.option("--distance", default=0, metavar="INTEGER",
+              type=click.IntRange(min=0, max=64),
+              help=("Maximum Hamming distance for two hashes to be "
+                    "considered similar. Default to 0."))
+@click.option("--similar", default=None, metavar="KEY",
+              help=("Find screenshots similar to the indexed screenshot with "
+                    "this relative path."))
+@click.option("--compare", default=None, metavar="PATH",
+              type=click.Path(exists=True),
+              help=("Another index or output directory, like from a "
+                    "previous capture, to compare with."))
+@click.option("--results", default=None, metavar="PATH",
+              type=click.File("w"),
+              help="Path to a file where to write results as JSON.")
+@click.pass_context
+def hashes_command(context, index, kind, distance, similar, compare, results):
+    """
+    Query screenshot perceptual hashes from INDEX, either an output directory
+    or an index file, without decoding any image.
+
+    Without any option, every group of similar screenshots are listed. With
+    '--compare', command exits with an error code if any screenshot has
+    changed.
+    """
+    logger = logging.getLogger("py-website-capture")
+
+    hash_index = HashIndex(get_index_path(index)).load()
+    exit_code = 0
+
+    if similar:
+        hashes = hash_index.get(similar)
+        if hashes is None:
+            logger.critical("Key is not indexed: {}".format(similar))
+            raise click.Abort()
+
+        output = [
+            {"key": key, "distance": d}
+            for key, d in hash_index.query(hashes[kind], kind, distance)
+            if key != similar
+        ]
+        for item in output:
+            logger.info("🔸 Similar: {key} (distance {distance})".format(
+                **item
+            ))
+        logger.info("🔹 {} similar screenshots".format(len(output)))
+    elif compare:
+        other = HashIndex(get_index_path(compare)).load()
+        output = hash_index.compare(other, kind, distance)
+        for key in output["changed"]:
+            logger.warning("🔸 Changed: {}".format(key))
+        for key in output["added"]:
+            logger.info("🔸 Added: {}".format(key))
+        for key in output["removed"]:
+            logger.info("🔸 Removed: {}".format(key))
+        logger.info("🔹 {} unchanged, {} changed, {} added, {} removed".format(
+            *[len(output[name])
+              for name in ["unchanged", "changed", "added", "removed"]]
+        ))
+        if output["changed"]:
+            exit_code = 1
+    else:
+        output = hash_index.duplicates(kind, distance)
+        for keys in output:
+            logger.info("🔸 Similar: {}".format(", ".join(keys)))
+        logger.info("🔹 {} groups of similar screenshots from {} "
+                    "indexed".format(len(output), len(hash_index)))
+
+    if results:
+        results.write(json.dumps(output, sort_keys=True) + "\n")
+
+    if exit_code:
+        context.exit(exit_code)
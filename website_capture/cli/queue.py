@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import click
+
+from website_capture.conf import get_project_configuration
+from website_capture.cli.capture import (DEFAULT_INTERFACE, INTERFACES,
+                                         RESULT_LABELS, get_interface_config,
+                                         get_interface_options)
+from website_capture.distributed import (LEASE_TIMEOUT, POLL_INTERVAL,
+                                         QueueClient, QueueServer,
+                                         QueueWorker, WorkQueue, build_jobs)
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.results import ResultWriter
+
+
+@click.command()
+@click.option("--interface",
+              type=click.Choice(INTERFACES.keys()),
+              help=("Interface engine to perform browser tasks. If argument is "
+                    "empty the default interface "
+                    "'{}' is used.".format(DEFAULT_INTERFACE)),
+              multiple=True)
+@click.option("--config", default=None, metavar="PATH",
+              help="Path to config file",
+              type=click.File("rb"),
+              required=True)
+@click.option("--host", default="127.0.0.1", metavar="STRING",
+              help=("Address to listen on for workers. Default to "
+                    "'127.0.0.1', use '0.0.0.0' for workers from other "
+                    "hosts."))
+@click.option("--port", default=8765, metavar="INTEGER",
+              type=click.IntRange(min=0),
+              help="Port to listen on for workers. Default to 8765.")
+@click.option("--lease-timeout", default=LEASE_TIMEOUT, metavar="INTEGER",
+              type=click.IntRange(min=1),
+              help=("Seconds before a job is given to another worker if its "
+                    "worker has not sent any heartbeat. Default to "
+                    "{}.".format(LEASE_TIMEOUT)))
+@click.option("--results", default=None, metavar="PATH",
+              type=click.File("w"),
+              help=("Path to a file where to write every result as a JSON "
+                    "line as soon as it is received."))
+@click.pass_context
+def serve_queue_command(context, interface, config, host, port,
+                        lease_timeout, results):
+    """
+    Serve page jobs from a job configuration file to workers and collect
+    their results until every jobs are done.
+    """
+    logger = logging.getLogger("py-website-capture")
+
+    try:
+        json_config = get_project_configuration(config)
+    except SettingsInvalidError as e:
+        logger.critical(e)
+        raise click.Abort()
+
+    interface = interface or (DEFAULT_INTERFACE,)
+    interface_config = get_interface_config(json_config)
+
+    try:
+        options = {
+            name: get_interface_options(interface_config, json_config, name)
+            for name in interface
+        }
+        instances = {
+            name: INTERFACES[name](**options[name]) for name in interface
+        }
+        jobs = build_jobs(instances, json_config["pages"])
+    except SettingsInvalidError as e:
+        logger.critical(e)
+        raise click.Abort()
+
+    writer = ResultWriter(results) if results else None
+
+    queue = WorkQueue(jobs, lease_timeout=lease_timeout)
+    with QueueServer(queue, options, host=host, port=port) as server:
+        logger.info("🔹 Serving {} jobs to workers on: {}".format(
+            len(jobs), server.url
+        ))
+
+        for i, (job, status, item) in enumerate(queue.iter_results(),
+                                                start=1):
+            logger.info("🔸 [{}] {}: {} ({})".format(
+                i,
+                RESULT_LABELS[status],
+                item["name"],
+                instances[job["interface"]].get_size_repr(*item["size"]),
+            ))
+
+            if writer:
+                writer.write(job["interface"], status, item)
+
+        # Let workers know there is nothing left to do before stopping
+        queue.wait_workers(POLL_INTERVAL * 3)
+
+    logger.info("🔹 Every jobs are done")
+
+
+@click.command()
+@click.option("--url", default="http://127.0.0.1:8765", metavar="URL",
+              help=("Coordinator URL. Default to 'http://127.0.0.1:8765'."))
+@click.option("--workers", default=1, metavar="INTEGER",
+              type=click.IntRange(min=1),
+              help=("Number of page jobs to perform at the same time, each "
+                    "worker uses its own browser. Default to 1."))
+@click.option("--name", default=None, metavar="STRING",
+              help=("Worker name in coordinator. Default to an unique random "
+                    "name."))
+@click.option("--output-dir", default=None, metavar="PATH",
+              type=click.Path(file_okay=False),
+              help=("Directory where to write page files instead of the "
+                    "output directory from coordinator configuration, like "
+                    "the mount point of a shared storage."))
+@click.pass_context
+def worker_command(context, url, workers, name, output_dir):
+    """
+    Perform page jobs from a coordinator started with 'serve-queue' command
+    until every jobs are done.
+    """
+    logger = logging.getLogger("py-website-capture")
+
+    worker = QueueWorker(QueueClient(url), INTERFACES, name=name,
+                         workers=workers, basedir=output_dir)
+    logger.info("🤖 {}".format(worker.name))
+
+    try:
+        performed = worker.run()
+    except OSError as e:
+        logger.critical("Coordinator is not reachable: {}".format(e))
+        raise click.Abort()
+
+    logger.info("🔹 Performed {} jobs".format(performed))
@@ -1,10 +1,38 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+import os
 
 from website_capture.exceptions import SettingsInvalidError
+from website_capture.pages import ChainedPages, PagesFile
+from website_capture.retry import validate_retry_options
+from website_capture.sources import PageDiscovery, is_url, validate_source
 
-ALLOWED_SCREENSHOT_METHODS = ["body", "window"]
+ALLOWED_SCREENSHOT_METHODS = ["body", "window", "fullpage"]
+
+ALLOWED_SCREENSHOT_FORMATS = ["png", "jpeg", "webp"]
+
+ALLOWED_SCHEDULING_MODES = ["size", "page"]
+
+ALLOWED_PAGE_LOAD_STRATEGIES = ["normal", "eager", "none"]
+
+ALLOWED_BLOCK_RESOURCE_TYPES = ["image", "font", "media"]
+
+ALLOWED_PROXY_CACHE_OPTIONS = ["directory", "max_size"]
+
+ALLOWED_PROFILE_TEMPLATE_OPTIONS = ["directory"]
+
+
+def get_relative_path(fileobject, path):
+    """
+    Return given path relative to directory of given configuration file
+    object, if it has a file name.
+    """
+    filename = getattr(fileobject, "name", None)
+    if isinstance(filename, str) and not os.path.isabs(path):
+        return os.path.join(os.path.dirname(os.path.abspath(filename)), path)
+
+    return path
 
 
 def get_project_configuration(fileobject):
@@ -18,6 +46,13 @@ def get_project_configuration(fileobject):
             has no ``name`` attribute, debug log will print out stream object
             representation.
 
+    Pages can be given inline in ``pages`` item or from a JSON lines file in
+    ``pages_file`` item, or both. Pages file is not read here, it is read and
+    validated lazily each time pages are iterated.
+
+    Pages can also be discovered from sitemaps or a crawl with ``sources``
+    item, discovery starts once pages are iterated.
+
     Return:
         dict: Configuration items in a dict.
     """
@@ -39,23 +74,125 @@ def get_project_configuration(fileobject):
                "create files in a 'output_dir' item.")
         raise SettingsInvalidError(msg)
 
-    if "pages" not in config:
+    if not any([name in config for name in ["pages", "pages_file",
+                                            "sources"]]):
         msg = ("Your configuration must contains a list of pages in a "
-               "'pages' item.")
+               "'pages' item, a pages file path in a 'pages_file' item or "
+               "a list of page sources in a 'sources' item.")
         raise SettingsInvalidError(msg)
 
+    if "sources" in config:
+        if not isinstance(config["sources"], list):
+            msg = "Item 'sources' must be a list of sources."
+            raise SettingsInvalidError(msg)
+
+        for index, source in enumerate(config["sources"], start=1):
+            validate_source(source, index)
+
     if ("screenshot_method" in config
         and config["screenshot_method"] not in ALLOWED_SCREENSHOT_METHODS):
         msg = ("Unknowed screenshot method '{}', it must be one of allowed "
                "methods: {}".format(
                    config["screenshot_method"],
-                   ", ".joint(ALLOWED_SCREENSHOT_METHODS)
+                   ", ".join(ALLOWED_SCREENSHOT_METHODS)
                 ))
         raise SettingsInvalidError(msg)
 
-    for page in config["pages"]:
+    if ("screenshot_format" in config
+        and config["screenshot_format"] not in ALLOWED_SCREENSHOT_FORMATS):
+        msg = ("Unknowed screenshot format '{}', it must be one of allowed "
+               "formats: {}".format(
+                   config["screenshot_format"],
+                   ", ".join(ALLOWED_SCREENSHOT_FORMATS)
+                ))
+        raise SettingsInvalidError(msg)
+
+    if ("scheduling" in config
+        and config["scheduling"] not in ALLOWED_SCHEDULING_MODES):
+        msg = ("Unknowed scheduling mode '{}', it must be one of allowed "
+               "modes: {}".format(
+                   config["scheduling"],
+                   ", ".join(ALLOWED_SCHEDULING_MODES)
+                ))
+        raise SettingsInvalidError(msg)
+
+    if ("page_load_strategy" in config
+        and config["page_load_strategy"] not in ALLOWED_PAGE_LOAD_STRATEGIES):
+        msg = ("Unknowed page load strategy '{}', it must be one of allowed "
+               "strategies: {}".format(
+                   config["page_load_strategy"],
+                   ", ".join(ALLOWED_PAGE_LOAD_STRATEGIES)
+                ))
+        raise SettingsInvalidError(msg)
+
+    for name in config.get("block_resource_types") or []:
+        if name not in ALLOWED_BLOCK_RESOURCE_TYPES:
+            msg = ("Unknowed blocked resource type '{}', it must be one of "
+                   "allowed types: {}".format(
+                       name,
+                       ", ".join(ALLOWED_BLOCK_RESOURCE_TYPES)
+                    ))
+            raise SettingsInvalidError(msg)
+
+    for name, allowed in [
+        ("proxy_cache", ALLOWED_PROXY_CACHE_OPTIONS),
+        ("profile_template", ALLOWED_PROFILE_TEMPLATE_OPTIONS),
+    ]:
+        value = config.get(name)
+        if isinstance(value, dict):
+            unknowed = sorted(set(value) - set(allowed))
+            if unknowed:
+                msg = ("Unknowed '{}' options '{}', they must be one of: "
+                       "{}".format(name, ", ".join(unknowed),
+                                   ", ".join(allowed)))
+                raise SettingsInvalidError(msg)
+        elif value is not None and not isinstance(value, bool):
+            msg = "Item '{}' must be a boolean or a dictionnary.".format(name)
+            raise SettingsInvalidError(msg)
+
+    proxy_cache = config.get("proxy_cache")
+    if isinstance(proxy_cache, dict) and "max_size" in proxy_cache:
+        max_size = proxy_cache["max_size"]
+        if (isinstance(max_size, bool)
+            or not isinstance(max_size, (int, float))
+            or max_size <= 0):
+            msg = "Option 'proxy_cache.max_size' must be a positive number."
+            raise SettingsInvalidError(msg)
+
+    for name in ["time_budget", "page_timeout"]:
+        value = config.get(name)
+        if value is not None and (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or value <= 0
+        ):
+            msg = "Item '{}' must be a positive number.".format(name)
+            raise SettingsInvalidError(msg)
+
+    if "retry" in config:
+        validate_retry_options(config["retry"])
+
+    for page in config.get("pages", []):
         # Page sizes have to be a tuple so it's hashable for ordering
         if "sizes" in page:
             page["sizes"] = [tuple(size) for size in page["sizes"]]
 
+    if "pages_file" in config or "sources" in config:
+        iterables = [config.get("pages", [])]
+        if "pages_file" in config:
+            iterables.append(PagesFile(
+                get_relative_path(fileobject, config["pages_file"])
+            ))
+        if "sources" in config:
+            sources = []
+            for source in config["sources"]:
+                # Sitemap file paths are relative to configuration file
+                if "sitemap" in source and not is_url(source["sitemap"]):
+                    source = dict(source, sitemap=get_relative_path(
+                        fileobject, source["sitemap"]
+                    ))
+                sources.append(source)
+            iterables.append(PageDiscovery(sources))
+        config["pages"] = ChainedPages(*iterables)
+
     return config
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Screenshot diff
+===============
+
+Compare screenshots against baseline screenshots to find visual regressions.
+
+Images are divided in blocks, a hash of each block from both images is
+compared first so only changed blocks are compared pixel per pixel. Block
+hashes of a baseline are cached in a file next to it, so they are only
+computed again when baseline has changed.
+
+It requires the optional ``Pillow`` package.
+"""
+import hashlib
+import io
+import json
+import os
+
+try:
+    from PIL import Image, ImageChops, ImageDraw
+except ImportError:
+    Image = None
+
+DIFF_BLOCK_SIZE = 64
+
+DIFF_IMAGE_EXTENSIONS = (".png", ".jpg", ".webp")
+
+# Files from tasks or diff which are not screenshots
+DIFF_EXCLUDED_SUFFIXES = (".diff.png", ".stitched.png")
+
+# Color of mismatched pixels in diff image
+DIFF_COLOR = (255, 0, 80)
+
+
+def get_block_boxes(width, height, block_size=DIFF_BLOCK_SIZE):
+    """
+    Return boxes of every blocks for given image size, row after row.
+    """
+    return [
+        (x, y, min(x + block_size, width), min(y + block_size, height))
+        for y in range(0, height, block_size)
+        for x in range(0, width, block_size)
+    ]
+
+
+def get_block_hashes(image, block_size=DIFF_BLOCK_SIZE):
+    """
+    Return a hash of each block pixels from given RGB image.
+
+    Returns:
+        list: Hexadecimal digests row after row.
+    """
+    return [
+        hashlib.blake2b(image.crop(box).tobytes(), digest_size=8).hexdigest()
+        for box in get_block_boxes(image.width, image.height, block_size)
+    ]
+
+
+def get_cache_path(path):
+    return ".".join([path, "blocks", "json"])
+
+
+def load_baseline_hashes(path, image, block_size=DIFF_BLOCK_SIZE):
+    """
+    Return block hashes of baseline, from its cache file when it is still
+    valid else they are computed and cached.
+
+    Arguments:
+        path (string): Baseline image path.
+        image (PIL.Image.Image): Opened baseline image in RGB.
+
+    Returns:
+        list: Hexadecimal digests row after row.
+    """
+    cache_path = get_cache_path(path)
+    stat = os.stat(path)
+    signature = {
+        "mtime": stat.st_mtime_ns,
+        "filesize": stat.st_size,
+        "width": image.width,
+        "height": image.height,
+        "block_size": block_size,
+    }
+
+    if os.path.exists(cache_path):
+        try:
+            with io.open(cache_path, "r") as fp:
+                cache = json.load(fp)
+        except ValueError:
+            cache = {}
+
+        if cache.get("signature") == signature:
+            return cache["hashes"]
+
+    hashes = get_block_hashes(image, block_size)
+
+    tmp_path = "{}.tmp".format(cache_path)
+    with io.open(tmp_path, "w") as fp:
+        json.dump({"signature": signature, "hashes": hashes}, fp)
+    os.replace(tmp_path, cache_path)
+
+    return hashes
+
+
+def get_ignore_mask(size, regions):
+    """
+    Return a mask where ignored regions are black.
+
+    Arguments:
+        size (tuple): Mask width and height.
+        regions (list): List of regions, each one is a list of
+            ``[x, y, width, height]``.
+
+    Returns:
+        PIL.Image.Image: Mask image in ``L`` mode or None if there is no
+        region.
+    """
+    if not regions:
+        return None
+
+    mask = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(mask)
+    for x, y, width, height in regions:
+        draw.rectangle([x, y, x + width - 1, y + height - 1], fill=0)
+
+    return mask
+
+
+def compare_screenshots(path, baseline_path, diff_path=None, threshold=0.0,
+                        tolerance=0, ignore=None, block_size=DIFF_BLOCK_SIZE):
+    """
+    Compare a screenshot against its baseline.
+
+    Arguments:
+        path (string): Screenshot path.
+        baseline_path (string): Baseline screenshot path.
+
+    Keyword Arguments:
+        diff_path (string): Path where to write diff image if screenshot has
+            changed. Diff image is the screenshot faded with mismatched pixels
+            highlighted. Default is None to not write any diff image.
+        threshold (float): Maximum mismatch score for screenshot to be
+            considered unchanged. Default is 0.
+        tolerance (int): Maximum difference of a pixel channel from 0 to 255
+            for pixel to be considered unchanged. Default is 0.
+        ignore (list): Regions to ignore, each one is a list of
+            ``[x, y, width, height]``. Default is None.
+        block_size (int): Width and height of compared blocks.
+
+    Returns:
+        dict: Comparison result with ``status`` (either ``unchanged``,
+        ``changed`` or ``missing`` when there is no screenshot or no
+        baseline), mismatch
+        ``score`` as the ratio of mismatched pixels, number of ``mismatched``
+        pixels and of changed ``blocks``, ``baseline`` path and ``diff``
+        image path if any.
+    """
+    result = {
+        "status": "missing",
+        "score": None,
+        "mismatched": None,
+        "blocks": None,
+        "baseline": baseline_path,
+        "diff": None,
+    }
+
+    if not os.path.exists(path) or not os.path.exists(baseline_path):
+        return result
+
+    with Image.open(path) as image, Image.open(baseline_path) as baseline:
+        image = image.convert("RGB")
+        baseline = baseline.convert("RGB")
+
+    width = max(image.width, baseline.width)
+    height = max(image.height, baseline.height)
+    pixels = width * height
+    common = (0, 0, min(image.width, baseline.width),
+              min(image.height, baseline.height))
+    mask = get_ignore_mask((width, height), ignore)
+
+    # Every pixels outside the common area are mismatched
+    mismatched = pixels - common[2] * common[3]
+    if mask is not None and mismatched:
+        outside = Image.new("L", (width, height), 255)
+        outside.paste(0, common)
+        mismatched = ImageChops.multiply(outside, mask).histogram()[255]
+
+    if image.size == baseline.size:
+        boxes = [
+            box for box, current, previous in zip(
+                get_block_boxes(width, height, block_size),
+                get_block_hashes(image, block_size),
+                load_baseline_hashes(baseline_path, baseline, block_size),
+            )
+            if current != previous
+        ]
+    else:
+        boxes = get_block_boxes(common[2], common[3], block_size)
+
+    changes = []
+    for box in boxes:
+        red, green, blue = ImageChops.difference(
+            image.crop(box),
+            baseline.crop(box)
+        ).split()
+        # Keep the biggest difference from every channels
+        difference = ImageChops.lighter(
+            ImageChops.lighter(red, green),
+            blue
+        ).point(lambda v: 255 if v > tolerance else 0)
+
+        if mask is not None:
+            difference = ImageChops.multiply(difference, mask.crop(box))
+
+        count = difference.histogram()[255]
+        if count:
+            mismatched += count
+            changes.append((box, difference))
+
+    result["score"] = mismatched / pixels if pixels else 0.0
+    result["mismatched"] = mismatched
+    result["blocks"] = len(changes)
+    result["status"] = "changed" if result["score"] > threshold else "unchanged"
+
+    if diff_path and mismatched:
+        diff = Image.new("RGB", (width, height), DIFF_COLOR)
+        faded = Image.blend(
+            image.convert("L").convert("RGB"),
+            Image.new("RGB", image.size, (255, 255, 255)),
+            0.7,
+        )
+        highlight = Image.new("L", (width, height), 0)
+        highlight.paste(255, common)
+        for box, difference in changes:
+            highlight.paste(ImageChops.invert(difference), box[:2])
+        if mask is not None:
+            # Ignored regions are displayed faded too
+            highlight = ImageChops.lighter(highlight, ImageChops.invert(mask))
+        diff.paste(faded, (0, 0), highlight.crop((0, 0) + image.size))
+        diff.save(diff_path)
+        result["diff"] = diff_path
+
+    return result
+
+
+def find_screenshots(basedir):
+    """
+    Return relative paths of every screenshot images from given directory.
+    """
+    paths = []
+
+    for root, dirs, files in os.walk(basedir):
+        dirs.sort()
+        for filename in sorted(files):
+            if (
+                filename.endswith(DIFF_IMAGE_EXTENSIONS)
+                and not filename.endswith(DIFF_EXCLUDED_SUFFIXES)
+                and ".thumb." not in filename
+            ):
+                paths.append(
+                    os.path.relpath(os.path.join(root, filename), basedir)
+                )
+
+    return paths
+
+
+def get_diff_path(path):
+    """
+    Return diff image path for given screenshot path.
+    """
+    return ".".join([os.path.splitext(path)[0], "diff", "png"])
@@ -0,0 +1,625 @@
+# -*- coding: utf-8 -*-
+"""
+Distributed capture
+===================
+
+A coordinator holds a queue of page jobs, each one a page with a size and an
+interface name, and serves it over HTTP to worker processes which can run on
+other hosts.
+
+A worker leases jobs from coordinator, performs them with
+``BaseInterface.page_job`` then sends their results back. Worker sends
+heartbeats for its leased jobs while it performs them, a job whose lease has
+not been renewed before lease timeout is given again to another worker.
+
+Workers write screenshots and reports to the output directory from
+configuration (or the one they are given), it should be a storage shared by
+every hosts so payload paths are valid for coordinator.
+
+Protocol is made of JSON ``POST`` requests:
+
+* ``/config``: Return interface options and lease timeout;
+* ``/lease``: Lease jobs to a worker, response has a ``finished`` item once
+  every jobs are done so worker can stop;
+* ``/heartbeat``: Renew leases of worker jobs, response lists jobs which are
+  not leased to worker anymore;
+* ``/complete``: Send results of a job.
+"""
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from website_capture.results import serialize_result
+
+# Seconds a worker has to renew a lease before its job is given to another
+# worker
+LEASE_TIMEOUT = 60
+
+# Maximum number of leases for a job before it fails
+MAX_LEASES = 3
+
+# Seconds a worker waits before asking again for jobs when every remaining
+# jobs are leased
+POLL_INTERVAL = 1
+
+LEASE_EXPIRED_MESSAGE = "Job lease has expired too many times"
+
+JOB_FAILED_MESSAGE = "Worker has failed to perform job"
+
+
+def build_jobs(interfaces, pages):
+    """
+    Return job items for every sizes of every pages for each interface.
+
+    Arguments:
+        interfaces (dict): Interface instances keyed by interface name, they
+            are used to set page default values.
+        pages (iterable): Page items.
+
+    Returns:
+        list: Job items with an unique ``id``, ``interface`` name, page
+        ``size`` and ``page`` item.
+    """
+    jobs = []
+
+    for name, interface in interfaces.items():
+        for page in interface.iter_page_default_values(pages):
+            for size in interface.get_page_sizes(page):
+                jobs.append({
+                    "id": len(jobs) + 1,
+                    "interface": name,
+                    "size": list(size),
+                    "page": dict(page),
+                })
+
+    return jobs
+
+
+class WorkQueue(object):
+    """
+    Queue of jobs leased to workers.
+
+    Every methods are thread safe.
+
+    Arguments:
+        jobs (list): Job items, see ``build_jobs``.
+
+    Keyword Arguments:
+        lease_timeout (float): Seconds before a job lease expires if it has
+            not been renewed.
+        max_leases (int): Maximum number of leases for a job, a job whose
+            last lease expires fails with an error result.
+        clock (callable): Function returning current time in seconds.
+    """
+    def __init__(self, jobs, lease_timeout=LEASE_TIMEOUT,
+                 max_leases=MAX_LEASES, clock=time.monotonic):
+        self.jobs = OrderedDict([(job["id"], job) for job in jobs])
+        self.lease_timeout = lease_timeout
+        self.max_leases = max_leases
+        self.clock = clock
+        self.pending = deque(self.jobs)
+        self.leases = {}
+        self.lease_counts = {}
+        self.done = set()
+        self.results = deque()
+        self.workers = {}
+        self.notified = set()
+        self._lock = threading.Condition()
+
+    @property
+    def is_finished(self):
+        return len(self.done) == len(self.jobs)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "jobs": len(self.jobs),
+                "pending": len(self.pending),
+                "leased": len(self.leases),
+                "done": len(self.done),
+                "workers": len(self.workers),
+            }
+
+    def expire(self):
+        """
+        Give expired leases back to pending jobs, or fail jobs which have
+        reached their maximum number of leases.
+
+        Lock must be held by caller.
+        """
+        now = self.clock()
+        expired = []
+
+        for job_id, (worker, expires) in list(self.leases.items()):
+            if expires > now:
+                continue
+
+            del self.leases[job_id]
+            if self.lease_counts[job_id] >= self.max_leases:
+                job = self.jobs[job_id]
+                self.finish(job_id, [("error", {
+                    "name": job["page"]["name"],
+                    "url": job["page"]["url"],
+                    "size": job["size"],
+                    "msg": LEASE_EXPIRED_MESSAGE,
+                    "error": "Last lease to worker {} has expired".format(
+                        worker
+                    ),
+                })])
+            else:
+                expired.append(job_id)
+
+        # Expired jobs are given first, in their leasing order
+        self.pending.extendleft(reversed(expired))
+
+    def finish(self, job_id, results):
+        """
+        Mark job as done with its results.
+
+        Lock must be held by caller.
+        """
+        self.leases.pop(job_id, None)
+        self.done.add(job_id)
+        self.results.append((self.jobs[job_id], results))
+        self._lock.notify_all()
+
+    def lease(self, worker, count=1):
+        """
+        Lease pending jobs to worker.
+
+        Returns:
+            list: Leased jobs, empty if there is no pending job.
+        """
+        with self._lock:
+            self.workers[worker] = self.clock()
+            self.expire()
+
+            if self.is_finished:
+                self.notified.add(worker)
+                self._lock.notify_all()
+
+            jobs = []
+            while self.pending and len(jobs) < count:
+                job_id = self.pending.popleft()
+                self.leases[job_id] = (worker,
+                                       self.clock() + self.lease_timeout)
+                self.lease_counts[job_id] = (
+                    self.lease_counts.get(job_id, 0) + 1
+                )
+                jobs.append(self.jobs[job_id])
+
+            return jobs
+
+    def heartbeat(self, worker, job_ids):
+        """
+        Renew leases of given worker jobs.
+
+        Returns:
+            list: Given job ids which are not leased to worker anymore.
+        """
+        with self._lock:
+            self.workers[worker] = self.clock()
+            self.expire()
+
+            lost = []
+            for job_id in job_ids:
+                lease = self.leases.get(job_id)
+                if lease is None or lease[0] != worker:
+                    lost.append(job_id)
+                else:
+                    self.leases[job_id] = (worker,
+                                           self.clock() + self.lease_timeout)
+
+            return lost
+
+    def complete(self, worker, job_id, results):
+        """
+        Store results of a job from a worker.
+
+        Results from a worker which has lost its lease are still accepted if
+        job is not done yet since they are valid.
+
+        Returns:
+            bool: True if results have been accepted.
+        """
+        with self._lock:
+            self.workers[worker] = self.clock()
+            if job_id not in self.jobs or job_id in self.done:
+                return False
+
+            if job_id in self.pending:
+                self.pending.remove(job_id)
+            self.finish(job_id, [tuple(item) for item in results])
+
+            return True
+
+    def iter_results(self, poll_interval=POLL_INTERVAL):
+        """
+        Yield results of every jobs as soon as they are completed, until
+        every jobs are done.
+
+        Yields:
+            tuple: Job item, result status and result item.
+        """
+        while True:
+            with self._lock:
+                while not self.results and not self.is_finished:
+                    self._lock.wait(poll_interval)
+                    # Leases expire even if no worker is left to ask for jobs
+                    self.expire()
+
+                if not self.results:
+                    return
+                job, results = self.results.popleft()
+
+            for status, item in results:
+                yield job, status, item
+
+    def wait_workers(self, timeout):
+        """
+        Wait until every known workers have been told every jobs are done,
+        or until timeout.
+
+        Returns:
+            bool: True if every workers have been told.
+        """
+        deadline = self.clock() + timeout
+
+        with self._lock:
+            while not set(self.workers) <= self.notified:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(min(remaining, POLL_INTERVAL))
+
+            return True
+
+
+class QueueRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve coordinator protocol for ``QueueServer``.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, content, status=200):
+        body = json.dumps(content, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self.respond({"error": "Invalid JSON"}, status=400)
+
+        queue = self.server.queue
+        command = self.path.strip("/")
+
+        if command == "config":
+            return self.respond({
+                "interfaces": self.server.interfaces,
+                "lease_timeout": queue.lease_timeout,
+            })
+        elif command == "lease":
+            jobs = queue.lease(payload["worker"], payload.get("count", 1))
+            return self.respond({
+                "jobs": jobs,
+                "finished": queue.is_finished,
+            })
+        elif command == "heartbeat":
+            return self.respond({
+                "lost": queue.heartbeat(payload["worker"], payload["jobs"]),
+            })
+        elif command == "complete":
+            return self.respond({
+                "accepted": queue.complete(payload["worker"], payload["job"],
+                                           payload["results"]),
+            })
+
+        return self.respond({"error": "Unknowed command"}, status=404)
+
+
+class QueueServer(object):
+    """
+    Serve a work queue over HTTP from a thread.
+
+    Arguments:
+        queue (WorkQueue): Queue to serve.
+        interfaces (dict): Options of every interfaces keyed by interface
+            name, given to workers to create their interfaces.
+
+    Keyword Arguments:
+        host (string): Address to listen on. Default is ``127.0.0.1``.
+        port (int): Port to listen on, zero for a free port. Default is 0.
+    """
+    def __init__(self, queue, interfaces, host="127.0.0.1", port=0):
+        self.queue = queue
+        self.interfaces = interfaces
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, self.port),
+                                          QueueRequestHandler)
+        self.server.daemon_threads = True
+        self.server.queue = self.queue
+        self.server.interfaces = self.interfaces
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={"poll_interval": 0.1},
+                                       daemon=True)
+        self.thread.start()
+
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class QueueClient(object):
+    """
+    Client for coordinator protocol.
+
+    Arguments:
+        url (string): Coordinator base URL.
+
+    Keyword Arguments:
+        timeout (float): Request timeout in seconds. Default is 30.
+    """
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, command, payload):
+        request = urllib.request.Request(
+            "{}/{}".format(self.url, command),
+            data=json.dumps(payload, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def get_config(self):
+        return self.request("config", {})
+
+    def lease(self, worker, count=1):
+        return self.request("lease", {"worker": worker, "count": count})
+
+    def heartbeat(self, worker, job_ids):
+        return self.request("heartbeat", {
+            "worker": worker,
+            "jobs": job_ids,
+        })["lost"]
+
+    def complete(self, worker, job_id, results):
+        return self.request("complete", {
+            "worker": worker,
+            "job": job_id,
+            "results": results,
+        })["accepted"]
+
+
+class QueueWorker(object):
+    """
+    Lease jobs from a coordinator and perform them.
+
+    Arguments:
+        client (QueueClient): Coordinator client.
+        interfaces (dict): Interface classes keyed by interface name.
+
+    Keyword Arguments:
+        name (string): Worker name, default to an unique random name.
+        workers (int): Number of threads performing jobs, each one with its
+            own driver session. Default is 1.
+        basedir (string): Output directory to use instead of the one from
+            coordinator. Default is None.
+        poll_interval (float): Seconds to wait before asking again for jobs
+            when coordinator has no pending job.
+    """
+    def __init__(self, client, interfaces, name=None, workers=1,
+                 basedir=None, poll_interval=POLL_INTERVAL):
+        self.client = client
+        self.interface_classes = interfaces
+        self.name = name or "worker-{}".format(uuid.uuid4().hex[:8])
+        self.workers = workers
+        self.basedir = basedir
+        self.poll_interval = poll_interval
+        self.interfaces = {}
+        self.pools = {}
+        self.running = set()
+        self.performed = 0
+        self.options = None
+        self.stopped = threading.Event()
+        self.log = logging.getLogger("py-website-capture")
+        self._lock = threading.Lock()
+
+    def get_interface(self, name):
+        """
+        Return interface instance for given interface name, created from
+        coordinator options on first use.
+
+        Interface is started like for a run (screenshot encoder, hash index,
+        caching proxy, manifest and time budget from worker first job) and
+        it is finished once worker stops.
+        """
+        with self._lock:
+            if name not in self.interfaces:
+                options = dict(self.options["interfaces"][name])
+                if self.basedir:
+                    options["basedir"] = self.basedir
+                interface = self.interface_classes[name](**options)
+                interface.start_run()
+                self.interfaces[name] = interface
+                self.pools[name] = interface.get_driver_pool()
+
+            return self.interfaces[name], self.pools[name]
+
+    def perform(self, job):
+        """
+        Perform a job.
+
+        Returns:
+            list: Serialized results from page job.
+        """
+        interface, pool = self.get_interface(job["interface"])
+        size = tuple(job["size"])
+
+        interface.make_destination_dir(size)
+        built, errors = interface.page_job(size, job["page"],
+                                           session=pool.get())
+
+        return [
+            serialize_result(job["interface"], "success", item)
+            for item in built
+        ] + [
+            serialize_result(job["interface"],
+                             interface.get_error_status(item), item)
+            for item in errors
+        ]
+
+    def get_failed_results(self, job, error):
+        """
+        Return serialized error result for a job which could not be
+        performed.
+        """
+        return [serialize_result(job["interface"], "error", {
+            "name": job["page"]["name"],
+            "url": job["page"]["url"],
+            "size": job["size"],
+            "msg": JOB_FAILED_MESSAGE,
+            "error": str(error),
+        })]
+
+    def work(self):
+        """
+        Lease and perform jobs one by one until every jobs are done.
+        """
+        while not self.stopped.is_set():
+            try:
+                response = self.client.lease(self.name)
+            except (OSError, urllib.error.URLError) as e:
+                self.log.warning("🔹 Coordinator is not reachable: {}".format(
+                    e
+                ))
+                self.stopped.set()
+                return
+
+            if not response["jobs"]:
+                if response["finished"]:
+                    self.stopped.set()
+                    return
+                self.stopped.wait(self.poll_interval)
+                continue
+
+            for job in response["jobs"]:
+                with self._lock:
+                    self.running.add(job["id"])
+                try:
+                    results = self.perform(job)
+                # Job fails straight away instead of waiting for its lease
+                # to expire since it would fail the same way again
+                except Exception as e:
+                    self.log.error("Job {} has failed: {}".format(job["id"],
+                                                                  e))
+                    results = self.get_failed_results(job, e)
+                finally:
+                    with self._lock:
+                        self.running.discard(job["id"])
+
+                try:
+                    self.client.complete(self.name, job["id"], [
+                        (result["status"], result["item"])
+                        for result in results
+                    ])
+                except (OSError, urllib.error.URLError) as e:
+                    self.log.warning(
+                        "🔹 Unable to send results of job {}: {}".format(
+                            job["id"], e
+                        )
+                    )
+                    continue
+
+                with self._lock:
+                    self.performed += 1
+
+    def send_heartbeats(self, interval):
+        while not self.stopped.wait(interval):
+            with self._lock:
+                job_ids = list(self.running)
+            if not job_ids:
+                continue
+
+            try:
+                lost = self.client.heartbeat(self.name, job_ids)
+            except (OSError, urllib.error.URLError) as e:
+                self.log.warning("🔹 Heartbeat failed: {}".format(e))
+                continue
+
+            for job_id in lost:
+                self.log.warning("🔹 Lease of job {} has been lost".format(
+                    job_id
+                ))
+
+    def run(self):
+        """
+        Perform jobs from coordinator until every jobs are done.
+
+        Returns:
+            int: Number of performed jobs.
+        """
+        self.options = self.client.get_config()
+        self.stopped.clear()
+
+        heartbeat = threading.Thread(
+            target=self.send_heartbeats,
+            args=(self.options["lease_timeout"] / 3,),
+            daemon=True,
+        )
+        heartbeat.start()
+
+        threads = [
+            threading.Thread(target=self.work, daemon=True)
+            for i in range(self.workers)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.stopped.set()
+            heartbeat.join()
+            for name, pool in self.pools.items():
+                pool.close()
+                self.interfaces[name].finish_run()
+
+        return self.performed
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Screenshot encoding
+===================
+
+Screenshots are taken as PNG bytes from driver then written to their file,
+possibly re-encoded to another format with a thumbnail, from a background
+pool of threads so driver can move on to the next page straight away.
+
+Re-encoding and thumbnails require the optional ``Pillow`` package, a PNG
+screenshot is written as it comes from driver without it.
+"""
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from website_capture.conf import ALLOWED_SCREENSHOT_FORMATS
+from website_capture.exceptions import PageConfigError
+
+SCREENSHOT_EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpg",
+    "webp": "webp",
+}
+
+
+def require_reencoding(config):
+    """
+    Return True if given page configuration requires to re-encode screenshot
+    from driver.
+    """
+    return bool(
+        config.get("screenshot_format", "png") != "png"
+        or config.get("screenshot_optimize")
+        or config.get("screenshot_thumbnail")
+    )
+
+
+def validate_encoding_options(config):
+    """
+    Validate screenshot encoding options from given page configuration.
+
+    Raises:
+        PageConfigError: If an option is invalid or requires Pillow which is
+        not installed.
+    """
+    screenshot_format = config.get("screenshot_format", "png")
+    if screenshot_format not in ALLOWED_SCREENSHOT_FORMATS:
+        msg = ("Unknowed screenshot format '{}', it must be one of allowed "
+               "formats: {}".format(
+                   screenshot_format,
+                   ", ".join(ALLOWED_SCREENSHOT_FORMATS)
+                ))
+        raise PageConfigError(msg)
+
+    quality = config.get("screenshot_quality")
+    if quality is not None and not (
+        isinstance(quality, int) and 1 <= quality <= 100
+    ):
+        msg = "Screenshot quality must be an integer from 1 to 100: {}"
+        raise PageConfigError(msg.format(quality))
+
+    thumbnail = config.get("screenshot_thumbnail")
+    if thumbnail is not None and not (
+        len(thumbnail) == 2
+        and all([isinstance(v, int) and v > 0 for v in thumbnail])
+    ):
+        msg = "Screenshot thumbnail must be a positive size [WIDTH, HEIGHT]: {}"
+        raise PageConfigError(msg.format(thumbnail))
+
+    if Image is None and config.get("screenshot_method") == "fullpage":
+        msg = ("Package 'Pillow' is required for 'fullpage' screenshot method "
+               "for page: {}")
+        raise PageConfigError(msg.format(config["name"]))
+
+    if Image is None and require_reencoding(config):
+        msg = ("Package 'Pillow' is required to re-encode screenshot or make "
+               "thumbnail for page: {}")
+        raise PageConfigError(msg.format(config["name"]))
+
+
+def save_image(image, path, config):
+    """
+    Save given image to given path with screenshot format and quality from
+    page configuration.
+    """
+    screenshot_format = config.get("screenshot_format", "png")
+    options = {}
+
+    if screenshot_format == "png":
+        options["optimize"] = bool(config.get("screenshot_optimize"))
+    else:
+        if config.get("screenshot_quality") is not None:
+            options["quality"] = config["screenshot_quality"]
+        if screenshot_format == "jpeg":
+            image = image.convert("RGB")
+
+    image.save(path, format=screenshot_format.upper(), **options)
+
+
+def encode_image(source, config):
+    """
+    Re-encode image from given source to screenshot file from page
+    configuration and its thumbnail if enabled.
+
+    Arguments:
+        source (string or file object): Image file path or file object.
+        config (dict): Page configuration.
+
+    Returns:
+        string: Written screenshot path.
+    """
+    with Image.open(source) as image:
+        image.load()
+
+        save_image(image, config["screenshot_path"], config)
+
+        if config.get("screenshot_thumbnail"):
+            image.thumbnail(tuple(config["screenshot_thumbnail"]))
+            save_image(image, config["thumbnail_path"], config)
+
+    return config["screenshot_path"]
+
+
+def encode_screenshot(content, config):
+    """
+    Write screenshot bytes to screenshot file from page configuration,
+    re-encoded if required, and its thumbnail if enabled.
+
+    Arguments:
+        content (bytes): PNG bytes as returned from driver.
+        config (dict): Page configuration.
+
+    Returns:
+        string: Written screenshot path.
+    """
+    if not require_reencoding(config):
+        with io.open(config["screenshot_path"], "wb") as fp:
+            fp.write(content)
+
+        return config["screenshot_path"]
+
+    return encode_image(io.BytesIO(content), config)
+
+
+class ScreenshotEncoder(object):
+    """
+    Pool of threads encoding screenshots in background.
+
+    Number of screenshots waiting to be encoded is limited so their bytes
+    do not pile up in memory when drivers are faster than encoding, submit
+    blocks until a slot is free.
+
+    Keyword Arguments:
+        workers (int): Number of encoding threads. Default is 1.
+        max_pending (int): Maximum number of screenshots waiting to be
+            encoded. Default is four times the number of workers.
+    """
+    def __init__(self, workers=1, max_pending=None):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="screenshot-encoder",
+        )
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 4)
+        self.errors = []
+        self.log = logging.getLogger("py-website-capture")
+
+    def run(self, config, func, *args):
+        """
+        Perform a job, its error is logged and stored in page configuration
+        as ``screenshot_error`` so page job can report it.
+        """
+        try:
+            return func(*args)
+        except Exception as e:
+            config["screenshot_error"] = e
+            self.log.error("Unable to encode screenshot to: {}".format(
+                config["screenshot_path"]
+            ))
+            self.log.error(e)
+            self.errors.append({
+                "name": config["name"],
+                "path": config["screenshot_path"],
+                "error": e,
+            })
+        finally:
+            self.slots.release()
+
+    def submit_job(self, config, func, *args):
+        """
+        Submit a job for given page configuration to encoding threads.
+
+        Returns:
+            concurrent.futures.Future: Future which resolves to job result or
+            None if job failed.
+        """
+        self.slots.acquire()
+
+        try:
+            return self.executor.submit(self.run, config, func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def submit(self, content, config):
+        """
+        Submit screenshot to encode.
+
+        Returns:
+            concurrent.futures.Future: Future which resolves to written
+            screenshot path or None if encoding failed.
+        """
+        return self.submit_job(config, encode_screenshot, content, config)
+
+    def close(self):
+        """
+        Wait for every submitted screenshots to be written then stop threads.
+        """
+        self.executor.shutdown(wait=True)
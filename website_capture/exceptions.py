@@ -40,3 +40,10 @@ class ProcessorImportError(SettingsInvalidError):
     Exception to be raised when a processor import fails.
     """
     pass
+
+
+class ScreenshotEncodingError(WebsiteCaptureBaseException):
+    """
+    Exception to be raised when a screenshot could not be encoded to its file.
+    """
+    pass
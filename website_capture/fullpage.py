@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Full page screenshot
+====================
+
+A full page screenshot is made from a screenshot of browser window for each
+viewport height of the page, page is scrolled between each one.
+
+Each tile is decoded then written as raw pixel rows to a strip file from
+background encoder, once every tiles are done strips are streamed in order to
+a PNG file. So only a few tiles are held in memory whatever the page height
+is.
+
+It requires the optional ``Pillow`` package to decode tiles.
+"""
+import io
+import os
+import struct
+import zlib
+from concurrent.futures import Future
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from website_capture.encoding import encode_image, require_reencoding
+
+# Size of compressed data chunks and of raw data blocks read from strips
+CHUNK_SIZE = 256 * 1024
+
+
+class PNGStreamWriter(object):
+    """
+    Write a RGB PNG image from rows given one block at a time, without
+    holding the whole image in memory.
+
+    Arguments:
+        fileobject (io.BufferedIOBase): Opened binary file object.
+        width (int): Image width.
+        height (int): Image height, it must be the total number of rows which
+            will be written.
+    """
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(self, fileobject, width, height):
+        self.fileobject = fileobject
+        self.width = width
+        self.height = height
+        self.row_size = width * 3
+        self.compressor = zlib.compressobj()
+        self.buffer = []
+        self.buffered = 0
+
+        self.fileobject.write(self.SIGNATURE)
+        self.write_chunk(b"IHDR", struct.pack(
+            ">IIBBBBB", width, height, 8, 2, 0, 0, 0
+        ))
+
+    def write_chunk(self, kind, data):
+        self.fileobject.write(struct.pack(">I", len(data)))
+        self.fileobject.write(kind)
+        self.fileobject.write(data)
+        self.fileobject.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write_data(self, data, flush=False):
+        if data:
+            self.buffer.append(data)
+            self.buffered += len(data)
+
+        if self.buffered >= CHUNK_SIZE or (flush and self.buffered):
+            self.write_chunk(b"IDAT", b"".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def write_rows(self, data):
+        """
+        Write raw RGB rows, given data length must be a multiple of row size.
+        """
+        rows = [
+            b"\x00" + data[i:i + self.row_size]
+            for i in range(0, len(data), self.row_size)
+        ]
+        self.write_data(self.compressor.compress(b"".join(rows)))
+
+    def close(self):
+        self.write_data(self.compressor.flush(), flush=True)
+        self.write_chunk(b"IEND", b"")
+
+
+def write_strip(content, path, skip, viewport):
+    """
+    Decode a tile and write its pixel rows to a strip file.
+
+    Arguments:
+        content (bytes): PNG bytes of window screenshot.
+        path (string): Strip file path.
+        skip (int): Height in CSS pixels at the top of tile which has already
+            been captured from previous tile, this happens for the last tile
+            since browser can not scroll past the page bottom.
+        viewport (int): Viewport height in CSS pixels, used to get device
+            pixel ratio from tile height.
+
+    Returns:
+        tuple: Strip path, width and height in pixels.
+    """
+    with Image.open(io.BytesIO(content)) as tile:
+        tile = tile.convert("RGB")
+
+    top = round(skip * tile.height / viewport) if viewport else 0
+    if top:
+        tile = tile.crop((0, top, tile.width, tile.height))
+
+    with io.open(path, "wb") as fp:
+        fp.write(tile.tobytes())
+
+    return path, tile.width, tile.height
+
+
+def assemble_strips(futures, config):
+    """
+    Stream every strip files in order to screenshot file then remove them.
+
+    Arguments:
+        futures (list): Futures of strip jobs which resolve to strip path,
+            width and height.
+        config (dict): Page configuration.
+
+    Returns:
+        string: Written screenshot path.
+    """
+    strips = [future.result() for future in futures]
+
+    try:
+        if None in strips:
+            raise ValueError("Some tiles could not be decoded")
+
+        width = strips[0][1]
+        if any([strip_width != width for path, strip_width, height in strips]):
+            raise ValueError("Tiles do not have the same width")
+
+        reencode = require_reencoding(config)
+        path = config["screenshot_path"]
+        if reencode:
+            path = ".".join([config["screenshot_path"], "stitched", "png"])
+
+        with io.open(path, "wb") as fp:
+            writer = PNGStreamWriter(
+                fp,
+                width,
+                sum([height for strip_path, strip_width, height in strips]),
+            )
+            block_size = max(CHUNK_SIZE // writer.row_size, 1) * writer.row_size
+            for strip_path, strip_width, height in strips:
+                with io.open(strip_path, "rb") as strip:
+                    for data in iter(lambda: strip.read(block_size), b""):
+                        writer.write_rows(data)
+            writer.close()
+
+        if reencode:
+            try:
+                encode_image(path, config)
+            finally:
+                os.remove(path)
+    finally:
+        for strip in strips:
+            if strip and os.path.exists(strip[0]):
+                os.remove(strip[0])
+
+    return config["screenshot_path"]
+
+
+class FullpageStitcher(object):
+    """
+    Stitch window screenshots taken while scrolling page into a full page
+    screenshot.
+
+    Arguments:
+        config (dict): Page configuration.
+        viewport (int): Viewport height in CSS pixels.
+
+    Keyword Arguments:
+        encoder (website_capture.encoding.ScreenshotEncoder): Background
+            encoder to decode tiles and assemble them. If not given, every
+            jobs are performed immediately.
+        callback (callable): Function called with page configuration and
+            screenshot path once screenshot has been written.
+    """
+    def __init__(self, config, viewport, encoder=None, callback=None):
+        self.config = config
+        self.viewport = viewport
+        self.encoder = encoder
+        self.callback = callback
+        self.strips = []
+
+    def submit(self, func, *args):
+        if self.encoder is not None:
+            return self.encoder.submit_job(self.config, func, *args)
+
+        future = Future()
+        future.set_result(func(*args))
+
+        return future
+
+    def add_tile(self, content, skip=0):
+        """
+        Add a window screenshot tile.
+
+        Arguments:
+            content (bytes): PNG bytes of window screenshot.
+
+        Keyword Arguments:
+            skip (int): Height in CSS pixels at the top of tile which has
+                already been captured from previous tile.
+        """
+        path = ".".join([
+            self.config["screenshot_path"],
+            "strip{}".format(len(self.strips)),
+        ])
+        self.strips.append(
+            self.submit(write_strip, content, path, skip, self.viewport)
+        )
+
+    def finish(self):
+        """
+        Assemble strips to screenshot file, from background encoder if any.
+
+        Assembling job is stored in page configuration as ``screenshot_job``
+        so next tasks can wait for screenshot to be written.
+
+        Returns:
+            string: Screenshot path.
+        """
+        self.config["screenshot_job"] = self.submit(self.assemble)
+
+        return self.config["screenshot_path"]
+
+    def assemble(self):
+        path = assemble_strips(self.strips, self.config)
+
+        if self.callback is not None:
+            self.callback(self.config, path)
+
+        return path
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver hubs
+==============
+
+Remote drivers are opened on a fleet of WebDriver servers, like Selenium Grid
+hubs, each one having a maximum number of sessions it can run at the same
+time.
+
+A driver holds a session slot on its hub from its start until it is closed,
+so a driver session reused for successive pages keeps the same hub. A new
+driver is opened on the hub with the lowest load (its opened sessions
+relatively to its maximum) and waits for a free slot when every hubs are
+full.
+"""
+import threading
+
+from website_capture.exceptions import SettingsInvalidError
+
+# Default maximum number of sessions for a hub
+HUB_MAX_SESSIONS = 1
+
+
+def get_hub_options(hub):
+    """
+    Return hub options from a hub item which is either an URL or a
+    dictionnary with ``url`` and optional ``max_sessions`` items.
+    """
+    if isinstance(hub, str):
+        hub = {"url": hub}
+
+    return {
+        "url": hub["url"],
+        "max_sessions": hub.get("max_sessions", HUB_MAX_SESSIONS),
+    }
+
+
+def validate_hubs(hubs):
+    """
+    Validate hub items.
+
+    Raises:
+        SettingsInvalidError: If an hub item is invalid.
+    """
+    if not isinstance(hubs, list) or not hubs:
+        msg = "Option 'hubs' must be a non empty list."
+        raise SettingsInvalidError(msg)
+
+    urls = []
+    for hub in hubs:
+        if isinstance(hub, dict):
+            unknowed = sorted(set(hub) - {"url", "max_sessions"})
+            if unknowed:
+                msg = ("Unknowed hub options '{}', they must be one of: url, "
+                       "max_sessions").format(", ".join(unknowed))
+                raise SettingsInvalidError(msg)
+        elif not isinstance(hub, str):
+            msg = "Hub must be an URL or a dictionnary."
+            raise SettingsInvalidError(msg)
+
+        options = get_hub_options(hub)
+
+        if not isinstance(options["url"], str) or not (
+            options["url"].startswith("http://")
+            or options["url"].startswith("https://")
+        ):
+            msg = "Hub URL must be an HTTP URL: {}".format(options["url"])
+            raise SettingsInvalidError(msg)
+
+        max_sessions = options["max_sessions"]
+        if (isinstance(max_sessions, bool) or not isinstance(max_sessions, int)
+                or max_sessions < 1):
+            msg = ("Hub option 'max_sessions' must be a positive integer: "
+                   "{}").format(options["url"])
+            raise SettingsInvalidError(msg)
+
+        if options["url"] in urls:
+            msg = "Hub URL is defined twice: {}".format(options["url"])
+            raise SettingsInvalidError(msg)
+        urls.append(options["url"])
+
+
+class HubBalancer(object):
+    """
+    Share session slots of hubs between driver sessions.
+
+    Arguments:
+        hubs (list): Hub items, either an URL or a dictionnary with ``url``
+            and optional ``max_sessions`` items.
+
+    Attributes:
+        active (dict): Number of sessions currently opened for each hub URL.
+        reserved (dict): Total number of session slots which have been
+            reserved for each hub URL.
+    """
+    def __init__(self, hubs):
+        self.hubs = [get_hub_options(hub) for hub in hubs]
+        self.active = {hub["url"]: 0 for hub in self.hubs}
+        self.reserved = {hub["url"]: 0 for hub in self.hubs}
+        self._condition = threading.Condition()
+
+    @property
+    def capacity(self):
+        """
+        Total number of sessions every hubs can run at the same time.
+        """
+        return sum([hub["max_sessions"] for hub in self.hubs])
+
+    def get_load(self, hub):
+        return self.active[hub["url"]] / hub["max_sessions"]
+
+    def acquire(self, exclude=None):
+        """
+        Reserve a session slot on the hub with the lowest load, wait for a
+        slot to be released if every hubs are full.
+
+        Keyword Arguments:
+            exclude (list): URLs of hubs to not use, like the ones which have
+                failed to open a session.
+
+        Returns:
+            string: Reserved hub URL or None if every hubs are excluded.
+        """
+        exclude = exclude or []
+
+        with self._condition:
+            while True:
+                hubs = [
+                    hub for hub in self.hubs
+                    if hub["url"] not in exclude
+                ]
+                if not hubs:
+                    return None
+
+                available = [
+                    hub for hub in hubs
+                    if self.active[hub["url"]] < hub["max_sessions"]
+                ]
+                if available:
+                    hub = min(available, key=self.get_load)
+                    self.active[hub["url"]] += 1
+                    self.reserved[hub["url"]] += 1
+                    return hub["url"]
+
+                self._condition.wait()
+
+    def release(self, url):
+        """
+        Release a session slot of given hub URL.
+        """
+        with self._condition:
+            self.active[url] -= 1
+            self._condition.notify_all()
@@ -2,6 +2,8 @@ from .base import BaseInterface
 from .dummy import DummyInterface
 from .selenium_interface import (SeleniumFirefoxInterface,
                                  SeleniumChromeInterface)
+from .asyncio_interface import AsyncWebDriverInterface
+from .remote_interface import RemoteInterface
 
 
 __all__ = [
@@ -9,5 +11,7 @@ __all__ = [
     "DummyInterface",
     "SeleniumFirefoxInterface",
     "SeleniumChromeInterface",
+    "AsyncWebDriverInterface",
+    "RemoteInterface",
 ]
 
@@ -0,0 +1,1001 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio interface
+=================
+
+An interface which talks directly to a WebDriver server through the W3C
+WebDriver HTTP protocol from an asyncio event loop, so many page jobs can be
+performed at the same time without a thread for each one.
+
+It only requires a running WebDriver server (like ``geckodriver`` or
+``chromedriver``) reachable from its URL.
+"""
+import asyncio
+import base64
+import functools
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from website_capture.interfaces.base import BaseInterface, LogManagerMixin
+from website_capture.interfaces.selenium_interface import (
+    SeleniumFirefoxInterface
+)
+from website_capture.blocking import (count_blocked_requests,
+                                      get_firefox_preferences)
+from website_capture.exceptions import PageConfigError
+from website_capture.performance import get_performance_metrics
+from website_capture.proxy import get_chrome_arguments
+from website_capture.readiness import WAIT_MARGIN
+from website_capture.timings import PhaseTimer, time_phase
+
+
+class AsyncHTTPConnectionPool(object):
+    """
+    A minimal HTTP/1.1 client keeping alive a bounded pool of connections to a
+    single server.
+
+    Arguments:
+        url (string): Base URL of server, it may include a path prefix.
+
+    Keyword Arguments:
+        size (int): Maximum number of connections opened at the same time.
+            Default is 10.
+        timeout (int): Default timeout in seconds for a request. Default is
+            120.
+    """
+    def __init__(self, url, size=10, timeout=120):
+        parsed = urlsplit(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def get_connection(self):
+        """
+        Return an idle connection or open a new one.
+
+        Returns:
+            tuple: Stream reader, stream writer and a boolean to know if
+            connection has been reused.
+        """
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self.opened += 1
+
+        return reader, writer, False
+
+    async def read_chunked(self, reader):
+        chunks = []
+
+        while True:
+            line = await reader.readline()
+            length = int(line.split(b";")[0].strip(), 16)
+            if length == 0:
+                await reader.readline()
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(length))
+            await reader.readline()
+
+    async def read_response(self, reader):
+        """
+        Read response from given reader.
+
+        Returns:
+            tuple: Status code, headers and body.
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+
+        status = int(status_line.decode("latin-1").split(" ", 2)[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = line.decode("latin-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self.read_chunked(reader)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+
+        return status, headers, body
+
+    async def send(self, reader, writer, method, path, body):
+        lines = [
+            "{} {}{} HTTP/1.1".format(method, self.prefix, path),
+            "Host: {}:{}".format(self.host, self.port),
+            "Connection: keep-alive",
+            "Accept: application/json",
+            "Content-Type: application/json; charset=utf-8",
+            "Content-Length: {}".format(len(body)),
+        ]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        return await self.read_response(reader)
+
+    async def request(self, method, path, payload=None, timeout=None):
+        """
+        Perform a request and return its response.
+
+        A reused connection may have been closed by server in the meantime,
+        in this case request is performed again once with a new connection.
+
+        Arguments:
+            method (string): HTTP method name.
+            path (string): Path to request, appended to pool URL path.
+
+        Keyword Arguments:
+            payload (object): Object to send encoded in JSON.
+            timeout (int): Timeout in seconds for this request instead of the
+                pool one.
+
+        Returns:
+            tuple: Status code, headers and body.
+        """
+        body = b""
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+
+        async with self._semaphore:
+            while True:
+                reader, writer, reused = await self.get_connection()
+                try:
+                    status, headers, content = await asyncio.wait_for(
+                        self.send(reader, writer, method, path, body),
+                        timeout or self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                break
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+
+        return status, headers, content
+
+    async def close(self):
+        """
+        Close every idle connections.
+        """
+        while self._idle:
+            reader, writer = self._idle.pop()
+            writer.close()
+
+
+class AsyncWebDriver(object):
+    """
+    A WebDriver session driven through W3C WebDriver HTTP commands.
+
+    Method names follow Selenium driver ones so processors may use it the
+    same way, except they are coroutines.
+
+    Page load and script timeouts of session are tracked so commands which
+    wait for them are not interrupted by a shorter HTTP timeout.
+
+    Arguments:
+        http (AsyncHTTPConnectionPool): Connection pool to WebDriver server.
+    """
+    # Default session timeouts from W3C specification
+    PAGE_LOAD_TIMEOUT = 300
+    SCRIPT_TIMEOUT = 30
+
+    def __init__(self, http):
+        self.http = http
+        self.session_id = None
+        self.page_load_timeout = self.PAGE_LOAD_TIMEOUT
+        self.script_timeout = self.SCRIPT_TIMEOUT
+
+    def get_command_timeout(self, seconds):
+        """
+        Return HTTP timeout for a command which may wait for given session
+        timeout.
+        """
+        return max(self.http.timeout, seconds + WAIT_MARGIN)
+
+    async def execute(self, method, path, payload=None, timeout=None):
+        """
+        Perform a WebDriver command and return decoded response.
+
+        Every WebDriver error or connection error is raised as a
+        ``WebDriverException``.
+
+        Keyword Arguments:
+            timeout (int): HTTP timeout in seconds for this command, default
+                to the connection pool one.
+        """
+        try:
+            status, headers, body = await self.http.request(
+                method, path, payload, timeout=timeout
+            )
+        except (OSError, asyncio.TimeoutError,
+                asyncio.IncompleteReadError) as e:
+            raise WebDriverException(
+                "Unable to reach WebDriver server: {}".format(repr(e))
+            )
+
+        try:
+            data = json.loads(body.decode("utf-8")) if body else {}
+        except ValueError:
+            raise WebDriverException(
+                "Invalid WebDriver response ({}): {}".format(status, body[:200])
+            )
+
+        value = data.get("value") if isinstance(data, dict) else None
+
+        if status >= 400 or (isinstance(value, dict) and "error" in value):
+            error = value if isinstance(value, dict) else {}
+            raise WebDriverException("{}: {}".format(
+                error.get("error", status),
+                error.get("message", ""),
+            ))
+
+        return data
+
+    def session_path(self, path=""):
+        return "/session/{}{}".format(self.session_id, path)
+
+    async def start(self, capabilities):
+        data = await self.execute("POST", "/session", {
+            "capabilities": {
+                "alwaysMatch": capabilities,
+            },
+        })
+        value = data.get("value") or {}
+        self.session_id = value.get("sessionId") or data.get("sessionId")
+
+        return self
+
+    async def get(self, url):
+        await self.execute(
+            "POST", self.session_path("/url"), {"url": url},
+            timeout=self.get_command_timeout(self.page_load_timeout),
+        )
+
+    async def set_window_size(self, width, height):
+        await self.execute("POST", self.session_path("/window/rect"), {
+            "width": width,
+            "height": height,
+        })
+
+    async def get_screenshot_as_png(self):
+        data = await self.execute("GET", self.session_path("/screenshot"))
+        return base64.b64decode(data["value"])
+
+    async def get_element_screenshot_as_png(self, selector):
+        data = await self.execute("POST", self.session_path("/element"), {
+            "using": "css selector",
+            "value": selector,
+        })
+        # Element reference key is defined by W3C specification
+        element = list(data["value"].values())[0]
+        data = await self.execute(
+            "GET",
+            self.session_path("/element/{}/screenshot".format(element))
+        )
+        return base64.b64decode(data["value"])
+
+    async def execute_script(self, script, *args):
+        data = await self.execute("POST", self.session_path("/execute/sync"), {
+            "script": script,
+            "args": list(args),
+        })
+        return data.get("value")
+
+    async def execute_cdp_cmd(self, cmd, cmd_args):
+        """
+        Execute a Chrome DevTools protocol command, this is not a W3C command
+        but it is implemented by ``chromedriver``.
+        """
+        path = self.session_path("/goog/cdp/execute")
+        data = await self.execute("POST", path, {
+            "cmd": cmd,
+            "params": cmd_args,
+        })
+        return data.get("value")
+
+    async def set_script_timeout(self, seconds):
+        await self.execute("POST", self.session_path("/timeouts"), {
+            "script": int(seconds * 1000),
+        })
+        self.script_timeout = seconds
+
+    async def set_page_load_timeout(self, seconds):
+        await self.execute("POST", self.session_path("/timeouts"), {
+            "pageLoad": int(seconds * 1000),
+        })
+        self.page_load_timeout = seconds
+
+    async def execute_async_script(self, script, *args):
+        data = await self.execute(
+            "POST",
+            self.session_path("/execute/async"),
+            {
+                "script": script,
+                "args": list(args),
+            },
+            timeout=self.get_command_timeout(self.script_timeout),
+        )
+        return data.get("value")
+
+    async def get_log(self, log_type):
+        """
+        Get logs, this is not a W3C command but it is implemented by some
+        drivers like ``chromedriver``.
+        """
+        data = await self.execute("POST", self.session_path("/log"), {
+            "type": log_type,
+        })
+        return data.get("value") or []
+
+    async def quit(self):
+        if self.session_id:
+            try:
+                await self.execute("DELETE", self.session_path())
+            finally:
+                self.session_id = None
+
+
+class AsyncDriverSession(object):
+    """
+    Asynchronous counterpart of ``DriverSession``, a driver shared between
+    successive page jobs of a worker.
+
+    Arguments:
+        interface (AsyncWebDriverInterface): Interface which is used to open,
+            configure and close driver.
+
+    Keyword Arguments:
+        max_jobs (int): Maximum number of page jobs to perform with the same
+            driver before recycling it. Zero means unlimited. Default is 0.
+    """
+    def __init__(self, interface, max_jobs=0):
+        self.interface = interface
+        self.max_jobs = max_jobs
+        self.driver = None
+        self.config = None
+        self.size = None
+        self.jobs = 0
+        self.loaded = None
+        self.key = None
+
+    @property
+    def is_open(self):
+        return self.driver is not None
+
+    async def open(self, config):
+        with time_phase(config, "driver_start"):
+            options = self.interface.get_driver_options(config)
+            self.driver = await self.interface.aget_driver_instance(options,
+                                                                    config)
+        self.config = config
+        self.size = config["size"]
+        self.jobs = 0
+        self.loaded = None
+        self.key = self.interface.get_session_key(config)
+
+        if self.size != self.interface._default_size_value:
+            with time_phase(config, "resize"):
+                await self.interface.aset_browser_size(self.driver, config)
+
+        return self.driver
+
+    async def acquire(self, config):
+        if (
+            self.is_open
+            and self.interface.get_session_key(config) != self.key
+        ):
+            await self.close()
+
+        if self.is_open and config["size"] != self.size:
+            if config["size"] == self.interface._default_size_value:
+                await self.close()
+            else:
+                with time_phase(config, "resize"):
+                    await self.interface.aset_browser_size(self.driver,
+                                                           config)
+                self.size = config["size"]
+
+        if not self.is_open:
+            await self.open(config)
+
+        self.jobs += 1
+
+        return self.driver
+
+    def get_loaded_key(self, config):
+        return (config["name"], config["url"])
+
+    def get_loaded_response(self, config):
+        if self.loaded and self.loaded[0] == self.get_loaded_key(config):
+            return self.loaded[1]
+
+        return None
+
+    def set_loaded_response(self, config, response):
+        self.loaded = (self.get_loaded_key(config), response)
+
+    async def release(self, failed=False):
+        if failed or (self.max_jobs and self.jobs >= self.max_jobs):
+            await self.close()
+
+    async def close(self):
+        if self.is_open:
+            try:
+                await self.interface.atear_down_driver(self.driver,
+                                                       self.config)
+            except WebDriverException as e:
+                self.interface.log.error(e)
+
+        self.driver = None
+        self.config = None
+        self.size = None
+        self.jobs = 0
+        self.loaded = None
+        self.key = None
+
+
+class AsyncWebDriverInterface(LogManagerMixin, BaseInterface):
+    """
+    Using a WebDriver server directly through its HTTP API from an asyncio
+    event loop.
+
+    Every page job is a coroutine and ``workers`` option set the number of
+    browser sessions opened at the same time on the WebDriver server. Every
+    sessions share the same pool of HTTP connections.
+
+    Keyword Arguments:
+        webdriver_url (string): Base URL of WebDriver server. Default to
+            ``AsyncWebDriverInterface.WEBDRIVER_URL``.
+        browser (string): Browser name to ask for a new session, currently
+            ``firefox`` or ``chrome``. Default is ``firefox``.
+        timeout (int): Timeout in seconds for a WebDriver command. Commands
+            which load a page or execute an asynchronous script wait at least
+            for the page load or script timeout of driver. Default is 120.
+    """
+    DESTINATION_FILEPATH = "{name}_webdriver"
+    DRIVER_CLASS = AsyncWebDriver
+    WEBDRIVER_URL = "http://127.0.0.1:4444"
+    REFLOW_SCRIPT = SeleniumFirefoxInterface.REFLOW_SCRIPT
+    PAGE_METRICS_SCRIPT = SeleniumFirefoxInterface.PAGE_METRICS_SCRIPT
+    SCROLL_SCRIPT = SeleniumFirefoxInterface.SCROLL_SCRIPT
+    PERFORMANCE_SCRIPT = SeleniumFirefoxInterface.PERFORMANCE_SCRIPT
+    READY_SCRIPT = SeleniumFirefoxInterface.READY_SCRIPT
+
+    def __init__(self, *args, webdriver_url=None, browser="firefox",
+                 timeout=120, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.webdriver_url = webdriver_url or self.WEBDRIVER_URL
+        self.browser = browser
+        self.timeout = timeout
+        self.http = None
+        self.executor = None
+
+    def get_executor(self):
+        """
+        Return a new thread pool to perform blocking operations (file
+        writes, encoding, manifest requests) out of event loop.
+        """
+        return ThreadPoolExecutor(
+            max_workers=max(self.workers, 1),
+            thread_name_prefix="website-capture-io",
+        )
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking callable from the executor of current run and return
+        its result.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def get_http_pool(self):
+        """
+        Return a new HTTP connection pool to WebDriver server.
+        """
+        return AsyncHTTPConnectionPool(
+            self.webdriver_url,
+            size=max(self.workers, 1),
+            timeout=self.timeout,
+        )
+
+    def get_driver_options(self, config):
+        """
+        Return capabilities to ask for a new session.
+        """
+        capabilities = {
+            "browserName": self.browser,
+        }
+
+        if self.page_load_strategy != "normal":
+            capabilities["pageLoadStrategy"] = self.page_load_strategy
+
+        patterns = self.get_blocked_patterns(config)
+        proxy = self.get_proxy_address()
+
+        if self.browser == "chrome":
+            capabilities["goog:loggingPrefs"] = {"browser": "ALL"}
+            if patterns:
+                # Blocked requests are counted from DevTools events
+                capabilities["goog:loggingPrefs"]["performance"] = "ALL"
+            args = []
+            if self.headless:
+                args.append("--headless")
+            if proxy:
+                args.extend(get_chrome_arguments(proxy))
+            if args:
+                capabilities["goog:chromeOptions"] = {
+                    "args": args,
+                }
+        else:
+            if self.headless:
+                capabilities.setdefault("moz:firefoxOptions", {})["args"] = [
+                    "-headless",
+                ]
+            if patterns or proxy:
+                capabilities.setdefault("moz:firefoxOptions", {})["prefs"] = (
+                    get_firefox_preferences(patterns, proxy=proxy)
+                )
+
+        return {
+            "capabilities": capabilities,
+        }
+
+    async def aget_driver_instance(self, options, config):
+        klass = self.get_driver_class()
+        driver = klass(self.http)
+
+        return await driver.start(options["capabilities"])
+
+    async def atear_down_driver(self, driver, config):
+        self.tear_down_driver(driver, config)
+        await driver.quit()
+
+    async def aset_browser_size(self, driver, config):
+        await driver.set_window_size(*config["size"])
+
+    async def await_for_reflow(self, driver, config):
+        await driver.execute_async_script(self.REFLOW_SCRIPT)
+
+    def get_session_key(self, config):
+        """
+        Firefox blocks requests from its profile so driver is recycled when
+        blocked patterns change. Chrome only requires a driver with
+        performance logs to count blocked requests.
+        """
+        patterns = self.get_blocked_patterns(config)
+
+        if self.browser == "chrome":
+            return bool(patterns)
+
+        return tuple(patterns)
+
+    async def aload_page(self, driver, config):
+        response = self.load_page(driver, config)
+        patterns = self.get_blocked_patterns(config)
+
+        if self.browser == "chrome" and patterns:
+            await driver.execute_cdp_cmd("Network.enable", {})
+            await driver.execute_cdp_cmd("Network.setBlockedURLs", {
+                "urls": patterns,
+            })
+
+        timeout = self.get_page_load_timeout(driver, config)
+        if timeout is not None:
+            await driver.set_page_load_timeout(timeout)
+
+        start_time = time.perf_counter()
+        await driver.get(config["url"])
+        response["elapsed_time"] = time.perf_counter() - start_time
+
+        if self.browser == "chrome" and patterns:
+            response["blocked"] = count_blocked_requests(
+                await driver.get_log("performance")
+            )
+
+        with time_phase(config, "wait"):
+            response["ready"] = await self.await_for_ready(driver, config)
+
+        return response
+
+    async def await_for_ready(self, driver, config):
+        """
+        Asynchronous version of ``SeleniumFirefoxInterface.wait_for_ready``.
+        """
+        options = self.get_ready_options(config)
+        if options is None:
+            return None
+
+        previous = driver.script_timeout
+        await driver.set_script_timeout(
+            options["timeout"] / 1000 + WAIT_MARGIN
+        )
+        try:
+            result = await driver.execute_async_script(self.READY_SCRIPT,
+                                                       options)
+        finally:
+            await driver.set_script_timeout(previous)
+
+        return self.check_readiness(config, result)
+
+    async def task_screenshot(self, driver, config, response):
+        method = config.get("screenshot_method", "body")
+
+        if method == "body":
+            content = await driver.get_element_screenshot_as_png("body")
+        elif method == "window":
+            content = await driver.get_screenshot_as_png()
+        elif method == "fullpage":
+            return await self.take_fullpage_screenshot(driver, config)
+        else:
+            raise PageConfigError("Unknowed screenshot method: {}".format(method))
+
+        # Encoder submit may block until an encoding slot is free
+        return await self.run_blocking(self.save_screenshot, config, content)
+
+    async def take_fullpage_screenshot(self, driver, config):
+        """
+        Asynchronous version of
+        ``SeleniumFirefoxInterface.take_fullpage_screenshot``.
+        """
+        metrics = await driver.execute_script(self.PAGE_METRICS_SCRIPT)
+        stitcher = self.get_fullpage_stitcher(config, metrics["viewport"])
+
+        offset = 0
+        while offset < metrics["height"]:
+            position = await driver.execute_script(self.SCROLL_SCRIPT, offset)
+            await self.await_for_reflow(driver, config)
+            content = await driver.get_screenshot_as_png()
+            # Stitcher may block until an encoding slot is free
+            await self.run_blocking(stitcher.add_tile, content,
+                                    skip=offset - position)
+            offset += metrics["viewport"]
+
+        await driver.execute_script(self.SCROLL_SCRIPT, 0)
+
+        return await self.run_blocking(stitcher.finish)
+
+    async def task_diff(self, driver, config, response):
+        return await self.run_blocking(super().task_diff, driver, config,
+                                       response)
+
+    async def task_performance(self, driver, config, response):
+        entries = await driver.execute_async_script(self.PERFORMANCE_SCRIPT)
+
+        return get_performance_metrics(entries)
+
+    async def get_driver_logs_content(self, driver, config, response):
+        """
+        Get browser logs from driver API, driver which does not implement it
+        just return an empty list.
+        """
+        try:
+            return await driver.get_log("browser")
+        except WebDriverException:
+            return []
+
+    def parse_logs(self, driver, config, content):
+        """
+        Parse browser logs from given log entries.
+        """
+        logs = []
+        prefix = config["url"]
+
+        for item in content:
+            level = "info"
+            msg = item["message"].strip()
+
+            if item["level"] == "SEVERE":
+                level = "error"
+
+            if msg.startswith(prefix):
+                msg = msg[len(prefix):]
+            logs.append((level, msg.strip()))
+
+        return logs
+
+    async def task_report(self, driver, config, response):
+        payload = {
+            "name": config["name"],
+            "url": config["url"],
+            "size": config["size"],
+            "interface": self.__class__.__name__,
+            "elapsed_time": response["elapsed_time"],
+        }
+
+        if "blocked" in response:
+            payload["blocked"] = response["blocked"]
+
+        with time_phase(config, "logs"):
+            content = await self.get_driver_logs_content(driver, config,
+                                                         response)
+            payload["logs"] = self.parse_logs(driver, config, content)
+
+        return await self.run_blocking(self.store_browser_logs, driver, config,
+                                       payload)
+
+    async def aget_page_response(self, driver, config, session):
+        """
+        Asynchronous version of ``BaseInterface.get_page_response``.
+        """
+        if not self.get_page_tasks(config):
+            return None
+
+        response = session.get_loaded_response(config)
+
+        with time_phase(config, "load"):
+            if response is not None:
+                self.log.debug("  - Reusing loaded page for size: {}".format(
+                    self.get_size_repr(*config["size"])
+                ))
+                await self.await_for_reflow(driver, config)
+            else:
+                response = await self.aload_page(driver, config)
+                session.set_loaded_response(config, response)
+
+        return response
+
+    async def acapture(self, driver, config, response=None):
+        """
+        Asynchronous version of ``BaseInterface.capture``, task methods may
+        be coroutines or regular methods.
+        """
+        tasks = self.get_page_tasks(config)
+
+        if not tasks:
+            self.log.warning("🔹 No enabled tasks for page: {} ({})".format(
+                config["name"],
+                self.get_size_repr(*config["size"]),
+            ))
+            return None
+
+        payload = {
+            "name": config["name"],
+            "url": config["url"],
+            "size": config["size"],
+        }
+
+        if response is None:
+            with time_phase(config, "load"):
+                response = await self.aload_page(driver, config)
+
+        for task in tasks:
+            with time_phase(config, "task_{}".format(task)):
+                result = getattr(
+                    self,
+                    self.AVAILABLE_PAGE_TASKS[task]
+                )(driver, config, response)
+
+                if inspect.isawaitable(result):
+                    result = await result
+
+            payload[task] = result
+
+        if self.hash_index is not None and "screenshot" in payload:
+            with time_phase(config, "hashes"):
+                payload["hashes"] = await self.run_blocking(
+                    self.get_screenshot_hashes, config
+                )
+
+        return payload
+
+    async def arelease_failed_session(self, session, error):
+        """
+        Asynchronous version of ``BaseInterface.release_failed_session``.
+        """
+        if self.retry_policy.is_crash(error):
+            await session.release(failed=True)
+        else:
+            session.loaded = None
+            await session.release()
+
+    async def apage_job(self, size, page, session):
+        """
+        Asynchronous version of ``BaseInterface.page_job`` using given
+        session.
+        """
+        built = []
+        error_logs = []
+
+        config = self.get_page_config(page, size)
+
+        # Journal and manifest are files, manifest may also request page
+        result = await self.run_blocking(self.check_page_job, config)
+        if result is not None:
+            status, item = result
+            if status == "success":
+                return [item], error_logs
+            return built, [item]
+
+        config["job_timeout"] = self.get_job_timeout(config)
+        config["timer"] = PhaseTimer()
+        start_time = time.perf_counter()
+        attempts = []
+
+        while True:
+            attempt_time = time.perf_counter()
+
+            try:
+                with time_phase(config, "acquire"):
+                    driver = await session.acquire(config)
+                response = await self.aget_page_response(driver, config,
+                                                         session)
+                payload = await self.acapture(driver, config,
+                                              response=response)
+            except BaseException as e:
+                if (
+                    not isinstance(e, Exception)
+                    or not self.retry_policy.is_handled(e)
+                ):
+                    await session.close()
+                    raise e
+
+                attempts.append(self.get_attempt_log(attempt_time, e))
+                await self.arelease_failed_session(session, e)
+
+                delay = self.get_retry_delay(config, e, len(attempts))
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+
+                error_logs.append(await self.run_blocking(
+                    self.fail_page_job, config, e, attempts
+                ))
+            else:
+                attempts.append(self.get_attempt_log(attempt_time))
+                with time_phase(config, "release"):
+                    await session.release()
+                # Page job is finished once its screenshot is written
+                error = payload and await self.run_blocking(
+                    self.get_screenshot_error, config
+                )
+                if error:
+                    error_logs.append(await self.run_blocking(
+                        self.fail_page_job, config, error, attempts
+                    ))
+                elif payload:
+                    built.append(await self.run_blocking(
+                        self.finish_page_job, config, payload, start_time,
+                        attempts
+                    ))
+
+            break
+
+        return built, error_logs
+
+    async def aiter_run(self, pages, stream=False):
+        """
+        Asynchronous version of ``BaseInterface.iter_run``.
+
+        Job batches are pulled from a queue by ``workers`` coroutines, each
+        one with its own driver session. Results are yielded as soon as they
+        are ready, in the same order than a sequential run.
+
+        Every pages are read before capture starts, ``stream`` argument is
+        only accepted for compatibility with ``BaseInterface.iter_run``.
+        """
+        self.executor = self.get_executor()
+        tasks = []
+        try:
+            await self.run_blocking(self.start_run)
+
+            # Pages may be read from a file
+            batches = await self.run_blocking(
+                lambda: list(self.get_run_batches(pages))
+            )
+
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future() for batch in batches]
+            queue = asyncio.Queue()
+            for index in range(len(batches)):
+                queue.put_nowait(index)
+
+            async def worker():
+                session = AsyncDriverSession(self, max_jobs=self.session_pages)
+                try:
+                    while not queue.empty():
+                        index = queue.get_nowait()
+                        try:
+                            batch_results = [
+                                await self.apage_job(size, page, session)
+                                for size, page in batches[index]
+                            ]
+                        except Exception as e:
+                            futures[index].set_exception(e)
+                        else:
+                            futures[index].set_result(batch_results)
+                finally:
+                    await session.close()
+
+            self.http = self.get_http_pool()
+            tasks = [
+                asyncio.ensure_future(worker())
+                for i in range(max(min(self.workers, len(batches)), 1))
+            ]
+
+            for future in futures:
+                for paths, errors in await future:
+                    for payload in paths:
+                        yield "success", payload
+                    for error in errors:
+                        yield self.get_error_status(error), error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.http is not None:
+                await self.http.close()
+                self.http = None
+            try:
+                await self.run_blocking(self.finish_run)
+            finally:
+                self.executor.shutdown()
+                self.executor = None
+
+    async def arun(self, pages, stream=False):
+        """
+        Asynchronous version of ``BaseInterface.run``.
+        """
+        built = []
+        error_logs = []
+
+        async for status, item in self.aiter_run(pages, stream=stream):
+            if status == "success":
+                built.append(item)
+            else:
+                error_logs.append(item)
+
+        return built, error_logs
+
+    def iter_run(self, pages, stream=False):
+        """
+        Proceed capture for every item from a new event loop and yield each
+        result as soon as it is ready.
+        """
+        loop = asyncio.new_event_loop()
+        results = self.aiter_run(pages, stream=stream)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    def run(self, pages, stream=False):
+        """
+        Proceed capture for every item from a new event loop.
+        """
+        return asyncio.run(self.arun(pages, stream=stream))
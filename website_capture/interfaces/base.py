@@ -1,15 +1,42 @@
 # -*- coding: utf-8 -*-
-import copy
 import io
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
-from collections import OrderedDict
+from collections import OrderedDict, deque
 
-from selenium.common.exceptions import WebDriverException
 from website_capture.exceptions import (InvalidPageSizeError, PageConfigError,
-                                        ProcessorImportError)
+                                        ProcessorImportError,
+                                        ScreenshotEncodingError,
+                                        SettingsInvalidError)
+from website_capture.conf import ALLOWED_SCHEDULING_MODES
+from website_capture.diff import Image as DiffImage
+from website_capture.diff import compare_screenshots, get_diff_path
+from website_capture.encoding import (SCREENSHOT_EXTENSIONS, ScreenshotEncoder,
+                                      encode_screenshot,
+                                      validate_encoding_options)
+from website_capture.fullpage import FullpageStitcher
+from website_capture.blocking import get_blocked_patterns
+from website_capture.performance import get_performance_metrics
+from website_capture.profiles import (PROFILE_TEMPLATES_DIRNAME,
+                                      ProfileTemplate)
+from website_capture.proxy import (PROXY_CACHE_DIRNAME, PROXY_CACHE_SIZE,
+                                   CachingProxy)
+from website_capture.readiness import get_wait_options
+from website_capture.retry import RetryPolicy
+from website_capture.scheduler import (SKIPPED_MESSAGE, JobScheduler,
+                                       get_page_timeout)
+from website_capture.phash import Image as HashImage
+from website_capture.phash import (HASH_INDEX_FILENAME, HashIndex,
+                                   compute_hashes, format_hashes)
+from website_capture.interfaces.session import DriverSessionPool
+from website_capture.timings import PhaseTimer, time_phase
+from website_capture.manifest import (CaptureManifest, get_config_fingerprint,
+                                      get_page_validator)
 
 
 class BaseInterface(object):
@@ -26,20 +53,124 @@ class BaseInterface(object):
             Remember to add a size into template
             ``BaseInterface.DESTINATION_FILEPATH`` if you disable this and you
             have more than one size used in your pages.
+        session_pages (int): Maximum number of pages a driver session will
+            perform before being recycled. A driver is opened once then
+            reused for every page of the same size until this limit is
+            reached or an error occured. Default is 0 for unlimited.
+        workers (int): Number of page jobs to perform at the same time, each
+            worker uses its own driver. Default is 1 to perform page jobs one
+            after another.
+        incremental (bool): Enable incremental mode where a page is not
+            captured again if its configuration and content have not changed
+            since its previous capture, its previous payload is returned
+            instead. Default is False.
+        scheduling (string): Job scheduling mode, either ``size`` to perform
+            every page for a size before the next size, or ``page`` to
+            perform every size of a page before the next page. With ``page``
+            mode a page is loaded only once then browser window is resized
+            for each of its sizes. Default is ``size``.
+        journal (website_capture.results.ResultJournal): Opened journal where
+            every page job result is appended as soon as it is finished.
+            Pages which have already succeeded in journal are not captured
+            again, their journal payload is returned instead. Default is None
+            to not use any journal.
+        encoder_workers (int): Number of background threads to encode and
+            write screenshots so driver does not wait for it before the next
+            page. Default is 1, zero encodes screenshots from driver thread.
+        diff_baseline (string): Directory of baseline screenshots for
+            ``diff`` task, with the same structure than ``basedir``. It can
+            be overrided from page configuration. Default is None.
+        hash_screenshots (bool): Enable perceptual hashes of screenshots.
+            Hashes are computed when screenshots are written, added to
+            payload and stored in an index file in ``basedir``. Default is
+            False.
+        summary (website_capture.timings.RunSummary): Run summary where
+            phase timings of every performed page job are collected. Default
+            is None to not collect timings.
+        page_load_strategy (string): Browser page load strategy, either
+            ``normal`` to wait for page to be fully loaded, ``eager`` to wait
+            for document to be parsed or ``none`` to not wait at all. Default
+            is ``normal``.
+        block_urls (list): URL patterns of requests to block for every
+            pages, pages can add their own patterns. Default is None.
+        block_resource_types (list): Resource types to block for every
+            pages, see ``website_capture.blocking``. Default is None.
+        proxy_cache (dict): Enable the caching proxy so assets shared by pages
+            are downloaded once, with optional ``directory`` for cache files
+            and ``max_size`` for cache size in megabytes. Proxy statistics
+            are added to run summary. Default is None to not use any proxy.
+        profile_template (dict): Enable browser profile templates so each
+            driver starts from a clone of a profile prepared once instead of
+            a new empty profile, with optional ``directory`` where templates
+            are kept between runs. Only used by Firefox interfaces. Default
+            is None to start drivers with a new profile.
+        time_budget (float): Time in seconds after which no page job starts
+            anymore, remaining jobs are skipped. Default is None for no
+            budget.
+        page_timeout (float): Default time in seconds a page has to load,
+            pages can override it with their ``timeout`` option. It is
+            shortened to the remaining time budget. Default is None to use
+            driver default timeout.
+        retry (dict): Retry policy options for failed page jobs, see
+            ``website_capture.retry.RetryPolicy``. Attempts are added to
+            payloads and error logs when page jobs can be retried. Default is
+            None to never retry.
     """
     DESTINATION_FILEPATH = "{name}_base"
     DRIVER_CLASS = None
+    MANIFEST_FILENAME = "manifest.json"
+    HASH_INDEX_FILENAME = HASH_INDEX_FILENAME
+    PROXY_CACHE_DIRNAME = PROXY_CACHE_DIRNAME
+    PROFILE_TEMPLATES_DIRNAME = PROFILE_TEMPLATES_DIRNAME
+    SCHEDULING_MODES = ALLOWED_SCHEDULING_MODES
+    # Default page load and script timeouts of WebDriver in seconds
+    PAGE_LOAD_TIMEOUT = 300
+    SCRIPT_TIMEOUT = 30
     _default_size_value = (0, 0) # Do not change this
     AVAILABLE_PAGE_TASKS = {
         "screenshot": "task_screenshot",
         "report": "task_report",
         "processing": "task_processing",
+        "diff": "task_diff",
+        "performance": "task_performance",
     }
 
-    def __init__(self, basedir="", headless=True, size_dir=True):
+    def __init__(self, basedir="", headless=True, size_dir=True,
+                 session_pages=0, workers=1, incremental=False,
+                 scheduling="size", journal=None, encoder_workers=1,
+                 diff_baseline=None, hash_screenshots=False, summary=None,
+                 page_load_strategy="normal", block_urls=None,
+                 block_resource_types=None, proxy_cache=None,
+                 profile_template=None, time_budget=None, page_timeout=None,
+                 retry=None):
         self.headless = headless
         self.basedir = basedir
         self.size_dir = size_dir
+        self.session_pages = session_pages
+        self.workers = workers
+        self.incremental = incremental
+        self.scheduling = scheduling
+        self.manifest = None
+        self.journal = journal
+        self.encoder_workers = encoder_workers
+        self.encoder = None
+        self.diff_baseline = diff_baseline
+        self.hash_screenshots = hash_screenshots
+        self.hash_index = None
+        self.summary = summary
+        self.page_load_strategy = page_load_strategy
+        self.block_urls = block_urls or []
+        self.block_resource_types = block_resource_types or []
+        self.proxy_cache = proxy_cache
+        self.proxy = None
+        self.shared_proxy = None
+        self.profile_template = profile_template
+        self.profile_templates = {}
+        self._profile_lock = threading.Lock()
+        self.time_budget = time_budget
+        self.page_timeout = page_timeout
+        self.scheduler = None
+        self.retry_policy = RetryPolicy(**(retry or {}))
         self.log = logging.getLogger("py-website-capture")
 
     def get_available_sizes(self, pages):
@@ -49,15 +180,28 @@ class BaseInterface(object):
         sizes = set([self._default_size_value])
 
         for page in pages:
-            for item in page.get("sizes", []):
-                try:
-                    width, height = item
-                    sizes.add((width, height))
-                except ValueError:
-                    msg = ("Invalid size value, it should be a tuple of "
-                            "exactly two integers "
-                            "(width, height): {}").format(item)
-                    raise InvalidPageSizeError(msg)
+            sizes.update(self.get_page_sizes(page))
+
+        return sorted(list(sizes))
+
+    def get_page_sizes(self, page):
+        """
+        Return distinct sizes required by a page item.
+
+        Raises:
+            InvalidPageSizeError: If a size is not a pair of values.
+        """
+        sizes = set()
+
+        for item in page.get("sizes", []):
+            try:
+                width, height = item
+                sizes.add((width, height))
+            except (TypeError, ValueError):
+                msg = ("Invalid size value, it should be a tuple of "
+                        "exactly two integers "
+                        "(width, height): {}").format(item)
+                raise InvalidPageSizeError(msg)
 
         return sorted(list(sizes))
 
@@ -92,6 +236,16 @@ class BaseInterface(object):
             self.get_size_repr(*size)
         )
 
+    def make_destination_dir(self, size):
+        """
+        Create destination dir for given size if not already exists.
+        """
+        sizedir = self.get_destination_dir(size)
+        if not os.path.exists(sizedir):
+            os.makedirs(sizedir, exist_ok=True)
+
+        return sizedir
+
     def get_file_destination(self, config):
         """
         Return page job base filepath destination.
@@ -127,12 +281,21 @@ class BaseInterface(object):
             msg = "Page configuration must have an 'url' value."
             raise PageConfigError(msg)
 
-        config = copy.deepcopy(page)
+        # Page options are shared between every sizes of a page instead of
+        # being copied, they must not be modified
+        config = dict(page)
 
         config["size"] = size
 
         config["destination"] = self.get_file_destination(config)
-        config["screenshot_path"] = ".".join([config["destination"], "png"])
+        validate_encoding_options(config)
+        get_wait_options(config)
+        self.get_blocked_patterns(config)
+        extension = SCREENSHOT_EXTENSIONS[config.get("screenshot_format", "png")]
+        config["screenshot_path"] = ".".join([config["destination"], extension])
+        if config.get("screenshot_thumbnail"):
+            config["thumbnail_path"] = ".".join([config["destination"],
+                                                 "thumb", extension])
         config["driver_log_path"] = ".".join([config["destination"], "driver", "log"])
         config["browser_log_path"] = ".".join([config["destination"], "report", "json"])
 
@@ -145,6 +308,146 @@ class BaseInterface(object):
         """
         return {}
 
+    def get_blocked_patterns(self, config):
+        """
+        Return URL patterns of requests to block for given page
+        configuration.
+        """
+        return get_blocked_patterns(
+            config,
+            block_urls=self.block_urls,
+            block_resource_types=self.block_resource_types,
+        )
+
+    def get_proxy_cache_options(self):
+        """
+        Return ``proxy_cache`` options as a dictionnary.
+        """
+        if isinstance(self.proxy_cache, dict):
+            return self.proxy_cache
+
+        return {}
+
+    def get_proxy_cache_dir(self):
+        """
+        Return directory where caching proxy keeps its responses.
+        """
+        return self.get_proxy_cache_options().get("directory") or os.path.join(
+            self.basedir, self.PROXY_CACHE_DIRNAME
+        )
+
+    def get_caching_proxy(self):
+        """
+        Return a new caching proxy from ``proxy_cache`` options.
+        """
+        options = self.get_proxy_cache_options()
+
+        return CachingProxy(
+            self.get_proxy_cache_dir(),
+            max_size=int(
+                options.get("max_size", PROXY_CACHE_SIZE) * 1024 * 1024
+            ),
+        )
+
+    def start_caching_proxy(self):
+        """
+        Start caching proxy if enabled, drivers are configured to use it from
+        their options.
+
+        A proxy given in ``shared_proxy`` attribute is used instead of
+        starting a new one, like from ``website_capture.runner`` when several
+        interfaces share the same cache directory.
+        """
+        if self.shared_proxy is not None:
+            self.proxy = self.shared_proxy
+        elif self.proxy_cache:
+            self.proxy = self.get_caching_proxy().start()
+
+    def stop_caching_proxy(self):
+        """
+        Stop caching proxy if started and add its statistics to run summary.
+
+        A shared proxy is left running, it is stopped by whoever started it.
+        """
+        if self.proxy is None:
+            return
+
+        proxy = self.proxy
+        self.proxy = None
+
+        if proxy is not self.shared_proxy:
+            self.log_proxy_stats(proxy.stop())
+
+    def log_proxy_stats(self, stats, key=None):
+        """
+        Log caching proxy statistics and add them to run summary.
+
+        Keyword Arguments:
+            key (string): Key of statistics in summary ``proxy`` section.
+                Default to interface class name.
+        """
+        self.log.info((
+            "🔹 Proxy cache: {hits} hits, {misses} misses, {stored} stored"
+        ).format(**stats))
+        if self.summary is not None:
+            self.summary.update_section("proxy", stats,
+                                        key=key or type(self).__name__)
+
+    def get_proxy_address(self):
+        """
+        Return address of the running caching proxy or None.
+        """
+        if self.proxy is None:
+            return None
+
+        return self.proxy.address
+
+    def get_profile_template(self, preferences):
+        """
+        Return the built profile template for given browser preferences.
+
+        Template is built once for the interface life, or reused from
+        templates directory if it has been built by a previous run.
+        """
+        options = {}
+        if isinstance(self.profile_template, dict):
+            options = self.profile_template
+
+        template = ProfileTemplate(
+            options.get("directory") or os.path.join(
+                self.basedir, self.PROFILE_TEMPLATES_DIRNAME
+            ),
+            preferences,
+        )
+
+        with self._profile_lock:
+            if template.fingerprint not in self.profile_templates:
+                if template.build(warm=self.warm_profile):
+                    self.log.debug("Built profile template: {}".format(
+                        template.path
+                    ))
+                self.profile_templates[template.fingerprint] = template
+
+            return self.profile_templates[template.fingerprint]
+
+    def warm_profile(self, path):
+        """
+        Warm up a new profile template from given directory path. Basic
+        method does nothing.
+        """
+        pass
+
+    def get_session_key(self, config):
+        """
+        Return a key for driver options which can not be changed once driver
+        has been started.
+
+        A driver session is recycled when a page configuration has another
+        key than the one session has been opened with. Basic method always
+        return None so driver is never recycled.
+        """
+        return None
+
     def get_driver_class(self):
         """
         Return driver object class.
@@ -166,12 +469,176 @@ class BaseInterface(object):
         """
         self.log.debug("Closing driver")
 
+    def get_screenshot_encoder(self):
+        """
+        Return a new background screenshot encoder or None if disabled.
+        """
+        if not self.encoder_workers:
+            return None
+
+        return ScreenshotEncoder(workers=self.encoder_workers)
+
+    def save_screenshot(self, config, content):
+        """
+        Write screenshot bytes to screenshot file from page configuration.
+
+        Screenshot is handed to background encoder if any so it is written
+        while driver goes on with next tasks. Encoding job is stored in page
+        configuration as ``screenshot_job`` so next tasks and page job can
+        wait for screenshot to be written.
+
+        Arguments:
+            config (dict): Page configuration.
+            content (bytes): PNG bytes from driver.
+
+        Returns:
+            string: Screenshot path.
+        """
+        if self.encoder is None:
+            return self.write_screenshot(content, config)
+
+        config["screenshot_job"] = self.encoder.submit_job(
+            config, self.write_screenshot, content, config
+        )
+
+        return config["screenshot_path"]
+
+    def get_screenshot_error(self, config):
+        """
+        Wait for screenshot from given page configuration to be written by
+        background encoder and return its encoding error if it failed.
+
+        Returns:
+            ScreenshotEncodingError: Error or None if screenshot has been
+            written or has not been encoded in background.
+        """
+        job = config.get("screenshot_job")
+        if job is None or job.result() is not None:
+            return None
+
+        msg = "Unable to encode screenshot to {}: {}".format(
+            config["screenshot_path"],
+            config.get("screenshot_error"),
+        )
+
+        return ScreenshotEncodingError(msg)
+
+    def write_screenshot(self, content, config):
+        """
+        Encode screenshot to its file and add it to hash index if enabled.
+        """
+        path = encode_screenshot(content, config)
+
+        if self.hash_index is not None:
+            self.index_screenshot(config, io.BytesIO(content))
+
+        return path
+
+    def get_hash_index(self):
+        """
+        Return screenshot hash index from output directory.
+        """
+        if HashImage is None:
+            msg = "Package 'Pillow' is required to hash screenshots."
+            raise SettingsInvalidError(msg)
+
+        path = os.path.join(self.basedir, self.HASH_INDEX_FILENAME)
+
+        return HashIndex(path).load()
+
+    def get_hash_key(self, config):
+        """
+        Return hash index key for given page configuration.
+        """
+        return os.path.relpath(config["screenshot_path"], self.basedir)
+
+    def index_screenshot(self, config, source):
+        """
+        Compute perceptual hashes of screenshot and add them to hash index.
+
+        Arguments:
+            config (dict): Page configuration.
+            source (string or file object): Screenshot image file path or
+                file object.
+        """
+        with HashImage.open(source) as image:
+            hashes = compute_hashes(image)
+
+        self.hash_index.add(self.get_hash_key(config), hashes)
+
+        return hashes
+
+    def get_screenshot_hashes(self, config):
+        """
+        Return hashes of screenshot from given page configuration once it has
+        been written.
+
+        Returns:
+            dict: Hexadecimal hashes for each hash kind or None if screenshot
+            has not been indexed.
+        """
+        job = config.get("screenshot_job")
+        if job is not None:
+            job.result()
+
+        hashes = self.hash_index.get(self.get_hash_key(config))
+        if hashes is None:
+            return None
+
+        return format_hashes(hashes)
+
+    def get_fullpage_stitcher(self, config, viewport):
+        """
+        Return a stitcher to build a full page screenshot from window
+        screenshots, tiles are decoded from background encoder if any.
+        """
+        callback = None
+        if self.hash_index is not None:
+            callback = self.index_screenshot
+
+        return FullpageStitcher(config, viewport, encoder=self.encoder,
+                                callback=callback)
+
+    def finish_timings(self, config, start_time):
+        """
+        Stop timing page job from given configuration and collect its timings
+        into run summary if any.
+
+        Arguments:
+            config (dict): Page configuration with its job timer.
+            start_time (float): ``time.perf_counter`` value when job started.
+
+        Returns:
+            dict: Elapsed time in seconds for each phase, with the whole job
+            time as ``total``.
+        """
+        timer = config.pop("timer")
+        timer.add("total", time.perf_counter() - start_time)
+
+        if self.summary is not None:
+            self.summary.add(type(self).__name__, timer.timings)
+
+        return timer.timings
+
+    def get_driver_pool(self):
+        """
+        Return a new driver session pool.
+        """
+        return DriverSessionPool(self, max_jobs=self.session_pages)
+
     def set_browser_size(self, driver, config):
         """
         Should set browser window to given size from config.
         """
         pass
 
+    def wait_for_reflow(self, driver, config):
+        """
+        Should wait for page to be rendered again after browser window has
+        been resized.
+        """
+        pass
+
     def load_page(self, driver, config):
         """
         Load given page url into given driver.
@@ -189,6 +656,89 @@ class BaseInterface(object):
             "elapsed_time": 0,
         }
 
+    def get_scheduler(self):
+        """
+        Return a new job scheduler with interface time budget.
+        """
+        return JobScheduler(time_budget=self.time_budget)
+
+    def get_job_timeout(self, config):
+        """
+        Return time in seconds given to page job from page ``timeout`` option
+        or ``page_timeout``, shortened to the remaining time budget.
+
+        Returns:
+            float: Timeout or None if there is no timeout.
+        """
+        timeout = get_page_timeout(config, default=self.page_timeout)
+
+        if self.scheduler is not None:
+            remaining = self.scheduler.remaining
+            if remaining is not None and (timeout is None
+                                          or remaining < timeout):
+                timeout = remaining
+
+        return timeout
+
+    def get_page_load_timeout(self, driver, config):
+        """
+        Return page load timeout to set to driver for given page job, or None
+        if driver already uses it.
+
+        Since a driver is shared between page jobs, a driver without page job
+        timeout goes back to the default timeout.
+        """
+        timeout = config.get("job_timeout")
+        if timeout is None:
+            timeout = self.PAGE_LOAD_TIMEOUT
+
+        if getattr(driver, "page_load_timeout",
+                   self.PAGE_LOAD_TIMEOUT) == timeout:
+            return None
+
+        driver.page_load_timeout = timeout
+
+        return timeout
+
+    def get_ready_options(self, config):
+        """
+        Return readiness options from page ``wait_for`` option, their timeout
+        can not exceed page job timeout.
+        """
+        options = get_wait_options(config)
+        timeout = config.get("job_timeout")
+
+        if options is not None and timeout is not None:
+            options["timeout"] = min(options["timeout"], int(timeout * 1000))
+
+        return options
+
+    def check_readiness(self, config, result):
+        """
+        Warn about a page which is still not ready once readiness timeout has
+        been reached.
+
+        Arguments:
+            config (dict): Page configuration.
+            result (dict): Result from readiness script with ``ready``,
+                ``pending`` conditions and ``elapsed`` time in milliseconds.
+
+        Returns:
+            dict: Given result.
+        """
+        if result and not result.get("ready"):
+            self.log.warning(
+                "🔹 Page is not ready after {:.0f}ms, still waiting for {}: "
+                "{} ({})".format(
+                    result.get("elapsed") or 0,
+                    ", ".join(result.get("pending") or []),
+                    config["name"],
+                    self.get_size_repr(*config["size"]),
+                )
+            )
+
+        return result
+
     def task_screenshot(self, driver, config, response):
         """
         Should screenshot loaded page.
@@ -216,14 +766,126 @@ class BaseInterface(object):
         """
         return {}
 
-    def capture(self, driver, config):
+    def get_performance_entries(self, driver, config):
+        """
+        Should return performance entries recorded by browser for loaded
+        page.
+
+        Basic method don't return any entry since it is dependent from final
+        driver interface implementation.
+        """
+        return {}
+
+    def task_performance(self, driver, config, response):
+        """
+        Measure loaded page performance from browser performance entries.
+
+        Returns:
+            dict: Page performance metrics, see
+            ``website_capture.performance.get_performance_metrics``.
+        """
+        return get_performance_metrics(
+            self.get_performance_entries(driver, config)
+        )
+
+    def get_baseline_path(self, config):
+        """
+        Return baseline path for screenshot from given page configuration.
+        """
+        basedir = config.get("diff_baseline", self.diff_baseline)
+        if not basedir:
+            msg = ("Page configuration must have a 'diff_baseline' value to "
+                   "perform 'diff' task: {}")
+            raise PageConfigError(msg.format(config["name"]))
+
+        return os.path.join(
+            basedir,
+            os.path.relpath(config["screenshot_path"], self.basedir)
+        )
+
+    def task_diff(self, driver, config, response):
+        """
+        Compare screenshot against its baseline screenshot.
+
+        It should be performed after ``screenshot`` task.
+
+        Returns:
+            dict: Comparison result from
+            ``website_capture.diff.compare_screenshots``.
+        """
+        if DiffImage is None:
+            msg = "Package 'Pillow' is required to perform 'diff' task: {}"
+            raise PageConfigError(msg.format(config["name"]))
+
+        baseline_path = self.get_baseline_path(config)
+
+        # Wait for screenshot to be written from background encoder
+        job = config.get("screenshot_job")
+        if job is not None:
+            job.result()
+
+        result = compare_screenshots(
+            config["screenshot_path"],
+            baseline_path,
+            diff_path=get_diff_path(config["screenshot_path"]),
+            threshold=config.get("diff_threshold", 0.0),
+            tolerance=config.get("diff_tolerance", 0),
+            ignore=config.get("diff_ignore"),
+        )
+
+        if result["status"] == "changed":
+            self.log.warning("🔹 Screenshot has changed: {} ({})".format(
+                config["name"],
+                self.get_size_repr(*config["size"]),
+            ))
+
+        return result
+
+    def get_page_tasks(self, config):
+        """
+        Return enabled and available tasks from given page configuration.
+        """
+        return [task for task in config.get("tasks", []) if (task in self.AVAILABLE_PAGE_TASKS)]
+
+    def get_page_response(self, driver, config, session):
+        """
+        Load page from given configuration into driver, except if page has
+        already been loaded in session driver by a previous page job (with
+        another size), then only wait for page to be rendered again.
+
+        Returns:
+            dict: Page loading response or None if page does not have any
+            task to perform.
+        """
+        if not self.get_page_tasks(config):
+            return None
+
+        response = session.get_loaded_response(config)
+
+        with time_phase(config, "load"):
+            if response is not None:
+                self.log.debug("  - Reusing loaded page for size: {}".format(
+                    self.get_size_repr(*config["size"])
+                ))
+                self.wait_for_reflow(driver, config)
+            else:
+                response = self.load_page(driver, config)
+                session.set_loaded_response(config, response)
+
+        return response
+
+    def capture(self, driver, config, response=None):
         """
         Perform screenshot with given driver for given page configuration.
 
         This should allways return path where screenshot file has been
         effectively writed to.
+
+        Keyword Arguments:
+            response (dict): Response from page loading if page has already
+                been loaded, else page is loaded before performing tasks.
         """
-        tasks = [task for task in config.get("tasks", []) if (task in self.AVAILABLE_PAGE_TASKS)]
+        tasks = self.get_page_tasks(config)
 
         # Perform tasks if there is any valid ones
         if tasks:
@@ -233,13 +895,20 @@ class BaseInterface(object):
                 "size": config["size"],
             }
 
-            response = self.load_page(driver, config)
+            if response is None:
+                with time_phase(config, "load"):
+                    response = self.load_page(driver, config)
 
             for task in tasks:
-                payload[task] = getattr(
-                    self,
-                    self.AVAILABLE_PAGE_TASKS[task]
-                )(driver, config, response)
+                with time_phase(config, "task_{}".format(task)):
+                    payload[task] = getattr(
+                        self,
+                        self.AVAILABLE_PAGE_TASKS[task]
+                    )(driver, config, response)
+
+            if self.hash_index is not None and "screenshot" in payload:
+                with time_phase(config, "hashes"):
+                    payload["hashes"] = self.get_screenshot_hashes(config)
 
             return payload
         # No valid task found
@@ -250,107 +919,694 @@ class BaseInterface(object):
             ))
             return None
 
-    def page_job(self, size, page):
+    def get_manifest(self):
+        """
+        Return capture manifest from output directory.
+        """
+        path = os.path.join(self.basedir, self.MANIFEST_FILENAME)
+
+        return CaptureManifest(path).load()
+
+    def get_manifest_key(self, config):
+        """
+        Return manifest entry key for given page configuration.
+        """
+        return "{}:{}:{}".format(
+            self.__class__.__name__,
+            self.get_size_repr(*config["size"]),
+            config["name"],
+        )
+
+    def outputs_exist(self, config, payload):
+        """
+        Check if files from given payload tasks still exist.
+        """
+        paths = {
+            "screenshot": config["screenshot_path"],
+            "report": config["browser_log_path"],
+        }
+
+        return all([
+            os.path.exists(path)
+            for task, path in paths.items()
+            if task in payload
+        ])
+
+    def check_manifest(self, config):
+        """
+        Check manifest entry for given page configuration.
+
+        Returns:
+            tuple: Previous payload if page is still fresh else None, current
+            page configuration fingerprint and current page validator.
+        """
+        entry = self.manifest.get(self.get_manifest_key(config)) or {}
+
+        fingerprint = get_config_fingerprint(config)
+        validator = get_page_validator(config["url"],
+                                       previous=entry.get("validator"))
+
+        payload = entry.get("payload")
+        if (
+            payload and validator
+            and entry["fingerprint"] == fingerprint
+            and entry["validator"] == validator
+            and self.outputs_exist(config, payload)
+        ):
+            payload = dict(payload, size=tuple(payload["size"]))
+            return payload, fingerprint, validator
+
+        return None, fingerprint, validator
+
+    def update_manifest(self, config, fingerprint, validator, payload):
+        """
+        Store a detached copy of given payload into manifest.
+        """
+        self.manifest.update(
+            self.get_manifest_key(config),
+            fingerprint,
+            validator,
+            json.loads(json.dumps(payload, default=str)),
+        )
+
+    def check_journal(self, config):
+        """
+        Return payload from journal if given page has already succeeded,
+        else None.
+        """
+        payload = self.journal.get(self.get_manifest_key(config))
+        if payload:
+            return dict(payload, size=tuple(payload["size"]))
+
+        return None
+
+    def write_journal(self, config, status, item):
+        """
+        Append a page job result to journal.
+        """
+        self.journal.write(
+            self.get_manifest_key(config),
+            type(self).__name__,
+            status,
+            item,
+        )
+
+    def is_skipped(self, config):
+        """
+        Return if page job should be skipped since time budget is exhausted.
+        """
+        return self.scheduler is not None and self.scheduler.is_expired
+
+    def get_skipped_log(self, config):
+        """
+        Return log of a skipped page job, it is yielded with ``skipped``
+        status and written to journal so job is captured again on resume.
+        """
+        self.log.warning("🔹 Skipped page: {} ({})".format(
+            config["name"],
+            self.get_size_repr(*config["size"]),
+        ))
+
+        return {
+            "name": config["name"],
+            "url": config["url"],
+            "size": config["size"],
+            "msg": SKIPPED_MESSAGE,
+            "skipped": True,
+        }
+
+    def get_error_status(self, error):
+        """
+        Return result status for an error log from page job.
+        """
+        return "skipped" if error.get("skipped") else "error"
+
+    def get_attempt_log(self, start_time, error=None):
+        """
+        Return log of a page job attempt with its elapsed time and its error
+        if it has failed.
+        """
+        log = {"elapsed": time.perf_counter() - start_time}
+        if error is not None:
+            log["error"] = str(error)
+
+        return log
+
+    def release_failed_session(self, session, error):
+        """
+        Release session after a failed attempt, driver is recycled unless
+        error is recoverable like a timeout.
+        """
+        if self.retry_policy.is_crash(error):
+            session.release(failed=True)
+        else:
+            # Page may not be fully loaded
+            session.loaded = None
+            session.release()
+
+    def get_retry_delay(self, config, error, attempt):
+        """
+        Return delay in seconds before next attempt of a failed page job.
+
+        Returns:
+            float: Delay or None if page job should not be retried, because
+            error is not retryable, every attempts are done or retry would
+            start after time budget.
+        """
+        if not self.retry_policy.should_retry(error, attempt):
+            return None
+
+        delay = self.retry_policy.get_delay(attempt)
+        if self.scheduler is not None:
+            remaining = self.scheduler.remaining
+            if remaining is not None and remaining <= delay:
+                return None
+
+        self.log.warning(
+            "🔹 Retrying page in {:.1f}s after attempt {}/{}: {} ({})".format(
+                delay,
+                attempt,
+                self.retry_policy.max_attempts,
+                config["name"],
+                self.get_size_repr(*config["size"]),
+            )
+        )
+
+        return delay
+
+    def get_error_log(self, config, error, attempts):
+        """
+        Log a failed page job and return its error log.
+        """
+        msg = ("Unable to reach page or unexpected error "
+                "with: {}")
+        self.log.error(msg.format(config["url"]))
+        self.log.error(error)
+
+        log = {
+            "name": config["name"],
+            "url": config["url"],
+            "size": config["size"],
+            "msg": msg,
+            "error": error,
+        }
+        if self.retry_policy.enabled:
+            log["attempts"] = attempts
+
+        return log
+
+    def finish_payload(self, config, payload, start_time, attempts):
+        """
+        Add job timings and attempts to a built payload.
+        """
+        payload["timings"] = self.finish_timings(config, start_time)
+        if self.retry_policy.enabled:
+            payload["attempts"] = attempts
+
+    def check_page_job(self, config):
+        """
+        Return result of a page job which does not have to be performed
+        because it has already succeeded in journal, it is skipped once time
+        budget is exhausted or page has not changed since its previous capture.
+
+        Fingerprint and validator from manifest are stored in page
+        configuration as ``manifest_entry`` to update manifest once page job
+        is finished.
+
+        Returns:
+            tuple: Result status and item, or None if page job has to be
+            performed.
+        """
+        if self.journal is not None:
+            finished = self.check_journal(config)
+            if finished:
+                self.log.info("🔹 Already finished page: {} ({})".format(
+                    config["name"],
+                    self.get_size_repr(*config["size"]),
+                ))
+                return "success", finished
+
+        if self.is_skipped(config):
+            log = self.get_skipped_log(config)
+            if self.journal is not None:
+                self.write_journal(config, "skipped", log)
+            return "skipped", log
+
+        if self.manifest is not None:
+            cached, fingerprint, validator = self.check_manifest(config)
+            if cached:
+                self.log.info("🔹 Unchanged page: {} ({})".format(
+                    config["name"],
+                    self.get_size_repr(*config["size"]),
+                ))
+                if self.journal is not None:
+                    self.write_journal(config, "success", cached)
+                return "success", cached
+            config["manifest_entry"] = (fingerprint, validator)
+
+        return None
+
+    def fail_page_job(self, config, error, attempts):
+        """
+        Return error log of a failed page job and write it to journal.
+        """
+        log = self.get_error_log(config, error, attempts)
+        if self.journal is not None:
+            self.write_journal(config, "error", log)
+
+        return log
+
+    def finish_page_job(self, config, payload, start_time, attempts):
+        """
+        Finish payload of a succeeded page job, then update manifest and
+        journal with it.
+
+        Returns:
+            dict: Finished payload.
+        """
+        self.finish_payload(config, payload, start_time, attempts)
+
+        if self.manifest is not None:
+            fingerprint, validator = config["manifest_entry"]
+            self.update_manifest(config, fingerprint, validator, payload)
+        if self.journal is not None:
+            self.write_journal(config, "success", payload)
+
+        # Should live in dedicated task method
+        if "screenshot" in payload:
+            self.log.debug("  - Saved screenshot to : {}".format(
+                config["screenshot_path"]
+            ))
+        if "report" in payload:
+            self.log.debug("  - Saved report to : {}".format(
+                config["browser_log_path"]
+            ))
+
+        return payload
+
+    def page_job(self, size, page, session=None):
         """
         Perform page job for given page with given size
+
+        Keyword Arguments:
+            session (website_capture.interfaces.session.DriverSession): Driver
+                session to use for page job. If not given, a dedicated driver
+                is opened then closed once job is finished.
         """
         built = []
         error_logs = []
 
+        own_session = session is None
+        if own_session:
+            session = self.get_driver_pool().get()
+
         config = self.get_page_config(page, size)
-        options = self.get_driver_options(config)
-        driver = self.get_driver_instance(options, config)
 
-        if size != self._default_size_value:
-            self.set_browser_size(driver, config)
+        result = self.check_page_job(config)
+        if result is not None:
+            status, item = result
+            if status == "success":
+                return [item], error_logs
+            return built, [item]
+
+        # Added after manifest fingerprint since it changes between runs
+        config["job_timeout"] = self.get_job_timeout(config)
+
+        timer = config["timer"] = PhaseTimer()
+        start_time = time.perf_counter()
+        attempts = []
 
         try:
-            payload = self.capture(driver, config)
-        # Driver error is not critical to finish every jobs, it is
-        # logged in and job queue continue
-        except WebDriverException as e:
-            self.tear_down_driver(driver, config)
-            msg = ("Unable to reach page or unexpected error "
-                    "with: {}")
-            self.log.error(msg.format(config["url"]))
-            self.log.error(e)
-            error_logs.append({
-                "name": config["name"],
-                "url": config["url"],
-                "size": size,
-                "msg": msg,
-                "error": e,
-            })
-        # Unexpected error kind is assumed to be critical
-        except Exception as e:
-            self.tear_down_driver(driver, config)
-            raise e
-        # Job succeed
-        else:
-            self.tear_down_driver(driver, config)
-            if payload:
-                built.append(payload)
-                # Should live in dedicated task method
-                if "screenshot" in payload:
-                    self.log.debug("  - Saved screenshot to : {}".format(
-                        config["screenshot_path"]
-                    ))
-                if "report" in payload:
-                    self.log.debug("  - Saved report to : {}".format(
-                        config["browser_log_path"]
-                    ))
+            while True:
+                attempt_time = time.perf_counter()
+
+                # Driver may fail to start, it is retried like other errors
+                try:
+                    with timer.phase("acquire"):
+                        driver = session.acquire(config)
+                    response = self.get_page_response(driver, config, session)
+                    payload = self.capture(driver, config, response=response)
+                except Exception as e:
+                    # Unexpected error kind is assumed to be critical
+                    if not self.retry_policy.is_handled(e):
+                        session.close()
+                        raise e
+
+                    attempts.append(self.get_attempt_log(attempt_time, e))
+                    self.release_failed_session(session, e)
+
+                    delay = self.get_retry_delay(config, e, len(attempts))
+                    if delay is not None:
+                        time.sleep(delay)
+                        continue
+
+                    # Driver error is not critical to finish every jobs, it
+                    # is logged in and job queue continue with a new driver
+                    error_logs.append(self.fail_page_job(config, e, attempts))
+                # Job succeed
+                else:
+                    attempts.append(self.get_attempt_log(attempt_time))
+                    with timer.phase("release"):
+                        session.release()
+                    # Page job is finished once its screenshot is written
+                    error = payload and self.get_screenshot_error(config)
+                    if error:
+                        error_logs.append(
+                            self.fail_page_job(config, error, attempts)
+                        )
+                    elif payload:
+                        built.append(self.finish_page_job(
+                            config, payload, start_time, attempts
+                        ))
+
+                break
+        finally:
+            if own_session:
+                session.close()
 
         return built, error_logs
 
-    def perform_size_pages(self, size, pages):
+    def perform_size_pages(self, size, pages, pool=None):
         """
         Perform page job for every page with given size
+
+        Keyword Arguments:
+            pool (website_capture.interfaces.session.DriverSessionPool): Pool
+                to get driver session from. If not given, a dedicated pool is
+                used and its driver is closed once every pages are done.
         """
         built = []
         error_logs = []
 
-        # Create destination dir if not already exists
-        sizedir = self.get_destination_dir(size)
-        if not os.path.exists(sizedir):
-            os.makedirs(sizedir)
+        own_pool = pool is None
+        if own_pool:
+            pool = self.get_driver_pool()
 
-        for page in pages:
-            if size in page.get("sizes", [self._default_size_value]):
-                paths, errors = self.page_job(size, page)
+        self.make_destination_dir(size)
+
+        try:
+            for page in self.get_size_pages(size, pages):
+                paths, errors = self.page_job(size, page, session=pool.get())
                 built.extend(paths)
                 error_logs.extend(errors)
+        finally:
+            if own_pool:
+                pool.close()
 
         return built, error_logs
 
-    def page_default_values(self, pages):
+    def get_size_pages(self, size, pages):
         """
-        Patch page items with required default values for optional field
+        Return page items which require given size.
         """
-        for page in pages:
-            # If no sizes option or empty list, fill it with default size to
-            # ensure they are processed
-            if "sizes" not in page or ("sizes" in page and not page["sizes"]):
-                page["sizes"] = [self._default_size_value]
+        return [
+            page
+            for page in pages
+            if size in page.get("sizes", [self._default_size_value])
+        ]
 
-        return pages
+    def get_job_batches(self, sizes, pages):
+        """
+        Return page jobs to perform, grouped in batches according to
+        scheduling mode.
 
-    def run(self, pages):
+        A batch is a list of ``(size, page)`` jobs which have to be performed
+        one after another with the same driver session. With ``size``
+        scheduling each batch is a single job ordered by size then page, with
+        ``page`` scheduling each batch contains every sizes of a page.
         """
-        Proceed capture for every item
+        if self.scheduling not in self.SCHEDULING_MODES:
+            msg = "Unknowed scheduling mode '{}', it must be one of: {}"
+            raise SettingsInvalidError(msg.format(
+                self.scheduling,
+                ", ".join(self.SCHEDULING_MODES),
+            ))
+
+        if self.scheduling == "page":
+            return [
+                [(size, page) for size in self.get_page_sizes(page)]
+                for page in pages
+            ]
+
+        return [
+            [(size, page)]
+            for size in sizes
+            for page in self.get_size_pages(size, pages)
+        ]
+
+    def iter_stream_batches(self, pages):
+        """
+        Yield a batch with every sizes of each page as soon as page is given,
+        so capture starts before every pages are known.
+
+        Pages are always scheduled by page since size ordering would need
+        every pages first. Destination directory of a size is created when
+        a page requires it for the first time.
+
+        Arguments:
+            pages (iterable): Page items, it can be a lazy iterable like
+                ``website_capture.sources.PageDiscovery``.
+
+        Yields:
+            list: Batch of ``(size, page)`` jobs.
+        """
+        sizes = set()
+
+        for page in self.iter_page_default_values(pages):
+            page_sizes = self.get_page_sizes(page)
+
+            for size in page_sizes:
+                if size not in sizes:
+                    self.make_destination_dir(size)
+                    sizes.add(size)
+
+            yield [(size, page) for size in page_sizes]
+
+    def iter_batch(self, batch, pool):
+        """
+        Perform every page jobs from given batch with the same driver session
+        and yield their results once each one is finished.
+
+        Yields:
+            tuple: Built payloads and error logs from page job.
+        """
+        session = pool.get()
+
+        for size, page in batch:
+            yield self.page_job(size, page, session=session)
+
+    def perform_batch(self, batch, pool):
+        """
+        Perform every page jobs from given batch with the same driver session.
         """
         built = []
         error_logs = []
 
+        for paths, errors in self.iter_batch(batch, pool):
+            built.extend(paths)
+            error_logs.extend(errors)
+
+        return built, error_logs
+
+    def iter_concurrent_batches(self, batches, pool):
+        """
+        Perform every given job batches using a pool of worker threads.
+
+        Batches are spreaded over workers but their results are yielded in
+        the same order than a sequential run would produce. Only a few
+        batches more than the number of workers are submitted at the same
+        time so results do not pile up in memory.
+
+        Yields:
+            tuple: Built payloads and error logs from each batch.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = deque()
+
+        try:
+            for batch in batches:
+                pending.append(executor.submit(self.perform_batch, batch, pool))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def page_default_value(self, page):
+        """
+        Patch a page item with required default values for optional field.
+
+        Arguments:
+            page (dict or website_capture.pages.PageRecord): Page item.
+
+        Returns:
+            dict or website_capture.pages.PageRecord: Patched page item.
+        """
+        # If no sizes option or empty list, fill it with default size to
+        # ensure they are processed
+        if "sizes" not in page or ("sizes" in page and not page["sizes"]):
+            page["sizes"] = [self._default_size_value]
+
+        return page
+
+    def iter_page_default_values(self, pages):
+        """
+        Yield each page item patched with required default values, page
+        after page.
+
+        Arguments:
+            pages (iterable): Page items, either dictionnaries or
+                ``website_capture.pages.PageRecord`` objects. It can be a
+                lazy iterable like ``website_capture.pages.PagesFile``.
+
+        Yields:
+            dict or website_capture.pages.PageRecord: Patched page item.
+        """
+        for page in pages:
+            yield self.page_default_value(page)
+
+    def page_default_values(self, pages):
+        """
+        Patch page items with required default values for optional field.
+
+        Every page items are read, ``BaseInterface.iter_page_default_values``
+        should be used when they are only needed page after page.
+
+        Arguments:
+            pages (iterable): Page items.
+
+        Returns:
+            list: Patched page items.
+        """
+        return list(self.iter_page_default_values(pages))
+
+    def get_run_batches(self, pages, stream=False):
+        """
+        Return job batches to perform for every pages of a run.
+
+        Every pages are read first since scheduler needs them all to order
+        jobs, by size with ``size`` scheduling or by page priority. With
+        ``page`` scheduling, default values are still set and destination
+        directories are created page after page while filling scheduler, so
+        pages are not kept twice in memory. Only ``stream`` starts capture
+        before every pages are read.
+
+        Keyword Arguments:
+            stream (bool): Yield batches as soon as pages are given instead of
+                ordering them with scheduler, see
+                ``BaseInterface.iter_stream_batches``. Default is False.
+
+        Returns:
+            iterable: Batches of ``(size, page)`` jobs.
+        """
+        if stream:
+            return self.iter_stream_batches(pages)
+
+        if self.scheduling == "page":
+            return self.scheduler.extend(self.iter_stream_batches(pages))
+
         pages = self.page_default_values(pages)
         available_sizes = self.get_available_sizes(pages)
-
         self.log.debug(f"Available sizes: {available_sizes}")
+
         for size in available_sizes:
-            self.log.debug("Size: {}".format(self.get_size_repr(*size)))
+            self.make_destination_dir(size)
 
-            paths, errors = self.perform_size_pages(size, pages)
-            built.extend(paths)
-            error_logs.extend(errors)
+        return self.scheduler.extend(
+            self.get_job_batches(available_sizes, pages)
+        )
+
+    def start_run(self):
+        """
+        Open every objects shared by page jobs of a run, like manifest,
+        scheduler, hash index, caching proxy and screenshot encoder.
+        """
+        if self.incremental:
+            self.manifest = self.get_manifest()
+
+        self.scheduler = self.get_scheduler().start()
+
+        if self.hash_screenshots:
+            self.hash_index = self.get_hash_index()
+
+        self.start_caching_proxy()
+        self.encoder = self.get_screenshot_encoder()
+
+    def finish_run(self):
+        """
+        Close every objects opened by ``BaseInterface.start_run``, once every
+        pending screenshots have been encoded.
+        """
+        self.scheduler = None
+        self.stop_caching_proxy()
+        if self.encoder is not None:
+            self.encoder.close()
+            self.encoder = None
+        if self.hash_index is not None:
+            self.hash_index.save()
+            self.hash_index = None
+        if self.manifest is not None:
+            self.manifest.save()
+            self.manifest = None
+
+    def iter_run(self, pages, stream=False):
+        """
+        Proceed capture for every item and yield each result as soon as its
+        page job is finished.
+
+        Arguments:
+            pages (iterable): Page items.
+
+        Keyword Arguments:
+            stream (bool): Capture pages as soon as they are given instead of
+                reading every pages first, see
+                ``BaseInterface.iter_stream_batches``. Default is False.
+
+        Yields:
+            tuple: Result status and item, status is ``success`` for a built
+            payload, ``error`` for an error log or ``skipped`` for the log of
+            a job skipped once time budget is exhausted.
+        """
+        self.start_run()
+        pool = self.get_driver_pool()
+        try:
+            batches = self.get_run_batches(pages, stream=stream)
+
+            if self.workers > 1:
+                self.log.debug(f"Workers: {self.workers}")
+                results = self.iter_concurrent_batches(batches, pool)
+            else:
+                results = (
+                    result
+                    for batch in batches
+                    for result in self.iter_batch(batch, pool)
+                )
+
+            for paths, errors in results:
+                for payload in paths:
+                    yield "success", payload
+                for error in errors:
+                    yield self.get_error_status(error), error
+        finally:
+            pool.close()
+            self.finish_run()
+
+    def run(self, pages, stream=False):
+        """
+        Proceed capture for every item
+
+        Logs of skipped jobs are returned with error logs.
+        """
+        built = []
+        error_logs = []
+
+        for status, item in self.iter_run(pages, stream=stream):
+            if status == "success":
+                built.append(item)
+            else:
+                error_logs.append(item)
 
         return built, error_logs
 
@@ -362,11 +1618,15 @@ class LogManagerMixin:
     def get_driver_logs_content(self, driver, config, response):
         """
         Get driver log content
+
+        When driver is shared between page jobs, only content written after
+        the offset given in ``driver_log_offset`` is returned.
         """
-        with io.open(config["driver_log_path"], "r") as fp:
+        with io.open(config["driver_log_path"], "rb") as fp:
+            fp.seek(config.get("driver_log_offset", 0))
             content = fp.read()
 
-        return content
+        return content.decode("utf-8", errors="replace")
 
     def remove_driver_logs(self, driver, config):
         """
@@ -409,9 +1669,13 @@ class LogManagerMixin:
             "elapsed_time": response["elapsed_time"],
         }
 
-        content = self.get_driver_logs_content(driver, config, response)
+        if "blocked" in response:
+            report["blocked"] = response["blocked"]
+
+        with time_phase(config, "logs"):
+            content = self.get_driver_logs_content(driver, config, response)
 
-        report["logs"] = self.parse_logs(driver, config, content)
+            report["logs"] = self.parse_logs(driver, config, content)
 
         return report
 
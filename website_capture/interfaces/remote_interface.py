@@ -0,0 +1,143 @@
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from urllib3.exceptions import HTTPError
+
+from website_capture.hubs import HubBalancer, validate_hubs
+from website_capture.interfaces.selenium_interface import (
+    SeleniumChromeInterface
+)
+
+
+class HubConnection(ChromeRemoteConnection):
+    """
+    Connection kept alive to a hub, with its own timeout for commands instead
+    of the global Selenium one.
+    """
+    def __init__(self, url, timeout):
+        self._timeout = timeout
+        super().__init__(url, keep_alive=True)
+
+
+class RemoteChromeDriver(webdriver.Remote):
+    """
+    Remote driver for a Chrome browser which can execute DevTools commands
+    like the local Chrome driver.
+    """
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {
+            "cmd": cmd,
+            "params": cmd_args,
+        })["value"]
+
+
+class RemoteInterface(SeleniumChromeInterface):
+    """
+    Using Chrome browsers from a fleet of remote WebDriver servers, like
+    Selenium Grid hubs, through Selenium.
+
+    Each driver is opened on the hub with the lowest load and holds one of its
+    session slots until it is closed, so driver sessions are reused across
+    pages on the same hub like with local drivers. A hub which fails to open
+    a session is skipped for the other ones.
+
+    Since each worker holds a driver, workers are limited to the total number
+    of sessions of every hubs.
+
+    Keyword Arguments:
+        hubs (list): Hub items, either an URL or a dictionnary with ``url``
+            and optional ``max_sessions`` (maximum number of sessions opened
+            at the same time on hub, default to 1) items. Default to a single
+            hub ``RemoteInterface.WEBDRIVER_URL``.
+        timeout (int): Timeout in seconds for a WebDriver command. Default
+            is 120.
+    """
+    DESTINATION_FILEPATH = "{name}_remote"
+    DRIVER_CLASS = RemoteChromeDriver
+    WEBDRIVER_URL = "http://127.0.0.1:4444/wd/hub"
+
+    def __init__(self, *args, hubs=None, timeout=120, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+        hubs = hubs or [self.WEBDRIVER_URL]
+        validate_hubs(hubs)
+        self.balancer = HubBalancer(hubs)
+
+        if self.workers > self.balancer.capacity:
+            self.log.warning(
+                "Workers are limited to the {} sessions of hubs".format(
+                    self.balancer.capacity
+                )
+            )
+            self.workers = self.balancer.capacity
+
+    def get_driver_options(self, config):
+        """
+        Remote drivers do not have a local service log file and W3C servers
+        only accept browser logging preferences from vendor capability.
+        """
+        options = super().get_driver_options(config)
+        del options["service_log_path"]
+
+        dc = dict(options["desired_capabilities"])
+        dc["goog:loggingPrefs"] = dc["loggingPrefs"]
+        options["desired_capabilities"] = dc
+
+        return options
+
+    def get_command_executor(self, url):
+        """
+        Return a connection to given hub URL, kept alive for every commands
+        of driver.
+        """
+        return HubConnection(url, self.timeout)
+
+    def get_driver_instance(self, options, config):
+        """
+        Open a new driver on the hub with the lowest load, other hubs are
+        tried if session can not be created.
+
+        Raises:
+            selenium.common.exceptions.WebDriverException: If no hub is able
+                to open a session.
+        """
+        klass = self.get_driver_class()
+        failed = []
+        error = None
+
+        while True:
+            url = self.balancer.acquire(exclude=failed)
+            if url is None:
+                msg = "Unable to open a session on any hub: {}".format(
+                    error
+                )
+                raise WebDriverException(msg)
+
+            try:
+                driver = klass(
+                    command_executor=self.get_command_executor(url),
+                    **options
+                )
+            except (WebDriverException, HTTPError, OSError) as e:
+                self.balancer.release(url)
+                self.log.warning(
+                    "🔸 Unable to open a session on hub {}: {}".format(url, e)
+                )
+                failed.append(url)
+                error = e
+                continue
+
+            self.log.debug("Opened session on hub: {}".format(url))
+            driver.hub_url = url
+
+            return driver
+
+    def tear_down_driver(self, driver, config):
+        """
+        Close driver then release its session slot on hub, even if hub has
+        not responded.
+        """
+        try:
+            super().tear_down_driver(driver, config)
+        finally:
+            self.balancer.release(driver.hub_url)
@@ -7,7 +7,13 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 
 from website_capture.interfaces.base import BaseInterface, LogManagerMixin
+from website_capture.blocking import (count_blocked_requests,
+                                      get_firefox_preferences)
 from website_capture.exceptions import PageConfigError
+from website_capture.performance import PERFORMANCE_SCRIPT
+from website_capture.proxy import get_chrome_arguments
+from website_capture.readiness import READY_SCRIPT, WAIT_MARGIN
+from website_capture.timings import time_phase
 
 
 class SeleniumFirefoxInterface(LogManagerMixin, BaseInterface):
@@ -19,34 +25,123 @@ class SeleniumFirefoxInterface(LogManagerMixin, BaseInterface):
     DESTINATION_FILEPATH = "{name}_firefox"
     DRIVER_CLASS = webdriver.Firefox
     FLUSH_DRIVER_LOGS = True # TODO: Should be overrided by page config option
+    # Wait for two animation frames so layout has been computed again
+    REFLOW_SCRIPT = (
+        "var done = arguments[arguments.length - 1];"
+        "window.requestAnimationFrame(function() {"
+        "    window.requestAnimationFrame(function() { done(); });"
+        "});"
+    )
+    # Page height and viewport height in CSS pixels
+    PAGE_METRICS_SCRIPT = (
+        "return {"
+        "    'height': Math.max(document.documentElement.scrollHeight,"
+        "                       document.body.scrollHeight),"
+        "    'viewport': window.innerHeight"
+        "};"
+    )
+    # Scroll to given vertical position and return the effective position
+    SCROLL_SCRIPT = (
+        "window.scrollTo(0, arguments[0]);"
+        "return window.scrollY;"
+    )
+    PERFORMANCE_SCRIPT = PERFORMANCE_SCRIPT
+    READY_SCRIPT = READY_SCRIPT
 
     def set_browser_size(self, driver, config):
         driver.set_window_size(*config["size"])
 
+    def wait_for_reflow(self, driver, config):
+        driver.execute_async_script(self.REFLOW_SCRIPT)
+
+    def get_profile_preferences(self, config, proxy=True):
+        """
+        Return browser profile preferences for given page configuration.
+
+        Keyword Arguments:
+            proxy (bool): Include caching proxy address if any. Default is
+                True.
+        """
+        # From Firefox 64 this should do the trick as last search result was
+        # pointing it. Sadly it does not work, there is more search and tests
+        # to do..
+        preferences = {
+            "devtools.console.stdout.content": "true",
+        }
+
+        # Firefox can not block requests from WebDriver, so blocked requests
+        # are sent to a closed port from a proxy configuration script which
+        # also sends other requests to caching proxy
+        patterns = self.get_blocked_patterns(config)
+        proxy = self.get_proxy_address() if proxy else None
+        if patterns or proxy:
+            preferences.update(get_firefox_preferences(patterns, proxy=proxy))
+
+        return preferences
+
     def get_driver_options(self, config):
         options = FirefoxOptions()
 
         if self.headless:
             options.headless = True
 
-        # From Firefox 64 this should do the trick as last search result was
-        # pointing it. Sadly it does not work, there is more search and tests
-        # to do..
-        fp = webdriver.FirefoxProfile()
-        fp.set_preference("devtools.console.stdout.content", "true")
+        if self.page_load_strategy != "normal":
+            options.set_capability("pageLoadStrategy",
+                                   self.page_load_strategy)
 
         # Update driver capabilities to ask for every browser logs so we have
         # errors and console.log
         dc = DesiredCapabilities.FIREFOX
         dc["loggingPrefs"] = {"browser": "ALL"}
 
-        return {
+        driver_options = {
             "options": options,
             "service_log_path": config["driver_log_path"],
             "desired_capabilities": dc,
-            "firefox_profile": fp,
         }
 
+        preferences = self.get_profile_preferences(config)
+
+        if self.profile_template:
+            # Browser directly uses a clone of profile template instead of a
+            # profile copied by Selenium. Proxy port changes for each run so
+            # it is only set in clone preferences, not in template ones.
+            template = self.get_profile_template(
+                self.get_profile_preferences(config, proxy=False)
+            )
+            path = template.clone(preferences=preferences)
+            options.add_argument("-profile")
+            options.add_argument(path)
+            driver_options["profile_clone"] = (template, path)
+        else:
+            fp = webdriver.FirefoxProfile()
+            for name, value in preferences.items():
+                fp.set_preference(name, value)
+            driver_options["firefox_profile"] = fp
+
+        return driver_options
+
+    def warm_profile(self, path):
+        """
+        Start browser once with given profile directory so it creates every
+        profile files.
+        """
+        options = FirefoxOptions()
+        options.headless = True
+        options.add_argument("-profile")
+        options.add_argument(path)
+
+        klass = self.get_driver_class()
+        driver = klass(options=options, service_log_path=os.devnull)
+        driver.quit()
+
+    def get_session_key(self, config):
+        """
+        Blocked patterns are set in driver profile, so driver is recycled when
+        they change.
+        """
+        return tuple(self.get_blocked_patterns(config))
+
     def get_driver_instance(self, options, config):
         """
         Remove previous log file if exists (so it does not stack with logs
@@ -55,20 +150,65 @@ class SeleniumFirefoxInterface(LogManagerMixin, BaseInterface):
         if os.path.exists(config["driver_log_path"]):
             os.remove(config["driver_log_path"])
 
+        options = dict(options)
+        profile_clone = options.pop("profile_clone", None)
+
         klass = self.get_driver_class()
-        driver = klass(**options)
+        try:
+            driver = klass(**options)
+        except Exception:
+            self.remove_profile_clone(profile_clone)
+            raise
+
+        driver.profile_clone = profile_clone
 
         return driver
 
+    def remove_profile_clone(self, profile_clone):
+        if profile_clone is not None:
+            template, path = profile_clone
+            template.remove_clone(path)
+
     def load_page(self, driver, config):
         response = super().load_page(driver, config)
 
+        timeout = self.get_page_load_timeout(driver, config)
+        if timeout is not None:
+            driver.set_page_load_timeout(timeout)
+
         start_time = time.perf_counter()
         driver.get(config["url"])
         response["elapsed_time"] = time.perf_counter() - start_time
 
+        with time_phase(config, "wait"):
+            response["ready"] = self.wait_for_ready(driver, config)
+
         return response
 
+    def wait_for_ready(self, driver, config):
+        """
+        Wait for conditions from page ``wait_for`` option.
+
+        Script timeout of driver is restored once finished since driver is
+        shared with next page jobs.
+
+        Returns:
+            dict: Result from readiness script or None if page does not have
+            any condition to wait for.
+        """
+        options = self.get_ready_options(config)
+        if options is None:
+            return None
+
+        previous = getattr(driver, "script_timeout", self.SCRIPT_TIMEOUT)
+        driver.set_script_timeout(options["timeout"] / 1000 + WAIT_MARGIN)
+        try:
+            result = driver.execute_async_script(self.READY_SCRIPT, options)
+        finally:
+            driver.set_script_timeout(previous)
+
+        return self.check_readiness(config, result)
+
     def parse_logs(self, driver, config, content):
         """
         Parse browser logs from given content.
@@ -92,6 +232,9 @@ class SeleniumFirefoxInterface(LogManagerMixin, BaseInterface):
 
         return logs
 
+    def get_performance_entries(self, driver, config):
+        return driver.execute_async_script(self.PERFORMANCE_SCRIPT)
+
     def task_report(self, driver, config, response):
         payload = super().task_report(driver, config, response)
         path = self.store_browser_logs(driver, config, payload)
@@ -103,13 +246,35 @@ class SeleniumFirefoxInterface(LogManagerMixin, BaseInterface):
 
         if method == "body":
             el = driver.find_element_by_tag_name("body")
-            el.screenshot(config["screenshot_path"])
+            content = el.screenshot_as_png
         elif method == "window":
-            driver.get_screenshot_as_file(config["screenshot_path"])
+            content = driver.get_screenshot_as_png()
+        elif method == "fullpage":
+            return self.take_fullpage_screenshot(driver, config)
         else:
             raise PageConfigError("Unknowed screenshot method: {}".format(method))
 
-        return config["screenshot_path"]
+        return self.save_screenshot(config, content)
+
+    def take_fullpage_screenshot(self, driver, config):
+        """
+        Take a window screenshot for each viewport height of page while
+        scrolling it, tiles are stitched to a full page screenshot.
+        """
+        metrics = driver.execute_script(self.PAGE_METRICS_SCRIPT)
+        stitcher = self.get_fullpage_stitcher(config, metrics["viewport"])
+
+        offset = 0
+        while offset < metrics["height"]:
+            position = driver.execute_script(self.SCROLL_SCRIPT, offset)
+            self.wait_for_reflow(driver, config)
+            stitcher.add_tile(driver.get_screenshot_as_png(),
+                              skip=offset - position)
+            offset += metrics["viewport"]
+
+        driver.execute_script(self.SCROLL_SCRIPT, 0)
+
+        return stitcher.finish()
 
     def tear_down_driver(self, driver, config):
         super().tear_down_driver(driver, config)
@@ -119,6 +284,8 @@ class SeleniumFirefoxInterface(LogManagerMixin, BaseInterface):
 
         driver.quit()
 
+        self.remove_profile_clone(getattr(driver, "profile_clone", None))
+
 
 class SeleniumChromeInterface(SeleniumFirefoxInterface):
     """
@@ -136,10 +303,22 @@ class SeleniumChromeInterface(SeleniumFirefoxInterface):
         if self.headless:
             options.headless = True
 
+        proxy = self.get_proxy_address()
+        if proxy:
+            for argument in get_chrome_arguments(proxy):
+                options.add_argument(argument)
+
+        if self.page_load_strategy != "normal":
+            options.set_capability("pageLoadStrategy",
+                                   self.page_load_strategy)
+
         # Update driver capabilities to ask for every browser logs so we have
         # errors and console.log
         dc = DesiredCapabilities.CHROME
         dc["loggingPrefs"] = {"browser": "ALL"}
+        # Blocked requests are counted from DevTools events
+        if self.get_blocked_patterns(config):
+            dc["loggingPrefs"]["performance"] = "ALL"
 
         return {
             "options": options,
@@ -147,6 +326,35 @@ class SeleniumChromeInterface(SeleniumFirefoxInterface):
             "desired_capabilities": dc,
         }
 
+    def get_session_key(self, config):
+        """
+        Driver is recycled when blocking is enabled or disabled since only
+        driver with performance logs can count blocked requests.
+        """
+        return bool(self.get_blocked_patterns(config))
+
+    def load_page(self, driver, config):
+        """
+        Block requests from DevTools protocol before loading page then count
+        blocked requests.
+        """
+        patterns = self.get_blocked_patterns(config)
+
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {
+                "urls": patterns,
+            })
+
+        response = super().load_page(driver, config)
+
+        if patterns:
+            response["blocked"] = count_blocked_requests(
+                driver.get_log("performance")
+            )
+
+        return response
+
     def get_driver_logs_content(self, driver, config, response):
         """
         Chrome driver does not push logs to a file, but dispose them from its
@@ -177,11 +385,3 @@ class SeleniumChromeInterface(SeleniumFirefoxInterface):
             logs.append((level, msg.strip()))
 
         return logs
-
-    def tear_down_driver(self, driver, config):
-        super().tear_down_driver(driver, config)
-
-        if self.FLUSH_DRIVER_LOGS:
-            self.remove_driver_logs(driver, config)
-
-        driver.quit()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Driver sessions
+===============
+
+Driver sessions allow to share a single driver instance between successive
+page jobs instead of starting a new driver for each page.
+"""
+import os
+import threading
+
+from website_capture.timings import time_phase
+
+
+class DriverSession(object):
+    """
+    A driver instance shared between successive page jobs.
+
+    Driver is lazily opened from the first page configuration the session is
+    acquired for, then it is reused for every following page jobs until it is
+    closed. A session is recycled (closed so the next acquire will open a new
+    driver) when it has reached its maximum number of jobs or when a job has
+    failed.
+
+    Session also remembers the last page loaded in its driver so a page job
+    for another size of the same page can reuse it without loading it again.
+
+    Arguments:
+        interface (website_capture.interfaces.base.BaseInterface): Interface
+            which is used to open, configure and close driver.
+
+    Keyword Arguments:
+        max_jobs (int): Maximum number of page jobs to perform with the same
+            driver before recycling it. Zero means unlimited. Default is 0.
+    """
+    def __init__(self, interface, max_jobs=0):
+        self.interface = interface
+        self.max_jobs = max_jobs
+        self.driver = None
+        self.config = None
+        self.size = None
+        self.jobs = 0
+        self.loaded = None
+        self.key = None
+
+    @property
+    def is_open(self):
+        return self.driver is not None
+
+    def open(self, config):
+        """
+        Start a new driver from given page configuration.
+
+        Driver log file path from this configuration is used for the whole
+        session life.
+        """
+        with time_phase(config, "driver_start"):
+            options = self.interface.get_driver_options(config)
+            self.driver = self.interface.get_driver_instance(options, config)
+        self.config = config
+        self.size = config["size"]
+        self.jobs = 0
+        self.loaded = None
+        self.key = self.interface.get_session_key(config)
+
+        if self.size != self.interface._default_size_value:
+            with time_phase(config, "resize"):
+                self.interface.set_browser_size(self.driver, config)
+
+        return self.driver
+
+    def get_log_offset(self):
+        """
+        Return current size of session driver log file so page job can only
+        read log lines which have been written since it started.
+        """
+        path = self.config["driver_log_path"]
+        if os.path.exists(path):
+            return os.path.getsize(path)
+
+        return 0
+
+    def acquire(self, config):
+        """
+        Return session driver for given page configuration.
+
+        A new driver is opened if session is not opened yet. If page
+        configuration require another size than the current session one,
+        browser window is resized, except for the default size which
+        requires a new driver since the browser default size can not be
+        restored.
+
+        Given page configuration is patched to point to the session driver log
+        file with the offset where its own log lines will start.
+
+        Driver is recycled if page configuration requires different driver
+        options, see ``BaseInterface.get_session_key``.
+        """
+        if (
+            self.is_open
+            and self.interface.get_session_key(config) != self.key
+        ):
+            self.close()
+
+        if self.is_open and config["size"] != self.size:
+            if config["size"] == self.interface._default_size_value:
+                self.close()
+            else:
+                with time_phase(config, "resize"):
+                    self.interface.set_browser_size(self.driver, config)
+                self.size = config["size"]
+
+        if not self.is_open:
+            self.open(config)
+
+        config["driver_log_path"] = self.config["driver_log_path"]
+        config["driver_log_offset"] = self.get_log_offset()
+
+        self.jobs += 1
+
+        return self.driver
+
+    def get_loaded_key(self, config):
+        return (config["name"], config["url"])
+
+    def get_loaded_response(self, config):
+        """
+        Return loading response of given page if it is the last page loaded
+        in session driver, else None.
+        """
+        if self.loaded and self.loaded[0] == self.get_loaded_key(config):
+            return self.loaded[1]
+
+        return None
+
+    def set_loaded_response(self, config, response):
+        """
+        Remember given page has been loaded in session driver.
+        """
+        self.loaded = (self.get_loaded_key(config), response)
+
+    def release(self, failed=False):
+        """
+        Release session after a page job, driver is closed if job has failed
+        or session has reached its maximum number of jobs.
+        """
+        if failed or (self.max_jobs and self.jobs >= self.max_jobs):
+            self.close()
+
+    def close(self):
+        """
+        Close session driver if any.
+        """
+        if self.is_open:
+            self.interface.tear_down_driver(self.driver, self.config)
+
+        self.driver = None
+        self.config = None
+        self.size = None
+        self.jobs = 0
+        self.loaded = None
+        self.key = None
+
+
+class DriverSessionPool(object):
+    """
+    Hold driver sessions so each thread performing page jobs has its own
+    session.
+
+    Arguments:
+        interface (website_capture.interfaces.base.BaseInterface): Interface
+            given to created sessions.
+
+    Keyword Arguments:
+        max_jobs (int): Maximum number of page jobs for each session, see
+            ``DriverSession``. Default is 0.
+    """
+    def __init__(self, interface, max_jobs=0):
+        self.interface = interface
+        self.max_jobs = max_jobs
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the session for current thread, create it if needed.
+        """
+        key = threading.get_ident()
+
+        with self._lock:
+            if key not in self.sessions:
+                self.sessions[key] = DriverSession(
+                    self.interface,
+                    max_jobs=self.max_jobs,
+                )
+
+            return self.sessions[key]
+
+    def close(self):
+        """
+        Close every sessions.
+        """
+        with self._lock:
+            sessions = list(self.sessions.values())
+            self.sessions = {}
+
+        for session in sessions:
+            session.close()
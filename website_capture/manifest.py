@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Capture manifest
+================
+
+A manifest keeps track of previous captures so an incremental run is able to
+skip pages which have not changed since their last capture.
+
+Each entry is stored for a page, a size and an interface with a fingerprint
+of the page configuration, a validator for the page content and the payload
+which has been built for it.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import urllib.error
+import urllib.request
+
+# Shared between manifest instances since they may target the same file
+_SAVE_LOCK = threading.Lock()
+
+
+def get_config_fingerprint(config):
+    """
+    Return a fingerprint for given page configuration.
+
+    Arguments:
+        config (dict): Page configuration.
+
+    Returns:
+        string: SHA1 hexadecimal digest of configuration serialized to JSON.
+    """
+    content = json.dumps(config, sort_keys=True, default=str)
+
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def get_page_validator(url, previous=None, timeout=10):
+    """
+    Request given url to get a validator for its current content.
+
+    Validator is built from ``ETag`` and ``Last-Modified`` headers when
+    response has any, else from a hash of response content. When a previous
+    validator with headers is given, request is conditional so an unchanged
+    page is not downloaded again.
+
+    Arguments:
+        url (string): Page URL.
+
+    Keyword Arguments:
+        previous (dict): Previous validator for this page.
+        timeout (int): Request timeout in seconds. Default is 10.
+
+    Returns:
+        dict: Validator or None if page can not be requested.
+    """
+    try:
+        request = urllib.request.Request(url)
+    except ValueError:
+        return None
+
+    if previous:
+        if previous.get("etag"):
+            request.add_header("If-None-Match", previous["etag"])
+        if previous.get("last_modified"):
+            request.add_header("If-Modified-Since", previous["last_modified"])
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            headers = response.headers
+            validator = {}
+            if headers.get("ETag"):
+                validator["etag"] = headers["ETag"]
+            if headers.get("Last-Modified"):
+                validator["last_modified"] = headers["Last-Modified"]
+
+            if not validator:
+                validator["content_hash"] = hashlib.sha256(
+                    response.read()
+                ).hexdigest()
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and previous:
+            return previous
+        return None
+    except (urllib.error.URLError, ValueError, OSError):
+        return None
+
+    return validator
+
+
+class CaptureManifest(object):
+    """
+    Manifest of captured pages stored as a JSON file.
+
+    Arguments:
+        path (string): Manifest file path.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.updated = set()
+        self.log = logging.getLogger("py-website-capture")
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Load entries from manifest file if it exists.
+        """
+        self.entries = self.read()
+
+        return self
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with io.open(self.path, "r") as fp:
+                return json.load(fp)
+        except ValueError:
+            self.log.warning("Ignored invalid manifest file: {}".format(
+                self.path
+            ))
+            return {}
+
+    def save(self):
+        """
+        Write entries updated from this instance to manifest file.
+
+        Manifest file is read again before writing so entries updated in the
+        meantime from another instance are kept.
+        """
+        with self._lock:
+            updated = {key: self.entries[key] for key in self.updated}
+
+        with _SAVE_LOCK:
+            entries = self.read()
+            entries.update(updated)
+
+            dirname = os.path.dirname(self.path)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname)
+
+            tmp_path = "{}.tmp".format(self.path)
+            with io.open(tmp_path, "w") as fp:
+                json.dump(entries, fp, indent=4, sort_keys=True, default=str)
+            os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        with self._lock:
+            return self.entries.get(key)
+
+    def update(self, key, fingerprint, validator, payload):
+        with self._lock:
+            self.entries[key] = {
+                "fingerprint": fingerprint,
+                "validator": validator,
+                "payload": payload,
+            }
+            self.updated.add(key)
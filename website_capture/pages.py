@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Page items
+==========
+
+Load page items from a JSON lines file, one page item per line, so very large
+page lists (like generated from sitemaps) do not have to be parsed at once.
+
+Pages are validated lazily while file is read and each page is kept as a
+compact ``PageRecord`` instead of a dictionnary.
+"""
+import io
+import json
+from collections.abc import Mapping
+
+from website_capture.exceptions import SettingsInvalidError
+
+
+class PageRecord(Mapping):
+    """
+    Compact and read-only-by-convention page item.
+
+    Record behaves like the page item dictionnary it comes from, its
+    ``name``, ``url`` and ``sizes`` are attributes and every other page
+    options are stored in ``options``. Option values are shared with every
+    page configurations built from record and must not be modified.
+
+    Arguments:
+        name (string): Page name.
+        url (string): Page URL.
+
+    Keyword Arguments:
+        sizes (list): Page sizes. Default to None for no sizes item.
+        options (dict): Other page options.
+    """
+    __slots__ = ("name", "url", "sizes", "options")
+
+    FIELDS = ("name", "url", "sizes")
+
+    def __init__(self, name, url, sizes=None, options=None):
+        self.name = name
+        self.url = url
+        self.sizes = sizes
+        self.options = options or None
+
+    @classmethod
+    def from_item(cls, item):
+        """
+        Return record from a page item dictionnary.
+        """
+        return cls(
+            item.get("name"),
+            item.get("url"),
+            sizes=item.get("sizes"),
+            options={
+                key: value for key, value in item.items()
+                if key not in cls.FIELDS
+            },
+        )
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.options is not None:
+            return self.options[key]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.options is None:
+                self.options = {}
+            self.options[key] = value
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+
+        if self.options is not None:
+            yield from self.options
+
+    def __len__(self):
+        return sum([1 for key in self])
+
+    def __repr__(self):
+        return "<PageRecord: {}>".format(self.name)
+
+
+def validate_page(item, position):
+    """
+    Validate a page item.
+
+    Arguments:
+        item (object): Page item to validate.
+        position (string): Page position in configuration for error
+            messages.
+
+    Raises:
+        SettingsInvalidError: If page item is invalid.
+    """
+    if not isinstance(item, dict):
+        msg = "Page item must be a dictionnary at {}".format(position)
+        raise SettingsInvalidError(msg)
+
+    for name in ["name", "url"]:
+        if not item.get(name) or not isinstance(item[name], str):
+            msg = "Page item must have a '{}' value at {}".format(name,
+                                                                  position)
+            raise SettingsInvalidError(msg)
+
+    sizes = item.get("sizes")
+    if sizes is not None and (
+        not isinstance(sizes, list)
+        or not all([
+            isinstance(size, (list, tuple)) and len(size) == 2
+            for size in sizes
+        ])
+    ):
+        msg = ("Page item 'sizes' must be a list of width and height pairs "
+               "at {}").format(position)
+        raise SettingsInvalidError(msg)
+
+
+def iter_page_lines(fileobject, name=None):
+    """
+    Read page records from a JSON lines file object as they are required.
+
+    Empty lines are ignored. Equal sizes lists are shared between records.
+
+    Arguments:
+        fileobject (object): File object to read lines from.
+
+    Keyword Arguments:
+        name (string): File name for error messages.
+
+    Raises:
+        SettingsInvalidError: If a line is not valid JSON or not a valid
+            page item. Pages before this line have already been yielded.
+
+    Yields:
+        PageRecord: Page record for each line.
+    """
+    name = name or getattr(fileobject, "name", repr(fileobject))
+    shared_sizes = {}
+
+    for number, line in enumerate(fileobject, start=1):
+        if not line.strip():
+            continue
+
+        position = "{}:{}".format(name, number)
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            msg = "Invalid JSON page item at {}: {}".format(position, e)
+            raise SettingsInvalidError(msg)
+
+        validate_page(item, position)
+
+        record = PageRecord.from_item(item)
+        if record.sizes is not None:
+            sizes = tuple([tuple(size) for size in record.sizes])
+            record.sizes = shared_sizes.setdefault(sizes, sizes)
+
+        yield record
+
+
+class PagesFile(object):
+    """
+    Iterable of page records from a JSON lines file.
+
+    File is read again for each iteration so it can be given to multiple
+    interfaces without keeping every records in memory.
+
+    Arguments:
+        path (string): Path to JSON lines file.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with io.open(self.path, "r") as fp:
+            yield from iter_page_lines(fp, name=self.path)
+
+    def __repr__(self):
+        return "<PagesFile: {}>".format(self.path)
+
+
+class ChainedPages(object):
+    """
+    Iterable of pages from every given page iterables in turn.
+    """
+    def __init__(self, *iterables):
+        self.iterables = iterables
+
+    def __iter__(self):
+        for iterable in self.iterables:
+            yield from iterable
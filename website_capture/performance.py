@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Page performance
+================
+
+Read performance entries recorded by browser while loading page and turn
+them into page performance metrics.
+
+Entries come from the Navigation Timing, Resource Timing and Paint Timing
+APIs so metrics are measured by browser itself, without the WebDriver
+overhead included in page loading ``elapsed_time``.
+"""
+
+# Asynchronous script to collect navigation, resource and paint entries.
+# Largest contentful paint entries are only available from a buffered
+# performance observer, they are collected on the next event loop turn.
+PERFORMANCE_SCRIPT = (
+    "var done = arguments[arguments.length - 1];"
+    "var lcp = [];"
+    "var observer = null;"
+    "var serialize = function(items) {"
+    "    return items.map(function(item) { return item.toJSON(); });"
+    "};"
+    "try {"
+    "    observer = new PerformanceObserver(function(list) {"
+    "        lcp = lcp.concat(list.getEntries());"
+    "    });"
+    "    observer.observe({type: 'largest-contentful-paint', buffered: true});"
+    "} catch (e) {}"
+    "window.setTimeout(function() {"
+    "    if (observer) {"
+    "        lcp = lcp.concat(observer.takeRecords());"
+    "        observer.disconnect();"
+    "    }"
+    "    done({"
+    "        'navigation': serialize("
+    "            performance.getEntriesByType('navigation')"
+    "        ),"
+    "        'resource': serialize(performance.getEntriesByType('resource')),"
+    "        'paint': serialize(performance.getEntriesByType('paint')),"
+    "        'largest-contentful-paint': lcp.map(function(item) {"
+    "            return {'startTime': item.startTime, 'size': item.size};"
+    "        })"
+    "    });"
+    "}, 0);"
+)
+
+
+def get_timing(entry, name, origin="startTime"):
+    """
+    Return a timing from given entry relative to its origin timing, in
+    milliseconds.
+
+    Returns:
+        float: Timing or None if entry does not have it or it did not happen
+        (browsers set zero for an event which did not happen).
+    """
+    value = entry.get(name)
+    if not value:
+        return None
+
+    return value - entry.get(origin, 0)
+
+
+def get_resource_metrics(entry):
+    """
+    Return metrics of a resource entry.
+    """
+    return {
+        "url": entry.get("name"),
+        "type": entry.get("initiatorType"),
+        "start": entry.get("startTime"),
+        "duration": entry.get("duration"),
+        "ttfb": get_timing(entry, "responseStart"),
+        "transfer_size": entry.get("transferSize"),
+        "encoded_size": entry.get("encodedBodySize"),
+        "decoded_size": entry.get("decodedBodySize"),
+    }
+
+
+def get_performance_metrics(entries):
+    """
+    Compute page performance metrics from performance entries.
+
+    Arguments:
+        entries (dict): List of entries for each entry type, as returned from
+            ``PERFORMANCE_SCRIPT``.
+
+    Returns:
+        dict: Page timings in milliseconds from navigation start (``ttfb``,
+        ``dom_content_loaded``, ``load``, ``first_paint``,
+        ``first_contentful_paint``, ``largest_contentful_paint``), document
+        ``transfer_size``, ``resources`` metrics in loading order and their
+        totals in ``resources_count``, ``resources_transfer_size`` and
+        ``resources_decoded_size``. Missing values are None.
+    """
+    entries = entries or {}
+    navigation = (entries.get("navigation") or [{}])[0]
+    paints = {
+        item.get("name"): item.get("startTime")
+        for item in entries.get("paint") or []
+    }
+    lcp = entries.get("largest-contentful-paint") or []
+    resources = sorted(
+        [get_resource_metrics(item) for item in entries.get("resource") or []],
+        key=lambda item: item["start"] or 0,
+    )
+
+    return {
+        "ttfb": get_timing(navigation, "responseStart"),
+        "dom_content_loaded": get_timing(navigation,
+                                         "domContentLoadedEventEnd"),
+        "load": get_timing(navigation, "loadEventEnd"),
+        "first_paint": paints.get("first-paint"),
+        "first_contentful_paint": paints.get("first-contentful-paint"),
+        "largest_contentful_paint": lcp[-1]["startTime"] if lcp else None,
+        "transfer_size": navigation.get("transferSize"),
+        "resources_count": len(resources),
+        "resources_transfer_size": sum([
+            item["transfer_size"] or 0 for item in resources
+        ]),
+        "resources_decoded_size": sum([
+            item["decoded_size"] or 0 for item in resources
+        ]),
+        "resources": resources,
+    }
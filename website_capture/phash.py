@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+Perceptual hashes
+=================
+
+Perceptual hashes are 64 bits fingerprints of an image which are close for
+images which look the same. They are computed when screenshots are written
+and stored in an index file so duplicated or changed screenshots can be found
+without to decode any image.
+
+Three kinds of hash are computed:
+
+* ``ahash`` (average hash) compares each pixel of a 8x8 grayscale thumbnail
+  to the mean value;
+* ``dhash`` (difference hash) compares each pixel of a 9x8 grayscale
+  thumbnail to its right neighbour;
+* ``phash`` (perceptual hash) compares the lowest frequencies of a discrete
+  cosine transform of a 32x32 grayscale thumbnail to their median value.
+
+Hashes computing requires the optional ``Pillow`` package whereas index
+queries do not.
+"""
+import io
+import logging
+import math
+import os
+import struct
+import sys
+import threading
+from array import array
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+HASH_KINDS = ["ahash", "dhash", "phash"]
+
+HASH_BITS = 64
+
+HASH_INDEX_FILENAME = "hashes.idx"
+
+# Shared between index instances since they may target the same file
+_SAVE_LOCK = threading.Lock()
+
+
+def pack_bits(bits):
+    """
+    Pack a sequence of booleans to an integer, first one is the most
+    significant bit.
+    """
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bool(bit))
+
+    return value
+
+
+def get_grayscale_pixels(image, width, height):
+    """
+    Return pixels of given image resized to given size in grayscale, row
+    after row.
+    """
+    return list(
+        image.convert("L").resize((width, height), Image.LANCZOS).getdata()
+    )
+
+
+def average_hash(image):
+    pixels = get_grayscale_pixels(image, 8, 8)
+    mean = sum(pixels) / len(pixels)
+
+    return pack_bits([pixel > mean for pixel in pixels])
+
+
+def difference_hash(image):
+    pixels = get_grayscale_pixels(image, 9, 8)
+
+    return pack_bits([
+        pixels[row * 9 + column + 1] > pixels[row * 9 + column]
+        for row in range(8)
+        for column in range(8)
+    ])
+
+
+# Cosines for the 8 lowest frequencies of a 32 values DCT
+_DCT_COSINES = [
+    [math.cos(math.pi * frequency * (2 * i + 1) / 64) for i in range(32)]
+    for frequency in range(8)
+]
+
+
+def perceptual_hash(image):
+    pixels = get_grayscale_pixels(image, 32, 32)
+
+    # Lowest frequencies of each row then of each column of these
+    rows = [
+        [
+            sum([value * cosine for value, cosine in zip(
+                pixels[row * 32:row * 32 + 32], cosines
+            )])
+            for cosines in _DCT_COSINES
+        ]
+        for row in range(32)
+    ]
+    coefficients = [
+        sum([rows[row][column] * cosines[row] for row in range(32)])
+        for cosines in _DCT_COSINES
+        for column in range(8)
+    ]
+    median = sorted(coefficients)[32]
+
+    return pack_bits([value > median for value in coefficients])
+
+
+def compute_hashes(image):
+    """
+    Compute every hash kinds of given image.
+
+    Arguments:
+        image (PIL.Image.Image): Image to hash.
+
+    Returns:
+        dict: Hash integer for each hash kind.
+    """
+    return {
+        "ahash": average_hash(image),
+        "dhash": difference_hash(image),
+        "phash": perceptual_hash(image),
+    }
+
+
+def format_hashes(hashes):
+    """
+    Return hashes as hexadecimal strings.
+    """
+    return {kind: "{:016x}".format(value) for kind, value in hashes.items()}
+
+
+def hamming_distance(first, second):
+    """
+    Return the number of different bits between two hashes.
+    """
+    return bin(first ^ second).count("1")
+
+
+def split_hash(value, count):
+    """
+    Split a hash in given number of chunks of consecutive bits, with sizes
+    as even as possible.
+
+    Two hashes whose distance is lower than the number of chunks have at
+    least one identical chunk.
+
+    Returns:
+        list: Chunk values, from the least significant bits.
+    """
+    size, extra = divmod(HASH_BITS, count)
+    chunks = []
+
+    for i in range(count):
+        width = size + 1 if i < extra else size
+        chunks.append(value & ((1 << width) - 1))
+        value >>= width
+
+    return chunks
+
+
+class HashIndex(object):
+    """
+    Index of screenshot hashes stored in a compact binary file.
+
+    Hashes are kept in unsigned 64 bits arrays, one for each hash kind, with
+    a list of keys (commonly screenshot paths relative to output directory)
+    at the same positions.
+
+    File starts with a signature, a version and the number of entries, then
+    comes each hash array as little endian 64 bits integers and finally keys
+    encoded in UTF-8 and separated with a new line.
+
+    Arguments:
+        path (string): Index file path.
+    """
+    SIGNATURE = b"WCHI"
+    VERSION = 1
+    HEADER = struct.Struct(">4sHI")
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = []
+        self.positions = {}
+        self.hashes = {kind: array("Q") for kind in HASH_KINDS}
+        self.updated = set()
+        self.log = logging.getLogger("py-website-capture")
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def load(self):
+        """
+        Load entries from index file if it exists.
+        """
+        keys, hashes = self.read()
+
+        with self._lock:
+            self.keys = keys
+            self.hashes = hashes
+            self.positions = {key: i for i, key in enumerate(keys)}
+
+        return self
+
+    def read(self):
+        keys = []
+        hashes = {kind: array("Q") for kind in HASH_KINDS}
+
+        if not os.path.exists(self.path):
+            return keys, hashes
+
+        with io.open(self.path, "rb") as fp:
+            content = fp.read()
+
+        try:
+            signature, version, count = self.HEADER.unpack_from(content)
+            if signature != self.SIGNATURE or version != self.VERSION:
+                raise ValueError("Unknown index format")
+
+            offset = self.HEADER.size
+            for kind in HASH_KINDS:
+                size = count * hashes[kind].itemsize
+                hashes[kind].frombytes(content[offset:offset + size])
+                if sys.byteorder == "big":
+                    hashes[kind].byteswap()
+                offset += size
+
+            keys = content[offset:].decode("utf-8").split("\n") if count else []
+            if len(keys) != count:
+                raise ValueError("Invalid number of keys")
+        except (ValueError, struct.error):
+            self.log.warning("Ignored invalid hash index file: {}".format(
+                self.path
+            ))
+            return [], {kind: array("Q") for kind in HASH_KINDS}
+
+        return keys, hashes
+
+    def write(self, keys, hashes):
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+
+        tmp_path = "{}.tmp".format(self.path)
+        with io.open(tmp_path, "wb") as fp:
+            fp.write(self.HEADER.pack(self.SIGNATURE, self.VERSION, len(keys)))
+            for kind in HASH_KINDS:
+                values = hashes[kind]
+                if sys.byteorder == "big":
+                    values = array("Q", values)
+                    values.byteswap()
+                fp.write(values.tobytes())
+            fp.write("\n".join(keys).encode("utf-8"))
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        """
+        Write entries updated from this instance to index file.
+
+        Index file is read again before writing so entries updated in the
+        meantime from another instance are kept.
+        """
+        with self._lock:
+            updated = {key: self.get(key, lock=False) for key in self.updated}
+
+        with _SAVE_LOCK:
+            saved = HashIndex(self.path)
+            saved.keys, saved.hashes = saved.read()
+            saved.positions = {key: i for i, key in enumerate(saved.keys)}
+            for key, hashes in updated.items():
+                saved.add(key, hashes)
+
+            self.write(saved.keys, saved.hashes)
+
+    def get(self, key, lock=True):
+        """
+        Return hashes for given key or None if it is not indexed.
+        """
+        if lock:
+            with self._lock:
+                return self.get(key, lock=False)
+
+        position = self.positions.get(key)
+        if position is None:
+            return None
+
+        return {kind: self.hashes[kind][position] for kind in HASH_KINDS}
+
+    def add(self, key, hashes):
+        """
+        Add or replace hashes for given key.
+        """
+        if "\n" in key:
+            raise ValueError("Index key can not contain a new line: {}".format(
+                key
+            ))
+
+        with self._lock:
+            position = self.positions.get(key)
+            if position is None:
+                self.positions[key] = len(self.keys)
+                self.keys.append(key)
+                for kind in HASH_KINDS:
+                    self.hashes[kind].append(hashes[kind])
+            else:
+                for kind in HASH_KINDS:
+                    self.hashes[kind][position] = hashes[kind]
+
+            self.updated.add(key)
+
+    def query(self, value, kind="phash", distance=0):
+        """
+        Find entries whose hash is near to given hash.
+
+        Arguments:
+            value (int): Hash value to search for.
+
+        Keyword Arguments:
+            kind (string): Hash kind to search in. Default is ``phash``.
+            distance (int): Maximum Hamming distance. Default is 0 for
+                identical hashes only.
+
+        Returns:
+            list: Tuples of key and distance, nearest first.
+        """
+        with self._lock:
+            matches = [
+                (key, hamming_distance(value, item))
+                for key, item in zip(self.keys, self.hashes[kind])
+            ]
+
+        return sorted(
+            [(key, d) for key, d in matches if d <= distance],
+            key=lambda item: (item[1], item[0]),
+        )
+
+    def duplicates(self, kind="phash", distance=0):
+        """
+        Find groups of entries with near hashes.
+
+        With a distance, hashes are split in ``distance + 1`` chunks and only
+        hashes which share a chunk are compared, since near hashes have at
+        least one identical chunk.
+
+        Keyword Arguments:
+            kind (string): Hash kind to compare. Default is ``phash``.
+            distance (int): Maximum Hamming distance. Default is 0 for
+                identical hashes only.
+
+        Returns:
+            list: Groups of keys, each group has at least two keys.
+        """
+        with self._lock:
+            entries = list(zip(self.keys, self.hashes[kind]))
+
+        # Identical hashes are grouped without any comparison
+        buckets = {}
+        for key, value in entries:
+            buckets.setdefault(value, []).append(key)
+
+        values = list(buckets)
+        parents = list(range(len(values)))
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        if distance >= HASH_BITS:
+            for i in range(1, len(values)):
+                parents[i] = 0
+        elif distance:
+            bands = {}
+            for i, value in enumerate(values):
+                for band in enumerate(split_hash(value, distance + 1)):
+                    bands.setdefault(band, []).append(i)
+
+            for candidates in bands.values():
+                for position, i in enumerate(candidates):
+                    for j in candidates[position + 1:]:
+                        if (
+                            find(i) != find(j)
+                            and hamming_distance(values[i], values[j])
+                            <= distance
+                        ):
+                            parents[find(j)] = find(i)
+
+        groups = {}
+        for i, value in enumerate(values):
+            groups.setdefault(find(i), []).extend(buckets[value])
+
+        return sorted(
+            [sorted(keys) for keys in groups.values() if len(keys) > 1]
+        )
+
+    def compare(self, other, kind="phash", distance=0):
+        """
+        Compare entries against another index, like the index from a previous
+        capture.
+
+        Arguments:
+            other (HashIndex): Index to compare to.
+
+        Keyword Arguments:
+            kind (string): Hash kind to compare. Default is ``phash``.
+            distance (int): Maximum Hamming distance for an entry to be
+                unchanged. Default is 0.
+
+        Returns:
+            dict: Sorted keys for each status ``unchanged``, ``changed``,
+            ``added`` (not in other index) and ``removed`` (only in other
+            index).
+        """
+        result = {"unchanged": [], "changed": [], "added": [], "removed": []}
+
+        with self._lock:
+            entries = list(zip(self.keys, self.hashes[kind]))
+
+        for key, value in entries:
+            previous = other.get(key)
+            if previous is None:
+                result["added"].append(key)
+            elif hamming_distance(value, previous[kind]) <= distance:
+                result["unchanged"].append(key)
+            else:
+                result["changed"].append(key)
+
+        keys = set(self.keys)
+        result["removed"] = [key for key in other.keys if key not in keys]
+
+        return {status: sorted(keys) for status, keys in result.items()}
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Browser profile templates
+=========================
+
+Firefox drivers are started with a new profile which Selenium zips and copies
+for each launch, then browser spends time to warm up this empty profile.
+
+A profile template is prepared once from browser preferences and kept on
+disk between runs, each driver session then starts from a cheap clone of
+this template given to browser with ``-profile`` argument.
+
+Files are cloned with copy-on-write when platform and filesystem support it.
+Otherwise files which are never changed in place by browser are hard linked
+and other files are copied, so a session can not alter its template.
+"""
+import errno
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+PROFILE_TEMPLATES_DIRNAME = ".profile-templates"
+
+# Directory where session clones are created, in templates directory so
+# hard links are on the same filesystem
+PROFILE_CLONES_DIRNAME = ".clones"
+
+# Patterns of profile files which browser only replaces, they can be shared
+# between clones with hard links
+PROFILE_LINKED_PATTERNS = [
+    "startupCache/*",
+    "gmp-*/*",
+    "*.xpi",
+]
+
+# Lock files are never cloned since they belong to a running browser
+PROFILE_IGNORED_FILES = ["lock", ".parentlock", "parent.lock"]
+
+# Linux ioctl request to clone a file with copy-on-write
+FICLONE = 0x40049409
+
+
+def get_preferences_script(preferences):
+    """
+    Return ``user.js`` content to set given preferences.
+    """
+    return "".join([
+        'user_pref({}, {});\n'.format(json.dumps(name), json.dumps(value))
+        for name, value in sorted(preferences.items())
+    ])
+
+
+def reflink_file(source, destination):
+    """
+    Clone a file with copy-on-write.
+
+    Returns:
+        bool: False if filesystem or platform does not support it.
+    """
+    # Not available on non POSIX platforms
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    with io.open(source, "rb") as src, io.open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL,
+                           errno.ENOTTY, errno.EBADF):
+                return False
+            raise
+
+    return True
+
+
+class ProfileTemplate(object):
+    """
+    A browser profile template built from preferences.
+
+    Template directory is named from a fingerprint of its preferences so
+    templates with different preferences can live in the same directory and
+    a template is reused by every run with the same preferences.
+
+    Arguments:
+        directory (string): Directory where templates are stored.
+        preferences (dict): Browser preferences written to template
+            ``user.js``.
+    """
+    PREFERENCES_FILENAME = "user.js"
+    MARKER_FILENAME = ".template"
+
+    def __init__(self, directory, preferences):
+        self.directory = directory
+        self.preferences = preferences
+        self.fingerprint = hashlib.sha1(
+            json.dumps(preferences, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        self.path = os.path.join(directory, self.fingerprint)
+        self.reflink = True
+
+    @property
+    def is_built(self):
+        return os.path.exists(os.path.join(self.path, self.MARKER_FILENAME))
+
+    def build(self, warm=None):
+        """
+        Build template unless it has already been built.
+
+        Template is built in a temporary directory which is moved to its
+        final path once finished, so an interrupted build is never used.
+
+        Keyword Arguments:
+            warm (callable): Function called with the temporary directory path
+                to warm up profile, like starting browser once with it.
+
+        Returns:
+            bool: True if template has been built, False if it was already.
+        """
+        if self.is_built:
+            return False
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        build_path = tempfile.mkdtemp(prefix=".build-", dir=self.directory)
+        try:
+            if warm is not None:
+                warm(build_path)
+
+            # Preferences are written after warming so browser can not
+            # overwrite them
+            path = os.path.join(build_path, self.PREFERENCES_FILENAME)
+            with io.open(path, "w") as fp:
+                fp.write(get_preferences_script(self.preferences))
+
+            for name in PROFILE_IGNORED_FILES:
+                path = os.path.join(build_path, name)
+                if os.path.lexists(path):
+                    os.remove(path)
+
+            with io.open(os.path.join(build_path, self.MARKER_FILENAME),
+                         "w") as fp:
+                json.dump(self.preferences, fp, indent=4, sort_keys=True)
+
+            if os.path.exists(self.path):
+                shutil.rmtree(self.path)
+            os.rename(build_path, self.path)
+        finally:
+            if os.path.exists(build_path):
+                shutil.rmtree(build_path)
+
+        return True
+
+    def is_linked(self, relative_path):
+        return any([
+            fnmatch.fnmatch(relative_path, pattern)
+            for pattern in PROFILE_LINKED_PATTERNS
+        ])
+
+    def clone_file(self, source, destination, relative_path):
+        if self.reflink:
+            try:
+                if reflink_file(source, destination):
+                    return
+            except OSError:
+                pass
+            # Do not try again for every file
+            self.reflink = False
+
+        if self.is_linked(relative_path):
+            try:
+                if os.path.exists(destination):
+                    os.remove(destination)
+                os.link(source, destination)
+                return
+            except OSError:
+                pass
+
+        shutil.copy2(source, destination)
+
+    def clone(self, preferences=None):
+        """
+        Clone template to a new profile directory.
+
+        Keyword Arguments:
+            preferences (dict): Browser preferences written to clone
+                ``user.js`` instead of template ones, like preferences which
+                change between runs.
+
+        Returns:
+            string: Path to profile clone, it should be removed with
+            ``ProfileTemplate.remove_clone`` once browser is closed.
+        """
+        clones_dir = os.path.join(self.directory, PROFILE_CLONES_DIRNAME)
+        if not os.path.exists(clones_dir):
+            os.makedirs(clones_dir)
+
+        clone_path = tempfile.mkdtemp(
+            prefix="{}-".format(self.fingerprint),
+            dir=clones_dir,
+        )
+
+        for root, dirs, files in os.walk(self.path):
+            relative_root = os.path.relpath(root, self.path)
+            target_root = os.path.normpath(
+                os.path.join(clone_path, relative_root)
+            )
+            for name in dirs:
+                os.makedirs(os.path.join(target_root, name), exist_ok=True)
+
+            for name in files:
+                if name in PROFILE_IGNORED_FILES + [self.MARKER_FILENAME]:
+                    continue
+                relative_path = os.path.normpath(
+                    os.path.join(relative_root, name)
+                ).replace(os.sep, "/")
+                self.clone_file(
+                    os.path.join(root, name),
+                    os.path.join(target_root, name),
+                    relative_path,
+                )
+
+        if preferences is not None:
+            path = os.path.join(clone_path, self.PREFERENCES_FILENAME)
+            # Replace file instead of writing into it since it may be shared
+            # with template
+            if os.path.exists(path):
+                os.remove(path)
+            with io.open(path, "w") as fp:
+                fp.write(get_preferences_script(preferences))
+
+        return clone_path
+
+    def remove_clone(self, path):
+        if path and os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
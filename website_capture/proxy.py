@@ -0,0 +1,575 @@
+# -*- coding: utf-8 -*-
+"""
+Caching proxy
+=============
+
+A forward HTTP proxy running in a thread of the capture process, which keeps
+responses in an on-disk cache shared by every driver sessions. Shared
+assets like styles, scripts, fonts and images are then downloaded once for a
+run instead of once for each page job, since each new driver starts with an
+empty browser cache.
+
+Only successful ``GET`` responses which are not private are cached. Entries
+stored during the current run are always served from cache, entries from a
+previous run are only served until their ``max-age`` or ``Expires`` date.
+Secure requests are tunneled without caching since they can not be read.
+
+Cache has a maximum size, least recently used entries are removed when it is
+exceeded.
+"""
+import contextlib
+import email.utils
+import hashlib
+import http.client
+import io
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+PROXY_CACHE_DIRNAME = ".proxy-cache"
+
+# Default maximum cache size in megabytes
+PROXY_CACHE_SIZE = 256
+
+# Responses bigger than this are streamed to browser without being cached
+PROXY_MAX_ENTRY_SIZE = 16 * 1024 * 1024
+
+PROXY_TIMEOUT = 30
+
+PROXY_CHUNK_SIZE = 64 * 1024
+
+# Headers which only concern a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = [
+    "connection", "keep-alive", "proxy-connection", "proxy-authenticate",
+    "proxy-authorization", "te", "trailer", "trailers", "transfer-encoding",
+    "upgrade",
+]
+
+
+def get_cache_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def get_cache_control(headers):
+    """
+    Return Cache-Control directives from given response headers.
+
+    Returns:
+        dict: Directive values, directives without value are True.
+    """
+    directives = {}
+
+    for name, value in headers:
+        if name.lower() != "cache-control":
+            continue
+        for item in value.split(","):
+            key, _, argument = item.strip().partition("=")
+            if key:
+                directives[key.lower()] = argument.strip('"') or True
+
+    return directives
+
+
+def is_cacheable(status, headers):
+    """
+    Return if a response can be stored in shared cache.
+    """
+    if status != 200:
+        return False
+
+    directives = get_cache_control(headers)
+    if any([
+        name in directives for name in ["no-store", "private", "no-cache"]
+    ]):
+        return False
+
+    for name, value in headers:
+        name = name.lower()
+        if name == "set-cookie":
+            return False
+        if name == "vary" and value.strip().lower() not in [
+            "", "accept-encoding"
+        ]:
+            return False
+
+    return True
+
+
+def get_expires(headers, now):
+    """
+    Return timestamp until response is fresh from its headers.
+
+    Returns:
+        float: Timestamp or None if response does not have any freshness
+        information.
+    """
+    directives = get_cache_control(headers)
+
+    for name in ["s-maxage", "max-age"]:
+        if name in directives:
+            try:
+                return now + int(directives[name])
+            except ValueError:
+                return None
+
+    for name, value in headers:
+        if name.lower() == "expires":
+            try:
+                return email.utils.parsedate_to_datetime(value).timestamp()
+            except (TypeError, ValueError):
+                return None
+
+    return None
+
+
+class CacheStore(object):
+    """
+    On-disk cache of responses with least recently used eviction.
+
+    Each entry is a file named from URL hash, it starts with a JSON line of
+    response metadata followed by response body. Entries order is kept in
+    memory and file modification time is updated on each access so order is
+    restored from a previous run.
+
+    Arguments:
+        directory (string): Cache directory, it is created if needed.
+        max_size (int): Maximum size in bytes of every entry bodies.
+    """
+    EXTENSION = ".cache"
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    def load(self):
+        """
+        Load entries from cache directory, oldest accessed first.
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(self.EXTENSION):
+                stat = os.stat(os.path.join(self.directory, filename))
+                entries.append((
+                    stat.st_mtime_ns,
+                    filename[:-len(self.EXTENSION)],
+                    stat.st_size,
+                ))
+
+        with self._lock:
+            self.entries = OrderedDict([
+                (key, size) for mtime, key, size in sorted(entries)
+            ])
+            self.size = sum(self.entries.values())
+            self.evict()
+
+        return self
+
+    def evict(self):
+        while self.size > self.max_size and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            path = self.get_path(key)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get(self, key):
+        """
+        Return entry metadata and body, or None if there is no entry.
+        """
+        with self._lock:
+            if key not in self.entries:
+                return None
+
+            path = self.get_path(key)
+            try:
+                with io.open(path, "rb") as fp:
+                    meta = json.loads(fp.readline().decode("utf-8"))
+                    body = fp.read()
+                os.utime(path)
+            except (OSError, ValueError):
+                self.size -= self.entries.pop(key)
+                return None
+
+            self.entries.move_to_end(key)
+
+        return meta, body
+
+    def put(self, key, meta, body):
+        """
+        Store an entry then remove least recently used entries if cache is
+        too big.
+
+        Returns:
+            bool: True if entry has been stored.
+        """
+        content = json.dumps(meta).encode("utf-8") + b"\n" + body
+        if len(content) > self.max_size:
+            return False
+
+        path = self.get_path(key)
+        tmp_path = "{}.{}.tmp".format(path, threading.get_ident())
+        with io.open(tmp_path, "wb") as fp:
+            fp.write(content)
+
+        with self._lock:
+            os.replace(tmp_path, path)
+            self.size -= self.entries.pop(key, 0)
+            self.entries[key] = len(content)
+            self.size += len(content)
+            self.evict()
+
+        return True
+
+
+class CachingProxyHandler(BaseHTTPRequestHandler):
+    """
+    Handle proxy requests with the cache from server ``proxy`` attribute.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        self.server.proxy.log.debug("Proxy: " + format % args)
+
+    def get_forwarded_headers(self, headers):
+        return [
+            (name, value) for name, value in headers
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+
+    def send_cached(self, meta, body):
+        self.send_response(meta["status"], meta["reason"])
+        for name, value in meta["headers"]:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Cache", "HIT")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def proxy_request(self, cacheable=False):
+        proxy = self.server.proxy
+        parts = urlsplit(self.path)
+
+        if parts.scheme != "http" or not parts.hostname:
+            self.send_error(400, "Proxy only accepts absolute HTTP URLs")
+            return
+
+        if not cacheable or "Authorization" in self.headers:
+            proxy.count("bypassed")
+            self.forward_request(parts)
+            return
+
+        # Concurrent requests for the same URL wait for the first one so
+        # response is fetched once
+        key = get_cache_key(self.path)
+        with proxy.fetching(key):
+            entry = proxy.store.get(key)
+            if entry is not None and proxy.is_fresh(entry[0]):
+                proxy.count("hits")
+                self.send_cached(*entry)
+                return
+
+            proxy.count("misses")
+            self.forward_request(parts, key=key)
+
+    def forward_request(self, parts, key=None):
+        """
+        Forward request to its origin and send back its response.
+
+        Keyword Arguments:
+            key (string): Cache key to store response if it is cacheable.
+                Default is None to not store response.
+        """
+        proxy = self.server.proxy
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        connection = http.client.HTTPConnection(
+            parts.hostname, parts.port or 80, timeout=proxy.timeout
+        )
+        try:
+            connection.putrequest(self.command, path, skip_host=True,
+                                  skip_accept_encoding=True)
+            for name, value in self.get_forwarded_headers(
+                self.headers.items()
+            ):
+                connection.putheader(name, value)
+            connection.endheaders(body)
+            response = connection.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            proxy.count("errors")
+            self.send_error(502, "Upstream error: {}".format(e))
+            return
+
+        try:
+            headers = self.get_forwarded_headers(response.getheaders())
+            headers = [
+                (name, value) for name, value in headers
+                if name.lower() != "content-length"
+            ]
+            size = response.getheader("Content-Length")
+
+            # Unknown or big responses are streamed without caching
+            if size is None or int(size) > proxy.max_entry_size:
+                self.stream_response(response, headers)
+                return
+
+            content = response.read()
+            if key is not None and is_cacheable(response.status, headers):
+                meta = {
+                    "url": self.path,
+                    "status": response.status,
+                    "reason": response.reason,
+                    "headers": headers,
+                    "fetched": time.time(),
+                    "expires": get_expires(headers, time.time()),
+                }
+                if proxy.store.put(key, meta, content):
+                    proxy.count("stored")
+
+            self.send_response(response.status, response.reason)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(content)))
+            self.send_header("X-Cache", "MISS")
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(content)
+        finally:
+            connection.close()
+
+    def stream_response(self, response, headers):
+        self.send_response(response.status, response.reason)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        for chunk in iter(lambda: response.read(PROXY_CHUNK_SIZE), b""):
+            self.wfile.write(chunk)
+
+    def do_GET(self):
+        self.proxy_request(cacheable=True)
+
+    def do_HEAD(self):
+        self.proxy_request()
+
+    def do_POST(self):
+        self.proxy_request()
+
+    def do_PUT(self):
+        self.proxy_request()
+
+    def do_PATCH(self):
+        self.proxy_request()
+
+    def do_DELETE(self):
+        self.proxy_request()
+
+    def do_OPTIONS(self):
+        self.proxy_request()
+
+    def do_CONNECT(self):
+        """
+        Tunnel a secure connection to its host.
+        """
+        proxy = self.server.proxy
+        host, _, port = self.path.rpartition(":")
+
+        try:
+            upstream = socket.create_connection(
+                (host, int(port or 443)), timeout=proxy.timeout
+            )
+        except (OSError, ValueError) as e:
+            proxy.count("errors")
+            self.send_error(502, "Upstream error: {}".format(e))
+            return
+
+        proxy.count("tunnels")
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.close_connection = True
+
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets,
+                                                     proxy.timeout)
+                if errored or not readable:
+                    break
+                for source in readable:
+                    data = source.recv(PROXY_CHUNK_SIZE)
+                    if not data:
+                        return
+                    target = upstream if source is self.connection else (
+                        self.connection
+                    )
+                    target.sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+
+class CachingProxy(object):
+    """
+    Caching forward proxy server running in a background thread.
+
+    Arguments:
+        directory (string): Cache directory.
+
+    Keyword Arguments:
+        max_size (int): Maximum cache size in bytes. Default is
+            ``PROXY_CACHE_SIZE`` megabytes.
+        host (string): Address to listen on. Default is ``127.0.0.1``.
+        port (int): Port to listen on. Default is 0 for any free port.
+        timeout (int): Timeout in seconds for upstream connections.
+    """
+    def __init__(self, directory, max_size=PROXY_CACHE_SIZE * 1024 * 1024,
+                 host="127.0.0.1", port=0, timeout=PROXY_TIMEOUT):
+        self.store = CacheStore(directory, max_size)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_entry_size = PROXY_MAX_ENTRY_SIZE
+        self.server = None
+        self.thread = None
+        self.started = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "bypassed": 0,
+            "tunnels": 0,
+            "errors": 0,
+        }
+        self.log = logging.getLogger("py-website-capture")
+        self._lock = threading.Lock()
+        self._fetching = {}
+
+    @property
+    def address(self):
+        """
+        Proxy address as ``host:port``.
+        """
+        return "{}:{}".format(self.host, self.port)
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    @contextlib.contextmanager
+    def fetching(self, key):
+        """
+        Context manager to hold the lock of given cache key, lock is removed
+        once nobody waits for it anymore.
+        """
+        with self._lock:
+            lock, waiting = self._fetching.get(key, (threading.Lock(), 0))
+            self._fetching[key] = (lock, waiting + 1)
+
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, waiting = self._fetching[key]
+                if waiting == 1:
+                    del self._fetching[key]
+                else:
+                    self._fetching[key] = (lock, waiting - 1)
+
+    def is_fresh(self, meta):
+        """
+        Return if a cache entry can be served without asking its origin.
+        """
+        if meta["fetched"] >= self.started:
+            return True
+
+        return bool(meta.get("expires")) and time.time() < meta["expires"]
+
+    def start(self):
+        """
+        Load cache and start serving from a daemon thread.
+        """
+        self.store.load()
+        self.started = time.time()
+
+        self.server = ThreadingHTTPServer((self.host, self.port),
+                                          CachingProxyHandler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        self.port = self.server.server_address[1]
+
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.1},
+            daemon=True,
+        )
+        self.thread.start()
+        self.log.debug("Caching proxy listening on: {}".format(self.address))
+
+        return self
+
+    def stop(self):
+        """
+        Stop server and return statistics.
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            self.thread = None
+
+        return self.get_stats()
+
+    def get_stats(self):
+        """
+        Return hit and miss statistics with cache usage.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+
+        requests = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / requests if requests else 0.0
+        stats["evictions"] = self.store.evictions
+        stats["entries"] = len(self.store.entries)
+        stats["size"] = self.store.size
+
+        return stats
+
+
+def get_chrome_arguments(address):
+    """
+    Return Chrome command line arguments to use proxy from given address.
+    """
+    return [
+        "--proxy-server=http://{}".format(address),
+        # Chrome never use a proxy for local addresses unless allowed
+        "--proxy-bypass-list=<-loopback>",
+    ]
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Page readiness
+==============
+
+Wait for a page to be ready once it has been loaded, from conditions given
+in page ``wait_for`` option, instead of a fixed delay.
+
+Every conditions are checked from a single asynchronous script which polls
+them in browser and returns as soon as they are all met or when timeout is
+reached.
+"""
+from website_capture.exceptions import PageConfigError
+
+WAIT_FOR_OPTIONS = ["selector", "network_idle", "fonts", "script", "timeout"]
+
+# Default timeout in seconds
+WAIT_TIMEOUT = 30
+
+# Delay in milliseconds between each check
+WAIT_INTERVAL = 50
+
+# Additional seconds given to driver script timeout so script has time to
+# return after its own timeout
+WAIT_MARGIN = 5
+
+# Network is idle when document is complete and no resource has finished
+# loading during given delay, resource loading ends are watched from a
+# performance observer. Predicate script is a function body which returns a
+# truthy value once page is ready.
+READY_SCRIPT = (
+    "var options = arguments[0];"
+    "var done = arguments[arguments.length - 1];"
+    "var start = performance.now();"
+    "var activity = 0;"
+    "var observer = null;"
+    "var fontsReady = !options.fonts || !document.fonts;"
+    "var predicate = options.script ? new Function(options.script) : null;"
+    "if (options.network_idle) {"
+    "    performance.getEntriesByType('resource').forEach(function(item) {"
+    "        activity = Math.max(activity, item.responseEnd);"
+    "    });"
+    "    try {"
+    "        observer = new PerformanceObserver(function(list) {"
+    "            list.getEntries().forEach(function(item) {"
+    "                activity = Math.max(activity, item.responseEnd);"
+    "            });"
+    "        });"
+    "        observer.observe({type: 'resource'});"
+    "    } catch (e) {}"
+    "}"
+    "if (!fontsReady) {"
+    "    document.fonts.ready.then(function() { fontsReady = true; });"
+    "}"
+    "var check = function() {"
+    "    var pending = [];"
+    "    var now = performance.now();"
+    "    if (options.selector && !document.querySelector(options.selector)) {"
+    "        pending.push('selector');"
+    "    }"
+    "    if (options.network_idle && ("
+    "        document.readyState !== 'complete'"
+    "        || now - activity < options.network_idle"
+    "    )) {"
+    "        pending.push('network_idle');"
+    "    }"
+    "    if (!fontsReady) {"
+    "        pending.push('fonts');"
+    "    }"
+    "    if (predicate) {"
+    "        try {"
+    "            if (!predicate()) { pending.push('script'); }"
+    "        } catch (e) {"
+    "            pending.push('script');"
+    "        }"
+    "    }"
+    "    if (!pending.length || now - start >= options.timeout) {"
+    "        if (observer) { observer.disconnect(); }"
+    "        done({"
+    "            'ready': !pending.length,"
+    "            'pending': pending,"
+    "            'elapsed': now - start"
+    "        });"
+    "    } else {"
+    "        window.setTimeout(check, options.interval);"
+    "    }"
+    "};"
+    "check();"
+)
+
+
+def get_wait_options(config):
+    """
+    Validate and return readiness options from given page configuration.
+
+    Arguments:
+        config (dict): Page configuration.
+
+    Raises:
+        PageConfigError: If ``wait_for`` option is invalid.
+
+    Returns:
+        dict: Options for ``READY_SCRIPT`` where delays are in milliseconds,
+        or None if page does not have any condition to wait for.
+    """
+    wait_for = config.get("wait_for")
+    if not wait_for:
+        return None
+
+    if not isinstance(wait_for, dict):
+        msg = "Page option 'wait_for' must be a dictionnary for page: {}"
+        raise PageConfigError(msg.format(config["name"]))
+
+    unknowed = sorted(set(wait_for) - set(WAIT_FOR_OPTIONS))
+    if unknowed:
+        msg = ("Unknowed 'wait_for' options '{}' for page '{}', they must be "
+               "one of: {}")
+        raise PageConfigError(msg.format(
+            ", ".join(unknowed),
+            config["name"],
+            ", ".join(WAIT_FOR_OPTIONS),
+        ))
+
+    for name in ["selector", "script"]:
+        if not isinstance(wait_for.get(name) or "", str):
+            msg = "Option 'wait_for.{}' must be a string for page: {}"
+            raise PageConfigError(msg.format(name, config["name"]))
+
+    for name in ["network_idle", "timeout"]:
+        value = wait_for.get(name)
+        if value is not None and (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or value <= 0
+        ):
+            msg = "Option 'wait_for.{}' must be a positive number for page: {}"
+            raise PageConfigError(msg.format(name, config["name"]))
+
+    return {
+        "selector": wait_for.get("selector") or None,
+        "network_idle": wait_for.get("network_idle") or 0,
+        "fonts": bool(wait_for.get("fonts")),
+        "script": wait_for.get("script") or None,
+        "timeout": int(wait_for.get("timeout", WAIT_TIMEOUT) * 1000),
+        "interval": WAIT_INTERVAL,
+    }
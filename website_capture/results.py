@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Results
+=======
+
+Helpers to write page job results as soon as they are finished.
+"""
+import io
+import json
+import logging
+import os
+import threading
+
+JOURNAL_FILENAME = "journal.jsonl"
+
+
+def serialize_result(interface, status, item):
+    """
+    Return a JSON serializable version of a page job result.
+
+    Arguments:
+        interface (string): Interface name.
+        status (string): Result status, either ``success`` or ``error``.
+        item (dict): Built payload or error log.
+
+    Returns:
+        dict: Serializable result where error exception has been turned to a
+        string.
+    """
+    item = dict(item)
+    if isinstance(item.get("error"), BaseException):
+        item["error"] = str(item["error"])
+
+    return {
+        "interface": interface,
+        "status": status,
+        "item": item,
+    }
+
+
+class ResultWriter(object):
+    """
+    Write every result on its own line as a JSON document (JSON lines).
+
+    Arguments:
+        fileobject (io.TextIOBase): Opened file object to write to.
+    """
+    def __init__(self, fileobject):
+        self.fileobject = fileobject
+
+    def write(self, interface, status, item):
+        """
+        Serialize result, write it and flush it immediately so file is always
+        up to date with results from a running capture.
+        """
+        result = serialize_result(interface, status, item)
+
+        self.fileobject.write(
+            json.dumps(result, sort_keys=True, default=str) + "\n"
+        )
+        self.fileobject.flush()
+
+        return result
+
+
+class CombinedResults(object):
+    """
+    Collect results from every interfaces to write them as a single JSON
+    document where results are grouped by interface, with the number of
+    results for each status.
+
+    Arguments:
+        fileobject (io.TextIOBase): Opened file object to write to.
+
+    Keyword Arguments:
+        interfaces (list): Interface names to include in document even if
+            they do not have any result.
+    """
+    STATUSES = ["success", "error", "skipped"]
+
+    def __init__(self, fileobject, interfaces=None):
+        self.fileobject = fileobject
+        self.interfaces = {}
+        self._lock = threading.Lock()
+
+        for name in interfaces or []:
+            self.get_interface(name)
+
+    def get_interface(self, name):
+        if name not in self.interfaces:
+            self.interfaces[name] = {
+                "counts": {status: 0 for status in self.STATUSES},
+                "results": [],
+            }
+
+        return self.interfaces[name]
+
+    def add(self, interface, status, item):
+        """
+        Serialize result and add it to its interface results.
+        """
+        result = serialize_result(interface, status, item)
+
+        with self._lock:
+            entry = self.get_interface(interface)
+            entry["counts"][status] += 1
+            entry["results"].append({
+                "status": status,
+                "item": result["item"],
+            })
+
+        return result
+
+    def save(self):
+        """
+        Write every collected results.
+        """
+        with self._lock:
+            json.dump(self.interfaces, self.fileobject, indent=4,
+                      sort_keys=True, default=str)
+        self.fileobject.flush()
+
+
+class ResultJournal(object):
+    """
+    Journal of finished page jobs stored as a JSON lines file.
+
+    Every result is appended and synchronized to disk as soon as it is
+    written, so a journal always reflects every job finished until a crash or
+    an interruption. Journal can be loaded again to resume a capture from
+    jobs which have not succeeded yet.
+
+    Arguments:
+        path (string): Journal file path.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.finished = {}
+        self.fileobject = None
+        self.log = logging.getLogger("py-website-capture")
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Load succeeded results from journal file if it exists.
+
+        Invalid lines, like a line truncated from an interruption, are
+        ignored.
+        """
+        self.finished = {}
+
+        if not os.path.exists(self.path):
+            return self
+
+        with io.open(self.path, "r") as fp:
+            for line in fp:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    self.log.warning("Ignored invalid journal line: {}".format(
+                        line.strip()
+                    ))
+                    continue
+
+                if result.get("status") == "success" and result.get("key"):
+                    self.finished[result["key"]] = result["item"]
+
+        return self
+
+    def open(self, resume=False):
+        """
+        Open journal file to write results.
+
+        Keyword Arguments:
+            resume (bool): If enabled, finished results are loaded and new ones
+                are appended to journal file, else journal file is started
+                again from scratch.
+        """
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+
+        if resume:
+            self.load()
+        else:
+            self.finished = {}
+
+        self.fileobject = io.open(self.path, "a" if resume else "w")
+
+        # Terminate a line truncated from an interruption so it does not
+        # corrupt the next written line
+        if resume and self.fileobject.tell() > 0:
+            with io.open(self.path, "rb") as fp:
+                fp.seek(-1, os.SEEK_END)
+                if fp.read(1) != b"\n":
+                    self.fileobject.write("\n")
+
+        return self
+
+    def get(self, key):
+        with self._lock:
+            return self.finished.get(key)
+
+    def write(self, key, interface, status, item):
+        """
+        Append result to journal and synchronize it to disk.
+        """
+        result = serialize_result(interface, status, item)
+        result["key"] = key
+        line = json.dumps(result, sort_keys=True, default=str) + "\n"
+
+        with self._lock:
+            self.fileobject.write(line)
+            self.fileobject.flush()
+            os.fsync(self.fileobject.fileno())
+
+            if status == "success":
+                self.finished[key] = result["item"]
+
+        return result
+
+    def close(self):
+        if self.fileobject is not None:
+            self.fileobject.close()
+            self.fileobject = None
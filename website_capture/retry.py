@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Retry policy
+============
+
+Page jobs which fail from a transient error, like a page load timeout or a
+crashed browser, can be attempted again after a delay which grows
+exponentially with each attempt. A random part (jitter) is removed from each
+delay so workers which failed at the same time do not retry all together.
+
+Driver is recycled after an error, except after a timeout since driver is
+still responsive.
+"""
+import random
+from importlib import import_module
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from website_capture.exceptions import SettingsInvalidError
+
+ALLOWED_RETRY_OPTIONS = [
+    "max_attempts", "backoff", "max_backoff", "jitter", "exceptions",
+]
+
+# Default exceptions to retry, every driver errors
+RETRY_EXCEPTIONS = ["selenium.common.exceptions.WebDriverException"]
+
+# Exceptions which do not require a new driver
+RECOVERABLE_EXCEPTIONS = (TimeoutException,)
+
+
+def import_exception(path):
+    """
+    Import an exception class from its Python path.
+
+    Raises:
+        SettingsInvalidError: If path can not be imported or is not an
+            exception class.
+    """
+    module_path, _, name = path.rpartition(".")
+
+    try:
+        klass = getattr(import_module(module_path), name)
+    except (ImportError, AttributeError, ValueError) as e:
+        msg = "Unable to import retry exception '{}': {}".format(path, e)
+        raise SettingsInvalidError(msg)
+
+    if not isinstance(klass, type) or not issubclass(klass, BaseException):
+        msg = "Retry exception '{}' is not an exception class.".format(path)
+        raise SettingsInvalidError(msg)
+
+    return klass
+
+
+def validate_retry_options(options):
+    """
+    Validate retry options.
+
+    Raises:
+        SettingsInvalidError: If an option is invalid.
+    """
+    if not isinstance(options, dict):
+        msg = "Item 'retry' must be a dictionnary."
+        raise SettingsInvalidError(msg)
+
+    unknowed = sorted(set(options) - set(ALLOWED_RETRY_OPTIONS))
+    if unknowed:
+        msg = ("Unknowed 'retry' options '{}', they must be one of: "
+               "{}".format(", ".join(unknowed),
+                           ", ".join(ALLOWED_RETRY_OPTIONS)))
+        raise SettingsInvalidError(msg)
+
+    max_attempts = options.get("max_attempts", 1)
+    if (isinstance(max_attempts, bool) or not isinstance(max_attempts, int)
+            or max_attempts < 1):
+        msg = "Option 'retry.max_attempts' must be a positive integer."
+        raise SettingsInvalidError(msg)
+
+    for name in ["backoff", "max_backoff", "jitter"]:
+        value = options.get(name, 0)
+        if (isinstance(value, bool) or not isinstance(value, (int, float))
+                or value < 0):
+            msg = "Option 'retry.{}' must be a positive number.".format(name)
+            raise SettingsInvalidError(msg)
+
+    if options.get("jitter", 0) > 1:
+        msg = "Option 'retry.jitter' must be between 0 and 1."
+        raise SettingsInvalidError(msg)
+
+    exceptions = options.get("exceptions", RETRY_EXCEPTIONS)
+    if not isinstance(exceptions, list) or not all([
+        isinstance(item, str) for item in exceptions
+    ]):
+        msg = "Option 'retry.exceptions' must be a list of Python paths."
+        raise SettingsInvalidError(msg)
+
+
+class RetryPolicy(object):
+    """
+    Decide if a failed page job is attempted again and when.
+
+    Keyword Arguments:
+        max_attempts (int): Maximum number of attempts for a page job,
+            including the first one. Default is 1 for no retry.
+        backoff (float): Delay in seconds before the first retry, it is
+            doubled for each following retry. Default is 1.
+        max_backoff (float): Maximum delay in seconds before a retry.
+            Default is 30.
+        jitter (float): Maximum part of delay randomly removed, from 0 for
+            fixed delays to 1 for delays anywhere from zero to full delay.
+            Default is 0.5.
+        exceptions (list): Python paths of exception classes which can be
+            retried. Default to every driver errors.
+    """
+    def __init__(self, max_attempts=1, backoff=1, max_backoff=30, jitter=0.5,
+                 exceptions=None):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.exceptions = tuple([
+            import_exception(path)
+            for path in (RETRY_EXCEPTIONS if exceptions is None
+                         else exceptions)
+        ])
+
+    @property
+    def enabled(self):
+        return self.max_attempts > 1
+
+    def is_retryable(self, error):
+        return isinstance(error, self.exceptions)
+
+    def is_crash(self, error):
+        """
+        Return if driver should be recycled after given error.
+        """
+        return not isinstance(error, RECOVERABLE_EXCEPTIONS)
+
+    def is_handled(self, error):
+        """
+        Return if given error fails page job instead of stopping capture.
+        """
+        return isinstance(error, WebDriverException) or self.is_retryable(
+            error
+        )
+
+    def should_retry(self, error, attempt):
+        """
+        Return if page job should be attempted again after given failed
+        attempt number.
+        """
+        return attempt < self.max_attempts and self.is_retryable(error)
+
+    def get_delay(self, attempt):
+        """
+        Return delay in seconds before attempt following given failed attempt
+        number.
+        """
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+        return delay * (1 - self.jitter * random.random())
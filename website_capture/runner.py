@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent runner
+=================
+
+Run several interfaces at the same time instead of one after the other. Each
+interface runs from its own thread with its own workers and driver sessions,
+results from every interfaces are merged as soon as they are finished.
+
+Interfaces with the same caching proxy directory share a single proxy, so
+assets cached by an interface are served to the others and a single proxy
+manages cache size.
+"""
+import os
+import queue
+import threading
+
+# Internal statuses sent by interface threads
+INTERFACE_FINISHED = "finished"
+INTERFACE_FAILED = "failed"
+
+
+class ConcurrentRunner(object):
+    """
+    Run interfaces concurrently and merge their results.
+
+    Arguments:
+        interfaces (dict): Interface instances indexed on their name.
+    """
+    def __init__(self, interfaces):
+        self.interfaces = interfaces
+        self.proxies = []
+
+    def start_caching_proxies(self):
+        """
+        Start a caching proxy for each cache directory and share it with
+        every interfaces using this directory.
+
+        Proxy options are the ones from the first interface of a directory.
+        """
+        shared = {}
+
+        for interface in self.interfaces.values():
+            if not interface.proxy_cache:
+                continue
+
+            directory = os.path.abspath(interface.get_proxy_cache_dir())
+            if directory not in shared:
+                proxy = interface.get_caching_proxy().start()
+                shared[directory] = (proxy, [])
+                self.proxies.append(shared[directory])
+
+            proxy, users = shared[directory]
+            interface.shared_proxy = proxy
+            users.append(interface)
+
+    def stop_caching_proxies(self):
+        """
+        Stop shared caching proxies and add their statistics to run summary
+        under the class names of interfaces which used them.
+        """
+        for proxy, users in self.proxies:
+            stats = proxy.stop()
+            for interface in users:
+                interface.shared_proxy = None
+
+            users[0].log_proxy_stats(stats, key=", ".join(
+                [type(interface).__name__ for interface in users]
+            ))
+
+        self.proxies = []
+
+    def run_interface(self, name, pages, stream, results, stop):
+        """
+        Run an interface and send each of its results to the results queue
+        until it is finished or runner is stopped.
+        """
+        jobs = self.interfaces[name].iter_run(pages, stream=stream)
+
+        try:
+            for status, item in jobs:
+                results.put((name, status, item))
+                if stop.is_set():
+                    break
+        except Exception as e:
+            results.put((name, INTERFACE_FAILED, e))
+        finally:
+            # Close generator so interface closes its drivers, proxy, etc..
+            jobs.close()
+            results.put((name, INTERFACE_FINISHED, None))
+
+    def iter_run(self, pages, stream=False):
+        """
+        Proceed capture of every pages for every interfaces at the same time
+        and yield each result as soon as its page job is finished.
+
+        If an interface fails, other interfaces are stopped after their
+        current page job then its error is raised.
+
+        Arguments:
+            pages (iterable): Page items, every interfaces iterate on them
+                at the same time so it can not be a one time iterator.
+                ``website_capture.sources.PageDiscovery`` discovers pages
+                once for every interfaces.
+
+        Keyword Arguments:
+            stream (bool): Given to interfaces, see
+                ``BaseInterface.iter_run``. Default is False.
+
+        Yields:
+            tuple: Interface name, result status and item.
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        self.start_caching_proxies()
+        threads = [
+            threading.Thread(
+                target=self.run_interface,
+                args=(name, pages, stream, results, stop),
+                daemon=True,
+            )
+            for name in self.interfaces
+        ]
+        for thread in threads:
+            thread.start()
+
+        running = len(threads)
+        error = None
+        try:
+            while running:
+                name, status, item = results.get()
+                if status == INTERFACE_FINISHED:
+                    running -= 1
+                elif status == INTERFACE_FAILED:
+                    error = error or item
+                    stop.set()
+                elif error is None:
+                    yield name, status, item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.stop_caching_proxies()
+
+        if error is not None:
+            raise error
+
+    def run(self, pages, stream=False):
+        """
+        Proceed capture of every pages for every interfaces at the same time.
+
+        Returns:
+            dict: Built payloads and logs of failed or skipped jobs for each
+            interface name.
+        """
+        output = {
+            name: ([], []) for name in self.interfaces
+        }
+
+        for name, status, item in self.iter_run(pages, stream=stream):
+            built, error_logs = output[name]
+            if status == "success":
+                built.append(item)
+            else:
+                error_logs.append(item)
+
+        return output
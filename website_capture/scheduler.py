@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Job scheduler
+=============
+
+Order job batches by page priority and stop capture once the time budget of
+a run is exhausted.
+
+Batches are kept in a heap so the ones with the highest page ``priority``
+are given first to workers, batches with the same priority keep their
+scheduling order. Once the time budget is exhausted, jobs which have not
+started yet are skipped and recorded as skipped results.
+"""
+import heapq
+import itertools
+import time
+
+from website_capture.exceptions import PageConfigError
+
+SKIPPED_MESSAGE = "Skipped since time budget is exhausted"
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def get_page_priority(page):
+    """
+    Return page priority, default to 0.
+
+    Raises:
+        PageConfigError: If priority is not a number.
+    """
+    priority = page.get("priority", 0)
+    if not is_number(priority):
+        msg = "Page '{}' priority must be a number.".format(page.get("name"))
+        raise PageConfigError(msg)
+
+    return priority
+
+
+def get_page_timeout(page, default=None):
+    """
+    Return page timeout in seconds from page ``timeout`` option or given
+    default one.
+
+    Raises:
+        PageConfigError: If timeout is not a positive number.
+    """
+    timeout = page.get("timeout", default)
+    if timeout is not None and (not is_number(timeout) or timeout <= 0):
+        msg = "Page '{}' timeout must be a positive number.".format(
+            page.get("name")
+        )
+        raise PageConfigError(msg)
+
+    return timeout
+
+
+class JobScheduler(object):
+    """
+    Priority queue of job batches with an optional time budget.
+
+    Keyword Arguments:
+        time_budget (float): Time in seconds from scheduler start after which
+            no job should start anymore. Default is None for no budget.
+        clock (callable): Function returning current time in seconds.
+            Default is ``time.monotonic``.
+    """
+    def __init__(self, time_budget=None, clock=time.monotonic):
+        self.time_budget = time_budget
+        self.clock = clock
+        self.started = None
+        self.heap = []
+        self.counter = itertools.count()
+
+    def start(self):
+        """
+        Start time budget countdown.
+        """
+        self.started = self.clock()
+
+        return self
+
+    @property
+    def remaining(self):
+        """
+        Remaining time budget in seconds, None if there is no budget.
+        """
+        if self.time_budget is None:
+            return None
+
+        elapsed = 0 if self.started is None else self.clock() - self.started
+
+        return max(self.time_budget - elapsed, 0)
+
+    @property
+    def is_expired(self):
+        return self.remaining == 0
+
+    def push(self, batch):
+        """
+        Add a batch of ``(size, page)`` jobs, its priority is the highest one
+        from its pages.
+        """
+        priority = max([get_page_priority(page) for size, page in batch])
+
+        heapq.heappush(self.heap, (-priority, next(self.counter), batch))
+
+    def extend(self, batches):
+        for batch in batches:
+            self.push(batch)
+
+        return self
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        """
+        Pop every batches by priority.
+        """
+        while self.heap:
+            yield heapq.heappop(self.heap)[2]
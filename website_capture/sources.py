@@ -0,0 +1,612 @@
+# -*- coding: utf-8 -*-
+"""
+Page sources
+============
+
+Discover pages to capture from sources instead of listing them by hand:
+
+* ``sitemap`` source reads a sitemap or a sitemap index, from an URL or a
+  file, possibly compressed with gzip. Sitemaps are parsed as a stream so
+  pages are given as soon as they are read;
+* ``crawl`` source follows links from a start page to pages from the same
+  origin, within a maximum number of requests and a maximum link depth.
+
+Discovered URLs are filtered with include and exclude patterns using the same
+wildcard syntax than blocked URL patterns, then turned to page items with
+source default ``sizes`` and ``tasks``. An URL is only discovered once for
+every sources.
+
+Discovery runs in a background thread while pages are captured.
+"""
+import fnmatch
+import gzip
+import hashlib
+import io
+import logging
+import re
+import threading
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ElementTree
+from collections import deque
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+from website_capture.exceptions import SettingsInvalidError
+from website_capture.pages import PageRecord
+
+SOURCE_KINDS = ["sitemap", "crawl"]
+
+ALLOWED_SOURCE_OPTIONS = SOURCE_KINDS + [
+    "include", "exclude", "sizes", "tasks", "max_pages", "max_depth",
+]
+
+# Default bounds of a crawl source
+CRAWL_MAX_PAGES = 100
+CRAWL_MAX_DEPTH = 2
+
+# Maximum number of sitemaps read from a sitemap index source
+SITEMAP_MAX_FILES = 1000
+
+# Maximum size of an HTML document read to find its links
+CRAWL_MAX_DOCUMENT_SIZE = 5 * 1024 * 1024
+
+SOURCE_TIMEOUT = 30
+
+# Number of discovered pages waiting to be captured before discovery pauses
+DISCOVERY_QUEUE_SIZE = 1000
+
+SOURCE_USER_AGENT = "py-website-capture"
+
+
+def validate_source(source, index):
+    """
+    Validate a source item.
+
+    Arguments:
+        source (object): Source item to validate.
+        index (int): Source position in ``sources`` item for error messages.
+
+    Raises:
+        SettingsInvalidError: If source is invalid.
+    """
+    if not isinstance(source, dict):
+        msg = "Source #{} must be a dictionnary.".format(index)
+        raise SettingsInvalidError(msg)
+
+    kinds = [name for name in SOURCE_KINDS if name in source]
+    if len(kinds) != 1:
+        msg = "Source #{} must have exactly one of these items: {}".format(
+            index, ", ".join(SOURCE_KINDS)
+        )
+        raise SettingsInvalidError(msg)
+
+    unknowed = sorted(set(source) - set(ALLOWED_SOURCE_OPTIONS))
+    if unknowed:
+        msg = ("Unknowed options '{}' for source #{}, they must be one of: "
+               "{}").format(", ".join(unknowed), index,
+                            ", ".join(ALLOWED_SOURCE_OPTIONS))
+        raise SettingsInvalidError(msg)
+
+    for name in ["include", "exclude", "tasks"]:
+        value = source.get(name, [])
+        if not isinstance(value, list) or not all([
+            isinstance(item, str) for item in value
+        ]):
+            msg = "Option '{}' of source #{} must be a list of strings."
+            raise SettingsInvalidError(msg.format(name, index))
+
+    sizes = source.get("sizes")
+    if sizes is not None and (
+        not isinstance(sizes, list)
+        or not all([
+            isinstance(size, (list, tuple)) and len(size) == 2
+            for size in sizes
+        ])
+    ):
+        msg = ("Option 'sizes' of source #{} must be a list of width and "
+               "height pairs.").format(index)
+        raise SettingsInvalidError(msg)
+
+    for name in ["max_pages", "max_depth"]:
+        value = source.get(name)
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, int)
+            or value < 0
+        ):
+            msg = "Option '{}' of source #{} must be a positive integer."
+            raise SettingsInvalidError(msg.format(name, index))
+
+
+def is_url(location):
+    return urlsplit(location).scheme in ("http", "https", "file")
+
+
+def normalize_url(url):
+    """
+    Return URL without fragment and with lowercase scheme and host, so
+    equivalent URLs are equal.
+    """
+    parts = urlsplit(urldefrag(url)[0])
+
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or "/",
+        parts.query,
+        "",
+    ))
+
+
+def get_page_name(url):
+    """
+    Return a page name from given URL, made of its host and path with a
+    short hash of the whole URL.
+
+    Host and path are simplified to file name characters, so different URLs
+    may have the same readable part (like ``/a/b`` and ``/a-b``), hash keeps
+    their names distinct.
+    """
+    parts = urlsplit(url)
+    name = re.sub(r"[^A-Za-z0-9.]+", "-", parts.netloc + parts.path)
+    name = name.strip("-")
+
+    return "{}-{}".format(
+        name,
+        hashlib.sha1(url.encode("utf-8")).hexdigest()[:8],
+    )
+
+
+class HashSet(object):
+    """
+    Compact set of strings which only keeps a 64 bits hash of each string.
+
+    Hash collisions are unlikely enough to ignore them for a few million
+    strings.
+    """
+    def __init__(self):
+        self.hashes = set()
+        self._lock = threading.Lock()
+
+    def get_hash(self, value):
+        return int.from_bytes(
+            hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(),
+            "big",
+        )
+
+    def add(self, value):
+        """
+        Add value to set.
+
+        Returns:
+            bool: False if value was already in set.
+        """
+        value_hash = self.get_hash(value)
+
+        with self._lock:
+            if value_hash in self.hashes:
+                return False
+            self.hashes.add(value_hash)
+
+        return True
+
+    def __contains__(self, value):
+        return self.get_hash(value) in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+class LinkParser(HTMLParser):
+    """
+    Collect link targets from an HTML document.
+    """
+    def __init__(self):
+        super().__init__()
+        self.base = None
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == "base" and attrs.get("href") and self.base is None:
+            self.base = attrs["href"]
+        elif tag in ("a", "area") and attrs.get("href"):
+            self.links.append(attrs["href"])
+
+
+class PageSource(object):
+    """
+    Base source, it turns discovered URLs to page items.
+
+    Arguments:
+        options (dict): Source item from configuration.
+
+    Keyword Arguments:
+        timeout (int): Timeout in seconds of every requests.
+    """
+    def __init__(self, options, timeout=SOURCE_TIMEOUT):
+        self.options = options
+        self.timeout = timeout
+        self.include = options.get("include") or []
+        self.exclude = options.get("exclude") or []
+        self.tasks = options.get("tasks")
+        self.sizes = None
+        if options.get("sizes"):
+            self.sizes = tuple([tuple(size) for size in options["sizes"]])
+        self.log = logging.getLogger("py-website-capture")
+
+    @property
+    def location(self):
+        raise NotImplementedError
+
+    def is_excluded(self, url):
+        return any([
+            fnmatch.fnmatchcase(url, pattern) for pattern in self.exclude
+        ])
+
+    def is_accepted(self, url):
+        """
+        Return if URL matches include patterns, if any, and none of exclude
+        patterns.
+        """
+        if self.include and not any([
+            fnmatch.fnmatchcase(url, pattern) for pattern in self.include
+        ]):
+            return False
+
+        return not self.is_excluded(url)
+
+    def get_page(self, url):
+        """
+        Return page item for given URL.
+        """
+        options = {}
+        if self.tasks is not None:
+            options["tasks"] = self.tasks
+
+        return PageRecord(get_page_name(url), url, sizes=self.sizes,
+                          options=options)
+
+    def open(self, location):
+        """
+        Open a file path or an URL and return a binary file object.
+        """
+        if not is_url(location):
+            return io.open(location, "rb")
+
+        request = urllib.request.Request(location, headers={
+            "User-Agent": SOURCE_USER_AGENT,
+        })
+
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def iter_urls(self):
+        """
+        Yield every discovered URLs, implemented by source kinds.
+        """
+        raise NotImplementedError
+
+    def iter_pages(self, seen):
+        """
+        Yield page items for every accepted URLs which have not been seen
+        yet.
+
+        Arguments:
+            seen (HashSet): URLs already discovered.
+        """
+        for url in self.iter_urls():
+            url = normalize_url(url)
+            if self.is_accepted(url) and seen.add(url):
+                yield self.get_page(url)
+
+
+class SitemapSource(PageSource):
+    """
+    Discover pages from a sitemap or a sitemap index.
+    """
+    @property
+    def location(self):
+        return self.options["sitemap"]
+
+    def open(self, location):
+        """
+        Open sitemap, it is uncompressed if it starts with gzip magic bytes.
+        """
+        fileobj = io.BufferedReader(super().open(location))
+
+        if fileobj.peek(2)[:2] == b"\x1f\x8b":
+            return gzip.GzipFile(fileobj=fileobj)
+
+        return fileobj
+
+    def parse(self, location):
+        """
+        Parse a sitemap as a stream.
+
+        Yields:
+            tuple: Item kind, either ``url`` for a page or ``sitemap`` for a
+            sitemap from a sitemap index, and its location.
+        """
+        with self.open(location) as fp:
+            for event, element in ElementTree.iterparse(fp, events=("end",)):
+                kind = element.tag.rsplit("}", 1)[-1]
+                if kind not in ("url", "sitemap"):
+                    continue
+
+                for child in element:
+                    if child.tag.rsplit("}", 1)[-1] == "loc" and child.text:
+                        yield kind, child.text.strip()
+                        break
+
+                # Free parsed items from memory
+                element.clear()
+
+    def iter_urls(self):
+        sitemaps = deque([self.location])
+        files = 0
+
+        while sitemaps and files < SITEMAP_MAX_FILES:
+            location = sitemaps.popleft()
+            files += 1
+
+            try:
+                for kind, loc in self.parse(location):
+                    if kind == "sitemap":
+                        sitemaps.append(loc)
+                    else:
+                        yield loc
+            except (OSError, ValueError, urllib.error.URLError,
+                    ElementTree.ParseError) as e:
+                self.log.warning("🔹 Unable to read sitemap {}: {}".format(
+                    location, e
+                ))
+
+
+class CrawlSource(PageSource):
+    """
+    Discover pages by following links from a start page, only to pages from
+    the same origin.
+
+    Every fetched document counts for ``max_pages`` even if it is not an
+    HTML document or it is not accepted by patterns, so a crawl always ends
+    after a known number of requests.
+    """
+    @property
+    def location(self):
+        return self.options["crawl"]
+
+    def get_origin(self, url):
+        parts = urlsplit(url)
+        return (parts.scheme.lower(), parts.netloc.lower())
+
+    def fetch(self, url):
+        """
+        Fetch an HTML document.
+
+        Returns:
+            tuple: Final URL after redirections and document content, or None
+            if document is not HTML or can not be fetched.
+        """
+        try:
+            with self.open(url) as response:
+                content_type = response.headers.get("Content-Type", "")
+                if "html" not in content_type:
+                    return None
+                charset = response.headers.get_content_charset() or "utf-8"
+                content = response.read(CRAWL_MAX_DOCUMENT_SIZE)
+                return response.geturl(), content.decode(charset, "replace")
+        except (OSError, ValueError, urllib.error.URLError) as e:
+            self.log.warning("🔹 Unable to crawl {}: {}".format(url, e))
+            return None
+
+    def get_links(self, url, content):
+        parser = LinkParser()
+        parser.feed(content)
+        base = urljoin(url, parser.base) if parser.base else url
+
+        return [urljoin(base, href.strip()) for href in parser.links]
+
+    def iter_urls(self):
+        max_pages = self.options.get("max_pages", CRAWL_MAX_PAGES)
+        max_depth = self.options.get("max_depth", CRAWL_MAX_DEPTH)
+
+        start = normalize_url(self.location)
+        origin = self.get_origin(start)
+        queued = HashSet()
+        queued.add(start)
+        pending = deque([(start, 0)])
+        fetched = 0
+
+        while pending and fetched < max_pages:
+            url, depth = pending.popleft()
+            fetched += 1
+
+            document = self.fetch(url)
+            if document is None:
+                continue
+
+            final_url, content = document
+            if self.get_origin(final_url) != origin:
+                continue
+
+            yield final_url
+
+            if depth >= max_depth:
+                continue
+
+            for link in self.get_links(final_url, content):
+                link = normalize_url(link)
+                if (
+                    self.get_origin(link) == origin
+                    and not self.is_excluded(link)
+                    and queued.add(link)
+                ):
+                    pending.append((link, depth + 1))
+
+
+SOURCE_CLASSES = {
+    "sitemap": SitemapSource,
+    "crawl": CrawlSource,
+}
+
+
+def get_source(options, timeout=SOURCE_TIMEOUT):
+    """
+    Return source object for given source item.
+    """
+    for kind in SOURCE_KINDS:
+        if kind in options:
+            return SOURCE_CLASSES[kind](options, timeout=timeout)
+
+
+class PageDiscovery(object):
+    """
+    Iterable of page items discovered from sources.
+
+    First iteration runs discovery in a background thread and yields pages
+    as soon as they are discovered, so capture starts while discovery is
+    still running. Discovered pages are kept as compact records and next
+    iterations replay them without discovering them again.
+
+    Iterations at the same time from several threads (like interfaces from
+    concurrent runner) share the same discovery, each one yields every
+    discovered pages. Discovery is stopped once every iterations have been
+    closed before its end, then next iteration starts it again.
+
+    Arguments:
+        sources (list): Source items from configuration.
+
+    Keyword Arguments:
+        timeout (int): Timeout in seconds of every requests.
+    """
+    def __init__(self, sources, timeout=SOURCE_TIMEOUT):
+        self.sources = [get_source(item, timeout=timeout) for item in sources]
+        self.pages = None
+        self.seen = None
+        self.log = logging.getLogger("py-website-capture")
+        self._lock = threading.Condition()
+        self._discovered = None
+        self._consumed = 0
+        self._finished = False
+        self._error = None
+        self._readers = 0
+        self._stop = None
+        self._thread = None
+
+    def discover(self, discovered, seen, stop):
+        """
+        Append every discovered pages to given list, then mark discovery as
+        finished or store its exception if it failed.
+
+        Discovery pauses while too many discovered pages have not been
+        iterated yet. A stopped discovery does not change anything anymore
+        since another one may have been started.
+        """
+        try:
+            for source in self.sources:
+                self.log.info("🔹 Discovering pages from {}: {}".format(
+                    type(source).__name__, source.location
+                ))
+                for page in source.iter_pages(seen):
+                    with self._lock:
+                        while (
+                            not stop.is_set()
+                            and len(discovered) - self._consumed
+                            >= DISCOVERY_QUEUE_SIZE
+                        ):
+                            self._lock.wait(0.1)
+                        if stop.is_set():
+                            return
+                        discovered.append(page)
+                        self._lock.notify_all()
+        except Exception as e:
+            with self._lock:
+                if not stop.is_set():
+                    self._error = e
+                    self._lock.notify_all()
+        else:
+            with self._lock:
+                if not stop.is_set():
+                    self._finished = True
+                    self._lock.notify_all()
+
+    def start_discovery(self):
+        """
+        Start discovery thread, lock must be held by caller.
+        """
+        self.seen = HashSet()
+        self._discovered = []
+        self._consumed = 0
+        self._finished = False
+        self._error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self.discover,
+            args=(self._discovered, self.seen, self._stop),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def release_discovery(self):
+        """
+        Release discovery from a finished or closed iteration. Last one keeps
+        discovered pages if discovery has finished, else it stops discovery.
+        """
+        with self._lock:
+            self._readers -= 1
+            if self._readers:
+                return
+
+            thread = self._thread
+            if self._finished:
+                self.pages = self._discovered
+                self.log.info("🔹 Discovered {} pages".format(
+                    len(self.pages)
+                ))
+            else:
+                self._stop.set()
+                self._lock.notify_all()
+            self._thread = None
+            self._discovered = None
+
+        thread.join()
+
+    def __iter__(self):
+        with self._lock:
+            pages = self.pages
+            if pages is None:
+                if self._thread is None:
+                    self.start_discovery()
+                discovered = self._discovered
+                self._readers += 1
+
+        if pages is not None:
+            yield from pages
+            return
+
+        index = 0
+        try:
+            while True:
+                with self._lock:
+                    while (
+                        index == len(discovered)
+                        and not self._finished
+                        and self._error is None
+                    ):
+                        self._lock.wait()
+
+                    if index == len(discovered):
+                        if self._error is not None:
+                            raise self._error
+                        break
+
+                    page = discovered[index]
+                    index += 1
+                    if index > self._consumed:
+                        self._consumed = index
+                        self._lock.notify_all()
+
+                yield page
+        finally:
+            self.release_discovery()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Timings
+=======
+
+Measure how long each phase of a page job takes and aggregate these timings
+over a whole run.
+"""
+import contextlib
+import io
+import json
+import math
+import os
+import threading
+import time
+
+RUN_SUMMARY_FILENAME = "summary.json"
+
+# Percentiles computed for each phase in run summary
+SUMMARY_PERCENTILES = [50, 95]
+
+
+def percentile(values, rank):
+    """
+    Return percentile of given values with the nearest rank method.
+
+    Arguments:
+        values (list): Sorted numbers.
+        rank (int): Percentile rank from 0 to 100.
+
+    Returns:
+        float: Percentile value or None if there is no value.
+    """
+    if not values:
+        return None
+
+    index = max(math.ceil(rank / 100 * len(values)) - 1, 0)
+
+    return values[index]
+
+
+class PhaseTimer(object):
+    """
+    Record elapsed time of named phases.
+
+    A phase which is timed multiple times accumulates its elapsed times.
+    """
+    def __init__(self):
+        self.timings = {}
+
+    def add(self, name, elapsed):
+        self.timings[name] = self.timings.get(name, 0) + elapsed
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager to time its block as given phase name, block is timed
+        even if it raises an exception.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(name, time.perf_counter() - start_time)
+
+
+def time_phase(config, name):
+    """
+    Return a context manager which times its block as a phase of the page job
+    from given page configuration.
+
+    Nothing is timed if configuration has no ``timer`` item, like for a page
+    configuration used out of a page job.
+    """
+    timer = config.get("timer")
+    if timer is None:
+        return contextlib.nullcontext()
+
+    return timer.phase(name)
+
+
+class RunSummary(object):
+    """
+    Aggregate page job timings from a run and write them to a JSON file.
+
+    Timings are collected for each interface, summary contains the number of
+    timed page jobs and the percentiles and maximum of each phase.
+
+    Arguments:
+        path (string): Summary file path.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.timings = {}
+        self.sections = {}
+        self._lock = threading.Lock()
+
+    def add(self, interface, timings):
+        """
+        Add timings of a page job.
+
+        Arguments:
+            interface (string): Interface name.
+            timings (dict): Elapsed time in seconds for each phase.
+        """
+        with self._lock:
+            phases = self.timings.setdefault(interface, {})
+            for name, elapsed in timings.items():
+                phases.setdefault(name, []).append(elapsed)
+
+    def update_section(self, name, content, key=None):
+        """
+        Set a section of additional data to write in summary.
+
+        Keyword Arguments:
+            key (string): If given, content is set as this item of section
+                instead of replacing the whole section.
+        """
+        with self._lock:
+            if key is None:
+                self.sections[name] = content
+            else:
+                self.sections.setdefault(name, {})[key] = content
+
+    def get_phase_summary(self, values):
+        values = sorted(values)
+
+        summary = {
+            "p{}".format(rank): percentile(values, rank)
+            for rank in SUMMARY_PERCENTILES
+        }
+        summary["count"] = len(values)
+        summary["max"] = values[-1]
+
+        return summary
+
+    def summarize(self):
+        """
+        Return summary of every collected timings.
+
+        Returns:
+            dict: Summary with ``interfaces`` item where each interface has
+            the number of timed ``pages`` and a summary for each of its
+            ``phases``, plus every additional sections.
+        """
+        with self._lock:
+            timings = {
+                interface: {
+                    name: list(values) for name, values in phases.items()
+                }
+                for interface, phases in self.timings.items()
+            }
+            summary = dict(self.sections)
+
+        summary["interfaces"] = {
+            interface: {
+                "pages": len(phases.get("total", [])),
+                "phases": {
+                    name: self.get_phase_summary(values)
+                    for name, values in phases.items()
+                },
+            }
+            for interface, phases in timings.items()
+        }
+
+        return summary
+
+    def save(self):
+        """
+        Write summary to its file.
+        """
+        summary = self.summarize()
+
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+
+        tmp_path = "{}.tmp".format(self.path)
+        with io.open(tmp_path, "w") as fp:
+            json.dump(summary, fp, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+        return summary